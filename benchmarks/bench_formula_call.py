@@ -0,0 +1,65 @@
+"""
+Benchmark: per-call cost of a formula, through the namespace vs. compiled.
+
+Each formula is evaluated repeatedly against a fully calculated model, once
+with the regular ModelNamespace dispatch and once compiled
+(``compile_formulas = True``), and the best per-call time is reported.
+
+Run from the repository root:
+
+    python benchmarks/bench_formula_call.py
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyproforma import FixedLine, FormulaLine, ProformaModel, ScalarLine  # noqa: E402
+from pyproforma.engine.model_namespace import ModelNamespace  # noqa: E402
+
+PERIODS = list(range(2025, 2035))
+NUMBER = 20_000
+
+
+class Bench(ProformaModel):
+    default_periods = PERIODS
+
+    tax_rate = ScalarLine(value=0.21)
+    revenue = FixedLine(values={p: 100.0 for p in PERIODS}, tags=["income"])
+    other = FixedLine(values={p: 5.0 for p in PERIODS}, tags=["income"])
+    costs = FixedLine(values={p: 60.0 for p in PERIODS})
+    simple = FormulaLine(lambda li, t: li.revenue[t] - li.costs[t])
+    scalar = FormulaLine(lambda li, t: li.revenue[t] * (1 - li.tax_rate))
+    lagged = FormulaLine(lambda li, t: li.revenue[t - 1] * 1.05, values={2025: 100.0})
+    tagged = FormulaLine(lambda li, t: li.tag["income"][t])
+    wide = FormulaLine(
+        lambda li, t: (li.revenue[t] + li.other[t] - li.costs[t]) * (1 - li.tax_rate)
+        + li.revenue[t - 1] * 0.0,
+        values={2025: 0.0},
+    )
+
+
+def per_call(line_item: FormulaLine, ns: ModelNamespace, period: int) -> float:
+    line_item.eval(ns, period)  # bind once outside the timing
+    timer = timeit.Timer(lambda: line_item.eval(ns, period))
+    return min(timer.repeat(repeat=5, number=NUMBER)) / NUMBER
+
+
+def main() -> None:
+    model = Bench()
+    plain = ModelNamespace(model._li, model._scalars)
+    compiled = ModelNamespace(model._li, model._scalars, compile_formulas=True)
+    period = PERIODS[-1]
+
+    print(f"{'formula':>8}  {'namespace (ns)':>14}  {'compiled (ns)':>13}  {'speedup':>8}")
+    for name in ("simple", "scalar", "lagged", "tagged", "wide"):
+        line_item = getattr(Bench, name)
+        base = per_call(line_item, plain, period)
+        fast = per_call(line_item, compiled, period)
+        print(f"{name:>8}  {base * 1e9:>14.0f}  {fast * 1e9:>13.0f}  {base / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Benchmark: a grid run vs. independent models for every scenario.
+
+A capital plan is swept over 20 growth rates x 20 cost ratios x 5 bond rates,
+2,000 scenarios. Revenue depends only on growth, operating costs on growth and
+the cost ratio, and the debt schedule only on the bond rate, so the grid run
+calculates each of them once per distinct combination and reuses it; only the
+lines that read every input are calculated per scenario. The baseline
+instantiates the model once per scenario. Both produce identical values.
+
+Run from the repository root:
+
+    python benchmarks/bench_grid.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyproforma import (  # noqa: E402
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    create_debt_lines,
+)
+from pyproforma.scenarios import GridRunner, grid_scenarios  # noqa: E402
+
+PERIODS = list(range(2025, 2045))
+
+
+class CapitalPlan(ProformaModel):
+    default_periods = PERIODS
+
+    growth = ScalarInputLine(default=0.03)
+    cost_ratio = ScalarInputLine(default=0.6)
+    bond_rate = ScalarInputLine(default=0.045)
+    bond_term = ScalarLine(value=20)
+    borrowing = InputLine(default={p: 5e7 if p % 5 == 0 else 0.0 for p in PERIODS})
+
+    revenue = FormulaLine(lambda li, t: li.revenue[t - 1] * (1 + li.growth), values={2025: 1e8})
+    operating_costs = FormulaLine(lambda li, t: li.revenue[t] * li.cost_ratio)
+    net_revenue = FormulaLine(lambda li, t: li.revenue[t] - li.operating_costs[t])
+    principal, interest = create_debt_lines(
+        par_amounts="borrowing", interest_rate="bond_rate", term="bond_term"
+    )
+    debt_service = FormulaLine(lambda li, t: li.principal[t] + li.interest[t])
+    dscr = FormulaLine(
+        lambda li, t: li.net_revenue[t] / li.debt_service[t] if li.debt_service[t] else 0.0
+    )
+    cash = FormulaLine(
+        lambda li, t: li.cash[t - 1] + li.net_revenue[t] + li.borrowing[t] - li.debt_service[t],
+        values={2025: 0.0},
+    )
+
+
+def scenarios():
+    return grid_scenarios(
+        growth=[0.01 + 0.002 * i for i in range(20)],
+        cost_ratio=[0.5 + 0.01 * i for i in range(20)],
+        bond_rate=[0.03 + 0.005 * i for i in range(5)],
+    )
+
+
+def best_time(func, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    runner = GridRunner(CapitalPlan)
+    for i, (model, scenario) in enumerate(zip(runner.run(scenarios()), scenarios())):
+        if i % 97 == 0:
+            expected = CapitalPlan(**scenario)
+            for name in CapitalPlan._line_item_names:
+                assert model[name].values == expected[name].values, (scenario, name)
+    print(f"{runner.scenarios} scenarios, {len(PERIODS)} periods: {runner}")
+
+    grid = best_time(lambda: [m.dscr[2044] for m in GridRunner(CapitalPlan).run(scenarios())])
+    independent = best_time(lambda: [CapitalPlan(**s).dscr[2044] for s in scenarios()])
+    print(f"{'independent models':>20}: {independent:.3f}s")
+    print(f"{'grid run':>20}: {grid:.3f}s  ({independent / grid:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,77 @@
+"""
+Benchmark: model instantiation time vs. line item count.
+
+Compares the planned engine (``calculate_line_items``) with the original
+retry-loop engine (``_calculate_with_retry``) on synthetic models whose
+formulas are declared in reverse dependency order — the worst case for the
+retry loop, and the common case for models organised top-down (totals first).
+
+The retry loop is quadratic in the item count, so the default sizes stop at
+500 items (under a minute). Pass other sizes to go further; 2000 items take
+several minutes:
+
+    python benchmarks/bench_instantiation.py
+    python benchmarks/bench_instantiation.py --sizes 1000 2000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyproforma import FixedLine, FormulaLine, ProformaModel  # noqa: E402
+from pyproforma.engine.calculation_engine import (  # noqa: E402
+    _calculate_with_retry,
+    calculate_line_items,
+)
+
+PERIODS = list(range(2025, 2035))
+SIZES = [50, 100, 250, 500]
+
+
+def build_model_class(n_items: int) -> type:
+    """A chain of n_items formulas, each growing the next, declared top-down."""
+    attrs = {}
+    for i in reversed(range(1, n_items)):
+        attrs[f"item_{i}"] = FormulaLine(
+            formula=(lambda prev: lambda li, t: getattr(li, prev)[t] * 1.01)(f"item_{i - 1}"),
+            tags=["chain"] if i % 10 == 0 else None,
+        )
+    attrs["item_0"] = FixedLine(values={p: 100.0 for p in PERIODS})
+    attrs["chain_total"] = FormulaLine(formula=lambda li, t: li.tag["chain"][t])
+    return type(f"Chain{n_items}", (ProformaModel,), attrs)
+
+
+def time_engine(engine, model, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        engine(model, model._scalars, model.periods)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=SIZES, help="line item counts to time"
+    )
+    args = parser.parse_args()
+
+    print(f"{'items':>6}  {'retry (s)':>10}  {'planned (s)':>11}  {'speedup':>8}", flush=True)
+    for n_items in args.sizes:
+        # Each column is printed as soon as it is timed.
+        print(f"{n_items:>6}", end="", flush=True)
+        model_cls = build_model_class(n_items)
+        model = model_cls(periods=PERIODS)
+        repeat = 3 if n_items <= 250 else 1
+        retry = time_engine(_calculate_with_retry, model, repeat)
+        print(f"  {retry:>10.4f}", end="", flush=True)
+        planned = time_engine(calculate_line_items, model, repeat)
+        print(f"  {planned:>11.4f}  {retry / planned:>7.1f}x", flush=True)
+
+
+if __name__ == "__main__":
+    main()
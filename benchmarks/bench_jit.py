@@ -0,0 +1,112 @@
+"""
+Benchmark: batch evaluation with the NumPy backend vs. numba kernels.
+
+Evaluates an operating model (revenue growth, costs, tax and a running cash
+balance) for a growing number of scenarios. For the numba backend it reports the
+cold run, which generates and compiles the kernels, separately from warm runs,
+and a "cached" run in a fresh process, which loads the compiled kernels from the
+on-disk cache instead of compiling them again.
+
+Run from the repository root (requires numba):
+
+    python benchmarks/bench_jit.py
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyproforma import (  # noqa: E402
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+)
+
+PERIODS = list(range(2025, 2045))
+SCENARIO_COUNTS = [1_000, 10_000, 100_000]
+
+
+def build(backend: str) -> type:
+    start = PERIODS[0]
+
+    class Model(ProformaModel):
+        default_periods = PERIODS
+        batch_backend = backend
+
+        growth = ScalarInputLine(default=0.03)
+        cost_ratio = ScalarInputLine(default=0.6)
+        tax_rate = ScalarLine(value=0.21)
+        base_revenue = InputLine(default={p: 1000.0 for p in PERIODS})
+        revenue = FormulaLine(
+            lambda li, t: li.revenue[t - 1] * (1 + li.growth),
+            values={start: 1000.0},
+        )
+        other_income = FormulaLine(lambda li, t: li.base_revenue[t] * 0.02)
+        costs = FormulaLine(lambda li, t: li.revenue[t] * li.cost_ratio)
+        ebit = FormulaLine(lambda li, t: li.revenue[t] + li.other_income[t] - li.costs[t])
+        tax = FormulaLine(lambda li, t: max(li.ebit[t], 0) * li.tax_rate)
+        net = FormulaLine(lambda li, t: li.ebit[t] - li.tax[t])
+        cash = FormulaLine(lambda li, t: li.cash[t - 1] + li.net[t], values={start: 0.0})
+
+    return Model
+
+
+def inputs(size: int) -> list[dict]:
+    return [
+        {"growth": 0.01 + 0.04 * i / size, "cost_ratio": 0.5 + 0.2 * i / size}
+        for i in range(size)
+    ]
+
+
+def timed(model_cls: type, scenarios: list[dict]) -> float:
+    start = time.perf_counter()
+    model_cls.evaluate_batch(scenarios)
+    return time.perf_counter() - start
+
+
+def cached_run() -> None:
+    """Time one evaluation in this (fresh) process, for the parent to report."""
+    print(timed(build("numba"), inputs(SCENARIO_COUNTS[0])))
+
+
+def main() -> None:
+    cache_dir = tempfile.mkdtemp(prefix="pyproforma-bench-")
+    os.environ["PYPROFORMA_CACHE_DIR"] = cache_dir
+
+    cold = timed(build("numba"), inputs(SCENARIO_COUNTS[0]))
+    cached = float(
+        subprocess.run(
+            [sys.executable, __file__, "--cached"],
+            capture_output=True,
+            text=True,
+            check=True,
+            env=os.environ,
+        ).stdout
+    )
+    print(f"numba cold compile + run ({SCENARIO_COUNTS[0]:,} scenarios): {cold:.3f} s")
+    print(f"numba new process, kernels from disk cache:        {cached:.3f} s")
+    print()
+    print(f"{'scenarios':>10}  {'numpy (s)':>10}  {'numba warm (s)':>14}  {'speedup':>8}")
+    numpy_model, numba_model = build("numpy"), build("numba")
+    for size in SCENARIO_COUNTS:
+        scenarios = inputs(size)
+        numpy_time = min(timed(numpy_model, scenarios) for _ in range(3))
+        numba_time = min(timed(numba_model, scenarios) for _ in range(3))
+        print(
+            f"{size:>10,}  {numpy_time:>10.4f}  {numba_time:>14.4f}  "
+            f"{numpy_time / numba_time:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    if "--cached" in sys.argv:
+        cached_run()
+    else:
+        main()
@@ -0,0 +1,99 @@
+"""
+Benchmark: generated per-class namespace vs. the generic ModelNamespace.
+
+Times ``calculate_line_items`` on the water utility example with each model
+class's generated namespace (slots bound to the value store) and with the
+generic ``ModelNamespace.__getattr__`` dispatch. The example is scaled up from
+its six-year plan to longer horizons by repeating its fixed schedules (volume
+growth, capital spending, existing debt service, new issues) and default rate
+increases, and each horizon is run over many inflation scenarios.
+
+Run from the repository root:
+
+    python benchmarks/bench_namespace.py
+"""
+
+import copy
+import importlib.util
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pyproforma import FixedLine, InputLine, ProformaModel  # noqa: E402
+from pyproforma.engine.calculation_engine import calculate_line_items  # noqa: E402
+from pyproforma.engine.model_namespace import ModelNamespace  # noqa: E402
+from pyproforma.specs.line_item import LineItem  # noqa: E402
+
+YEARS = [6, 30, 120]
+SCENARIOS = 100
+
+
+def load_water_utility() -> type:
+    path = ROOT / "examples" / "water_utility" / "model.py"
+    spec = importlib.util.spec_from_file_location("water_utility_model", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.WaterUtilityModel
+
+
+def _repeat(values: dict, periods: list[int]) -> dict:
+    """Extend a schedule over periods by repeating its periods in order."""
+    keys = sorted(values)
+    return {p: values[keys[(p - keys[0]) % len(keys)]] for p in periods if p >= keys[0]}
+
+
+def scale_up(model_cls: type, years: int) -> type:
+    """A copy of model_cls whose schedules cover ``years`` periods."""
+    start = model_cls.default_periods[0]
+    periods = list(range(start, start + years))
+    attrs = {"default_periods": periods}
+    for name, item in vars(model_cls).items():
+        if not isinstance(item, LineItem):
+            continue
+        item = copy.copy(item)
+        if isinstance(item, FixedLine):
+            item.values = _repeat(item.values, periods)
+        elif isinstance(item, InputLine) and item.has_default:
+            item._default = _repeat(item.default, periods)
+        attrs[name] = item
+    return type(f"{model_cls.__name__}{years}", (ProformaModel,), attrs)
+
+
+def time_scenarios(models: list, repeat: int = 3) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for model in models:
+            model._debt_calculators = model._new_debt_calculators()
+            calculate_line_items(model, model._scalars, model.periods)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    water_utility = load_water_utility()
+    print(f"{SCENARIOS} scenarios per horizon")
+    print(f"{'years':>5}  {'items':>5}  {'generic (s)':>11}  {'generated (s)':>13}  {'speedup':>8}")
+    for years in YEARS:
+        model_cls = scale_up(water_utility, years)
+        generated = model_cls._namespace_cls
+        models = [
+            model_cls(inflation_rate=0.02 + 0.02 * i / SCENARIOS) for i in range(SCENARIOS)
+        ]
+        model_cls._namespace_cls = ModelNamespace
+        try:
+            generic = time_scenarios(models)
+        finally:
+            model_cls._namespace_cls = generated
+        fast = time_scenarios(models)
+        items = len(model_cls._line_item_names)
+        print(
+            f"{years:>5}  {items:>5}  {generic:>11.4f}  {fast:>13.4f}  {generic / fast:>7.2f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
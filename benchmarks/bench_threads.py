@@ -0,0 +1,57 @@
+"""
+Benchmark: run_scenarios with a thread pool, by number of threads.
+
+Runs the water utility example model for 800 scenarios with 1, 2, 4 and 8
+threads and reports the speed-up over one thread. On a standard CPython build
+the GIL serialises the formulas, so expect little or none; on a free-threaded
+build (CPython 3.13t and later, e.g. ``python3.13t``) threads run in parallel.
+Every run is checked against the serial results.
+
+Run from the repository root:
+
+    python benchmarks/bench_threads.py
+"""
+
+import os
+import sys
+import sysconfig
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "examples" / "water_utility"))
+
+import numpy as np  # noqa: E402
+from model import WaterUtilityModel  # noqa: E402
+
+from pyproforma import run_scenarios  # noqa: E402
+
+SCENARIOS = [
+    {"inflation_rate": 0.01 + 0.0005 * (i % 60), "new_bond_rate": 0.03 + 0.001 * (i % 30)}
+    for i in range(800)
+]
+
+
+def main() -> None:
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    free_threaded = bool(sysconfig.get_config_var("Py_GIL_DISABLED"))
+    print(
+        f"Python {sys.version.split()[0]}, free-threaded build: {free_threaded}, "
+        f"GIL enabled: {gil}, {os.cpu_count()} CPUs"
+    )
+    serial = run_scenarios(WaterUtilityModel, SCENARIOS, workers=1, outputs=["dscr"])
+    base = None
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        results = run_scenarios(
+            WaterUtilityModel, SCENARIOS, workers=workers, outputs=["dscr"], executor="thread"
+        )
+        elapsed = time.perf_counter() - start
+        np.testing.assert_array_equal(results["dscr"], serial["dscr"])
+        base = base or elapsed
+        print(f"{workers:>2} threads: {elapsed:.3f}s  ({base / elapsed:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
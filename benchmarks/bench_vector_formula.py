@@ -0,0 +1,85 @@
+"""
+Benchmark: elementwise items as FormulaLine vs. VectorFormulaLine.
+
+Instantiates the same model, with its elementwise items written either as
+per-period FormulaLines or as whole-column VectorFormulaLines, over a growing
+number of periods. A running balance (a FormulaLine in both versions) keeps the
+two kinds of item interleaved, so the vector version also exercises staging.
+
+Run from the repository root:
+
+    python benchmarks/bench_vector_formula.py
+"""
+
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyproforma import (  # noqa: E402
+    FixedLine,
+    FormulaLine,
+    ProformaModel,
+    ScalarLine,
+    VectorFormulaLine,
+)
+
+PERIOD_COUNTS = [10, 100, 1000]
+
+
+def build(periods: list[int], vector: bool) -> type:
+    start = periods[0]
+
+    def column(vector_formula, scalar_formula, **kwargs):
+        if vector:
+            return VectorFormulaLine(vector_formula, **kwargs)
+        return FormulaLine(scalar_formula, **kwargs)
+
+    class Model(ProformaModel):
+        default_periods = periods
+
+        cost_ratio = ScalarLine(value=0.55)
+        tax_rate = ScalarLine(value=0.21)
+        revenue = FixedLine(values={p: 1000.0 + p - start for p in periods}, tags=["income"])
+        other = FixedLine(values={p: 50.0 for p in periods}, tags=["income"])
+        costs = column(
+            lambda li: li.revenue * li.cost_ratio,
+            lambda li, t: li.revenue[t] * li.cost_ratio,
+        )
+        ebit = column(
+            lambda li: li.tag["income"] - li.costs,
+            lambda li, t: li.tag["income"][t] - li.costs[t],
+        )
+        tax = column(lambda li: li.ebit * li.tax_rate, lambda li, t: li.ebit[t] * li.tax_rate)
+        net = column(lambda li: li.ebit - li.tax, lambda li, t: li.ebit[t] - li.tax[t])
+        cash = FormulaLine(lambda li, t: li.cash[t - 1] + li.net[t], values={start: 0.0})
+        cash_change = column(
+            lambda li: li.cash - li.cash.lag(1),
+            lambda li, t: li.cash[t] - li.cash[t - 1],
+            values={start: 0.0},
+        )
+
+    return Model
+
+
+def best_time(model_cls: type, repeat: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        model_cls()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> None:
+    print(f"{'periods':>8}  {'FormulaLine (s)':>15}  {'vector (s)':>10}  {'speedup':>8}")
+    for count in PERIOD_COUNTS:
+        periods = list(range(2000, 2000 + count))
+        scalar = best_time(build(periods, vector=False))
+        vector = best_time(build(periods, vector=True))
+        print(f"{count:>8}  {scalar:>15.4f}  {vector:>10.4f}  {scalar / vector:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,11 @@ PyProforma - A lightweight financial modeling framework.
 
 from .charts.chart_def import ChartDef
 from .compare import ModelComparison
-from .engine import LineItemValue, LineItemValues
+from .engine import Engine, IterativeSolver, LineItemValue, LineItemValues, register_engine
 from .proforma_model import ProformaModel
-from .results import LineItemResult, LineItemSelection, ScalarResult
+from .results import BatchResult, LineItemResult, LineItemSelection, ScalarResult
 from .results.tags_namespace import TagNamespace
+from .scenarios import ScenarioResults, run_scenarios
 from .specs import (
     DebtCalculator,
     DebtConfig,
@@ -19,6 +20,7 @@ from .specs import (
     LineItem,
     ScalarInputLine,
     ScalarLine,
+    VectorFormulaLine,
     create_debt_lines,
 )
 from .table import Format, NumberFormatSpec
@@ -53,6 +55,7 @@ __all__ = [
     "CumulativePercentChangeRow",
     "FixedLine",
     "FormulaLine",
+    "VectorFormulaLine",
     "InputLine",
     "ScalarLine",
     "ScalarInputLine",
@@ -65,8 +68,14 @@ __all__ = [
     "LineItem",
     "LineItemValues",
     "LineItemValue",
+    "Engine",
+    "register_engine",
+    "IterativeSolver",
     "LineItemResult",
     "LineItemSelection",
+    "BatchResult",
+    "run_scenarios",
+    "ScenarioResults",
     "TagNamespace",
     "Tables",
     "ModelComparison",
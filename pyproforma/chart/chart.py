@@ -18,7 +18,7 @@ from typing import TYPE_CHECKING, Literal
 if TYPE_CHECKING:
     from pyproforma.table.format_value import NumberFormatSpec
 
-ChartType = Literal["line", "bar", "stacked_bar"]
+ChartType = Literal["line", "bar", "stacked_bar", "tornado"]
 
 
 @dataclass
@@ -26,7 +26,7 @@ class ChartSeries:
     """A single data series for a chart."""
 
     label: str
-    x_values: list[int]
+    x_values: list[int | str]
     y_values: list[float]
     color: str | None = None
 
@@ -1,8 +1,8 @@
 """
 MatplotlibRenderer — renders a Chart to a matplotlib Figure.
 
-Called by Chart.show() and Chart.figure(). Supports line, bar, and stacked_bar
-chart types. Applies NumberFormatSpec to y-axis tick labels when set.
+Called by Chart.show() and Chart.figure(). Supports line, bar, stacked_bar and
+tornado chart types. Applies NumberFormatSpec to value-axis tick labels when set.
 """
 
 from __future__ import annotations
@@ -35,6 +35,8 @@ class MatplotlibRenderer(ChartRenderer):
             self._render_bar(ax, spec)
         elif spec.chart_type == "stacked_bar":
             self._render_stacked_bar(ax, spec)
+        elif spec.chart_type == "tornado":
+            self._render_tornado(ax, spec)
 
         self._apply_labels(ax, spec)
         self._apply_y_format(ax, spec)
@@ -91,6 +93,18 @@ class MatplotlibRenderer(ChartRenderer):
         ax.set_xticks(x)
         ax.set_xticklabels([str(v) for v in spec.series[0].x_values])
 
+    def _render_tornado(self, ax, spec: ChartSpec) -> None:
+        import numpy as np
+
+        # Categories run top to bottom; each series is drawn from zero.
+        y = np.arange(len(spec.series[0].x_values))[::-1]
+        for series in spec.series:
+            ax.barh(y, series.y_values, label=series.label, color=series.color)
+
+        ax.axvline(0, color="black", linewidth=0.8)
+        ax.set_yticks(y)
+        ax.set_yticklabels([str(v) for v in spec.series[0].x_values])
+
     # ------------------------------------------------------------------
     # Shared helpers
     # ------------------------------------------------------------------
@@ -112,4 +126,5 @@ class MatplotlibRenderer(ChartRenderer):
         from pyproforma.table.format_value import format_value
 
         fmt = spec.value_format
-        ax.yaxis.set_major_formatter(FuncFormatter(lambda val, _pos: format_value(val, fmt)))
+        axis = ax.xaxis if spec.chart_type == "tornado" else ax.yaxis
+        axis.set_major_formatter(FuncFormatter(lambda val, _pos: format_value(val, fmt)))
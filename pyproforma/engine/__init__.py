@@ -3,11 +3,18 @@ Calculation internals — engine and namespace.
 """
 
 from .calculation_engine import calculate_line_items
+from .engines import Engine, available_engines, get_engine, register_engine
+from .iterative_solver import IterativeSolver
 from .line_item_values import LineItemValue, LineItemValues
 from .model_namespace import ModelNamespace
 
 __all__ = [
     "calculate_line_items",
+    "Engine",
+    "register_engine",
+    "get_engine",
+    "available_engines",
+    "IterativeSolver",
     "LineItemValues",
     "LineItemValue",
     "ModelNamespace",
@@ -0,0 +1,249 @@
+"""
+Columnar, NumPy-backed storage for line item values.
+
+ArrayLineItemValues is a drop-in alternative to LineItemValues that keeps every
+period-indexed value in one dense float64 array of shape (items, periods),
+instead of a dict of boxed floats per line item. Select it on a model with
+``value_store = "array"`` (or ``"auto"`` to use it whenever numpy is installed).
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from .line_item_values import LineItemValue, LineItemValues
+from .numpy_support import import_numpy
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+
+class ArrayLineItemValues(LineItemValues):
+    """
+    LineItemValues stored in a dense float64 items × periods array.
+
+    Rows follow the order of ``names`` and columns the order of ``periods``.
+    Cells that have not been set yet are tracked in a boolean mask, so reading
+    them raises the same KeyError as the dict store. Values that are not real
+    numbers (e.g. ``None`` for a not-applicable InputLine period) are kept in a
+    small side table; numbers are stored as floats.
+
+    Attributes:
+        data (numpy.ndarray): The items × periods value array. Row views are
+            exposed zero-copy via ``array(name)``.
+
+    Examples:
+        >>> li = ArrayLineItemValues(periods=[2024, 2025], names=["revenue"])
+        >>> li.set("revenue", 2024, 100)
+        >>> li.revenue[2024]
+        100.0
+        >>> li.array("revenue")
+        array([100.,  nan])
+    """
+
+    def __init__(
+        self,
+        values: dict[str, dict[int, float]] | None = None,
+        periods: list[int] | None = None,
+        names: list[str] | None = None,
+        model: "ProformaModel | None" = None,
+    ):
+        np = import_numpy("the array value store")
+        if names is None:
+            names = list(values or {})
+        self._periods = list(periods or [])
+        self._names = set(names)
+        self._model = model
+        self._row = {name: i for i, name in enumerate(names)}
+        self._column = {period: j for j, period in enumerate(self._periods)}
+        self.data = np.full((len(names), len(self._periods)), np.nan, dtype=np.float64)
+        self._filled = np.zeros((len(names), len(self._periods)), dtype=bool)
+        self._objects: dict[tuple[int, int], Any] = {}
+        self._views: dict[str, ArrayLineItemValue] = {}
+
+        from .line_item_values import TagNamespace
+        self._tag_namespace = TagNamespace(model, self) if model else None
+        self._tag_sums: dict[tuple[str, int], float] = {}
+        self._evaluating: str | None = None
+
+        for name, period_values in (values or {}).items():
+            if name in self._row:
+                for period, value in period_values.items():
+                    self.set(name, period, value)
+
+    def get(
+        self, name: str, period: int | None = None
+    ) -> Any | dict[int, Any] | None:
+        """
+        Get the value(s) for a line item.
+
+        Returns a fresh ``{period: value}`` dict when period is None, or None
+        if the name or period is unknown or not yet set.
+        """
+        row = self._row.get(name)
+        if row is None:
+            return None
+        if period is None:
+            return {
+                p: self._read(row, col)
+                for p, col in self._column.items()
+                if self._filled[row, col]
+            }
+        col = self._column.get(period)
+        if col is None or not self._filled[row, col]:
+            return None
+        return self._read(row, col)
+
+    def set(self, name: str, period: int, value: Any) -> None:
+        """
+        Set the value for a line item at a specific period.
+
+        Raises:
+            ValueError: If name is not registered or period is not a model period.
+        """
+        row = self._row.get(name)
+        if row is None:
+            raise ValueError(
+                f"Cannot set value for unregistered line item '{name}'. "
+                f"Available line items: {', '.join(sorted(self._names))}"
+            )
+        col = self._column.get(period)
+        if col is None:
+            raise ValueError(
+                f"Cannot set value for '{name}' in period {period}: "
+                f"not one of the model periods {self._periods}"
+            )
+        self._write(row, col, value)
+        if self._tag_sums:
+            self._forget_tag_sums(name, period)
+
+    def _has(self, name: str, period: int) -> bool:
+        row = self._row.get(name)
+        col = self._column.get(period)
+        return row is not None and col is not None and bool(self._filled[row, col])
+
+    def _copy(self, model: "ProformaModel | None" = None) -> "ArrayLineItemValues":
+        """Return an independent copy of this store (see ``LineItemValues._copy``)."""
+        copied = ArrayLineItemValues(
+            periods=self._periods,
+            names=list(self._row),
+            model=self._model if model is None else model,
+        )
+        copied.data[...] = self.data
+        copied._filled[...] = self._filled
+        copied._objects = dict(self._objects)
+        copied._tag_sums = dict(self._tag_sums)
+        return copied
+
+    def adopt(self, other: LineItemValues, names: list[str]) -> None:
+        """Copy the values of names from another store (row copies when compatible)."""
+        if (
+            isinstance(other, ArrayLineItemValues)
+            and other._row == self._row
+            and other._periods == self._periods
+        ):
+            rows = [self._row[name] for name in names if name in self._row]
+            self.data[rows] = other.data[rows]
+            self._filled[rows] = other._filled[rows]
+            row_set = set(rows)
+            for key, value in other._objects.items():
+                if key[0] in row_set:
+                    self._objects[key] = value
+            self._tag_sums.clear()
+            return
+        for name in names:
+            for period, value in (other.get(name) or {}).items():
+                if period in self._column:
+                    self.set(name, period, value)
+
+    def array(self, name: str):
+        """
+        Return a read-only view of a line item's row — no copy is made.
+
+        Unset and non-numeric cells read as NaN.
+        """
+        row = self._row.get(name)
+        if row is None:
+            raise AttributeError(
+                f"Line item '{name}' is not registered. "
+                f"Available line items: {', '.join(sorted(self._names))}"
+            )
+        view = self.data[row]
+        view.flags.writeable = False
+        return view
+
+    def __getattr__(self, name: str) -> "ArrayLineItemValue":
+        if name.startswith("_"):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        view = self._views.get(name)
+        if view is not None:
+            return view
+        row = self._row.get(name)
+        if row is None:
+            raise AttributeError(
+                f"Line item '{name}' is not registered. "
+                f"Available line items: {', '.join(sorted(self._names))}"
+            )
+        view = ArrayLineItemValue(name, self, row)
+        self._views[name] = view
+        return view
+
+    def __repr__(self):
+        return (
+            f"ArrayLineItemValues(items={len(self._row)}, "
+            f"periods={self._periods!r})"
+        )
+
+    def _read(self, row: int, col: int) -> Any:
+        if self._objects and (row, col) in self._objects:
+            return self._objects[(row, col)]
+        return float(self.data[row, col])
+
+    def _write(self, row: int, col: int, value: Any) -> None:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            self.data[row, col] = value
+            if self._objects:
+                self._objects.pop((row, col), None)
+        else:
+            self.data[row, col] = float("nan")
+            self._objects[(row, col)] = value
+        self._filled[row, col] = True
+
+
+class ArrayLineItemValue(LineItemValue):
+    """
+    View of one row of an ArrayLineItemValues store.
+
+    Behaves like LineItemValue (``item[period]``, ``item.get(period)``) and adds
+    ``.array`` for zero-copy NumPy access to the whole row.
+    """
+
+    def __init__(self, name: str, store: ArrayLineItemValues, row: int):
+        self._name = name
+        self._store = store
+        self._row = row
+
+    @property
+    def _values(self) -> dict[int, Any]:
+        return self._store.get(self._name)
+
+    @property
+    def array(self):
+        """Read-only NumPy view of this line item's values across periods."""
+        return self._store.array(self._name)
+
+    def get(self, period: int, default: Any = None) -> Any | None:
+        col = self._store._column.get(period)
+        if col is None or not self._store._filled[self._row, col]:
+            return default
+        return self._store._read(self._row, col)
+
+    def __getitem__(self, period: int) -> Any:
+        store = self._store
+        col = store._column.get(period)
+        if col is None or not store._filled[self._row, col]:
+            raise KeyError(f"Period {period} not found for line item '{self._name}'")
+        return store._read(self._row, col)
+
+    def __repr__(self):
+        return f"ArrayLineItemValue(name={self._name!r}, values={self._values!r})"
@@ -0,0 +1,482 @@
+"""
+Batch engine — evaluates one ProformaModel class for N scenarios at once.
+
+Every line item holds an N-length NumPy array per period, so each formula is
+called once per period for the whole batch instead of once per scenario.
+Formulas that cannot run on arrays (typically because they branch on a value,
+``if li.x[t] > 0``) fall back to per-scenario evaluation for that line item.
+
+With ``batch_backend = "numba"`` on the model class, arithmetic FormulaLines
+run in compiled kernels instead (see ``jit_kernels``).
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from .calculation_engine import _calculate_single_line_item, _check_pending_error
+from .numpy_support import import_numpy
+
+if TYPE_CHECKING:
+    from pyproforma.results.batch_result import BatchResult
+
+
+def evaluate_batch(
+    model_cls: type,
+    inputs: list[dict],
+    periods: list[int] | None = None,
+) -> "BatchResult":
+    """
+    Evaluate a model class for a list of scenario input sets.
+
+    Args:
+        model_cls: The ProformaModel subclass to evaluate.
+        inputs: One dict of InputLine / ScalarInputLine kwargs per scenario, exactly
+            as they would be passed to ``model_cls(...)``.
+        periods: Periods to evaluate. Defaults to the class's ``default_periods``.
+
+    Returns:
+        BatchResult: Values for every scenario, line item and period.
+
+    Raises:
+        TypeError / ValueError: The same validation errors as instantiating the
+            model, for the first scenario that fails.
+    """
+    np = import_numpy("batch evaluation")
+    inputs = list(inputs)
+    if not inputs:
+        raise ValueError("evaluate_batch requires at least one scenario.")
+    if periods is None:
+        periods = getattr(model_cls, "default_periods", [])
+    periods = list(periods)
+
+    resolved = [model_cls._resolve_inputs(kwargs) for kwargs in inputs]
+    scalars = _stack_scalars([r[0] for r in resolved], np)
+    input_line_values = _stack_input_lines([r[1] for r in resolved], np)
+    return calculate_batch(model_cls, periods, scalars, input_line_values, len(inputs))
+
+
+def calculate_batch(
+    model_cls: type,
+    periods: list[int],
+    scalars: dict[str, Any],
+    input_line_values: dict[str, dict[int, Any]],
+    size: int,
+    backend: str | None = None,
+) -> "BatchResult":
+    """
+    Evaluate a model class for ``size`` scenarios given column-form inputs.
+
+    Lower-level than ``evaluate_batch``: inputs are already resolved, and each
+    scalar or InputLine period value is either a plain number (shared by every
+    scenario) or an N-length array. backend overrides the class's
+    ``batch_backend`` setting.
+    """
+    from pyproforma.results.batch_result import BatchResult
+
+    evaluation = _BatchEvaluation(
+        model_cls, periods, scalars, input_line_values, size, backend
+    )
+    kernels = evaluation.kernels
+    for index, stage in enumerate(evaluation.plan.stages):
+        if kernels is not None and _compiled_stage(kernels, stage):
+            # Every item compiles: one kernel call covers all periods.
+            if index == 0:
+                for period in periods:
+                    evaluation.set_fixed(period)
+            for _, names in kernels.segments(stage.ordered_items):
+                kernels.run(names, 0, len(periods))
+        else:
+            for period in periods:
+                evaluation.evaluate_period(period, stage, fixed=index == 0)
+        for name in stage.vector_items:
+            evaluation.evaluate_vector(name, periods)
+    return BatchResult(
+        model_cls,
+        periods,
+        evaluation.li,
+        scalars,
+        fallback_items=sorted(evaluation.fallback_items),
+        compiled_items=list(kernels.compiled_items) if kernels is not None else [],
+    )
+
+
+def _compiled_stage(kernels: Any, stage: Any) -> bool:
+    if stage.deferred_items:
+        return False
+    return all(compiled for compiled, _ in kernels.segments(stage.ordered_items))
+
+
+def _kernel_runner(
+    model_cls: type,
+    periods: list[int],
+    li: Any,
+    scalars: dict[str, Any],
+    input_line_values: dict[str, dict[int, Any]],
+    backend: str | None = None,
+) -> Any:
+    """Return a KernelRunner when backend (default: ``batch_backend``) selects numba."""
+    from .jit_kernels import numba_available
+
+    if backend is None:
+        backend = getattr(model_cls, "batch_backend", "numpy")
+    if backend not in ("numpy", "numba", "auto"):
+        raise ValueError(
+            f"Unknown batch_backend {backend!r} on {model_cls.__name__}. "
+            f"Use 'numpy', 'numba' or 'auto'."
+        )
+    if backend == "numpy" or (backend == "auto" and not numba_available()):
+        return None
+    from .jit_kernels import KernelRunner
+
+    return KernelRunner(model_cls, periods, li, scalars, input_line_values)
+
+
+class _BatchEvaluation:
+    """State for one batch run: value store, namespaces and debt calculators."""
+
+    def __init__(
+        self,
+        model_cls: type,
+        periods: list[int],
+        scalars: dict[str, Any],
+        input_line_values: dict[str, dict[int, Any]],
+        size: int,
+        backend: str | None = None,
+    ):
+        from pyproforma.specs.debt_line import DebtBase
+
+        from .batch_values import BatchLineItemValues
+        from .evaluation_plan import get_evaluation_plan
+
+        self.model_cls = model_cls
+        self.plan = get_evaluation_plan(model_cls)
+        self.size = size
+        self.scalars = scalars
+        self.input_line_values = input_line_values
+
+        self.li = BatchLineItemValues(
+            model_cls._line_item_names, periods, size, model_cls._tag_members
+        )
+        self.ns = model_cls._namespace_cls(self.li, scalars)
+        self.calculators: dict[int, BatchDebtCalculator] = {}
+        for name in model_cls._line_item_names:
+            spec = getattr(model_cls, name)
+            if isinstance(spec, DebtBase) and id(spec.config) not in self.calculators:
+                self.calculators[id(spec.config)] = BatchDebtCalculator(
+                    par_amounts=spec.config.par_amounts,
+                    interest_rate=spec.config.interest_rate,
+                    term=spec.config.term,
+                    size=size,
+                )
+        self.fallback_items: set[str] = set()
+        self._scenario_namespaces: list | None = None
+        self.kernels = _kernel_runner(
+            model_cls, periods, self.li, scalars, input_line_values, backend
+        )
+
+    def set_fixed(self, period: int) -> None:
+        """Store every fixed item's value for one period."""
+        for name in self.plan.fixed_items:
+            self.li.set(name, period, self._input_value(getattr(self.model_cls, name), period))
+
+    def evaluate_period(self, period: int, stage: Any = None, fixed: bool = True) -> None:
+        """Evaluate one period of a plan stage (the whole plan when stage is None)."""
+        model_cls = self.model_cls
+        if stage is None:
+            stage = self.plan
+        if fixed:
+            self.set_fixed(period)
+
+        if self.kernels is None:
+            segments = [(False, stage.ordered_items)]
+        else:
+            segments = self.kernels.segments(stage.ordered_items)
+        pending = []
+        for compiled, names in segments:
+            column = self.li._column[period]
+            if compiled and self.kernels.ready(names, column):
+                self.kernels.run(names, column, column + 1)
+                continue
+            for name in names:
+                line_item = getattr(model_cls, name)
+                try:
+                    value = self._evaluate(line_item, period)
+                except (AttributeError, KeyError) as e:
+                    _check_pending_error(line_item, period, e)
+                    pending.append(name)
+                    continue
+                self.li.set(name, period, value)
+
+        remaining = pending + stage.deferred_items
+        while remaining:
+            still_pending = []
+            for name in remaining:
+                line_item = getattr(model_cls, name)
+                try:
+                    value = self._evaluate(line_item, period)
+                except (AttributeError, KeyError) as e:
+                    _check_pending_error(line_item, period, e)
+                    still_pending.append(name)
+                    continue
+                self.li.set(name, period, value)
+            if len(still_pending) == len(remaining):
+                raise ValueError(
+                    f"Circular reference detected for period {period}. "
+                    f"Cannot calculate: {', '.join(still_pending)}"
+                )
+            remaining = still_pending
+
+    def evaluate_vector(self, name: str, periods: list[int]) -> None:
+        """Evaluate a VectorFormulaLine for every scenario and period at once."""
+        from .vector_namespace import evaluate_vector_line
+
+        values = evaluate_vector_line(
+            getattr(self.model_cls, name),
+            self.li,
+            self.scalars,
+            periods,
+            self.model_cls._tag_members,
+            size=self.size,
+        )
+        for period, value in zip(periods, values):
+            self.li.set(name, period, value)
+
+    def keep(self, mask: Any) -> None:
+        """
+        Drop the scenarios where mask is False, so later periods skip them.
+
+        Filters every N-length array the evaluation holds: stored values, scalar
+        and InputLine inputs, debt schedules and the compiled kernels' scalars.
+        """
+        np = import_numpy("batch evaluation")
+        mask = np.asarray(mask, dtype=bool)
+        size = int(mask.sum())
+
+        def select(value: Any) -> Any:
+            if isinstance(value, np.ndarray) and value.shape == (self.size,):
+                return value[mask]
+            return value
+
+        self.li.data = self.li.data[:, :, mask]
+        self.li.size = size
+        self.scalars = {name: select(value) for name, value in self.scalars.items()}
+        self.input_line_values = {
+            name: {period: select(value) for period, value in values.items()}
+            for name, values in self.input_line_values.items()
+        }
+        self.ns = self.model_cls._namespace_cls(self.li, self.scalars)
+        for calculator in self.calculators.values():
+            calculator.size = size
+            calculator._schedules = {
+                issue_year: {
+                    period: tuple(select(array) for array in arrays)
+                    for period, arrays in schedule.items()
+                }
+                for issue_year, schedule in calculator._schedules.items()
+            }
+        if self.kernels is not None:
+            self.kernels.scalar_array = np.ascontiguousarray(self.kernels.scalar_array[:, mask])
+        self._scenario_namespaces = None
+        self.size = size
+
+    def _input_value(self, line_item: Any, period: int) -> Any:
+        from pyproforma.specs.input_line import InputLine
+
+        if isinstance(line_item, InputLine):
+            period_values = self.input_line_values.get(line_item.name, {})
+            if period not in period_values:
+                raise ValueError(
+                    f"No input value for '{line_item.name}' in period {period}"
+                )
+            return period_values[period]
+        value = line_item.get_value(period)
+        if value is None:
+            raise ValueError(
+                f"No value defined for '{line_item.name}' in period {period}"
+            )
+        return value
+
+    def _evaluate(self, line_item: Any, period: int) -> Any:
+        from pyproforma.specs.debt_line import DebtBase
+
+        if isinstance(line_item, DebtBase):
+            calculator = self.calculators[id(line_item.config)]
+            try:
+                return line_item.eval(self.ns, period, calculator)
+            except (AttributeError, KeyError):
+                raise
+            except Exception as e:
+                raise ValueError(
+                    f"Error evaluating debt line for '{line_item.name}' "
+                    f"in period {period}: {e}"
+                ) from e
+
+        if period in line_item.values:
+            return line_item.values[period]
+        if line_item.name not in self.fallback_items:
+            self.li._evaluating = line_item.name
+            try:
+                value = line_item.eval(self.ns, period)
+            except (AttributeError, KeyError):
+                raise
+            except Exception:
+                # Typically "truth value of an array is ambiguous": the formula
+                # branches on a value. Evaluate it one scenario at a time instead.
+                self.fallback_items.add(line_item.name)
+            else:
+                if value is None:
+                    raise ValueError(f"Formula for '{line_item.name}' returned None")
+                return value
+            finally:
+                self.li._evaluating = None
+        return self._evaluate_per_scenario(line_item, period)
+
+    def _evaluate_per_scenario(self, line_item: Any, period: int) -> Any:
+        np = import_numpy("batch evaluation")
+        if self._scenario_namespaces is None:
+            self._scenario_namespaces = [
+                self._scenario_namespace(i) for i in range(self.size)
+            ]
+        values = np.empty(self.size)
+        for i, ns in enumerate(self._scenario_namespaces):
+            values[i] = _calculate_single_line_item(line_item, ns, period)
+        return values
+
+    def _scenario_namespace(self, index: int) -> Any:
+        from .model_namespace import ModelNamespace
+
+        scalars = {
+            name: float(value[index]) if hasattr(value, "shape") else value
+            for name, value in self.scalars.items()
+        }
+        return ModelNamespace(self.li.scenario(index), scalars)
+
+
+class BatchDebtCalculator:
+    """
+    Vectorized counterpart of DebtCalculator for batch evaluation.
+
+    Holds one level-payment schedule per issue period, with N-length arrays for
+    principal, interest and balance. The arithmetic follows DebtCalculator step
+    for step, so each scenario's values are identical to a single-model run.
+    Scenarios with no issuance in a period (par ≤ 0) contribute zero.
+    """
+
+    def __init__(self, par_amounts: str, interest_rate: str, term: str, size: int):
+        self.par_amounts = par_amounts
+        self.interest_rate = interest_rate
+        self.term = term
+        self.size = size
+        self._schedules: dict[int, dict[int, tuple[Any, Any, Any]]] = {}
+
+    def eval(self, ns: Any, t: int) -> None:
+        """Process a period, recording an issuance for scenarios with positive par."""
+        np = import_numpy("batch evaluation")
+        try:
+            par_amount = getattr(ns, self.par_amounts)[t]
+        except (KeyError, AttributeError):
+            return
+        if par_amount is None:
+            return
+        par = np.broadcast_to(np.asarray(par_amount, dtype=np.float64), (self.size,))
+        active = par > 0
+        if not active.any():
+            return
+
+        rate = self._period_value(getattr(ns, self.interest_rate), t)
+        term = np.trunc(self._period_value(getattr(ns, self.term), t)).astype(np.int64)
+        self._add_bond_issue(par, active & (term > 0), t, rate, term)
+
+    def _period_value(self, value: Any, t: int) -> Any:
+        np = import_numpy("batch evaluation")
+        if not isinstance(value, (int, float, np.ndarray)):
+            value = value[t]
+        return np.broadcast_to(np.asarray(value, dtype=np.float64), (self.size,))
+
+    def _add_bond_issue(self, par, active, issue_year: int, rate, term) -> None:
+        np = import_numpy("batch evaluation")
+        # Python's pow, not numpy's vectorized one, so each scenario rounds exactly
+        # as DebtCalculator does. This runs once per issuance, not per period.
+        growth = np.array(
+            [
+                (1 + r) ** n if is_active else 1.0
+                for r, n, is_active in zip(rate.tolist(), term.tolist(), active.tolist())
+            ],
+            dtype=np.float64,
+        )
+        with np.errstate(divide="ignore", invalid="ignore"):
+            numerator = rate * growth
+            denominator = growth - 1
+            annual_payment = np.where(
+                rate == 0, par / term, par * (numerator / denominator)
+            )
+        balance = np.where(active, par, 0.0)
+        schedule = {}
+        max_term = int(term[active].max()) if active.any() else 0
+        for year_offset in range(max_term):
+            live = active & (year_offset < term)
+            interest = balance * rate
+            principal = annual_payment - interest
+            principal = np.where(live & (year_offset == term - 1), balance, principal)
+            principal = np.where(live, principal, 0.0)
+            schedule[issue_year + year_offset] = (
+                principal,
+                np.where(live, interest, 0.0),
+                np.where(live, balance, 0.0),
+            )
+            balance = balance - principal
+        self._schedules[issue_year] = schedule
+
+    def get_principal(self, period: int) -> Any:
+        return sum(s[period][0] for s in self._schedules.values() if period in s)
+
+    def get_interest(self, period: int) -> Any:
+        return sum(s[period][1] for s in self._schedules.values() if period in s)
+
+    def get_outstanding_balance(self, period: int) -> Any:
+        return sum(
+            s[period][2] - s[period][0] for s in self._schedules.values() if period in s
+        )
+
+
+def _stack_scalars(resolved: list[dict], np: Any) -> dict[str, Any]:
+    """Combine per-scenario scalar dicts into plain values or N-length arrays."""
+    stacked = {}
+    for name in resolved[0]:
+        values = [scalars[name] for scalars in resolved]
+        first = values[0]
+        if all(v == first for v in values):
+            stacked[name] = first
+        else:
+            stacked[name] = np.array(values, dtype=np.float64)
+    return stacked
+
+
+def _stack_input_lines(resolved: list[dict], np: Any) -> dict[str, dict[int, Any]]:
+    """Combine per-scenario InputLine dicts into ``{name: {period: value | array}}``."""
+    stacked: dict[str, dict[int, Any]] = {}
+    for name in resolved[0]:
+        periods: dict[int, None] = {}
+        for input_values in resolved:
+            periods.update(dict.fromkeys(input_values[name]))
+        stacked[name] = {}
+        for period in periods:
+            values = [input_values[name].get(period, _ABSENT) for input_values in resolved]
+            if all(v is _ABSENT for v in values):
+                continue
+            if any(v is _ABSENT or v is None for v in values):
+                if all(v is None for v in values):
+                    stacked[name][period] = None
+                    continue
+                raise ValueError(
+                    f"'{name}' has no value for period {period} in some scenarios "
+                    f"but not others. Batch scenarios must supply the same periods."
+                )
+            first = values[0]
+            if all(v == first for v in values):
+                stacked[name][period] = first
+            else:
+                stacked[name][period] = np.array(values, dtype=np.float64)
+    return stacked
+
+
+_ABSENT = object()
@@ -0,0 +1,252 @@
+"""
+Value storage for batch (many-scenario) evaluation.
+
+BatchLineItemValues holds one N-length NumPy array per line item per period,
+so a formula written for a single model (``li.revenue[t] * li.tax_rate``)
+evaluates all N scenarios at once when ``li.revenue[t]`` is an array.
+"""
+
+from typing import Any
+
+
+class BatchLineItemValues:
+    """
+    Line item values for N scenarios, stored as an items × periods × N array.
+
+    ``li.revenue[t]`` returns the N-length array of values for period ``t``.
+    A period that is None in every scenario (a not-applicable InputLine period)
+    reads back as None, as it does for a single model.
+
+    Attributes:
+        data (numpy.ndarray): float64 array of shape (items, periods, scenarios).
+        size (int): Number of scenarios.
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        periods: list[int],
+        size: int,
+        tag_members: dict[str, list[str]] | None = None,
+    ):
+        from .numpy_support import import_numpy
+
+        np = import_numpy("batch evaluation")
+        self._names = list(names)
+        self._periods = list(periods)
+        self._row = {name: i for i, name in enumerate(self._names)}
+        self._column = {period: j for j, period in enumerate(self._periods)}
+        self.size = size
+        self.data = np.full((len(self._names), len(self._periods), size), np.nan)
+        self._filled = np.zeros((len(self._names), len(self._periods)), dtype=bool)
+        self._none: set[tuple[int, int]] = set()
+        self._views: dict[str, BatchLineItemValue] = {}
+        self._tag_members = tag_members or {}
+        self._tag_namespace = BatchTagNamespace(self)
+        self._evaluating: str | None = None
+
+    @property
+    def tag(self) -> "BatchTagNamespace":
+        """Tag sums across scenarios: ``li.tag["revenue"][t]`` is an N-length array."""
+        return self._tag_namespace
+
+    def get(self, name: str, period: int) -> Any:
+        """Return the N-length array for name and period, or None if unset/unknown."""
+        row = self._row.get(name)
+        col = self._column.get(period)
+        if row is None or col is None or not self._filled[row, col]:
+            return None
+        if (row, col) in self._none:
+            return None
+        return self.data[row, col]
+
+    def set(self, name: str, period: int, value: Any) -> None:
+        """Store a scalar (broadcast to every scenario), an N-length array, or None."""
+        row = self._row[name]
+        col = self._column[period]
+        if value is None:
+            self._none.add((row, col))
+            self.data[row, col] = float("nan")
+        else:
+            self._none.discard((row, col))
+            self.data[row, col] = value
+        self._filled[row, col] = True
+
+    def __getattr__(self, name: str) -> "BatchLineItemValue":
+        if name.startswith("_"):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        view = self._views.get(name)
+        if view is not None:
+            return view
+        if name not in self._row:
+            raise AttributeError(
+                f"Line item '{name}' is not registered. "
+                f"Available line items: {', '.join(sorted(self._names))}"
+            )
+        view = BatchLineItemValue(name, self)
+        self._views[name] = view
+        return view
+
+    def scenario(self, index: int) -> "ScenarioLineItemValues":
+        """A single-scenario view with plain float values, for per-scenario fallback."""
+        return ScenarioLineItemValues(self, index)
+
+    def __repr__(self):
+        return (
+            f"BatchLineItemValues(items={len(self._names)}, "
+            f"periods={self._periods!r}, size={self.size})"
+        )
+
+
+class BatchLineItemValue:
+    """One line item's values across periods, each an N-length scenario array."""
+
+    def __init__(self, name: str, store: BatchLineItemValues):
+        self._name = name
+        self._store = store
+        self._row = store._row[name]
+
+    def __getitem__(self, period: int) -> Any:
+        store = self._store
+        col = store._column.get(period)
+        if col is None or not store._filled[self._row, col]:
+            raise KeyError(f"Period {period} not found for line item '{self._name}'")
+        if (self._row, col) in store._none:
+            return None
+        return store.data[self._row, col]
+
+    def __repr__(self):
+        return f"BatchLineItemValue(name={self._name!r})"
+
+
+class BatchTagNamespace:
+    """``li.tag[name]`` inside batch evaluation."""
+
+    def __init__(self, store: BatchLineItemValues):
+        self._store = store
+
+    def __getitem__(self, tag: str) -> "BatchTagSum":
+        return BatchTagSum(self._store, tag)
+
+
+class BatchTagSum:
+    """
+    Sums tagged items for a period across scenarios, skipping None values.
+
+    Like TagSum, a member not set yet for the period raises KeyError, so the
+    engine retries the formula once it is, and the item being evaluated is
+    left out of its own tag's sum.
+    """
+
+    def __init__(self, store: BatchLineItemValues, tag: str):
+        self._store = store
+        self._tag = tag
+
+    def __getitem__(self, period: int) -> Any:
+        store = self._store
+        if period not in store._column:
+            raise KeyError(
+                f"Period {period} not found in model. "
+                f"Available periods: {store._periods}"
+            )
+        col = store._column[period]
+        total = 0.0
+        for name in store._tag_members.get(self._tag, []):
+            if name == store._evaluating:
+                continue
+            if not store._filled[store._row[name], col]:
+                raise KeyError(
+                    f"Period {period} not yet calculated for '{name}', "
+                    f"tagged '{self._tag}'"
+                )
+            value = store.get(name, period)
+            if value is not None:
+                total = total + value
+        return total
+
+
+class ScenarioLineItemValues:
+    """
+    Read-only single-scenario view over a BatchLineItemValues store.
+
+    Formulas that branch on values (``if li.x[t] > 0``) cannot run on arrays; the
+    batch engine evaluates them once per scenario through this view, where
+    ``li.x[t]`` is a plain float.
+    """
+
+    def __init__(self, store: BatchLineItemValues, index: int):
+        self._store = store
+        self._index = index
+        self._items: dict[str, ScenarioLineItemValue] = {}
+        self._tag_namespace = _ScenarioTagNamespace(self)
+        self._evaluating: str | None = None
+
+    @property
+    def tag(self) -> "_ScenarioTagNamespace":
+        return self._tag_namespace
+
+    def get(self, name: str, period: int) -> Any:
+        value = self._store.get(name, period)
+        return None if value is None else float(value[self._index])
+
+    def __getattr__(self, name: str) -> "ScenarioLineItemValue":
+        if name.startswith("_"):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        item = self._items.get(name)
+        if item is None:
+            getattr(self._store, name)  # raises the "is not registered" error
+            item = ScenarioLineItemValue(name, self)
+            self._items[name] = item
+        return item
+
+
+class ScenarioLineItemValue:
+    """One line item in one scenario: ``item[period]`` is a plain float."""
+
+    def __init__(self, name: str, view: ScenarioLineItemValues):
+        self._name = name
+        self._view = view
+
+    def __getitem__(self, period: int) -> Any:
+        value = getattr(self._view._store, self._name)[period]
+        return None if value is None else float(value[self._view._index])
+
+
+class _ScenarioTagNamespace:
+    def __init__(self, view: ScenarioLineItemValues):
+        self._view = view
+
+    def __getitem__(self, tag: str) -> "_ScenarioTagSum":
+        return _ScenarioTagSum(self._view, tag)
+
+
+class _ScenarioTagSum:
+    def __init__(self, view: ScenarioLineItemValues, tag: str):
+        self._view = view
+        self._tag = tag
+
+    def __getitem__(self, period: int) -> float:
+        store = self._view._store
+        if period not in store._column:
+            raise KeyError(
+                f"Period {period} not found in model. "
+                f"Available periods: {store._periods}"
+            )
+        col = store._column[period]
+        total = 0.0
+        for name in store._tag_members.get(self._tag, []):
+            if name == self._view._evaluating:
+                continue
+            if not store._filled[store._row[name], col]:
+                raise KeyError(
+                    f"Period {period} not yet calculated for '{name}', "
+                    f"tagged '{self._tag}'"
+                )
+            value = self._view.get(name, period)
+            if value is not None:
+                total += value
+        return total
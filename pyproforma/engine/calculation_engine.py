@@ -7,8 +7,12 @@ values across periods.
 
 from typing import TYPE_CHECKING, Any
 
+from .dual_numbers import Dual
+
 if TYPE_CHECKING:
+    from .evaluation_plan import EvaluationPlan
     from .line_item_values import LineItemValues
+    from .model_namespace import ModelNamespace
 
 
 def calculate_line_items(
@@ -19,6 +23,12 @@ def calculate_line_items(
     """
     Calculate all line item values for the given model.
 
+    Calculated items are evaluated in the order given by the class's
+    EvaluationPlan, so each is evaluated once per period. Items the plan could not
+    order (untraceable formulas, or precedents and tag members the tracer missed)
+    fall back to the retry loop at the end of each period. VectorFormulaLine items are evaluated
+    once, for every period, between the plan's stages.
+
     Args:
         model: The ProformaModel instance containing line item definitions.
         scalars: Dict of scalar line item values (FixedLine(value=) or scalar InputLine).
@@ -27,75 +37,329 @@ def calculate_line_items(
     Returns:
         LineItemValues: Populated container with all calculated values.
     """
-    from pyproforma.specs.debt_line import DebtBase
-    from pyproforma.specs.fixed_line import FixedLine
-    from pyproforma.specs.formula_line import FormulaLine
-    from pyproforma.specs.input_line import InputLine
+    from .evaluation_plan import get_evaluation_plan
 
-    from .line_item_values import LineItemValues
-    from .model_namespace import ModelNamespace
+    plan = get_evaluation_plan(model.__class__)
 
     # scalar_names are already resolved into the scalars dict — skip them here
-    li = LineItemValues(periods=periods, names=model.line_item_names, model=model)
+    li = new_line_item_values(model, periods)
+    ns = new_namespace(model, li, scalars)
+    _evaluate_stages(model, ns, li, scalars, periods, plan)
+    return li
 
-    fixed_items = []
-    formula_items = []
 
-    for name in model.line_item_names:
-        line_item = getattr(model.__class__, name, None)
-        if isinstance(line_item, (FixedLine, InputLine)):
-            fixed_items.append(name)
-        elif isinstance(line_item, (FormulaLine, DebtBase)):
-            formula_items.append(name)
+def recalculate_line_items(
+    model: Any,
+    base: "LineItemValues",
+    scalars: dict,
+    periods: list[int],
+    changed: set[str],
+) -> tuple["LineItemValues", list[str]]:
+    """
+    Recalculate only the line items affected by changed inputs.
 
-    for period in periods:
-        ns = ModelNamespace(li, scalars)
+    Items that do not depend on any changed name keep their values from ``base``
+    (with the dict store, the very same ``{period: value}`` dicts are shared).
+    Items whose formula could not be traced are always recalculated.
+
+    Args:
+        model: The new ProformaModel instance (same class and periods as base's).
+        base: Calculated values of the model being derived from.
+        scalars: The new model's scalar values.
+        periods: The model periods.
+        changed: Names of InputLine / ScalarInputLine fields whose values changed.
+
+    Returns:
+        tuple: ``(values, recomputed)`` — the new value store and the names of the
+        recalculated line items, in declaration order.
+    """
+    from .evaluation_plan import get_evaluation_plan
+
+    plan = get_evaluation_plan(model.__class__)
+    dirty = affected_line_items(model.__class__, changed)
+    recomputed = [name for name in model.line_item_names if name in dirty]
+
+    li = new_line_item_values(model, periods)
+    li.adopt(base, [name for name in model.line_item_names if name not in dirty])
+    ns = new_namespace(model, li, scalars)
+    _evaluate_stages(model, ns, li, scalars, periods, plan, dirty)
+    return li, recomputed
+
+
+def calculate_periods(
+    model: Any,
+    li: "LineItemValues",
+    scalars: dict,
+    periods: list[int],
+) -> None:
+    """
+    Calculate further periods into a value store that holds the earlier ones.
+
+    Continues a calculation, e.g. from a snapshot taken with ``li._copy()``: the
+    periods before these must already be in li, and the model's debt calculators
+    must have processed them. VectorFormulaLine items read whole columns, so a
+    model with any cannot be calculated in pieces.
 
+    Args:
+        model: The ProformaModel instance (its inputs and debt calculators are used).
+        li: The value store to fill.
+        scalars: The model's scalar values.
+        periods: The periods to calculate, in order.
+
+    Raises:
+        ValueError: If the model has VectorFormulaLine items.
+    """
+    from .evaluation_plan import get_evaluation_plan
+
+    plan = get_evaluation_plan(model.__class__)
+    if plan.vector_items:
+        raise ValueError(
+            f"{model.__class__.__name__} has VectorFormulaLine items, "
+            f"so it cannot be calculated period by period."
+        )
+    stage = plan.stages[0]
+    ns = new_namespace(model, li, scalars)
+    _evaluate_periods(
+        model, ns, li, periods, plan.fixed_items, stage.ordered_items, stage.deferred_items
+    )
+
+
+def affected_line_items(model_cls: type, changed: set[str]) -> set[str]:
+    """
+    Names whose values may differ once the inputs in changed take new values.
+
+    That is the changed names and everything depending on them, plus items whose
+    formula could not be traced (and their dependents), which are always treated
+    as affected.
+    """
+    from .dependency_graph import get_dependency_graph
+    from .evaluation_plan import get_evaluation_plan
+
+    plan = get_evaluation_plan(model_cls)
+    graph = get_dependency_graph(model_cls)
+    affected = set(changed) | graph.descendants_of(changed)
+    affected |= set(plan.deferred_items) | graph.descendants_of(plan.deferred_items)
+    return affected
+
+
+def new_namespace(model: Any, li: "LineItemValues", scalars: dict) -> "ModelNamespace":
+    """
+    Create the formula namespace for a model's value store.
+
+    Uses the namespace class generated for the model class (``_namespace_cls``),
+    whose line items and scalars are pre-bound slots, and honours the class's
+    ``compile_formulas`` setting.
+    """
+    from .model_namespace import ModelNamespace
+
+    model_cls = model.__class__
+    namespace_cls = getattr(model_cls, "_namespace_cls", ModelNamespace)
+    return namespace_cls(li, scalars, bool(getattr(model_cls, "compile_formulas", False)))
+
+
+def new_line_item_values(model: Any, periods: list[int]) -> "LineItemValues":
+    """
+    Create an empty value store for a model, honouring its ``value_store`` setting.
+
+    ``"dict"`` (the default) uses LineItemValues; ``"array"`` uses the NumPy-backed
+    ArrayLineItemValues; ``"auto"`` picks the array store when numpy is installed.
+    """
+    from .line_item_values import LineItemValues
+    from .numpy_support import numpy_available
+
+    store = getattr(model.__class__, "value_store", "dict")
+    if store not in ("dict", "array", "auto"):
+        raise ValueError(
+            f"Unknown value_store {store!r} on {model.__class__.__name__}. "
+            f"Use 'dict', 'array' or 'auto'."
+        )
+    if store == "array" or (store == "auto" and numpy_available()):
+        from .array_values import ArrayLineItemValues
+
+        return ArrayLineItemValues(periods=periods, names=model.line_item_names, model=model)
+    return LineItemValues(periods=periods, names=model.line_item_names, model=model)
+
+
+def _evaluate_stages(
+    model: Any,
+    ns: Any,
+    li: "LineItemValues",
+    scalars: dict,
+    periods: list[int],
+    plan: "EvaluationPlan",
+    dirty: set[str] | None = None,
+) -> None:
+    """
+    Evaluate a plan's stages: each stage's per-period items, then its vector items.
+
+    With dirty given, only those items are evaluated (deferred items always are);
+    the others must already be in li.
+    """
+    model_cls = model.__class__
+
+    def wanted(names: list[str]) -> list[str]:
+        return names if dirty is None else [name for name in names if name in dirty]
+
+    for index, stage in enumerate(plan.stages):
+        _evaluate_periods(
+            model,
+            ns,
+            li,
+            periods,
+            wanted(plan.fixed_items) if index == 0 else [],
+            wanted(stage.ordered_items),
+            stage.deferred_items,
+        )
+        vector_items = wanted(stage.vector_items)
+        if vector_items:
+            from .vector_namespace import evaluate_vector_line
+
+            for name in vector_items:
+                values = evaluate_vector_line(
+                    getattr(model_cls, name), li, scalars, periods, model_cls._tag_members
+                )
+                for period, value in zip(periods, values):
+                    li.set(name, period, value)
+
+
+def _evaluate_periods(
+    model: Any,
+    ns: Any,
+    li: "LineItemValues",
+    periods: list[int],
+    fixed_items: list[str],
+    ordered_items: list[str],
+    deferred_items: list[str],
+) -> None:
+    """Evaluate the given items period by period, in plan order."""
+    model_cls = model.__class__
+    for period in periods:
         for name in fixed_items:
-            line_item = getattr(model.__class__, name)
+            line_item = getattr(model_cls, name)
             value = _calculate_single_line_item(line_item, ns, period, model)
             li.set(name, period, value)
 
-        remaining = formula_items.copy()
-        max_iterations = len(formula_items) + 1
-        iteration = 0
+        pending = []
+        for name in ordered_items:
+            line_item = getattr(model_cls, name)
+            try:
+                value = _calculate_single_line_item(line_item, ns, period, model)
+            except (AttributeError, KeyError) as e:
+                _check_pending_error(line_item, period, e)
+                pending.append(name)
+                continue
+            li.set(name, period, value)
 
-        while remaining and iteration < max_iterations:
-            iteration += 1
-            still_pending = []
+        _resolve_with_retry(pending + deferred_items, model, ns, li, period)
 
-            for name in remaining:
-                line_item = getattr(model.__class__, name)
-                try:
-                    value = _calculate_single_line_item(line_item, ns, period, model)
-                    li.set(name, period, value)
-                except AttributeError as e:
-                    error_msg = str(e)
-                    if "is not registered" in error_msg:
-                        raise ValueError(
-                            f"Error in formula for '{line_item.name}': {e}"
-                        ) from e
-                    still_pending.append(name)
-                except KeyError as e:
-                    error_msg = str(e)
-                    if f"Period {period}" in error_msg:
-                        still_pending.append(name)
-                    else:
-                        raise ValueError(
-                            f"Error evaluating formula for '{line_item.name}' in period {period}: {e}"  # noqa: E501
-                        ) from e
-
-            if len(still_pending) == len(remaining):
-                raise ValueError(
-                    f"Circular reference detected for period {period}. "
-                    f"Cannot calculate: {', '.join(still_pending)}"
-                )
 
-            remaining = still_pending
+def _calculate_with_retry(
+    model: Any,
+    scalars: dict,
+    periods: list[int],
+) -> "LineItemValues":
+    """
+    Calculate all line item values by repeatedly retrying pending formulas.
+
+    This is the original, plan-free engine: every period, each calculated item is
+    attempted in declaration order and retried until its dependencies resolve.
+    Kept as the reference implementation the other engines are checked against;
+    it does not support VectorFormulaLine items. A formula summing a tag in the
+    same period is retried until every member of the tag is set for that period
+    (TagSum raises KeyError until then).
+    """
+    from .evaluation_plan import get_evaluation_plan
+    from .line_item_values import LineItemValues
+    from .model_namespace import ModelNamespace
+
+    model_cls = model.__class__
+    plan = get_evaluation_plan(model_cls)
+    if plan.vector_items:
+        raise ValueError("The retry engine does not support VectorFormulaLine items.")
+    formula_items = [
+        name for name in model.line_item_names if name in plan.precedents
+    ]
+
+    li = LineItemValues(periods=periods, names=model.line_item_names, model=model)
+
+    for period in periods:
+        ns = ModelNamespace(li, scalars)
+
+        for name in plan.fixed_items:
+            line_item = getattr(model_cls, name)
+            value = _calculate_single_line_item(line_item, ns, period, model)
+            li.set(name, period, value)
+
+        _resolve_with_retry(formula_items, model, ns, li, period)
 
     return li
 
 
+def _resolve_with_retry(
+    names: list[str],
+    model: Any,
+    ns: Any,
+    li: "LineItemValues",
+    period: int,
+) -> None:
+    """
+    Evaluate names for one period, retrying until all resolve or none can.
+
+    Items still unresolved when no progress is made form a circular reference,
+    solved by the model's IterativeSolver if it has one.
+    """
+    remaining = list(names)
+    max_iterations = len(remaining) + 1
+    iteration = 0
+
+    while remaining and iteration < max_iterations:
+        iteration += 1
+        still_pending = []
+
+        for name in remaining:
+            line_item = getattr(model.__class__, name)
+            try:
+                value = _calculate_single_line_item(line_item, ns, period, model)
+                li.set(name, period, value)
+            except (AttributeError, KeyError) as e:
+                _check_pending_error(line_item, period, e)
+                still_pending.append(name)
+
+        if len(still_pending) == len(remaining):
+            solver = getattr(model, "_solver", None)
+            if solver is not None:
+                from .iterative_solver import solve_circular
+
+                solve_circular(still_pending, model, ns, li, period, solver)
+                return
+            raise ValueError(
+                f"Circular reference detected for period {period}. "
+                f"Cannot calculate: {', '.join(still_pending)}"
+            )
+
+        remaining = still_pending
+
+
+def _check_pending_error(line_item: Any, period: int, error: Exception) -> None:
+    """
+    Decide whether an error means "a precedent is not calculated yet".
+
+    Returns silently if so (the caller should retry the item later in the period);
+    otherwise raises the ValueError reported to the user.
+    """
+    error_msg = str(error)
+    if isinstance(error, AttributeError):
+        if "is not registered" in error_msg:
+            raise ValueError(
+                f"Error in formula for '{line_item.name}': {error}"
+            ) from error
+        return
+    if f"Period {period}" not in error_msg:
+        raise ValueError(
+            f"Error evaluating formula for '{line_item.name}' in period {period}: {error}"
+        ) from error
+
+
 def _calculate_single_line_item(
     line_item: Any,
     ns: Any,
@@ -127,6 +391,8 @@ def _calculate_single_line_item(
     if isinstance(line_item, FormulaLine):
         if period in line_item.values:
             return line_item.values[period]
+        li = ns._li
+        li._evaluating = line_item.name  # TagSum leaves the item out of its own tag
         try:
             value = line_item.eval(ns, period)
         except (AttributeError, KeyError):
@@ -135,6 +401,8 @@ def _calculate_single_line_item(
             raise ValueError(
                 f"Error evaluating formula for '{line_item.name}' in period {period}: {e}"
             ) from e
+        finally:
+            li._evaluating = None
         if value is None:
             raise ValueError(
                 f"Formula for '{line_item.name}' returned None"
@@ -157,6 +425,8 @@ def _calculate_single_line_item(
             raise ValueError(
                 f"Error evaluating debt line for '{line_item.name}' in period {period}: {e}"
             ) from e
+        if isinstance(value, Dual):
+            return value
         if not isinstance(value, (int, float)):
             raise ValueError(
                 f"Debt line '{line_item.name}' returned invalid type: {type(value)}"
@@ -0,0 +1,328 @@
+"""
+Dependency graph for ProformaModel subclasses.
+
+Built once per class when the subclass is defined and exposed as
+``ModelClass.graph``. Every edge points from a precedent (a line item or scalar)
+to the calculated item that reads it:
+
+- FormulaLine and VectorFormulaLine references, traced with a recording proxy
+  and completed with the names found in the formula's compiled code (branches
+  not taken while tracing)
+- names read by helper functions a formula calls from its own module, found
+  the same way, and item names in string constants (or in globals and closure
+  variables holding strings); a formula whose reads cannot be proven this way
+  (it calls user code from another module or package, a callable object, a
+  function held in a container, ``getattr`` with a computed name, or sums a
+  tag with a computed name) depends on every input
+- tag sums, resolved to the concrete line items carrying the tag
+- debt lines, which depend on their DebtConfig's par amount, rate and term items
+
+Each edge from a line item also carries the period offsets it is read at
+(``offsets``), which separates same-period edges (``li.x[t]``) from inter-period
+ones (``li.x[t - 1]``).
+"""
+
+import threading
+
+_GRAPH_LOCK = threading.Lock()
+
+
+def get_dependency_graph(model_cls: type) -> "DependencyGraph":
+    """
+    Return the dependency graph of a model class, building it if needed.
+
+    ProformaModel subclasses get theirs in ``__init_subclass__``; this also covers
+    classes whose graph was not built yet.
+    """
+    graph = model_cls.__dict__.get("graph")
+    if graph is None:
+        with _GRAPH_LOCK:
+            graph = model_cls.__dict__.get("graph")
+            if graph is None:
+                graph = DependencyGraph.build(model_cls)
+                model_cls.graph = graph
+    return graph
+
+
+class DependencyGraph:
+    """
+    Direct and transitive dependencies between a model's line items and scalars.
+
+    Direct queries are dictionary lookups; transitive queries are computed on first
+    use per name and cached. Results are in model declaration order.
+
+    Attributes:
+        names (list[str]): Every line item and scalar, in declaration order.
+        tag_members (dict[str, list[str]]): Line items carrying each tag.
+        unresolved (list[str]): Formula items whose trace raised, so their
+            precedents may be incomplete.
+
+    Examples:
+        >>> WaterUtilityModel.graph.precedents("total_revenue")
+        ['water_sales', 'power_sales', ...]
+        >>> WaterUtilityModel.graph.descendants("inflation_rate")
+        ['total_om', ...]
+        >>> WaterUtilityModel.graph.level("total_revenue")
+        2
+        >>> WaterUtilityModel.graph.offsets("total_revenue")
+        {'water_sales': [0], 'power_sales': [0], ...}
+    """
+
+    def __init__(
+        self,
+        names: list[str],
+        precedents: dict[str, list[str]],
+        tag_members: dict[str, list[str]] | None = None,
+        unresolved: list[str] | None = None,
+        model_cls: type | None = None,
+    ):
+        self.names = list(names)
+        self.tag_members = tag_members or {}
+        self.unresolved = list(unresolved or [])
+        self._position = {name: i for i, name in enumerate(self.names)}
+        self._precedents = {
+            name: tuple(sorted(set(refs), key=self._position.__getitem__))
+            for name, refs in precedents.items()
+        }
+        dependents: dict[str, list[str]] = {name: [] for name in self.names}
+        for name in self.names:
+            for ref in self._precedents.get(name, ()):
+                dependents[ref].append(name)
+        self._dependents = {name: tuple(items) for name, items in dependents.items()}
+        self._ancestors: dict[str, tuple[str, ...]] = {}
+        self._descendants: dict[str, tuple[str, ...]] = {}
+        self._levels: dict[str, int] | None = None
+        self._model_cls = model_cls
+        self._offsets: dict[str, dict[str, tuple[int | None, ...]]] = {}
+
+    @classmethod
+    def build(cls, model_cls: type) -> "DependencyGraph":
+        """Trace every calculated item of a ProformaModel subclass."""
+        from pyproforma.specs.debt_line import DebtBase
+        from pyproforma.specs.formula_line import (
+            FormulaLine,
+            _has_opaque_calls,
+            _static_references,
+        )
+        from pyproforma.specs.vector_formula_line import VectorFormulaLine
+
+        line_items = list(model_cls._line_item_names)
+        scalars = list(model_cls._scalar_names)
+        known = set(line_items) | set(scalars)
+        names = [name for name in model_cls.__dict__ if name in known]
+
+        tag_members = {tag: list(members) for tag, members in model_cls._tag_members.items()}
+
+        precedents: dict[str, list[str]] = {}
+        unresolved = []
+        for name in line_items:
+            spec = getattr(model_cls, name)
+            if isinstance(spec, (FormulaLine, VectorFormulaLine)):
+                if spec.formula is None:
+                    continue
+                items, tags, failed = spec._trace()
+                if failed:
+                    unresolved.append(name)
+                static_names, static_strings = _static_references(spec.formula)
+                # A string naming an item may be read with getattr(li, "name").
+                refs = list(items) + sorted(static_names) + sorted(static_strings)
+                for tag in list(tags) + sorted(static_strings & set(tag_members)):
+                    refs.extend(tag_members.get(tag, []))
+                if _has_opaque_calls(spec.formula):
+                    # Whatever it reads must come from the inputs somehow.
+                    refs.extend(model_cls._scalar_input_names + model_cls._input_line_names)
+            elif isinstance(spec, DebtBase):
+                config = spec.config
+                refs = [config.par_amounts, config.interest_rate, config.term]
+            else:
+                continue
+            precedents[name] = [ref for ref in refs if ref in known and ref != name]
+
+        return cls(names, precedents, tag_members, unresolved, model_cls)
+
+    def precedents(self, name: str) -> list[str]:
+        """Line items and scalars that name reads directly."""
+        self._check(name)
+        return list(self._precedents.get(name, ()))
+
+    def dependents(self, name: str) -> list[str]:
+        """Calculated items that read name directly."""
+        self._check(name)
+        return list(self._dependents[name])
+
+    def ancestors(self, name: str) -> list[str]:
+        """Everything name depends on, directly or transitively."""
+        self._check(name)
+        cached = self._ancestors.get(name)
+        if cached is None:
+            cached = self._closure(name, self._precedents)
+            self._ancestors[name] = cached
+        return list(cached)
+
+    def descendants(self, name: str) -> list[str]:
+        """Every calculated item that depends on name, directly or transitively."""
+        self._check(name)
+        cached = self._descendants.get(name)
+        if cached is None:
+            cached = self._closure(name, self._dependents)
+            self._descendants[name] = cached
+        return list(cached)
+
+    def descendants_of(self, names: "list[str] | set[str]") -> set[str]:
+        """Union of ``descendants`` over several names."""
+        found: set[str] = set()
+        for name in names:
+            found.update(self.descendants(name))
+        return found
+
+    def offsets(self, name: str) -> dict[str, list[int | None]]:
+        """
+        Period offsets at which name reads each line item, relative to its period.
+
+        0 is a same-period read (``li.x[t]``), -1 the previous period
+        (``li.x[t - 1]``), None an offset that could not be determined. Includes
+        name itself when its formula reads its own earlier values. Tag sums count
+        as reads of every item carrying the tag; debt lines read their par
+        amount, rate and term items in the same period; a VectorFormulaLine reads
+        whole columns, so its offsets are unknown. Analyzed on first use per name.
+        """
+        self._check(name)
+        cached = self._offsets.get(name)
+        if cached is None:
+            cached = self._compute_offsets(name)
+            self._offsets[name] = cached
+        return {ref: list(found) for ref, found in cached.items()}
+
+    def same_period_precedents(self, name: str) -> list[str]:
+        """Line items name reads in its own period (or at an unknown offset)."""
+        return [
+            ref
+            for ref, found in self.offsets(name).items()
+            if ref != name and (0 in found or None in found)
+        ]
+
+    def lookback(self, name: str) -> int | None:
+        """
+        How many periods back name reads directly: 0 if only the current period,
+        1 for ``t - 1``, and so on. None if an offset is unknown.
+        """
+        deepest = 0
+        for found in self.offsets(name).values():
+            for offset in found:
+                if offset is None:
+                    return None
+                deepest = max(deepest, -offset)
+        return deepest
+
+    def circular_references(self) -> list[list[str]]:
+        """
+        Groups of items that read each other in the same period.
+
+        Unlike ``starting_cash`` / ``ending_cash[t - 1]``, which only loop across
+        periods, these can never be calculated. Only reads known to be at offset
+        0 count, so every group reported is a genuine circular reference.
+        """
+        from .evaluation_plan import _strongly_connected_components
+
+        edges = {}
+        for name in self.names:
+            if name in self._precedents:
+                edges[name] = [
+                    ref for ref, found in self.offsets(name).items() if 0 in found
+                ]
+        cycles = []
+        for members in _strongly_connected_components(list(edges), edges):
+            if len(members) > 1 or members[0] in edges[members[0]]:
+                cycles.append(sorted(members, key=self._position.__getitem__))
+        return sorted(cycles, key=lambda members: self._position[members[0]])
+
+    def _compute_offsets(self, name: str) -> dict[str, tuple[int | None, ...]]:
+        from pyproforma.specs.debt_line import DebtBase
+        from pyproforma.specs.formula_line import FormulaLine
+
+        model_cls = self._model_cls
+        if model_cls is None or name not in self._precedents:
+            return {}
+        line_items = set(model_cls._line_item_names)
+        refs = [ref for ref in self._precedents[name] if ref in line_items]
+        spec = getattr(model_cls, name)
+        found: dict[str, set[int | None]] = {}
+        if isinstance(spec, FormulaLine):
+            analysis = spec._period_offsets()
+            if analysis is not None:
+                for ref, offsets in analysis.items.items():
+                    if ref in line_items:
+                        found.setdefault(ref, set()).update(offsets)
+                for tag, offsets in analysis.tags.items():
+                    for member in self.tag_members.get(tag, []):
+                        found.setdefault(member, set()).update(offsets)
+        elif isinstance(spec, DebtBase):
+            found = {ref: {0} for ref in refs}
+        for ref in refs:
+            found.setdefault(ref, {None})
+        ordered = sorted(found, key=self._position.__getitem__)
+        return {
+            ref: tuple(sorted(found[ref], key=lambda o: (o is None, o or 0)))
+            for ref in ordered
+        }
+
+    def level(self, name: str) -> int:
+        """
+        Topological level: 0 for items with no precedents, otherwise one more than
+        the deepest precedent. Items in a cycle (e.g. ``starting_cash`` /
+        ``ending_cash[t - 1]``) share a level.
+        """
+        self._check(name)
+        return self._compute_levels()[name]
+
+    @property
+    def levels(self) -> list[list[str]]:
+        """Names grouped by topological level, in declaration order within a level."""
+        levels = self._compute_levels()
+        grouped: list[list[str]] = [[] for _ in range(max(levels.values(), default=-1) + 1)]
+        for name in self.names:
+            grouped[levels[name]].append(name)
+        return grouped
+
+    def _closure(self, name: str, edges: dict[str, tuple[str, ...]]) -> tuple[str, ...]:
+        found = set()
+        stack = list(edges.get(name, ()))
+        while stack:
+            item = stack.pop()
+            if item not in found:
+                found.add(item)
+                stack.extend(edges.get(item, ()))
+        return tuple(sorted(found, key=self._position.__getitem__))
+
+    def _compute_levels(self) -> dict[str, int]:
+        if self._levels is None:
+            from .evaluation_plan import _strongly_connected_components
+
+            edges = {name: self._precedents.get(name, ()) for name in self.names}
+            components = _strongly_connected_components(self.names, edges)
+            component_of = {
+                name: index for index, members in enumerate(components) for name in members
+            }
+            # Tarjan emits components in reverse topological order: precedents first.
+            component_level: dict[int, int] = {}
+            for index, members in enumerate(components):
+                level = 0
+                for name in members:
+                    for ref in self._precedents.get(name, ()):
+                        source = component_of[ref]
+                        if source != index:
+                            level = max(level, component_level[source] + 1)
+                component_level[index] = level
+            self._levels = {name: component_level[component_of[name]] for name in self.names}
+        return self._levels
+
+    def _check(self, name: str) -> None:
+        if name not in self._position:
+            raise KeyError(
+                f"'{name}' is not a line item or scalar in this model. "
+                f"Available: {', '.join(sorted(self.names))}"
+            )
+
+    def __repr__(self):
+        edges = sum(len(refs) for refs in self._precedents.values())
+        return f"DependencyGraph(nodes={len(self.names)}, edges={edges})"
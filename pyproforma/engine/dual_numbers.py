@@ -0,0 +1,296 @@
+"""
+Dual numbers for forward-mode automatic differentiation.
+
+A Dual holds a value and its partial derivatives with respect to a fixed list of
+inputs. Arithmetic on Duals applies the chain rule, so evaluating a formula on
+Dual inputs yields the formula's value and its gradient in the same pass:
+
+    >>> x = Dual(3.0, (1.0, 0.0))
+    >>> y = Dual(2.0, (0.0, 1.0))
+    >>> x * y + x ** 2
+    Dual(15.0, (8.0, 3.0))
+
+Only values that depend on an input are Duals; everything else stays a plain
+float, so constant parts of a model cost nothing extra.
+
+Operations whose derivative is undefined at the point of evaluation raise
+NonDifferentiableError instead of returning a silently wrong gradient:
+
+- converting a Dual to float or int (which is what ``math`` functions do),
+  rounding, ``//`` and ``%``;
+- ``abs`` at zero, and ``x ** p`` at zero for a fractional ``p`` below 1;
+- comparisons or truth tests that sit exactly on a branch boundary that moves
+  with the inputs (``max(a, b)`` with ``a == b``).
+
+These only raise when the Dual actually carries a non-zero derivative: ``int()``
+of a value that happens to be a Dual with all-zero derivatives is fine.
+"""
+
+import math
+from typing import Any
+
+_Number = (int, float)
+
+
+class NonDifferentiableError(ValueError):
+    """A non-differentiable operation was applied to a value that depends on inputs."""
+
+
+class Dual:
+    """
+    A value with its derivatives with respect to a fixed list of inputs.
+
+    Args:
+        value: The value.
+        derivatives: One partial derivative per input.
+    """
+
+    __slots__ = ("value", "derivatives")
+    # Make numpy scalars defer to the reflected operators below.
+    __array_ufunc__ = None
+
+    def __init__(self, value: float, derivatives: tuple[float, ...]):
+        self.value = float(value)
+        self.derivatives = tuple(derivatives)
+
+    @classmethod
+    def variable(cls, value: float, index: int, size: int) -> "Dual":
+        """The index-th of size inputs: derivative 1 with respect to itself."""
+        derivatives = [0.0] * size
+        derivatives[index] = 1.0
+        return cls(value, derivatives)
+
+    def _depends(self) -> bool:
+        return any(d != 0 for d in self.derivatives)
+
+    def _flag(self, operation: str) -> None:
+        if self._depends():
+            raise NonDifferentiableError(
+                f"{operation} is not differentiable at {self.value!r}, a value that "
+                f"depends on inputs"
+            )
+
+    # -- arithmetic ---------------------------------------------------------------
+
+    def __add__(self, other: Any) -> "Dual":
+        if isinstance(other, Dual):
+            return Dual(
+                self.value + other.value,
+                tuple(a + b for a, b in zip(self.derivatives, other.derivatives)),
+            )
+        if isinstance(other, _Number):
+            return Dual(self.value + other, self.derivatives)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> "Dual":
+        if isinstance(other, Dual):
+            return Dual(
+                self.value - other.value,
+                tuple(a - b for a, b in zip(self.derivatives, other.derivatives)),
+            )
+        if isinstance(other, _Number):
+            return Dual(self.value - other, self.derivatives)
+        return NotImplemented
+
+    def __rsub__(self, other: Any) -> "Dual":
+        if isinstance(other, _Number):
+            return Dual(other - self.value, tuple(-d for d in self.derivatives))
+        return NotImplemented
+
+    def __mul__(self, other: Any) -> "Dual":
+        if isinstance(other, Dual):
+            a, b = self.value, other.value
+            return Dual(
+                a * b,
+                tuple(da * b + a * db for da, db in zip(self.derivatives, other.derivatives)),
+            )
+        if isinstance(other, _Number):
+            return Dual(self.value * other, tuple(d * other for d in self.derivatives))
+        return NotImplemented
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: Any) -> "Dual":
+        if isinstance(other, Dual):
+            a, b = self.value, other.value
+            quotient = a / b
+            return Dual(
+                quotient,
+                tuple(
+                    (da - quotient * db) / b
+                    for da, db in zip(self.derivatives, other.derivatives)
+                ),
+            )
+        if isinstance(other, _Number):
+            return Dual(self.value / other, tuple(d / other for d in self.derivatives))
+        return NotImplemented
+
+    def __rtruediv__(self, other: Any) -> "Dual":
+        if isinstance(other, _Number):
+            quotient = other / self.value
+            return Dual(quotient, tuple(-quotient * d / self.value for d in self.derivatives))
+        return NotImplemented
+
+    def __pow__(self, other: Any) -> "Dual":
+        a = self.value
+        if isinstance(other, _Number):
+            if other == 0:
+                return Dual(1.0, (0.0,) * len(self.derivatives))
+            result = a ** other
+            scale = self._power_scale(other)
+            return Dual(result, tuple(scale * d for d in self.derivatives))
+        if isinstance(other, Dual):
+            b = other.value
+            result = a ** b
+            if other._depends() and a <= 0:
+                raise NonDifferentiableError(
+                    f"x ** y is not differentiable in y at x = {a!r}, a value that "
+                    f"is not positive"
+                )
+            log_a = math.log(a) if a > 0 else 0.0
+            scale = self._power_scale(b) if b != 0 else 0.0
+            return Dual(
+                result,
+                tuple(
+                    scale * da + result * log_a * db
+                    for da, db in zip(self.derivatives, other.derivatives)
+                ),
+            )
+        return NotImplemented
+
+    def _power_scale(self, p: float) -> float:
+        """The derivative of ``x ** p`` at this value, for a non-zero exponent p."""
+        a = self.value
+        if a == 0 and p < 1:
+            # The slope of x ** p is infinite at zero for 0 < p < 1.
+            self._flag(f"x ** {p!r}")
+            return 0.0
+        return p * a ** (p - 1)
+
+    def __rpow__(self, other: Any) -> "Dual":
+        if isinstance(other, _Number):
+            result = other ** self.value
+            if other <= 0:
+                self._flag(f"{other!r} ** x")
+                return Dual(result, (0.0,) * len(self.derivatives))
+            scale = result * math.log(other)
+            return Dual(result, tuple(scale * d for d in self.derivatives))
+        return NotImplemented
+
+    def __neg__(self) -> "Dual":
+        return Dual(-self.value, tuple(-d for d in self.derivatives))
+
+    def __pos__(self) -> "Dual":
+        return self
+
+    def __abs__(self) -> "Dual":
+        if self.value == 0:
+            self._flag("abs()")
+        return -self if self.value < 0 else self
+
+    # -- discontinuous operations -------------------------------------------------
+
+    def __float__(self) -> float:
+        self._flag("Conversion to float (as in math module functions)")
+        return self.value
+
+    def __int__(self) -> int:
+        self._flag("int()")
+        return int(self.value)
+
+    def __index__(self) -> int:
+        self._flag("Use as an integer")
+        if not self.value.is_integer():
+            raise TypeError(f"Dual value {self.value!r} is not an integer")
+        return int(self.value)
+
+    def __trunc__(self) -> int:
+        self._flag("math.trunc()")
+        return math.trunc(self.value)
+
+    def __floor__(self) -> int:
+        self._flag("math.floor()")
+        return math.floor(self.value)
+
+    def __ceil__(self) -> int:
+        self._flag("math.ceil()")
+        return math.ceil(self.value)
+
+    def __round__(self, ndigits: int | None = None) -> float:
+        self._flag("round()")
+        return round(self.value, ndigits)
+
+    def __floordiv__(self, other: Any) -> float:
+        self._flag("//")
+        return self.value // _value(other)
+
+    def __rfloordiv__(self, other: Any) -> float:
+        self._flag("//")
+        return other // self.value
+
+    def __mod__(self, other: Any) -> float:
+        self._flag("%")
+        return self.value % _value(other)
+
+    def __rmod__(self, other: Any) -> float:
+        self._flag("%")
+        return other % self.value
+
+    # -- comparisons --------------------------------------------------------------
+
+    def _compare(self, other: Any, operation: str) -> tuple[float, float] | None:
+        if isinstance(other, Dual):
+            b = other.value
+            if self.value == b and any(
+                da != db for da, db in zip(self.derivatives, other.derivatives)
+            ):
+                raise NonDifferentiableError(
+                    f"Comparison '{operation}' of two equal values ({b!r}) whose "
+                    f"derivatives differ sits on a branch boundary"
+                )
+            return self.value, b
+        if isinstance(other, _Number):
+            if self.value == other:
+                self._flag(f"Comparison '{operation}' with {other!r}")
+            return self.value, other
+        return None
+
+    def __lt__(self, other: Any) -> bool:
+        pair = self._compare(other, "<")
+        return NotImplemented if pair is None else pair[0] < pair[1]
+
+    def __le__(self, other: Any) -> bool:
+        pair = self._compare(other, "<=")
+        return NotImplemented if pair is None else pair[0] <= pair[1]
+
+    def __gt__(self, other: Any) -> bool:
+        pair = self._compare(other, ">")
+        return NotImplemented if pair is None else pair[0] > pair[1]
+
+    def __ge__(self, other: Any) -> bool:
+        pair = self._compare(other, ">=")
+        return NotImplemented if pair is None else pair[0] >= pair[1]
+
+    def __eq__(self, other: Any) -> bool:
+        pair = self._compare(other, "==")
+        return NotImplemented if pair is None else pair[0] == pair[1]
+
+    def __ne__(self, other: Any) -> bool:
+        pair = self._compare(other, "!=")
+        return NotImplemented if pair is None else pair[0] != pair[1]
+
+    __hash__ = None
+
+    def __bool__(self) -> bool:
+        if self.value == 0:
+            self._flag("Truth test")
+        return self.value != 0
+
+    def __repr__(self):
+        return f"Dual({self.value!r}, {self.derivatives!r})"
+
+
+def _value(x: Any) -> Any:
+    return x.value if isinstance(x, Dual) else x
@@ -0,0 +1,231 @@
+"""
+Engine interface and registry.
+
+An engine fills a model's value store from its inputs. Every engine must produce
+the values the reference engine produces (the conformance suite in
+``tests/engine/test_engine_conformance.py`` checks each registered engine), so
+the choice is purely about speed and memory:
+
+- ``"reference"``: the original plan-free engine. Retries each formula within a
+  period until its precedents resolve. Slow, but simple enough to trust.
+- ``"planned"`` (default): evaluates items in the order of the class's
+  EvaluationPlan, once each per period.
+- ``"lazy"``: computes nothing upfront; each value is computed on first read.
+- ``"numpy"``: the batch engine with a single scenario (requires numpy).
+- ``"numba"``: the batch engine with numba kernels (requires numba).
+
+Select an engine per instance with ``Model(engine="numpy")``, per class with
+``engine = "numpy"`` on the subclass, or globally by setting
+``ProformaModel.engine``. Add one by subclassing Engine and calling
+``register_engine``.
+"""
+
+from abc import ABC, abstractmethod
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .line_item_values import LineItemValues
+
+
+class Engine(ABC):
+    """
+    Base class for engines.
+
+    Subclasses implement ``calculate`` and may override ``recalculate`` (used by
+    ``with_inputs``) to reuse values unaffected by the changed inputs.
+
+    Attributes:
+        name (str): The registry name, set by ``register_engine``.
+        lazy (bool): True if ``calculate`` returns a store that computes values on
+            first read. Models evaluated lazily report no ``recomputed_items``.
+        supports_solver (bool): True if the engine solves same-period circular
+            references with the model's IterativeSolver.
+    """
+
+    name: str = ""
+    lazy: bool = False
+    supports_solver: bool = False
+
+    def require(self) -> None:
+        """Raise ImportError, with an install hint, if a dependency is missing."""
+
+    def available(self) -> bool:
+        """Return True if the engine's optional dependencies are installed."""
+        try:
+            self.require()
+        except ImportError:
+            return False
+        return True
+
+    @abstractmethod
+    def calculate(self, model: Any, scalars: dict, periods: list[int]) -> "LineItemValues":
+        """
+        Calculate every line item value of a model.
+
+        Args:
+            model: The ProformaModel instance (inputs already resolved).
+            scalars: Resolved scalar values by name.
+            periods: The model periods (never empty).
+
+        Returns:
+            LineItemValues: The model's value store.
+        """
+
+    def recalculate(
+        self,
+        model: Any,
+        base: "LineItemValues",
+        scalars: dict,
+        periods: list[int],
+        changed: set[str],
+    ) -> tuple["LineItemValues", list[str]]:
+        """
+        Calculate a model derived with ``with_inputs`` from one with values base.
+
+        The default recalculates everything.
+
+        Returns:
+            tuple: ``(values, recomputed)``, as ``recalculate_line_items``.
+        """
+        return self.calculate(model, scalars, periods), list(model.line_item_names)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(name={self.name!r})"
+
+
+class ReferenceEngine(Engine):
+    """The original retry-loop engine. Does not support VectorFormulaLine items."""
+
+    supports_solver = True
+
+    def calculate(self, model, scalars, periods):
+        from .calculation_engine import _calculate_with_retry
+
+        return _calculate_with_retry(model, scalars, periods)
+
+
+class PlannedEngine(Engine):
+    """Evaluates items in EvaluationPlan order; recalculates only affected items."""
+
+    supports_solver = True
+
+    def calculate(self, model, scalars, periods):
+        from .calculation_engine import calculate_line_items
+
+        return calculate_line_items(model, scalars, periods)
+
+    def recalculate(self, model, base, scalars, periods, changed):
+        from .calculation_engine import recalculate_line_items
+
+        return recalculate_line_items(model, base, scalars, periods, changed)
+
+
+class LazyEngine(Engine):
+    """Computes each value, with the precedents it needs, the first time it is read."""
+
+    lazy = True
+
+    def calculate(self, model, scalars, periods):
+        from .lazy_values import LazyLineItemValues
+
+        return LazyLineItemValues(model, scalars, periods)
+
+
+class BatchEngine(Engine):
+    """
+    Evaluates one model with the batch engine, as a batch of one scenario.
+
+    Values are returned as floats. Array arithmetic does not raise on a division
+    by zero or an invalid operation, so a run that produces a non-finite value is
+    repeated with the planned engine, which raises the reference error (or, for
+    a formula that returns inf or nan itself, gives the same values).
+
+    Args:
+        backend: The batch backend, ``"numpy"`` or ``"numba"``.
+    """
+
+    def __init__(self, backend: str):
+        self.backend = backend
+
+    def require(self) -> None:
+        from .jit_kernels import import_numba
+        from .numpy_support import import_numpy
+
+        import_numpy(f"the {self.name!r} engine")
+        if self.backend == "numba":
+            import_numba(f"the {self.name!r} engine")
+
+    def calculate(self, model, scalars, periods):
+        import math
+
+        from .batch_engine import calculate_batch
+        from .calculation_engine import calculate_line_items, new_line_item_values
+        from .numpy_support import import_numpy
+
+        np = import_numpy(f"the {self.name!r} engine")
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            batch = calculate_batch(
+                model.__class__,
+                periods,
+                scalars,
+                model._input_line_values,
+                1,
+                backend=self.backend,
+            )
+        values = batch._values
+        li = new_line_item_values(model, periods)
+        for name in model.line_item_names:
+            for period in periods:
+                value = values.get(name, period)
+                if value is not None:
+                    value = float(value[0])
+                    if not math.isfinite(value):
+                        return calculate_line_items(model, scalars, periods)
+                li.set(name, period, value)
+        return li
+
+
+_ENGINES: dict[str, Engine] = {}
+
+
+def register_engine(name: str, engine: Engine) -> None:
+    """
+    Register an engine under a name, replacing any engine of that name.
+
+    Args:
+        name: The name passed as ``Model(engine=name)``.
+        engine: The Engine instance.
+    """
+    if not isinstance(engine, Engine):
+        raise TypeError(f"engine must be an Engine instance, got {type(engine).__name__}")
+    engine.name = name
+    _ENGINES[name] = engine
+
+
+def get_engine(name: str) -> Engine:
+    """
+    Return the engine registered under name.
+
+    Raises:
+        ValueError: If no engine has that name.
+        ImportError: If the engine's optional dependencies are not installed.
+    """
+    engine = _ENGINES.get(name)
+    if engine is None:
+        raise ValueError(
+            f"Unknown engine {name!r}. Available engines: {', '.join(_ENGINES)}"
+        )
+    engine.require()
+    return engine
+
+
+def available_engines() -> list[str]:
+    """Names of the registered engines whose dependencies are installed."""
+    return [name for name, engine in _ENGINES.items() if engine.available()]
+
+
+register_engine("reference", ReferenceEngine())
+register_engine("planned", PlannedEngine())
+register_engine("lazy", LazyEngine())
+register_engine("numpy", BatchEngine("numpy"))
+register_engine("numba", BatchEngine("numba"))
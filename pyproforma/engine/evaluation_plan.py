@@ -0,0 +1,377 @@
+"""
+Evaluation plan for ProformaModel subclasses.
+
+Orders a model's calculated line items (FormulaLine and debt lines) once per
+class, so the calculation engine can evaluate each item exactly once per period
+instead of retrying pending formulas until their dependencies resolve.
+
+The plan is only as complete as the graph's edges. A read the graph missed
+raises KeyError when its value is not calculated yet (a tag sum does so for
+any member not calculated yet), and the engine retries that item at the end
+of the period.
+
+Models with VectorFormulaLine items are split into stages: each stage runs its
+per-period items over every period, then evaluates the vector items that are
+ready once that is done.
+"""
+
+import heapq
+import threading
+from typing import Any, Callable
+
+
+class EvaluationStage:
+    """
+    One pass over the periods, followed by whole-column vector items.
+
+    Attributes:
+        ordered_items (list[str]): Per-period items in dependency order.
+        deferred_items (list[str]): Per-period items resolved with the retry loop.
+        vector_items (list[str]): VectorFormulaLine items evaluated, in dependency
+            order, once ``ordered_items`` and ``deferred_items`` are known for
+            every period.
+    """
+
+    def __init__(
+        self,
+        ordered_items: list[str],
+        deferred_items: list[str],
+        vector_items: list[str],
+    ):
+        self.ordered_items = ordered_items
+        self.deferred_items = deferred_items
+        self.vector_items = vector_items
+
+    def __repr__(self):
+        return (
+            f"EvaluationStage(ordered={len(self.ordered_items)}, "
+            f"deferred={len(self.deferred_items)}, vector={len(self.vector_items)})"
+        )
+
+
+class EvaluationPlan:
+    """
+    Per-class evaluation order for a model's line items.
+
+    Built from the class's DependencyGraph (``ModelClass.graph``): formula
+    references, tag sums resolved to the items carrying each tag, and the par
+    amount, rate and term items named by each debt line's ``DebtConfig``.
+
+    Attributes:
+        fixed_items (list[str]): FixedLine and InputLine names, in declaration order.
+        ordered_items (list[str]): Per-period calculated items in dependency
+            order. Each is evaluated once per period.
+        deferred_items (list[str]): Per-period items whose formula could not be
+            traced, plus everything downstream of them. These are resolved after
+            ``ordered_items`` each period using the retry loop.
+        vector_items (list[str]): VectorFormulaLine items in dependency order.
+        stages (list[EvaluationStage]): The items above grouped into stages.
+            A model without vector items has a single stage.
+        precedents (dict[str, list[str]]): Direct line item precedents of each
+            calculated item, in declaration order.
+        scalar_precedents (dict[str, list[str]]): Scalars referenced by each
+            calculated item.
+
+    Examples:
+        >>> plan = get_evaluation_plan(WaterUtilityModel)
+        >>> plan.ordered_items.index("total_revenue") > plan.ordered_items.index("power_sales")
+        True
+    """
+
+    def __init__(
+        self,
+        fixed_items: list[str],
+        ordered_items: list[str],
+        deferred_items: list[str],
+        precedents: dict[str, list[str]],
+        scalar_precedents: dict[str, list[str]] | None = None,
+        stages: list[EvaluationStage] | None = None,
+    ):
+        self.fixed_items = fixed_items
+        self.ordered_items = ordered_items
+        self.deferred_items = deferred_items
+        self.precedents = precedents
+        self.scalar_precedents = scalar_precedents or {}
+        if stages is None:
+            stages = [EvaluationStage(ordered_items, deferred_items, [])]
+        self.stages = stages
+        self.vector_items = [name for stage in stages for name in stage.vector_items]
+
+    def __repr__(self):
+        return (
+            f"EvaluationPlan(fixed={len(self.fixed_items)}, "
+            f"ordered={len(self.ordered_items)}, "
+            f"deferred={len(self.deferred_items)}, "
+            f"stages={len(self.stages)})"
+        )
+
+
+_PLAN_LOCK = threading.Lock()
+
+
+def get_evaluation_plan(model_cls: type) -> EvaluationPlan:
+    """
+    Return the evaluation plan for a model class, building it on first use.
+
+    The plan is cached on the class itself, so every instance of the same
+    ProformaModel subclass shares it.
+    """
+    plan = model_cls.__dict__.get("_evaluation_plan")
+    if plan is None:
+        with _PLAN_LOCK:
+            plan = model_cls.__dict__.get("_evaluation_plan")
+            if plan is None:
+                plan = build_evaluation_plan(model_cls)
+                model_cls._evaluation_plan = plan
+    return plan
+
+
+def build_evaluation_plan(model_cls: type) -> EvaluationPlan:
+    """Build a fresh EvaluationPlan for a model class."""
+    from pyproforma.specs.debt_line import DebtBase
+    from pyproforma.specs.fixed_line import FixedLine
+    from pyproforma.specs.formula_line import FormulaLine
+    from pyproforma.specs.input_line import InputLine
+    from pyproforma.specs.vector_formula_line import VectorFormulaLine
+
+    from .dependency_graph import get_dependency_graph
+
+    graph = get_dependency_graph(model_cls)
+    names = list(model_cls._line_item_names)
+    position = {name: i for i, name in enumerate(names)}
+    scalar_names = set(model_cls._scalar_names)
+
+    fixed_items = []
+    calculated = []
+    precedents: dict[str, list[str]] = {}
+    scalar_precedents: dict[str, list[str]] = {}
+    unresolved = set(graph.unresolved)
+    vectors = set()
+
+    for name in names:
+        spec = getattr(model_cls, name)
+        if isinstance(spec, (FixedLine, InputLine)):
+            fixed_items.append(name)
+            continue
+        if isinstance(spec, VectorFormulaLine):
+            vectors.add(name)
+        elif not isinstance(spec, (FormulaLine, DebtBase)):
+            continue
+        refs = graph.precedents(name)
+        calculated.append(name)
+        scalar_precedents[name] = [ref for ref in refs if ref in scalar_names]
+        precedents[name] = sorted(
+            (ref for ref in refs if ref in position), key=position.__getitem__
+        )
+
+    ordered = _topological_order(
+        calculated, precedents, position, graph.same_period_precedents
+    )
+
+    # Anything downstream of an untraceable formula inherits its uncertainty.
+    dependents: dict[str, list[str]] = {name: [] for name in calculated}
+    for name in calculated:
+        for ref in precedents[name]:
+            if ref in dependents:
+                dependents[ref].append(name)
+    deferred = set()
+    stack = list(unresolved)
+    while stack:
+        name = stack.pop()
+        if name in deferred:
+            continue
+        deferred.add(name)
+        stack.extend(dependents[name])
+
+    if not vectors:
+        return EvaluationPlan(
+            fixed_items=fixed_items,
+            ordered_items=[name for name in ordered if name not in deferred],
+            deferred_items=[name for name in ordered if name in deferred],
+            precedents=precedents,
+            scalar_precedents=scalar_precedents,
+        )
+
+    stage_of = _vector_stages(model_cls, calculated, precedents, vectors)
+    stages = [
+        EvaluationStage([], [], []) for _ in range(max(stage_of.values(), default=0) + 1)
+    ]
+    for name in ordered:
+        stage = stages[stage_of[name]]
+        if name in vectors:
+            stage.vector_items.append(name)
+        elif name in deferred:
+            stage.deferred_items.append(name)
+        else:
+            stage.ordered_items.append(name)
+    return EvaluationPlan(
+        fixed_items=fixed_items,
+        ordered_items=[name for stage in stages for name in stage.ordered_items],
+        deferred_items=[name for stage in stages for name in stage.deferred_items],
+        precedents=precedents,
+        scalar_precedents=scalar_precedents,
+        stages=stages,
+    )
+
+
+def _vector_stages(
+    model_cls: type,
+    calculated: list[str],
+    precedents: dict[str, list[str]],
+    vectors: set[str],
+) -> dict[str, int]:
+    """
+    Assign each calculated item the stage it is evaluated in.
+
+    A per-period item runs one stage after the latest vector item it reads (or in
+    the stage of its other precedents); a vector item runs at the end of the
+    stage in which the last of its precedents is complete.
+
+    Raises:
+        ValueError: A vector item is part of a circular reference, or reads its
+            own values.
+    """
+    from pyproforma.specs.formula_line import _static_references
+
+    for name in vectors:
+        spec = getattr(model_cls, name)
+        if spec.formula is None:
+            continue
+        items, _, failed = spec._trace()
+        if name in items or (failed and name in _static_references(spec.formula)[0]):
+            raise ValueError(
+                f"VectorFormulaLine '{name}' references itself. Items that depend on "
+                f"their own earlier values must be FormulaLines."
+            )
+
+    stage_of: dict[str, int] = {}
+    # Tarjan emits components in reverse topological order: precedents first.
+    for members in _strongly_connected_components(calculated, precedents):
+        looped = [name for name in members if name in vectors]
+        if looped and len(members) > 1:
+            raise ValueError(
+                f"VectorFormulaLine '{looped[0]}' is part of a circular reference "
+                f"({', '.join(sorted(members))}). Vector items are evaluated for "
+                f"all periods at once, so nothing they read may depend on them."
+            )
+        stage = 0
+        for name in members:
+            for ref in precedents[name]:
+                if ref in stage_of:
+                    shift = 1 if ref in vectors and name not in vectors else 0
+                    stage = max(stage, stage_of[ref] + shift)
+        for name in members:
+            stage_of[name] = stage
+    return stage_of
+
+
+def _topological_order(
+    names: list[str],
+    edges: dict[str, list[str]],
+    position: dict[str, int],
+    same_period: Callable[[str], list[str]] | None = None,
+) -> list[str]:
+    """
+    Order names so that each comes after its precedents.
+
+    Strongly connected components (items that reference each other, typically
+    across periods such as ``starting_cash[t]`` / ``ending_cash[t - 1]``) are kept
+    together. Within one, members are ordered by their same-period reads when
+    same_period is given (so ``starting_cash`` comes before ``ending_cash``
+    whatever the declaration order), otherwise by declaration order. Ties are
+    broken by declaration order so the plan is deterministic and close to the
+    order the model was written in.
+    """
+    components = _strongly_connected_components(names, edges)
+    component_of = {}
+    for index, members in enumerate(components):
+        members.sort(key=position.__getitem__)
+        if same_period is not None and len(members) > 1:
+            inside = set(members)
+            members[:] = _topological_order(
+                members,
+                {name: [ref for ref in same_period(name) if ref in inside] for name in members},
+                position,
+            )
+        for name in members:
+            component_of[name] = index
+
+    waiting_on = [0] * len(components)
+    downstream: list[set[int]] = [set() for _ in components]
+    for name in names:
+        target = component_of[name]
+        for ref in edges[name]:
+            source = component_of.get(ref)
+            if source is not None and source != target and target not in downstream[source]:
+                downstream[source].add(target)
+                waiting_on[target] += 1
+
+    ready = [
+        (position[members[0]], index)
+        for index, members in enumerate(components)
+        if waiting_on[index] == 0
+    ]
+    heapq.heapify(ready)
+    ordered: list[str] = []
+    while ready:
+        _, index = heapq.heappop(ready)
+        ordered.extend(components[index])
+        for target in downstream[index]:
+            waiting_on[target] -= 1
+            if waiting_on[target] == 0:
+                heapq.heappush(ready, (position[components[target][0]], target))
+    return ordered
+
+
+def _strongly_connected_components(
+    names: list[str],
+    edges: dict[str, Any],
+) -> list[list[str]]:
+    """Iterative Tarjan's algorithm; safe for long formula chains."""
+    index_of: dict[str, int] = {}
+    lowlink: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+    counter = 0
+
+    for root in names:
+        if root in index_of:
+            continue
+        work = [(root, iter(edges.get(root, ())))]
+        index_of[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        while work:
+            node, children = work[-1]
+            advanced = False
+            for child in children:
+                if child not in edges:
+                    continue
+                if child not in index_of:
+                    index_of[child] = lowlink[child] = counter
+                    counter += 1
+                    stack.append(child)
+                    on_stack.add(child)
+                    work.append((child, iter(edges.get(child, ()))))
+                    advanced = True
+                    break
+                if child in on_stack:
+                    lowlink[node] = min(lowlink[node], index_of[child])
+            if advanced:
+                continue
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                lowlink[parent] = min(lowlink[parent], lowlink[node])
+            if lowlink[node] == index_of[node]:
+                members = []
+                while True:
+                    member = stack.pop()
+                    on_stack.discard(member)
+                    members.append(member)
+                    if member == node:
+                        break
+                components.append(members)
+    return components
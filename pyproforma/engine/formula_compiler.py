@@ -0,0 +1,329 @@
+"""
+Formula compilation: bypass ModelNamespace attribute dispatch.
+
+In a normal evaluation every ``li.revenue[t]`` goes through
+``ModelNamespace.__getattr__`` and ``LineItemValues.__getattr__``, and allocates
+a LineItemValue. A compiled formula rewrites those reads once, from the
+formula's source:
+
+- ``li.x[<expr>]`` becomes a direct lookup in x's ``{period: value}`` dict,
+  falling back to ``li.x[<expr>]`` semantics (and error messages) on a miss
+- every other ``li.x`` (scalars, ``li.tag``) becomes a variable bound once per
+  namespace to exactly what ``li.x`` returns
+
+Formulas the compiler cannot handle safely (source unavailable, ``li`` passed
+around as an object, ``getattr(li, name)``, private attributes, ...) keep their
+original function. Enable per model with ``compile_formulas = True``.
+"""
+
+import ast
+import copy
+import linecache
+import types
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from .model_namespace import ModelNamespace
+
+_DICT_PREFIX = "_pf_d_"
+_OBJECT_PREFIX = "_pf_o_"
+_NO_VALUES: dict = {}
+
+
+class CompiledFormula:
+    """
+    A formula rewritten to read line items without namespace dispatch.
+
+    ``bind(ns)`` resolves the formula's references against one namespace and
+    returns a function with the original ``(li, t)`` signature. Binding is done
+    once per namespace; the engine caches the result.
+
+    Attributes:
+        formula (Callable): The original formula.
+        names (list[str]): Attribute names read from ``li``, in source order.
+        indexed (list[str]): The subset read as ``li.x[...]``.
+    """
+
+    def __init__(
+        self,
+        formula: Callable,
+        factory: Callable,
+        names: list[str],
+        indexed: list[str],
+    ):
+        self.formula = formula
+        self.names = names
+        self.indexed = indexed
+        self._factory = factory
+
+    def bind(self, ns: "ModelNamespace") -> Callable | None:
+        """
+        Resolve references against ns and return the compiled function.
+
+        Returns None if a reference cannot be resolved up front (e.g. an unknown
+        name in a branch that is never taken); the caller then uses the
+        original formula, which reports errors as usual when they occur.
+        """
+        from .line_item_values import LineItemValues
+
+        li = object.__getattribute__(ns, "_li")
+        scalars = object.__getattribute__(ns, "_scalars")
+        # Only the plain dict store exposes its {period: value} dicts directly;
+        # other stores (array, lazy) go through the item object every time.
+        direct = type(li) is LineItemValues
+        kwargs: dict[str, Any] = {}
+        try:
+            for name in self.names:
+                kwargs[_OBJECT_PREFIX + name] = getattr(ns, name)
+            for name in self.indexed:
+                values = _NO_VALUES
+                if direct and name not in scalars:
+                    values = li._values.get(name, _NO_VALUES)
+                kwargs[_DICT_PREFIX + name] = values
+            closure = self.formula.__closure__ or ()
+            for var, cell in zip(self.formula.__code__.co_freevars, closure):
+                kwargs[var] = cell.cell_contents
+        except (AttributeError, ValueError):
+            return None
+        function = self._factory(**kwargs)
+        function.__defaults__ = self.formula.__defaults__
+        function.__kwdefaults__ = self.formula.__kwdefaults__
+        return function
+
+    def __repr__(self):
+        return f"CompiledFormula({self.formula!r}, names={self.names!r})"
+
+
+def compile_formula(formula: Callable) -> CompiledFormula | None:
+    """
+    Compile a formula, or return None if it uses unsupported constructs.
+
+    Args:
+        formula: A ``(li, t)`` lambda or function.
+
+    Returns:
+        CompiledFormula | None: The compiled formula, or None to use the
+        original function.
+    """
+    code = getattr(formula, "__code__", None)
+    if code is None or code.co_argcount < 1:
+        return None
+    node = _find_function_node(code)
+    if node is None:
+        return None
+    rewriter = _Rewriter(node.args.args[0].arg)
+    try:
+        # The parsed file is cached and shared, so rewrite a copy.
+        new_node = rewriter.rewrite(copy.deepcopy(node))
+    except _Unsupported:
+        return None
+
+    params = [_OBJECT_PREFIX + name for name in rewriter.names]
+    params += [_DICT_PREFIX + name for name in rewriter.indexed]
+    params += list(code.co_freevars)
+    if len(set(params)) != len(params):
+        return None
+    if isinstance(new_node, ast.Lambda):
+        body: list[ast.stmt] = [ast.Return(value=new_node)]
+    else:
+        body = [new_node, ast.Return(value=ast.Name(id=new_node.name, ctx=ast.Load()))]
+    factory_def = ast.FunctionDef(
+        name="_pf_factory",
+        args=ast.arguments(
+            posonlyargs=[],
+            args=[],
+            vararg=None,
+            kwonlyargs=[ast.arg(arg=param) for param in params],
+            kw_defaults=[None] * len(params),
+            kwarg=None,
+            defaults=[],
+        ),
+        body=body,
+        decorator_list=[],
+        returns=None,
+        type_comment=None,
+    )
+    if hasattr(ast.FunctionDef, "type_params"):  # Python 3.12+
+        factory_def.type_params = []
+    module = ast.fix_missing_locations(ast.Module(body=[factory_def], type_ignores=[]))
+    try:
+        compiled = compile(module, code.co_filename, "exec")
+    except (SyntaxError, ValueError, TypeError):
+        return None
+    namespace: dict[str, Any] = {}
+    exec(compiled, namespace)
+    # Rebuild the factory on the formula's own globals so module-level names
+    # (math, helper functions, constants) resolve exactly as before.
+    factory = types.FunctionType(
+        namespace["_pf_factory"].__code__, formula.__globals__, "_pf_factory"
+    )
+    factory.__kwdefaults__ = None
+    return CompiledFormula(formula, factory, rewriter.names, rewriter.indexed)
+
+
+class _Unsupported(Exception):
+    """Raised while rewriting when the formula cannot be compiled safely."""
+
+
+class _Rewriter(ast.NodeTransformer):
+    """Rewrites ``li.<name>`` reads inside one formula's AST."""
+
+    def __init__(self, li_name: str):
+        self.li_name = li_name
+        self.names: list[str] = []
+        self.indexed: list[str] = []
+
+    def rewrite(self, node: ast.AST) -> ast.AST:
+        args = node.args
+        if args.vararg or args.kwarg or args.posonlyargs or args.kwonlyargs:
+            raise _Unsupported()
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if isinstance(node, ast.AsyncFunctionDef) or node.decorator_list:
+                raise _Unsupported()
+        # Defaults are re-attached from the original function after binding.
+        args.defaults = [ast.Constant(value=None) for _ in args.defaults]
+        if isinstance(node, ast.Lambda):
+            node.body = self.visit(node.body)
+        else:
+            node.returns = None
+            for arg in args.args:
+                arg.annotation = None
+            node.body = [self.visit(stmt) for stmt in node.body]
+        return node
+
+    def _li_attribute(self, node: ast.AST) -> str | None:
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.value, ast.Name)
+            and node.value.id == self.li_name
+            and isinstance(node.ctx, ast.Load)
+        ):
+            if node.attr.startswith("_"):
+                raise _Unsupported()
+            return node.attr
+        return None
+
+    def _use(self, name: str, indexed: bool) -> None:
+        if name not in self.names:
+            self.names.append(name)
+        if indexed and name not in self.indexed:
+            self.indexed.append(name)
+
+    def visit_Subscript(self, node: ast.Subscript) -> ast.AST:
+        name = self._li_attribute(node.value)
+        if name is None or not isinstance(node.ctx, ast.Load):
+            return self.generic_visit(node)
+        index = self.visit(node.slice)
+        # li.tag["name"] is a lookup on the tag namespace, not a period read.
+        indexed = name != "tag" and _is_pure(index)
+        self._use(name, indexed=indexed)
+        fallback = ast.Subscript(
+            value=ast.Name(id=_OBJECT_PREFIX + name, ctx=ast.Load()),
+            slice=index,
+            ctx=ast.Load(),
+        )
+        if not indexed:
+            return ast.copy_location(fallback, node)
+        values = ast.Name(id=_DICT_PREFIX + name, ctx=ast.Load())
+        fast = ast.IfExp(
+            test=ast.Compare(left=copy.deepcopy(index), ops=[ast.In()], comparators=[values]),
+            body=ast.Subscript(value=values, slice=copy.deepcopy(index), ctx=ast.Load()),
+            orelse=fallback,
+        )
+        return ast.copy_location(fast, node)
+
+    def visit_Attribute(self, node: ast.Attribute) -> ast.AST:
+        name = self._li_attribute(node)
+        if name is None:
+            return self.generic_visit(node)
+        self._use(name, indexed=False)
+        return ast.copy_location(ast.Name(id=_OBJECT_PREFIX + name, ctx=ast.Load()), node)
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        if node.id == self.li_name:
+            # li used as a plain object (passed on, getattr(li, ...), reassigned)
+            raise _Unsupported()
+        if node.id.startswith("_pf_"):
+            raise _Unsupported()
+        return node
+
+    def visit_arg(self, node: ast.arg) -> ast.AST:
+        if node.arg == self.li_name:
+            raise _Unsupported()  # li shadowed by a nested function
+        return node
+
+    def visit_Lambda(self, node: ast.Lambda) -> ast.AST:
+        return self.generic_visit(node)
+
+    def _unsupported(self, node: ast.AST) -> ast.AST:
+        raise _Unsupported()
+
+    visit_Global = _unsupported
+    visit_Nonlocal = _unsupported
+    visit_Yield = _unsupported
+    visit_YieldFrom = _unsupported
+    visit_Await = _unsupported
+    visit_ClassDef = _unsupported
+
+
+def _is_pure(node: ast.AST) -> bool:
+    """True for index expressions safe to evaluate twice (names, constants, arithmetic)."""
+    if isinstance(node, (ast.Name, ast.Constant)):
+        return True
+    if isinstance(node, ast.BinOp):
+        return _is_pure(node.left) and _is_pure(node.right)
+    if isinstance(node, ast.UnaryOp):
+        return _is_pure(node.operand)
+    return False
+
+
+def _find_function_node(code: types.CodeType) -> ast.Lambda | ast.FunctionDef | None:
+    """Locate the lambda or def that produced code in its source file, if unambiguous."""
+    functions = _parse_file(code.co_filename)
+    if functions is None:
+        return None
+    arg_names = list(code.co_varnames[: code.co_argcount])
+    candidates = [
+        node
+        for node in functions.get((code.co_name, code.co_firstlineno), ())
+        if [arg.arg for arg in node.args.args] == arg_names
+    ]
+    if len(candidates) != 1:
+        return None
+    return candidates[0]
+
+
+_FunctionIndex = dict[tuple[str, int], list[ast.AST]]
+_PARSED: dict[str, tuple[tuple[str, ...], "_FunctionIndex | None"]] = {}
+
+
+def _parse_file(filename: str) -> "_FunctionIndex | None":
+    """
+    Parse a source file once (re-parsed if linecache sees different contents).
+
+    Returns its lambdas and defs indexed by ``(code name, first line)``, the key
+    under which a code object identifies the function it came from.
+    """
+    lines = tuple(linecache.getlines(filename))
+    if not lines:
+        return None
+    cached = _PARSED.get(filename)
+    if cached is not None and cached[0] == lines:
+        return cached[1]
+    try:
+        tree = ast.parse("".join(lines), filename)
+    except (SyntaxError, ValueError):
+        functions = None
+    else:
+        functions = {}
+        for node in ast.walk(tree):
+            if isinstance(node, ast.Lambda):
+                key = ("<lambda>", node.lineno)
+            elif isinstance(node, ast.FunctionDef):
+                first = min([node.lineno] + [d.lineno for d in node.decorator_list])
+                key = (node.name, first)
+            else:
+                continue
+            functions.setdefault(key, []).append(node)
+    _PARSED[filename] = (lines, functions)
+    return functions
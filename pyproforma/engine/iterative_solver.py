@@ -0,0 +1,292 @@
+"""
+Iterative solving of same-period circular references.
+
+Without a solver, items that depend on each other within a period (interest on
+the average cash balance, debt sized from a DSCR that depends on the debt
+service) raise "Circular reference detected". With ``solver =
+IterativeSolver()`` on the model class (or ``Model(solver=...)``), the engine
+instead solves the items it could not order by fixed-point iteration:
+
+1. Each stuck item starts from its value in the previous period (0.0 in the
+   first period): a warm start, since consecutive periods usually have similar
+   solutions.
+2. A Gauss–Seidel sweep evaluates every stuck item once, in plan order, each
+   seeing the values already updated earlier in the sweep.
+3. Sweeps repeat until no value changes by more than ``tolerance`` (relative to
+   ``max(1, |value|)``), optionally accelerated by Aitken's delta-squared
+   process or Anderson mixing.
+
+The number of sweeps needed in each period is reported in
+``model.iteration_counts``.
+"""
+
+import math
+from typing import Any, Callable
+
+_ACCELERATIONS = (None, "aitken", "anderson")
+
+
+class IterativeSolver:
+    """
+    Settings for solving same-period circular references by iteration.
+
+    Args:
+        tolerance: Convergence threshold on the largest change of any item in
+            one sweep, relative to ``max(1, |value|)``. Defaults to 1e-9.
+        max_iterations: Sweeps allowed per period before raising. Defaults to 100.
+        acceleration: None (plain Gauss–Seidel), ``"aitken"`` (component-wise
+            delta-squared extrapolation every third sweep) or ``"anderson"``
+            (Anderson mixing over the last ``anderson_depth`` sweeps). Both help
+            most for slowly converging cycles.
+        anderson_depth: Number of previous sweeps Anderson mixing uses.
+
+    Raises:
+        ValueError: If a setting is out of range.
+
+    Examples:
+        >>> class Model(ProformaModel):
+        ...     solver = IterativeSolver(tolerance=1e-10, acceleration="anderson")
+        ...     interest = FormulaLine(
+        ...         lambda li, t: li.rate * (li.cash[t - 1] + li.cash[t]) / 2,
+        ...         values={2024: 0.0},
+        ...     )
+        ...     cash = FormulaLine(
+        ...         lambda li, t: li.cash[t - 1] + li.income[t] + li.interest[t],
+        ...         values={2024: 0.0},
+        ...     )
+    """
+
+    def __init__(
+        self,
+        tolerance: float = 1e-9,
+        max_iterations: int = 100,
+        acceleration: str | None = None,
+        anderson_depth: int = 5,
+    ):
+        if not tolerance > 0:
+            raise ValueError(f"tolerance must be positive, got {tolerance!r}")
+        if int(max_iterations) != max_iterations or max_iterations < 1:
+            raise ValueError(f"max_iterations must be a positive integer, got {max_iterations!r}")
+        if acceleration not in _ACCELERATIONS:
+            raise ValueError(
+                f"Unknown acceleration {acceleration!r}. Use None, 'aitken' or 'anderson'."
+            )
+        if int(anderson_depth) != anderson_depth or anderson_depth < 1:
+            raise ValueError(f"anderson_depth must be a positive integer, got {anderson_depth!r}")
+        self.tolerance = tolerance
+        self.max_iterations = int(max_iterations)
+        self.acceleration = acceleration
+        self.anderson_depth = int(anderson_depth)
+
+    def solve(
+        self,
+        sweep: Callable[[list[float]], list[float]],
+        initial: list[float],
+    ) -> tuple[list[float], int]:
+        """
+        Iterate ``x = sweep(x)`` from initial to a fixed point.
+
+        Args:
+            sweep: One Gauss–Seidel sweep: stores x, re-evaluates every item and
+                returns the new values (leaving them stored).
+            initial: Starting values.
+
+        Returns:
+            tuple: ``(solution, sweeps)``. The solution is the last sweep's output,
+            which is what the caller's store holds.
+
+        Raises:
+            ValueError: If the iteration has not converged after max_iterations.
+        """
+        accelerate = _ACCELERATORS[self.acceleration](self)
+        x = list(initial)
+        residual = math.inf
+        for iteration in range(1, self.max_iterations + 1):
+            gx = sweep(x)
+            residual = max(
+                (abs(new - old) / max(1.0, abs(new)) for new, old in zip(gx, x)),
+                default=0.0,
+            )
+            if residual <= self.tolerance:
+                return gx, iteration
+            x = accelerate(x, gx)
+        raise _NotConverged(self.max_iterations, residual)
+
+    def __repr__(self):
+        return (
+            f"IterativeSolver(tolerance={self.tolerance!r}, "
+            f"max_iterations={self.max_iterations!r}, "
+            f"acceleration={self.acceleration!r})"
+        )
+
+
+class _NotConverged(Exception):
+    def __init__(self, iterations: int, residual: float):
+        super().__init__(iterations, residual)
+        self.iterations = iterations
+        self.residual = residual
+
+
+# ---------------------------------------------------------------------------
+# Acceleration: each factory returns accelerate(x, gx) -> next x
+# ---------------------------------------------------------------------------
+
+def _plain(solver: IterativeSolver) -> Callable:
+    return lambda x, gx: gx
+
+
+def _aitken(solver: IterativeSolver) -> Callable:
+    """Component-wise Aitken delta-squared extrapolation over three iterates."""
+    iterates: list[list[float]] = []
+
+    def accelerate(x: list[float], gx: list[float]) -> list[float]:
+        if not iterates:
+            iterates.append(x)
+        iterates.append(gx)
+        if len(iterates) < 3:
+            return gx
+        x0, x1, x2 = iterates
+        extrapolated = []
+        for a, b, c in zip(x0, x1, x2):
+            denominator = (c - b) - (b - a)
+            if denominator == 0 or not math.isfinite(denominator):
+                extrapolated.append(c)
+            else:
+                extrapolated.append(c - (c - b) ** 2 / denominator)
+        iterates.clear()
+        return extrapolated
+
+    return accelerate
+
+
+def _anderson(solver: IterativeSolver) -> Callable:
+    """Anderson mixing (type II) over the last anderson_depth sweeps."""
+    depth = solver.anderson_depth
+    previous: list[tuple[list[float], list[float]]] = []  # (f, gx)
+    delta_f: list[list[float]] = []
+    delta_g: list[list[float]] = []
+
+    def accelerate(x: list[float], gx: list[float]) -> list[float]:
+        f = [new - old for new, old in zip(gx, x)]
+        if previous:
+            f_prev, g_prev = previous[0]
+            delta_f.append([a - b for a, b in zip(f, f_prev)])
+            delta_g.append([a - b for a, b in zip(gx, g_prev)])
+            if len(delta_f) > depth:
+                del delta_f[0], delta_g[0]
+        previous[:] = [(f, gx)]
+        if not delta_f:
+            return gx
+        # Least squares: minimise |f - sum_j gamma_j * delta_f[j]|.
+        gram = [
+            [sum(a * b for a, b in zip(u, v)) for v in delta_f] for u in delta_f
+        ]
+        rhs = [sum(a * b for a, b in zip(u, f)) for u in delta_f]
+        gamma = _solve_linear(gram, rhs)
+        if gamma is None:
+            delta_f.clear()
+            delta_g.clear()
+            return gx
+        mixed = list(gx)
+        for coefficient, column in zip(gamma, delta_g):
+            for i, value in enumerate(column):
+                mixed[i] -= coefficient * value
+        return mixed
+
+    return accelerate
+
+
+def _solve_linear(matrix: list[list[float]], rhs: list[float]) -> list[float] | None:
+    """Solve a small linear system by Gaussian elimination; None if singular."""
+    n = len(rhs)
+    scale = max((abs(matrix[i][i]) for i in range(n)), default=0.0)
+    if scale == 0 or not math.isfinite(scale):
+        return None
+    a = [list(row) + [b] for row, b in zip(matrix, rhs)]
+    for col in range(n):
+        pivot = max(range(col, n), key=lambda r: abs(a[r][col]))
+        if abs(a[pivot][col]) <= 1e-14 * scale:
+            return None
+        a[col], a[pivot] = a[pivot], a[col]
+        for row in range(col + 1, n):
+            factor = a[row][col] / a[col][col]
+            for k in range(col, n + 1):
+                a[row][k] -= factor * a[col][k]
+    solution = [0.0] * n
+    for row in range(n - 1, -1, -1):
+        total = a[row][n] - sum(a[row][k] * solution[k] for k in range(row + 1, n))
+        solution[row] = total / a[row][row]
+    return solution
+
+
+_ACCELERATORS = {None: _plain, "aitken": _aitken, "anderson": _anderson}
+
+
+# ---------------------------------------------------------------------------
+# Engine integration
+# ---------------------------------------------------------------------------
+
+def solve_circular(
+    names: list[str],
+    model: Any,
+    ns: Any,
+    li: Any,
+    period: int,
+    solver: IterativeSolver,
+) -> int:
+    """
+    Solve the items in names, which the engine could not order, for one period.
+
+    Stores the converged values in li, records the sweeps in
+    ``model.iteration_counts`` and returns them.
+
+    Raises:
+        ValueError: If an item does not evaluate to a number, or the iteration
+            does not converge.
+    """
+    from .calculation_engine import _calculate_single_line_item
+
+    model_cls = model.__class__
+    line_items = [getattr(model_cls, name) for name in names]
+
+    def sweep(x: list[float]) -> list[float]:
+        for name, value in zip(names, x):
+            li.set(name, period, value)
+        values = []
+        for line_item in line_items:
+            value = _calculate_single_line_item(line_item, ns, period, model)
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(
+                    f"'{line_item.name}' is part of a circular reference in period "
+                    f"{period} and must evaluate to a number to be solved "
+                    f"iteratively, got {value!r}"
+                )
+            li.set(line_item.name, period, value)
+            values.append(float(value))
+        return values
+
+    try:
+        _, iterations = solver.solve(sweep, _warm_start(names, model, li, period))
+    except _NotConverged as e:
+        raise ValueError(
+            f"Circular reference for period {period} did not converge in "
+            f"{e.iterations} iterations (largest change {e.residual:.3g}, "
+            f"tolerance {solver.tolerance:g}): {', '.join(names)}"
+        ) from None
+    counts = model.__dict__.setdefault("iteration_counts", {})
+    counts[period] = counts.get(period, 0) + iterations
+    return iterations
+
+
+def _warm_start(names: list[str], model: Any, li: Any, period: int) -> list[float]:
+    """Each item's value in the previous model period, or 0.0."""
+    periods = model.periods
+    index = periods.index(period)
+    previous = periods[index - 1] if index > 0 else None
+    initial = []
+    for name in names:
+        value = li.get(name, previous) if previous is not None and li._has(name, previous) else None
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            value = 0.0
+        initial.append(float(value))
+    return initial
@@ -0,0 +1,528 @@
+"""
+Numba-compiled kernels for batch evaluation (``batch_backend = "numba"``).
+
+A batch evaluation stores every value in one float64 array of shape
+(items, periods, scenarios). FormulaLines that are plain arithmetic on line
+items, scalars and the period (``li.revenue[t] * (1 - li.tax_rate)``,
+``li.cash[t - 1] + li.net[t]``, ``max(li.x[t], 0)``, ``a if cond else b``) are
+translated from their source into Python statements over that array, and each
+run of consecutive translatable items in the evaluation plan becomes one
+``numba.njit`` function looping over periods, items and scenarios. Nothing else
+changes: every other item (debt lines, formulas calling arbitrary functions,
+reading ``None`` inputs, ...) is evaluated by the NumPy batch engine as usual,
+between the kernels.
+
+Generated kernels are written to a cache directory (``PYPROFORMA_CACHE_DIR``,
+default ``~/.cache/pyproforma/kernels``) and compiled with ``cache=True``, so a
+new process loads them from disk instead of compiling again.
+"""
+
+import ast
+import hashlib
+import importlib.util
+import math
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+from typing import Any, Callable
+
+from .formula_compiler import _find_function_node
+from .numpy_support import import_numpy
+from .period_offsets import _OffsetVisitor
+
+
+def import_numba(feature: str):
+    """
+    Import and return the numba module, or raise a helpful ImportError.
+
+    Args:
+        feature: Short description of what needs numba, used in the error message.
+    """
+    try:
+        import numba
+    except ImportError as e:
+        raise ImportError(
+            f"numba is required for {feature}. "
+            "Install it with: pip install numba  "
+            "(or: pip install pyproforma[numba])"
+        ) from e
+    return numba
+
+
+def numba_available() -> bool:
+    """Return True if numba can be imported."""
+    try:
+        import numba  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+_MATH_FUNCTIONS = {"exp", "log", "log10", "sqrt", "floor", "ceil", "fabs", "pow"}
+_BUILTINS = {"abs": abs, "min": min, "max": max}
+_BINARY_OPS = {
+    ast.Add: "+",
+    ast.Sub: "-",
+    ast.Mult: "*",
+    ast.Div: "/",
+    ast.FloorDiv: "//",
+    ast.Mod: "%",
+    ast.Pow: "**",
+}
+_COMPARE_OPS = {
+    ast.Lt: "<",
+    ast.LtE: "<=",
+    ast.Gt: ">",
+    ast.GtE: ">=",
+    ast.Eq: "==",
+    ast.NotEq: "!=",
+}
+
+
+class KernelFormula:
+    """
+    A FormulaLine translated to one expression over the batch value array.
+
+    Attributes:
+        name (str): The line item.
+        expression (str): Python expression for one scenario ``s`` in period
+            column ``j`` (``data[row, j - 1, s] + scalars[0, s]``).
+        reads (list[tuple[str, int]]): ``(line item, period offset)`` pairs read.
+        scalars (list[str]): Scalars read.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        expression: str,
+        reads: list[tuple[str, int]],
+        scalars: list[str],
+    ):
+        self.name = name
+        self.expression = expression
+        self.reads = reads
+        self.scalars = scalars
+
+    def __repr__(self):
+        return f"KernelFormula({self.name!r}, {self.expression!r})"
+
+
+def translate_formula(model_cls: type, name: str) -> KernelFormula | None:
+    """
+    Translate one FormulaLine of a model class, or return None if unsupported.
+
+    Translations are cached on the class.
+    """
+    cache = model_cls.__dict__.get("_kernel_formulas")
+    if cache is None:
+        cache = {}
+        model_cls._kernel_formulas = cache
+    if name not in cache:
+        cache[name] = _translate(model_cls, name)
+    return cache[name]
+
+
+class _Unsupported(Exception):
+    """Raised while translating when a formula is not plain arithmetic."""
+
+
+def _translate(model_cls: type, name: str) -> KernelFormula | None:
+    from pyproforma.specs.formula_line import FormulaLine
+
+    spec = getattr(model_cls, name)
+    formula = getattr(spec, "formula", None)
+    if type(spec) is not FormulaLine or formula is None:
+        return None
+    code = getattr(formula, "__code__", None)
+    if code is None or code.co_argcount != 2 or formula.__defaults__:
+        return None
+    node = _find_function_node(code)
+    if node is None:
+        return None
+    if isinstance(node, ast.Lambda):
+        body = node.body
+    else:
+        statements = [
+            stmt for stmt in node.body
+            if not (isinstance(stmt, ast.Expr) and isinstance(stmt.value, ast.Constant))
+        ]
+        if len(statements) != 1 or not isinstance(statements[0], ast.Return):
+            return None
+        body = statements[0].value
+    translator = _Translator(model_cls, formula, node.args.args[0].arg, node.args.args[1].arg)
+    try:
+        expression = translator.expression(body)
+    except _Unsupported:
+        return None
+    return KernelFormula(name, expression, translator.reads, translator.scalars)
+
+
+class _Translator:
+    """Turns one formula expression into kernel source."""
+
+    def __init__(self, model_cls: type, formula: Callable, li_name: str, t_name: str):
+        self.rows = {item: i for i, item in enumerate(model_cls._line_item_names)}
+        self.scalar_index = {item: i for i, item in enumerate(model_cls._scalar_names)}
+        self.tag_members = model_cls._tag_members
+        self.li_name = li_name
+        self.t_name = t_name
+        self.offsets = _OffsetVisitor(li_name, t_name)
+        self.closure = dict(
+            zip(
+                formula.__code__.co_freevars,
+                (cell.cell_contents for cell in (formula.__closure__ or ())),
+            )
+        )
+        self.globals = formula.__globals__
+        self.reads: list[tuple[str, int]] = []
+        self.scalars: list[str] = []
+
+    def _resolve(self, name: str) -> Any:
+        if name in self.closure:
+            return self.closure[name]
+        if name in self.globals:
+            return self.globals[name]
+        builtins = self.globals.get("__builtins__", {})
+        if isinstance(builtins, dict):
+            return builtins.get(name, _MISSING)
+        return getattr(builtins, name, _MISSING)
+
+    def _read(self, name: str, index: ast.AST) -> str:
+        offset = self.offsets._offset(index)
+        if offset is None:
+            raise _Unsupported()
+        self.reads.append((name, offset))
+        column = "j" if offset == 0 else f"j + {offset}" if offset > 0 else f"j - {-offset}"
+        return f"data[{self.rows[name]}, {column}, s]"
+
+    def expression(self, node: ast.AST) -> str:
+        if isinstance(node, ast.Constant):
+            if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+                raise _Unsupported()
+            return repr(node.value)
+        if isinstance(node, ast.Name):
+            if node.id == self.t_name:
+                return "t"
+            if node.id == self.li_name:
+                raise _Unsupported()
+            return _constant(self._resolve(node.id))
+        if isinstance(node, ast.Attribute):
+            if isinstance(node.value, ast.Name) and node.value.id == self.li_name:
+                if node.attr not in self.scalar_index:
+                    raise _Unsupported()
+                if node.attr not in self.scalars:
+                    self.scalars.append(node.attr)
+                return f"scalars[{self.scalar_index[node.attr]}, s]"
+            raise _Unsupported()
+        if isinstance(node, ast.Subscript):
+            return self._subscript(node)
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            left = self.expression(node.left)
+            right = self.expression(node.right)
+            return f"({left} {_BINARY_OPS[type(node.op)]} {right})"
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, (ast.USub, ast.UAdd)):
+            sign = "-" if isinstance(node.op, ast.USub) else "+"
+            return f"({sign}{self.expression(node.operand)})"
+        if isinstance(node, ast.IfExp):
+            return (
+                f"({self.expression(node.body)} if {self.condition(node.test)} "
+                f"else {self.expression(node.orelse)})"
+            )
+        if isinstance(node, ast.Call):
+            return self._call(node)
+        raise _Unsupported()
+
+    def condition(self, node: ast.AST) -> str:
+        if isinstance(node, ast.Compare):
+            parts = []
+            left = self.expression(node.left)
+            for op, comparator in zip(node.ops, node.comparators):
+                if type(op) not in _COMPARE_OPS:
+                    raise _Unsupported()
+                right = self.expression(comparator)
+                parts.append(f"({left} {_COMPARE_OPS[type(op)]} {right})")
+                left = right
+            return "(" + " and ".join(parts) + ")"
+        if isinstance(node, ast.BoolOp):
+            joiner = " and " if isinstance(node.op, ast.And) else " or "
+            return "(" + joiner.join(self.condition(value) for value in node.values) + ")"
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            return f"(not {self.condition(node.operand)})"
+        return f"({self.expression(node)} != 0)"
+
+    def _subscript(self, node: ast.Subscript) -> str:
+        value = node.value
+        if isinstance(value, ast.Attribute) and isinstance(value.value, ast.Name):
+            if value.value.id == self.li_name and value.attr in self.rows:
+                return self._read(value.attr, node.slice)
+        tag = self.offsets._tag_name(value)
+        if tag is None:
+            raise _Unsupported()
+        # Same order as BatchTagSum: 0.0, then each member in declaration order.
+        members = self.tag_members.get(tag, [])
+        terms = ["0.0"] + [self._read(member, node.slice) for member in members]
+        return "(" + " + ".join(terms) + ")"
+
+    def _call(self, node: ast.Call) -> str:
+        if node.keywords or any(isinstance(arg, ast.Starred) for arg in node.args):
+            raise _Unsupported()
+        args = ", ".join(self.expression(arg) for arg in node.args)
+        func = node.func
+        if isinstance(func, ast.Name) and func.id in _BUILTINS:
+            if self._resolve(func.id) is not _BUILTINS[func.id]:
+                raise _Unsupported()
+            if func.id != "abs" and len(node.args) < 2:
+                raise _Unsupported()
+            return f"{func.id}({args})"
+        if (
+            isinstance(func, ast.Attribute)
+            and isinstance(func.value, ast.Name)
+            and func.attr in _MATH_FUNCTIONS
+            and self._resolve(func.value.id) is math
+        ):
+            return f"math.{func.attr}({args})"
+        raise _Unsupported()
+
+
+_MISSING = object()
+
+
+def _constant(value: Any) -> str:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise _Unsupported()
+    if isinstance(value, float) and not math.isfinite(value):
+        raise _Unsupported()
+    return repr(value)
+
+
+# ---------------------------------------------------------------------------
+# Kernel generation and the on-disk cache
+# ---------------------------------------------------------------------------
+
+_KERNELS: dict[str, Callable] = {}
+# One thread writes, imports and compiles a kernel; the others wait for it.
+_KERNELS_LOCK = threading.Lock()
+
+
+def kernel_source(rows: list[int], formulas: list[KernelFormula]) -> str:
+    """Source of the kernel evaluating formulas (stored in rows) in order."""
+    lines = [
+        "import math",
+        "",
+        "from numba import njit",
+        "",
+        "",
+        "@njit(cache=True, error_model='numpy', nogil=True)",
+        "def kernel(data, scalars, periods, skip, start, stop):",
+        "    size = data.shape[2]",
+        "    for j in range(start, stop):",
+        "        t = periods[j]",
+    ]
+    for i, (row, formula) in enumerate(zip(rows, formulas)):
+        lines += [
+            f"        # {formula.name}",
+            f"        if not skip[{i}, j]:",
+            "            for s in range(size):",
+            f"                data[{row}, j, s] = {formula.expression}",
+        ]
+    return "\n".join(lines) + "\n"
+
+
+def load_kernel(source: str) -> Callable:
+    """Return the compiled kernel for source, writing it to the cache directory once."""
+    digest = hashlib.sha1(source.encode()).hexdigest()[:20]
+    kernel = _KERNELS.get(digest)
+    if kernel is not None:
+        return kernel
+    with _KERNELS_LOCK:
+        kernel = _KERNELS.get(digest)
+        if kernel is None:
+            kernel = _load_kernel(source, digest)
+            _KERNELS[digest] = kernel
+    return kernel
+
+
+def _load_kernel(source: str, digest: str) -> Callable:
+    import_numba("the numba batch backend")
+    path = _cache_dir() / f"kernel_{digest}.py"
+    if not path.exists() or path.read_text() != source:
+        temporary = path.with_suffix(f".{os.getpid()}.tmp")
+        temporary.write_text(source)
+        os.replace(temporary, path)
+    # Registered under its own name: numba re-imports it when loading from the cache.
+    module_name = f"_pyproforma_kernel_{digest}"
+    spec = importlib.util.spec_from_file_location(module_name, path)
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module.kernel
+
+
+def _cache_dir() -> Path:
+    base = os.environ.get("PYPROFORMA_CACHE_DIR")
+    path = Path(base) if base else Path.home() / ".cache" / "pyproforma"
+    path = path / "kernels"
+    try:
+        path.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        path = Path(tempfile.gettempdir()) / "pyproforma-kernels"
+        path.mkdir(parents=True, exist_ok=True)
+    return path
+
+
+# ---------------------------------------------------------------------------
+# Running kernels inside a batch evaluation
+# ---------------------------------------------------------------------------
+
+class KernelRunner:
+    """
+    Decides which items of one batch evaluation run in kernels, and runs them.
+
+    An item runs in a kernel when its formula translates, every scalar it reads
+    is numeric, every period it reads exists (``t - 1`` needs consecutive integer
+    periods and an override value for the first period), none of the line items
+    it reads hold ``None``, and everything it reads in the same period is
+    evaluated before it. ``ready`` re-checks the last condition per period,
+    since an item the plan orders first can still be retried later in a period.
+
+    Args:
+        model_cls: The model class being evaluated.
+        periods: The evaluated periods.
+        li: The batch value store.
+        scalars: Scalar values (numbers or N-length arrays).
+        input_line_values: InputLine values by name and period.
+    """
+
+    def __init__(
+        self,
+        model_cls: type,
+        periods: list[int],
+        li: Any,
+        scalars: dict[str, Any],
+        input_line_values: dict[str, dict[int, Any]],
+    ):
+        np = import_numpy("the numba batch backend")
+        import_numba("the numba batch backend")
+        from .evaluation_plan import get_evaluation_plan
+
+        self.model_cls = model_cls
+        self.li = li
+        self.periods = list(periods)
+        self.period_array = np.asarray(self.periods, dtype=np.int64)
+        self.plan = get_evaluation_plan(model_cls)
+
+        self.scalar_array = np.zeros((len(model_cls._scalar_names), li.size))
+        self.numeric_scalars = set()
+        for i, name in enumerate(model_cls._scalar_names):
+            value = scalars.get(name)
+            try:
+                self.scalar_array[i] = np.broadcast_to(
+                    np.asarray(value, dtype=np.float64), (li.size,)
+                )
+            except (TypeError, ValueError):
+                continue
+            if not isinstance(value, bool):
+                self.numeric_scalars.add(name)
+
+        self._none_items = {
+            name
+            for name, values in input_line_values.items()
+            if any(value is None for value in values.values())
+        }
+        self._sequence = self._evaluation_sequence()
+        self._eligible: dict[str, bool] = {}
+        self._segments: dict[tuple[str, ...], list[tuple[bool, list[str]]]] = {}
+        self.compiled_items: list[str] = []
+
+    def _evaluation_sequence(self) -> dict[str, tuple[int, int]]:
+        """(stage, position) at which each item is evaluated within a period."""
+        sequence = {}
+        position = 0
+        for name in self.plan.fixed_items:
+            sequence[name] = (0, position)
+            position += 1
+        for index, stage in enumerate(self.plan.stages):
+            for name in stage.ordered_items + stage.deferred_items + stage.vector_items:
+                sequence[name] = (index, position)
+                position += 1
+        return sequence
+
+    def eligible(self, name: str) -> bool:
+        cached = self._eligible.get(name)
+        if cached is None:
+            cached = self._check(name)
+            self._eligible[name] = cached
+        return cached
+
+    def _check(self, name: str) -> bool:
+        formula = translate_formula(self.model_cls, name)
+        if formula is None or name not in self._sequence:
+            return False
+        if any(scalar not in self.numeric_scalars for scalar in formula.scalars):
+            return False
+        stage, position = self._sequence[name]
+        overrides = getattr(self.model_cls, name).values
+        count = len(self.periods)
+        consecutive = all(b - a == 1 for a, b in zip(self.periods, self.periods[1:]))
+        for ref, offset in formula.reads:
+            if ref in self._none_items or ref not in self._sequence:
+                return False
+            ref_stage, ref_position = self._sequence[ref]
+            if offset == 0:
+                if ref_position >= position:
+                    return False
+                continue
+            # Later periods of the same stage are not evaluated yet.
+            if not consecutive or ref_stage > stage or (offset > 0 and ref_stage == stage):
+                return False
+            for j, period in enumerate(self.periods):
+                if period not in overrides and not 0 <= j + offset < count:
+                    return False
+        return True
+
+    def segments(self, names: list[str]) -> list[tuple[bool, list[str]]]:
+        """Split names into runs of ``(runs in a kernel, names)``, preserving order."""
+        key = tuple(names)
+        cached = self._segments.get(key)
+        if cached is None:
+            cached = []
+            for name in names:
+                compiled = self.eligible(name)
+                if cached and cached[-1][0] == compiled:
+                    cached[-1][1].append(name)
+                else:
+                    cached.append((compiled, [name]))
+            for compiled, members in cached:
+                if compiled:
+                    self.compiled_items.extend(m for m in members if m not in self.compiled_items)
+            self._segments[key] = cached
+        return cached
+
+    def ready(self, names: list[str], column: int) -> bool:
+        """True if everything names read in the same period column is evaluated."""
+        li = self.li
+        for name in names:
+            for ref, offset in translate_formula(self.model_cls, name).reads:
+                if offset == 0 and ref not in names and not li._filled[li._row[ref], column]:
+                    return False
+        return True
+
+    def run(self, names: list[str], start: int, stop: int) -> None:
+        """Evaluate names (a compiled segment) for period columns start..stop-1."""
+        np = import_numpy("the numba batch backend")
+        li = self.li
+        rows = [li._row[name] for name in names]
+        formulas = [translate_formula(self.model_cls, name) for name in names]
+        skip = np.zeros((len(names), len(self.periods)), dtype=np.bool_)
+        for i, name in enumerate(names):
+            for period, value in getattr(self.model_cls, name).values.items():
+                j = li._column.get(period)
+                if j is not None:
+                    skip[i, j] = True
+                    if start <= j < stop:
+                        li.data[rows[i], j] = value
+        kernel = load_kernel(kernel_source(rows, formulas))
+        kernel(li.data, self.scalar_array, self.period_array, skip, start, stop)
+        li._filled[rows, start:stop] = True
@@ -0,0 +1,313 @@
+"""
+On-demand line item values for lazily evaluated models.
+
+``Model(lazy=True)`` skips the calculation pass at instantiation. Each value is
+computed the first time it is read, after computing (and memoising) only
+the precedents it needs. Reading ``model.net_revenue[2030]`` therefore evaluates
+just the part of the graph behind that one number.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Any
+
+from .calculation_engine import (
+    _calculate_single_line_item,
+    _check_pending_error,
+    calculate_line_items,
+    new_namespace,
+)
+from .line_item_values import LineItemValue, LineItemValues
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+
+class _LazyAbort(BaseException):
+    """
+    Carries an error out of nested lazy evaluation unchanged.
+
+    A value computed on demand runs inside the formula that asked for it. An error
+    there must reach the caller as-is rather than be re-wrapped by every formula
+    on the way out (the engine wraps ordinary exceptions raised by a formula).
+    Deriving from BaseException keeps it clear of ``except Exception`` in formulas
+    and in the engine.
+    """
+
+    def __init__(self, error: Exception):
+        super().__init__(error)
+        self.error = error
+
+
+class _NeedValue(BaseException):
+    """
+    Raised by a read of a value that is not computed yet, during a computation.
+
+    Rather than computing it there (recursing once per precedent and lagged
+    period), the read unwinds to ``LazyLineItemValues._run``, which computes the
+    needed value first and then retries. A BaseException, like _LazyAbort.
+    """
+
+    def __init__(self, name: str, period: int, prefetch: bool = False):
+        super().__init__(name, period)
+        self.key = (name, period)
+        self.prefetch = prefetch
+
+
+class LazyLineItemValues(LineItemValues):
+    """
+    LineItemValues that computes each value the first time it is requested.
+
+    Values are memoised in the same ``{name: {period: value}}`` layout as the
+    eager store. Debt lines are computed in period order, since a debt schedule
+    depends on every earlier issuance; a VectorFormulaLine computes all of its
+    periods at once. Errors match the eager engine: formula
+    errors carry the same message, and a circular reference raises the same
+    "Circular reference detected for period ..." error.
+
+    Reads from several threads are safe: computing a missing value holds a lock,
+    shared with the stores this one adopts values from, since those memo dicts
+    and debt schedules are shared too.
+
+    Examples:
+        >>> model = MyModel(lazy=True)
+        >>> model.profit[2030]   # computes profit[2030] and what it needs
+    """
+
+    def __init__(self, model: "ProformaModel", scalars: dict, periods: list[int]):
+        super().__init__(periods=periods, names=model.line_item_names, model=model)
+        self._scalars = scalars
+        self._ns = new_namespace(model, self, scalars)
+        self._period_index = {period: i for i, period in enumerate(self._periods)}
+        self._in_progress: set[tuple[str, int]] = set()
+        self._items: dict[str, LazyLineItemValue] = {}
+        self._lock = threading.RLock()
+        self._reads: dict[str, list[tuple[str, int]]] = {}
+        self._no_prefetch: set[tuple[str, int]] = set()
+
+    def get(
+        self, name: str, period: int | None = None
+    ) -> Any | dict[int, Any] | None:
+        """Get (computing if needed) one value, or every period's values when period is None."""
+        if name not in self._values:
+            return None
+        if period is None:
+            for p in self._periods:
+                self._resolve(name, p)
+            return self._values[name]
+        if period not in self._period_index:
+            return None
+        self._resolve(name, period)
+        return self._values[name].get(period)
+
+    def __getattr__(self, name: str) -> "LazyLineItemValue":
+        if name.startswith("_"):
+            raise AttributeError(
+                f"'{type(self).__name__}' object has no attribute '{name}'"
+            )
+        item = self._items.get(name)
+        if item is None:
+            if name not in self._values:
+                raise AttributeError(
+                    f"Line item '{name}' is not registered. "
+                    f"Available line items: {', '.join(sorted(self._names))}"
+                )
+            item = LazyLineItemValue(name, self)
+            self._items[name] = item
+        return item
+
+    def adopt(self, other: LineItemValues, names: list[str]) -> None:
+        """Take the values of names from another store; a lazy store shares its memo dicts."""
+        if isinstance(other, LazyLineItemValues):
+            self._lock = other._lock
+            for name in names:
+                self._values[name] = other._values[name]
+            self._tag_sums.clear()
+            return
+        super().adopt(other, names)
+
+    def __repr__(self):
+        computed = sum(len(values) for values in self._values.values())
+        return (
+            f"LazyLineItemValues(items={len(self._values)}, "
+            f"periods={self._periods!r}, computed={computed})"
+        )
+
+    def _resolve(self, name: str, period: int) -> None:
+        """Compute name at period if needed; a read inside a computation raises _NeedValue."""
+        if period in self._values[name]:
+            return
+        with self._lock:
+            if self._in_progress:
+                raise _NeedValue(name, period)
+            self._run((name, period))
+
+    def _run(self, key: tuple[str, int]) -> None:
+        """
+        Compute key and whatever it needs, without recursion.
+
+        Keys wait on an explicit stack. Before a formula runs, the precedents the
+        dependency graph knows it reads (at constant offsets) are pushed and
+        computed first, so it normally runs once; a read the graph did not
+        predict stops the computation with _NeedValue, and it is retried once
+        that value is computed. Depth is bounded by memory, not the recursion
+        limit, however long a chain of items or lagged periods is.
+
+        A prefetched value may sit in a branch the formula never takes. If
+        computing it fails, it is dropped and the formula runs without
+        prefetching, so errors and circular references are only reported for
+        values that are really read.
+        """
+        stack = [(key, False)]
+        self._in_progress.add(key)
+        error = None
+        try:
+            while stack:
+                (name, period), _ = stack[-1]
+                try:
+                    self._compute(name, period)
+                except _NeedValue as need:
+                    if need.key not in self._in_progress:
+                        stack.append((need.key, need.prefetch))
+                        self._in_progress.add(need.key)
+                        continue
+                    failure = self._unresolvable_error(need.key[1])
+                except _LazyAbort as abort:
+                    failure = abort.error
+                else:
+                    self._in_progress.discard(stack.pop()[0])
+                    continue
+                prefetched = [i for i, (_, prefetch) in enumerate(stack) if prefetch]
+                if not prefetched:
+                    error = failure
+                    break
+                # Unwind to the failed prefetch and run its reader without prefetching.
+                for dropped, _ in stack[prefetched[-1]:]:
+                    self._in_progress.discard(dropped)
+                del stack[prefetched[-1]:]
+                self._no_prefetch.add(stack[-1][0])
+        finally:
+            self._in_progress.clear()
+        if error is not None:
+            raise error
+
+    def _compute(self, name: str, period: int) -> None:
+        """Compute one value; raises _NeedValue for a missing precedent."""
+        from pyproforma.specs.debt_line import DebtBase
+        from pyproforma.specs.vector_formula_line import VectorFormulaLine
+
+        values = self._values[name]
+        if period in values:
+            return
+
+        model = self._model
+        line_item = getattr(model.__class__, name)
+        if isinstance(line_item, VectorFormulaLine):
+            self._compute_vector(line_item)
+            return
+        if isinstance(line_item, DebtBase):
+            # The schedule must have seen every earlier period's issuance.
+            for earlier in self._periods[: self._period_index[period]]:
+                if earlier not in values:
+                    raise _NeedValue(name, earlier)
+        if (name, period) not in self._no_prefetch and period not in getattr(
+            line_item, "values", ()
+        ):
+            for ref, offset in self._graph_reads(name):
+                read = period + offset
+                if (
+                    read in self._period_index
+                    and read not in self._values[ref]
+                    and (ref, read) not in self._in_progress
+                ):
+                    raise _NeedValue(ref, read, prefetch=True)
+
+        try:
+            value = _calculate_single_line_item(line_item, self._ns, period, model)
+        except (AttributeError, KeyError) as e:
+            try:
+                _check_pending_error(line_item, period, e)
+            except ValueError as error:
+                raise _LazyAbort(error) from None
+            # The eager engine would wait for this; on demand, nothing will arrive.
+            raise _LazyAbort(self._unresolvable_error(period)) from None
+        except Exception as error:
+            raise _LazyAbort(error) from None
+        values[period] = value
+
+    def _graph_reads(self, name: str) -> list[tuple[str, int]]:
+        """(line item, offset) pairs name is known to read, from the dependency graph."""
+        reads = self._reads.get(name)
+        if reads is None:
+            from .dependency_graph import get_dependency_graph
+
+            graph = get_dependency_graph(self._model.__class__)
+            reads = [
+                (ref, offset)
+                for ref, offsets in graph.offsets(name).items()
+                if ref in self._values
+                for offset in offsets
+                if offset is not None and offset <= 0
+            ]
+            self._reads[name] = reads
+        return reads
+
+    def _compute_vector(self, line_item: Any) -> None:
+        """Compute every period of a VectorFormulaLine in one evaluation."""
+        from .vector_namespace import evaluate_vector_line
+
+        try:
+            column = evaluate_vector_line(
+                line_item,
+                self,
+                self._scalars,
+                self._periods,
+                self._model.__class__._tag_members,
+            )
+        except Exception as error:
+            raise _LazyAbort(error) from None
+        self._values[line_item.name].update(zip(self._periods, column))
+
+    def _unresolvable_error(self, period: int) -> Exception:
+        """
+        The error the eager engine reports for a value that can never resolve.
+
+        Re-runs the eager engine up to ``period`` so the message (normally
+        "Circular reference detected for period ...") is exactly the same.
+        """
+        periods = self._periods[: self._period_index[period] + 1]
+        try:
+            calculate_line_items(self._model, self._scalars, periods)
+        except ValueError as error:
+            return error
+        names = sorted({name for name, p in self._in_progress if p == period})
+        return ValueError(
+            f"Circular reference detected for period {period}. "
+            f"Cannot calculate: {', '.join(names)}"
+        )
+
+
+class LazyLineItemValue(LineItemValue):
+    """One line item of a LazyLineItemValues store; ``item[period]`` computes on demand."""
+
+    def __init__(self, name: str, store: LazyLineItemValues):
+        self._name = name
+        self._store = store
+
+    @property
+    def _values(self) -> dict[int, Any]:
+        return self._store._values[self._name]
+
+    def get(self, period: int, default: Any = None) -> Any | None:
+        if period not in self._store._period_index:
+            return default
+        self._store._resolve(self._name, period)
+        return self._values.get(period, default)
+
+    def __getitem__(self, period: int) -> Any:
+        if period not in self._store._period_index:
+            raise KeyError(f"Period {period} not found for line item '{self._name}'")
+        self._store._resolve(self._name, period)
+        return self._values[period]
+
+    def __repr__(self):
+        return f"LazyLineItemValue(name={self._name!r}, computed={self._values!r})"
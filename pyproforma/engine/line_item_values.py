@@ -11,7 +11,20 @@ if TYPE_CHECKING:
 
 
 class TagSum:
-    """Sums all line items sharing a tag for a given period. Used inside formula evaluation."""
+    """
+    Sums all line items sharing a tag for a given period. Used inside formula evaluation.
+
+    Members come from the class's tag index (``_tag_members``). Once every member
+    has a value for a period, the sum is memoised on the value store, so later
+    references to the same tag and period are a single lookup.
+
+    A member with no value yet for the period raises KeyError ("Period ..."),
+    like reading that member directly, so the engine defers the formula until
+    the member is calculated instead of using a partial total.
+
+    The item being evaluated (``li._evaluating``) is left out, so a total that
+    carries the tag it sums adds up the other members. That sum is not memoised.
+    """
 
     def __init__(self, model: "ProformaModel", li: "LineItemValues", tag: str):
         self._model = model
@@ -19,21 +32,33 @@ class TagSum:
         self._tag = tag
 
     def __getitem__(self, period: int) -> float:
+        li = self._li
+        key = (self._tag, period)
+        members = self._model.__class__._tag_members.get(self._tag, ())
+        reader = li._evaluating if li._evaluating in members else None
+        if reader is None:
+            cached = li._tag_sums.get(key)
+            if cached is not None:
+                return cached
         if period not in self._model.periods:
             raise KeyError(
                 f"Period {period} not found in model. "
                 f"Available periods: {self._model.periods}"
             )
         total = 0.0
-        for name in self._model.line_item_names:
-            spec = getattr(self._model.__class__, name)
-            if hasattr(spec, "tags") and self._tag in spec.tags:
-                try:
-                    value = self._li.get(name, period)
-                    if value is not None:
-                        total += value
-                except (AttributeError, KeyError):
-                    pass
+        for name in members:
+            if name == reader:
+                continue
+            value = li.get(name, period)
+            if value is not None:
+                total += value
+            elif not li._has(name, period):
+                raise KeyError(
+                    f"Period {period} not yet calculated for '{name}', "
+                    f"tagged '{self._tag}'"
+                )
+        if reader is None:
+            li._tag_sums[key] = total
         return total
 
     def __repr__(self):
@@ -115,8 +140,11 @@ class LineItemValues:
         else:
             self._values = values or {}
 
-        # Initialize tag namespace
+        # Initialize tag namespace; (tag, period) sums are memoised by TagSum
         self._tag_namespace = TagNamespace(model, self) if model else None
+        self._tag_sums: dict[tuple[str, int], float] = {}
+        # Name of the formula being evaluated, set by the engine (see TagSum)
+        self._evaluating: str | None = None
 
     @property
     def tag(self) -> "TagNamespace":
@@ -184,6 +212,68 @@ class LineItemValues:
         if name not in self._values:
             self._values[name] = {}
         self._values[name][period] = value
+        if self._tag_sums:
+            self._forget_tag_sums(name, period)
+
+    def _has(self, name: str, period: int) -> bool:
+        """Whether a value (possibly None) has been set for name at period."""
+        return period in self._values.get(name, ())
+
+    def _forget_tag_sums(self, name: str, period: int) -> None:
+        """Drop memoised tag sums that included name's value at period."""
+        for tag in getattr(self._model.__class__, name).tags:
+            self._tag_sums.pop((tag, period), None)
+
+    def _copy(self, model: "ProformaModel | None" = None) -> "LineItemValues":
+        """
+        Return an independent copy of this store, to branch a calculation from it.
+
+        Args:
+            model: The model the copy belongs to. Defaults to this store's model.
+        """
+        copied = LineItemValues(
+            {name: dict(values) for name, values in self._values.items()},
+            periods=self._periods,
+            names=None if self._names is None else list(self._names),
+            model=self._model if model is None else model,
+        )
+        copied._tag_sums = dict(self._tag_sums)
+        return copied
+
+    def adopt(self, other: "LineItemValues", names: list[str]) -> None:
+        """
+        Take the values of names from another store.
+
+        The ``{period: value}`` dicts are shared, not copied, so models derived
+        with ``with_inputs`` reuse the values they have in common.
+        """
+        for name in names:
+            period_values = other.get(name)
+            if period_values is not None:
+                self._values[name] = period_values
+        self._tag_sums.clear()
+
+    def array(self, name: str):
+        """
+        Return a line item's values across periods as a NumPy float array.
+
+        The dict store builds a new array (unset or None periods become NaN);
+        ArrayLineItemValues returns a zero-copy view instead.
+
+        Raises:
+            ImportError: If numpy is not installed.
+        """
+        from .numpy_support import import_numpy
+
+        np = import_numpy("array access to line item values")
+        period_values = self.get(name) or {}
+        return np.array(
+            [
+                np.nan if period_values.get(p) is None else period_values[p]
+                for p in self._periods
+            ],
+            dtype=np.float64,
+        )
 
     def __getattr__(self, name: str) -> "LineItemValue":
         """
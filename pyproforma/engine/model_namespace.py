@@ -46,11 +46,14 @@ class ModelNamespace:
         >>> growth = FormulaLine(lambda li, t: li.revenue[t - 1] * (1 + li.rate[t]))
     """
 
-    __slots__ = ("_li", "_scalars")
+    __slots__ = ("_li", "_scalars", "_bound")
 
-    def __init__(self, li: "LineItemValues", scalars: dict):
+    def __init__(self, li: "LineItemValues", scalars: dict, compile_formulas: bool = False):
         object.__setattr__(self, "_li", li)
         object.__setattr__(self, "_scalars", scalars)
+        # FormulaLine -> formula bound to this namespace (see formula_compiler);
+        # None when formulas run uncompiled.
+        object.__setattr__(self, "_bound", {} if compile_formulas else None)
 
     def __getattr__(self, name: str):
         if name.startswith("_"):
@@ -86,3 +89,61 @@ class ModelNamespace:
 
     def __repr__(self) -> str:
         return "ModelNamespace(...)"
+
+
+class _BoundNamespace(ModelNamespace):
+    """
+    Base for the namespace classes generated per model by ``namespace_class``.
+
+    Every line item and scalar of the model is a slot, filled once when the
+    namespace is created: line items with their value-store accessor, numeric
+    scalars pre-wrapped as ``_ScalarValue``. ``li.revenue`` is then a plain slot
+    load. Names that are not slots (typos, or anything the store could not
+    provide) still go through ``ModelNamespace.__getattr__`` and its messages.
+    """
+
+    __slots__ = ()
+    _item_names: tuple[str, ...] = ()
+    _scalar_slot_names: tuple[str, ...] = ()
+
+    def __init__(self, li: "LineItemValues", scalars: dict, compile_formulas: bool = False):
+        super().__init__(li, scalars, compile_formulas)
+        setter = object.__setattr__
+        try:
+            setter(self, "tag", li.tag)
+        except AttributeError:
+            pass
+        for name in self._scalar_slot_names:
+            if name in scalars:
+                value = scalars[name]
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    value = _ScalarValue(value, name)
+                setter(self, name, value)
+        for name in self._item_names:
+            if name in scalars:
+                continue
+            try:
+                setter(self, name, getattr(li, name))
+            except AttributeError:
+                pass
+
+
+def namespace_class(model_cls: type) -> type[ModelNamespace]:
+    """
+    Generate the namespace class for a model class.
+
+    Called from ``ProformaModel.__init_subclass__``; the result is stored as
+    ``model_cls._namespace_cls``.
+    """
+    items = tuple(model_cls._line_item_names)
+    scalars = tuple(model_cls._scalar_names)
+    return type(
+        f"{model_cls.__name__}Namespace",
+        (_BoundNamespace,),
+        {
+            "__slots__": ("tag",) + items + scalars,
+            "__module__": __name__,
+            "_item_names": items,
+            "_scalar_slot_names": scalars,
+        },
+    )
@@ -0,0 +1,35 @@
+"""
+Optional NumPy import shared by the array-based engine features.
+
+NumPy is not a hard dependency of pyproforma. Features that need it call
+``import_numpy()`` at the point of use, which raises a helpful ImportError when
+it is not installed.
+"""
+
+
+def import_numpy(feature: str):
+    """
+    Import and return the numpy module, or raise a helpful ImportError.
+
+    Args:
+        feature: Short description of what needs numpy, used in the error message
+            (e.g. ``"the array value store"``).
+    """
+    try:
+        import numpy
+    except ImportError as e:
+        raise ImportError(
+            f"numpy is required for {feature}. "
+            "Install it with: pip install numpy  "
+            "(or: pip install pyproforma[numpy])"
+        ) from e
+    return numpy
+
+
+def numpy_available() -> bool:
+    """Return True if numpy can be imported."""
+    try:
+        import numpy  # noqa: F401
+    except ImportError:
+        return False
+    return True
@@ -0,0 +1,215 @@
+"""
+Period-offset analysis of FormulaLine formulas.
+
+Records, for each ``li.x[...]`` read in a formula, the offset of the period it
+reads relative to the period being calculated: ``li.revenue[t]`` is offset 0,
+``li.cash[t - 1]`` is offset -1. Offset-0 reads are same-period edges of the
+dependency graph; negative offsets are inter-period edges, which is what lets a
+running balance refer to itself without being a circular reference.
+
+The analysis reads the formula's source, so every branch is covered. When the
+source is unavailable the formula is traced instead with a symbolic period,
+which covers only the branch taken. An index the analysis cannot reduce to
+``t + constant`` (``li.x[first_year]``, ``li.x[f(t)]``) is recorded as None:
+unknown.
+"""
+
+import ast
+from typing import Any, Callable
+
+from .formula_compiler import _find_function_node
+
+
+class PeriodOffsets:
+    """
+    Period offsets read by one formula.
+
+    Attributes:
+        items (dict[str, list[int | None]]): Offsets at which each line item is
+            read with ``li.x[...]``, sorted, with None (unknown) last.
+        tags (dict[str, list[int | None]]): The same for ``li.tag["name"][...]``.
+        exact (bool): True when the offsets come from the formula's source and so
+            cover every branch; False when they were traced.
+
+    Examples:
+        >>> analyze_offsets(lambda li, t: li.cash[t - 1] + li.net[t]).items
+        {'cash': [-1], 'net': [0]}
+    """
+
+    def __init__(
+        self,
+        items: dict[str, list[int | None]],
+        tags: dict[str, list[int | None]],
+        exact: bool,
+    ):
+        self.items = items
+        self.tags = tags
+        self.exact = exact
+
+    def __repr__(self):
+        return f"PeriodOffsets(items={self.items!r}, tags={self.tags!r}, exact={self.exact})"
+
+
+def analyze_offsets(formula: Callable) -> PeriodOffsets | None:
+    """
+    Analyze the period offsets a ``(li, t)`` formula reads.
+
+    Returns:
+        PeriodOffsets | None: The offsets, or None if the formula cannot be
+        analyzed at all (not a two-argument function).
+    """
+    code = getattr(formula, "__code__", None)
+    if code is None or code.co_argcount < 2:
+        return None
+    node = _find_function_node(code)
+    if node is not None:
+        li_name, t_name = node.args.args[0].arg, node.args.args[1].arg
+        visitor = _OffsetVisitor(li_name, t_name)
+        if isinstance(node, ast.Lambda):
+            visitor.visit(node.body)
+        else:
+            for stmt in node.body:
+                visitor.visit(stmt)
+        return PeriodOffsets(_sorted(visitor.items), _sorted(visitor.tags), exact=True)
+    return _trace_offsets(formula)
+
+
+def _sorted(found: dict[str, set]) -> dict[str, list[int | None]]:
+    return {
+        name: sorted(offsets, key=lambda o: (o is None, o or 0))
+        for name, offsets in found.items()
+    }
+
+
+class _OffsetVisitor(ast.NodeVisitor):
+    """Collects ``li.x[<index>]`` and ``li.tag[<name>][<index>]`` reads."""
+
+    def __init__(self, li_name: str, t_name: str):
+        self.li_name = li_name
+        self.t_name = t_name
+        self.items: dict[str, set] = {}
+        self.tags: dict[str, set] = {}
+
+    def _li_attribute(self, node: ast.AST) -> str | None:
+        if (
+            isinstance(node, ast.Attribute)
+            and isinstance(node.value, ast.Name)
+            and node.value.id == self.li_name
+        ):
+            return node.attr
+        return None
+
+    def visit_Subscript(self, node: ast.Subscript) -> None:
+        name = self._li_attribute(node.value)
+        if name is not None and name != "tag":
+            self.items.setdefault(name, set()).add(self._offset(node.slice))
+            self.visit(node.slice)
+            return
+        tag = self._tag_name(node.value)
+        if tag is not None:
+            self.tags.setdefault(tag, set()).add(self._offset(node.slice))
+            self.visit(node.slice)
+            return
+        self.generic_visit(node)
+
+    def _tag_name(self, node: ast.AST) -> str | None:
+        if (
+            isinstance(node, ast.Subscript)
+            and self._li_attribute(node.value) == "tag"
+            and isinstance(node.slice, ast.Constant)
+            and isinstance(node.slice.value, str)
+        ):
+            return node.slice.value
+        return None
+
+    def _offset(self, node: ast.AST) -> int | None:
+        """Reduce an index expression to the constant k in ``t + k``, or None."""
+        if isinstance(node, ast.Name):
+            return 0 if node.id == self.t_name else None
+        if isinstance(node, ast.BinOp) and isinstance(node.op, (ast.Add, ast.Sub)):
+            left, right = node.left, node.right
+            if _is_int(right):
+                base = self._offset(left)
+                if base is None:
+                    return None
+                return base + right.value if isinstance(node.op, ast.Add) else base - right.value
+            if isinstance(node.op, ast.Add) and _is_int(left):
+                base = self._offset(right)
+                return None if base is None else base + left.value
+        return None
+
+
+def _is_int(node: ast.AST) -> bool:
+    return (
+        isinstance(node, ast.Constant)
+        and isinstance(node.value, int)
+        and not isinstance(node.value, bool)
+    )
+
+
+# ---------------------------------------------------------------------------
+# Tracing fallback (source unavailable)
+# ---------------------------------------------------------------------------
+
+class _SymbolicPeriod:
+    """Stands in for t while tracing: ``t - 1`` becomes a period at offset -1."""
+
+    def __init__(self, offset: int):
+        self.offset = offset
+
+    def __add__(self, other: Any) -> "_SymbolicPeriod":
+        if isinstance(other, int) and not isinstance(other, bool):
+            return _SymbolicPeriod(self.offset + other)
+        return NotImplemented
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> "_SymbolicPeriod":
+        if isinstance(other, int) and not isinstance(other, bool):
+            return _SymbolicPeriod(self.offset - other)
+        return NotImplemented
+
+
+class _OffsetRecorder:
+    """Records ``li.x[...]`` reads made with a _SymbolicPeriod (or anything else)."""
+
+    def __init__(self):
+        self.items: dict[str, set] = {}
+        self.tags: dict[str, set] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name == "tag":
+            return _TagOffsets(self.tags)
+        return _ReadRecorder(self.items, name)
+
+
+class _ReadRecorder:
+    def __init__(self, found: dict[str, set], name: str):
+        self._found = found
+        self._name = name
+
+    def __getitem__(self, period: Any) -> Any:
+        from pyproforma.specs.formula_line import _DummyValue
+
+        offset = period.offset if isinstance(period, _SymbolicPeriod) else None
+        self._found.setdefault(self._name, set()).add(offset)
+        return _DummyValue()
+
+
+class _TagOffsets:
+    def __init__(self, found: dict[str, set]):
+        self._found = found
+
+    def __getitem__(self, tag: str) -> _ReadRecorder:
+        return _ReadRecorder(self._found, tag)
+
+
+def _trace_offsets(formula: Callable) -> PeriodOffsets:
+    recorder = _OffsetRecorder()
+    try:
+        formula(recorder, _SymbolicPeriod(0))
+    except Exception:
+        pass
+    return PeriodOffsets(_sorted(recorder.items), _sorted(recorder.tags), exact=False)
@@ -0,0 +1,254 @@
+"""
+Input sensitivities by forward-mode automatic differentiation.
+
+``model.sensitivity("net_revenue", 2030)`` returns the derivative of a value
+with respect to every input of the model: each ScalarInputLine, and each period
+of each InputLine that is not locked and has a value, except inputs used as a
+debt term, which is a whole number of years. Bumping each input and
+recalculating would cost one evaluation per input. Instead, every input is
+replaced by a Dual number (see ``dual_numbers``) carrying a unit derivative, and
+one evaluation pass carries the derivatives through formulas, tag sums and debt
+schedules together.
+
+The pass is lazy and memoised on the model: a query evaluates only the values
+behind it, and later queries reuse them.
+
+VectorFormulaLine formulas see object arrays of Duals, so arithmetic, shifts
+and NumPy functions built on them (``np.cumsum``) carry derivatives.
+
+A value whose formula applies a non-differentiable operation to something that
+depends on the inputs (``int()``, a ``math`` function, ``abs`` at zero, a
+comparison exactly on a branch boundary, a NumPy function with no Dual form
+such as ``np.exp``) is flagged: it keeps its plain value so evaluation can
+continue, but its derivatives are NaN, and any sensitivity that depends on it
+raises a ValueError naming the operation.
+"""
+
+import math
+from typing import TYPE_CHECKING, Any
+
+from .dual_numbers import Dual, NonDifferentiableError
+from .lazy_values import LazyLineItemValues, _LazyAbort
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+
+def input_variables(model: "ProformaModel") -> list[tuple[str, int | None]]:
+    """
+    The inputs sensitivities are taken against, in order.
+
+    Inputs used as a debt term are left out: a term is a whole number of
+    years, so the schedule has no derivative with respect to it.
+
+    Returns:
+        list: ``(name, None)`` for each numeric ScalarInputLine, then
+        ``(name, period)`` for each unlocked, non-None InputLine period.
+    """
+    from pyproforma.specs.debt_line import DebtBase
+
+    cls = model.__class__
+    terms = {
+        getattr(cls, name).config.term
+        for name in cls._line_item_names
+        if isinstance(getattr(cls, name), DebtBase)
+    }
+    variables: list[tuple[str, int | None]] = [
+        (name, None)
+        for name in cls._scalar_input_names
+        if isinstance(model._scalars[name], (int, float))
+        and not isinstance(model._scalars[name], bool)
+        and name not in terms
+    ]
+    for name in cls._input_line_names:
+        if name in terms:
+            continue
+        locked = getattr(cls, name).locked_values
+        values = model._input_line_values.get(name, {})
+        variables.extend(
+            (name, period)
+            for period in model.periods
+            if period not in locked and values.get(period) is not None
+        )
+    return variables
+
+
+class SensitivityValues(LazyLineItemValues):
+    """
+    Dual-number values of a model, computed on demand.
+
+    Each value that depends on an input is a Dual whose derivatives follow
+    ``variables``; values that do not are plain floats.
+
+    Attributes:
+        variables (list): The inputs, as returned by ``input_variables``.
+        flags (dict): ``{(name, period): reason}`` for values whose formula used a
+            non-differentiable operation.
+    """
+
+    def __init__(self, model: "ProformaModel"):
+        self.variables = input_variables(model)
+        shadow = _dual_model(model, self.variables)
+        super().__init__(shadow, shadow._scalars, model.periods)
+        self.flags: dict[tuple[str, int], str] = {}
+        self._plain = model
+        self._broken_debt: dict[int, str] = {}
+
+    def _compute(self, name: str, period: int) -> None:
+        from pyproforma.specs.debt_line import DebtBase
+        from pyproforma.specs.vector_formula_line import VectorFormulaLine
+
+        if period in self._values[name]:
+            return
+        line_item = getattr(self._model.__class__, name)
+        is_debt = isinstance(line_item, DebtBase)
+        if is_debt and id(line_item.config) in self._broken_debt:
+            # A flagged issuance leaves the rest of the schedule without it.
+            self._flag(name, period, self._broken_debt[id(line_item.config)])
+            return
+        try:
+            super()._compute(name, period)
+        except _LazyAbort as abort:
+            reason = _non_differentiable(abort.error)
+            if reason is None:
+                raise
+            if is_debt:
+                self._broken_debt[id(line_item.config)] = reason
+            periods = self._periods if isinstance(line_item, VectorFormulaLine) else [period]
+            for p in periods:
+                self._flag(name, p, reason)
+
+    def _compute_vector(self, line_item: Any) -> None:
+        from .vector_namespace import evaluate_vector_line
+
+        try:
+            column = evaluate_vector_line(
+                line_item,
+                self,
+                self._scalars,
+                self._periods,
+                self._model.__class__._tag_members,
+                dual=True,
+            )
+        except Exception as error:
+            if _non_differentiable(error) is None:
+                # The plain model evaluated it, so the formula uses something
+                # (a NumPy function, say) that does not apply to Dual numbers.
+                error = NonDifferentiableError(
+                    f"vector formula for '{line_item.name}' does not support dual "
+                    f"numbers ({error.__cause__ or error})"
+                )
+            raise _LazyAbort(error) from None
+        self._values[line_item.name].update(zip(self._periods, column))
+
+    def _flag(self, name: str, period: int, reason: str) -> None:
+        self.flags[(name, period)] = reason
+        value = self._plain._li.get(name, period)
+        if value is not None:
+            value = Dual(value, (math.nan,) * len(self.variables))
+        self._values[name][period] = value
+
+
+def sensitivity(
+    model: "ProformaModel", name: str, period: int | None = None
+) -> dict[str, Any]:
+    """
+    Derivatives of one value with respect to every input of the model.
+
+    Args:
+        model: The model. Its dual-number values are memoised on it.
+        name: A line item, or a scalar.
+        period: The period (required for a line item).
+
+    Returns:
+        dict: ``{scalar_input: derivative}`` and
+        ``{input_line: {period: derivative}}``, the layout ``with_inputs`` takes.
+
+    Raises:
+        ValueError: If name is unknown, has no value, depends on a
+            non-differentiable operation, or the model uses an iterative solver.
+    """
+    cls = model.__class__
+    if model._solver is not None:
+        raise ValueError(
+            f"Sensitivities are not available for {cls.__name__}: it is solved with "
+            f"an IterativeSolver."
+        )
+    store = model.__dict__.get("_sensitivity_values")
+    if store is None:
+        # Threads racing to create the store all end up using the first one.
+        store = model.__dict__.setdefault("_sensitivity_values", SensitivityValues(model))
+
+    if name in cls._scalar_names:
+        value = store._scalars[name]
+    elif name in cls._line_item_names:
+        if period not in model.periods:
+            raise ValueError(
+                f"sensitivity of line item '{name}' needs one of the model periods "
+                f"{model.periods}, got {period!r}"
+            )
+        value = store.get(name, period)
+        if value is None:
+            raise ValueError(f"'{name}' has no value in period {period}.")
+    else:
+        raise ValueError(f"'{name}' is not a line item or scalar of {cls.__name__}.")
+
+    if isinstance(value, Dual):
+        derivatives = value.derivatives
+        if any(math.isnan(d) for d in derivatives):
+            raise ValueError(_undefined_message(model, store, name, period))
+    else:
+        derivatives = (0.0,) * len(store.variables)
+
+    result: dict[str, Any] = {}
+    for (input_name, input_period), derivative in zip(store.variables, derivatives):
+        if input_period is None:
+            result[input_name] = derivative
+        else:
+            result.setdefault(input_name, {})[input_period] = derivative
+    return result
+
+
+def _dual_model(model: "ProformaModel", variables: list[tuple[str, int | None]]) -> Any:
+    """A copy of model whose inputs are Dual variables, with fresh debt calculators."""
+    cls = model.__class__
+    size = len(variables)
+    scalars = dict(model._scalars)
+    input_values = {name: dict(values) for name, values in model._input_line_values.items()}
+    for index, (name, period) in enumerate(variables):
+        if period is None:
+            scalars[name] = Dual.variable(scalars[name], index, size)
+        else:
+            input_values[name][period] = Dual.variable(input_values[name][period], index, size)
+    shadow = cls.__new__(cls)
+    shadow.periods = list(model.periods)
+    shadow.line_item_names = model.line_item_names
+    shadow.scalar_names = model.scalar_names
+    shadow._scalars = scalars
+    shadow._input_line_values = input_values
+    shadow._debt_calculators = shadow._new_debt_calculators()
+    return shadow
+
+
+def _non_differentiable(error: BaseException | None) -> str | None:
+    """The NonDifferentiableError message behind error (possibly wrapped), or None."""
+    while error is not None:
+        if isinstance(error, NonDifferentiableError):
+            return str(error)
+        error = error.__cause__ or error.__context__
+    return None
+
+
+def _undefined_message(
+    model: "ProformaModel", store: SensitivityValues, name: str, period: int | None
+) -> str:
+    related = {name, *model.__class__.graph.ancestors(name)}
+    flags = [
+        (item, p, reason) for (item, p), reason in store.flags.items() if item in related
+    ] or [(item, p, reason) for (item, p), reason in store.flags.items()]
+    where = "" if period is None else f" in period {period}"
+    details = "; ".join(f"'{item}' in period {p}: {reason}" for item, p, reason in flags)
+    return (
+        f"Sensitivity of '{name}'{where} is undefined: it depends on a "
+        f"non-differentiable operation ({details})."
+    )
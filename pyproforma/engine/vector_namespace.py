@@ -0,0 +1,235 @@
+"""
+Whole-column formula namespace for VectorFormulaLine.
+
+A VectorFormulaLine formula is called once per model with a VectorNamespace, in
+which ``li.revenue`` is a PeriodVector: a NumPy array holding revenue for every
+period, in period order. In batch evaluation each vector has shape
+(scenarios, periods) instead, and scenario-varying scalars are columns of shape
+(scenarios, 1), so the same elementwise formula serves both. In a sensitivity
+pass (``dual=True``) vectors are object arrays of Dual numbers, so derivatives
+flow through the same elementwise formula.
+"""
+
+from typing import Any
+
+from .dual_numbers import Dual
+from .numpy_support import import_numpy
+
+np = import_numpy("VectorFormulaLine")
+
+
+class PeriodVector(np.ndarray):
+    """
+    A float64 array of one value per period (last axis), with period shifts.
+
+    Arithmetic on a PeriodVector returns a PeriodVector, so shifts can be applied
+    to expressions as well: ``(li.revenue - li.costs).lag(1)``.
+
+    Examples:
+        >>> v = PeriodVector([1.0, 2.0, 3.0])
+        >>> v.lag(1)
+        PeriodVector([nan,  1.,  2.])
+        >>> v.lead(1, fill=0.0)
+        PeriodVector([2., 3., 0.])
+    """
+
+    def __new__(cls, values: Any, dtype: Any = np.float64) -> "PeriodVector":
+        return np.asarray(values, dtype=dtype).view(cls)
+
+    def lag(self, n: int = 1, fill: float = np.nan) -> "PeriodVector":
+        """
+        Values shifted n periods later: element i is the value of period i - n.
+
+        The first n periods have no earlier value and take fill (NaN by default).
+        A negative n shifts the other way, like ``lead(-n)``.
+        """
+        n = int(n)
+        if n < 0:
+            return self.lead(-n, fill)
+        shifted = np.full_like(self, fill)
+        count = self.shape[-1]
+        if n < count:
+            shifted[..., n:] = self[..., : count - n]
+        return shifted
+
+    def lead(self, n: int = 1, fill: float = np.nan) -> "PeriodVector":
+        """Values shifted n periods earlier: element i is the value of period i + n."""
+        n = int(n)
+        if n < 0:
+            return self.lag(-n, fill)
+        shifted = np.full_like(self, fill)
+        count = self.shape[-1]
+        if n < count:
+            shifted[..., : count - n] = self[..., n:]
+        return shifted
+
+
+class VectorNamespace:
+    """
+    The ``li`` passed to VectorFormulaLine formulas.
+
+    Line items are read from a value store that already holds every period of
+    them (the engine schedules vector items accordingly), converted once per
+    namespace to a PeriodVector. Scalars are returned as-is.
+
+    Args:
+        li: The model's value store (any store whose items support
+            ``li.<name>[period]``).
+        scalars: Scalar values by name.
+        periods: Model periods, in order.
+        tag_members: Line item names carrying each tag.
+        size: Number of scenarios for batch evaluation, or None for one model.
+        dual: True if values may be Dual numbers (a sensitivity pass): vectors
+            are then object arrays, and Dual scalars 0-d object arrays.
+    """
+
+    def __init__(
+        self,
+        li: Any,
+        scalars: dict[str, Any],
+        periods: list[int],
+        tag_members: dict[str, list[str]],
+        size: int | None = None,
+        dual: bool = False,
+    ):
+        self._li = li
+        self._scalars = scalars
+        self._periods = list(periods)
+        self._tag_members = tag_members
+        self._size = size
+        self._dtype = object if dual else np.float64
+        self._columns: dict[str, PeriodVector] = {}
+        self.t = np.asarray(self._periods)
+        self.tag = _VectorTagNamespace(self)
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if name in self._scalars:
+            value = self._scalars[name]
+            if self._size is not None and getattr(value, "ndim", 0) == 1:
+                return value[:, None]
+            if isinstance(value, Dual):
+                # A Dual defers array arithmetic; an object array applies it elementwise.
+                return np.array(value, dtype=object)
+            return value
+        column = self._columns.get(name)
+        if column is None:
+            column = self._column(name)
+            self._columns[name] = column
+        return column
+
+    def _column(self, name: str) -> PeriodVector:
+        item = getattr(self._li, name)
+        values = []
+        for period in self._periods:
+            value = item[period]
+            values.append(np.nan if value is None else value)
+        if self._size is None:
+            return PeriodVector(values, self._dtype)
+        return PeriodVector(
+            np.stack([np.broadcast_to(v, (self._size,)) for v in values], axis=-1)
+        )
+
+    def __repr__(self):
+        return f"VectorNamespace(periods={self._periods!r})"
+
+
+class _VectorTagNamespace:
+    """``li.tag["name"]``: the per-period sum of the items carrying a tag."""
+
+    def __init__(self, ns: VectorNamespace):
+        self._ns = ns
+
+    def __getitem__(self, tag: str) -> PeriodVector:
+        members = self._ns._tag_members.get(tag, [])
+        total = np.zeros(len(self._ns._periods))
+        for name in members:
+            total = total + getattr(self._ns, name)
+        return PeriodVector(total)
+
+
+def evaluate_vector_line(
+    line_item: Any,
+    li: Any,
+    scalars: dict[str, Any],
+    periods: list[int],
+    tag_members: dict[str, list[str]],
+    size: int | None = None,
+    dual: bool = False,
+) -> list[Any]:
+    """
+    Evaluate a VectorFormulaLine and return its value for each period.
+
+    Values are plain floats (N-length arrays in batch evaluation; floats or Duals
+    with ``dual=True``). Periods listed in the line item's ``values`` take those
+    values instead.
+
+    Raises:
+        ValueError: The formula failed, returned the wrong shape, or read a line
+            item that is not yet calculated for every period. A division by zero
+            (or invalid operation) that reaches a period's value raises the
+            error the equivalent FormulaLine raises for that period.
+    """
+    name = line_item.name
+    ns = VectorNamespace(li, scalars, periods, tag_members, size, dual)
+    try:
+        if size is None and not dual:
+            with np.errstate(divide="raise", invalid="raise"):
+                result = line_item.eval(ns)
+        else:
+            result = line_item.eval(ns)
+    except FloatingPointError as e:
+        # Masked out (np.where(li.x != 0, 1 / li.x, 0)) or not, as FormulaLine would be.
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result = line_item.eval(ns)
+        _check_finite(line_item, periods, result, e)
+    except AttributeError as e:
+        if "is not registered" in str(e):
+            raise ValueError(f"Error in formula for '{name}': {e}") from e
+        raise ValueError(f"Error evaluating vector formula for '{name}': {e}") from e
+    except KeyError as e:
+        raise ValueError(
+            f"Cannot evaluate vector formula for '{name}': its inputs must be "
+            f"calculated for every period first ({e.args[0] if e.args else e})"
+        ) from e
+    except Exception as e:
+        raise ValueError(f"Error evaluating vector formula for '{name}': {e}") from e
+    if result is None:
+        raise ValueError(f"Formula for '{name}' returned None")
+
+    shape = (len(periods),) if size is None else (size, len(periods))
+    try:
+        column = np.broadcast_to(np.asarray(result, dtype=ns._dtype), shape)
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            f"Vector formula for '{name}' must return one value per period "
+            f"({len(periods)}), got {getattr(result, 'shape', type(result).__name__)}"
+        ) from e
+
+    if dual:
+        values = [value if isinstance(value, Dual) else float(value) for value in column]
+    elif size is None:
+        values = column.tolist()
+    else:
+        values = [column[:, j].copy() for j in range(len(periods))]
+    for j, period in enumerate(periods):
+        if period in line_item.values:
+            values[j] = line_item.values[period]
+    return values
+
+
+def _check_finite(
+    line_item: Any, periods: list[int], result: Any, error: FloatingPointError
+) -> None:
+    """Raise FormulaLine's error for the first period a floating point error left non-finite."""
+    try:
+        column = np.broadcast_to(np.asarray(result, dtype=np.float64), (len(periods),))
+    except (TypeError, ValueError):
+        return  # reported as a shape error
+    reason = "float division by zero" if "divide" in str(error) else str(error)
+    for period, value in zip(periods, column):
+        if period not in line_item.values and not np.isfinite(value):
+            raise ValueError(
+                f"Error evaluating formula for '{line_item.name}' in period {period}: {reason}"
+            ) from error
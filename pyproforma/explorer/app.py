@@ -3,6 +3,7 @@
 import dataclasses
 import json
 import os
+import threading
 
 from flask import Flask, abort, flash, redirect, render_template, request, url_for
 
@@ -47,8 +48,11 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
     class _State:
         pass
 
+    # Requests are served from threads. Each handler reads state.model once and
+    # uses that model throughout; updates replace it whole, under state.lock.
     state = _State()
     state.model = model
+    state.lock = threading.Lock()
     state.model_class = type(model)
     state.periods = model.periods
 
@@ -143,8 +147,8 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
             if isinstance(row, ItemRow):
                 result.append(dataclasses.replace(row, href=url_for("line_item", name=row.name)))
             elif isinstance(row, TagItemsRow):
-                names = [n for n in state.model.line_item_names
-                         if row.tag in getattr(type(state.model), n).tags]
+                names = [n for n in state.model_class._line_item_names
+                         if row.tag in getattr(state.model_class, n).tags]
                 for name in names:
                     result.append(ItemRow(name=name, bold=row.bold,
                                           href=url_for("line_item", name=name)))
@@ -269,16 +273,17 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
 
     @app.route("/table/<int:idx>")
     def table_view(idx):
+        m = state.model
         labels = list(state.tables.keys())
         if idx >= len(labels):
             abort(404)
         label = labels[idx]
         definition = state.tables[label]
-        table = state.model.tables.build(_add_hrefs(definition))
+        table = m.tables.build(_add_hrefs(definition))
         download_url = url_for("table_download", idx=idx) if state.excel_available else None
         return render_template(
             "table_view.html",
-            model=state.model,
+            model=m,
             title=table.title or label,
             table_html=table.to_bootstrap_html(),
             download_url=download_url,
@@ -286,6 +291,7 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
 
     @app.route("/table/<int:idx>/download")
     def table_download(idx):
+        m = state.model
         labels = list(state.tables.keys())
         if idx >= len(labels):
             abort(404)
@@ -294,7 +300,7 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
         from flask import send_file
         label = labels[idx]
         definition = state.tables[label]
-        table = state.model.tables.build(_add_hrefs(definition))
+        table = m.tables.build(_add_hrefs(definition))
         buf = table.to_excel_bytes()
         filename = label.lower().replace(" ", "_") + ".xlsx"
         return send_file(
@@ -306,20 +312,22 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
 
     @app.route("/chart/<int:idx>")
     def chart_view(idx):
+        m = state.model
         labels = list(state.charts.keys())
         if idx >= len(labels):
             abort(404)
         label = labels[idx]
-        chart_data = json.dumps(state.model.charts.build(state.charts[label]).to_apexcharts())
+        chart_data = json.dumps(m.charts.build(state.charts[label]).to_apexcharts())
         return render_template(
             "chart_view.html",
-            model=state.model,
+            model=m,
             title=label,
             chart_data=chart_data,
         )
 
     @app.route("/view/<int:idx>")
     def view_page(idx):
+        m = state.model
         labels = list(state.views.keys())
         if idx >= len(labels):
             abort(404)
@@ -341,27 +349,27 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
             processed = []
             for col_idx, comp in enumerate(row):
                 if isinstance(comp, StatCard):
-                    c = comp.build(state.model)
+                    c = comp.build(m)
                     c["col_width"] = col_width
                 elif isinstance(comp, InputGroup):
-                    c = comp.build(state.model)
+                    c = comp.build(m)
                     c["col_width"] = col_width
                 elif isinstance(comp, dict) and comp.get("type") == "stat":
                     c = StatCard(
                         name=comp["name"],
                         label=comp.get("label"),
                         aggregation=comp.get("aggregation", "latest"),
-                    ).build(state.model)
+                    ).build(m)
                     c["col_width"] = col_width
                 elif comp["type"] == "chart":
                     c = dict(comp)
                     c["col_width"] = col_width
                     c["chart_data"] = json.dumps(
-                        state.model.charts.build(state.charts[comp["ref"]]).to_apexcharts()
+                        m.charts.build(state.charts[comp["ref"]]).to_apexcharts()
                     )
                     c["chart_id"] = f"view-chart-{row_idx}-{col_idx}"
                 elif comp["type"] == "table":
-                    built = state.model.tables.build(_add_hrefs(state.tables[comp["ref"]]))
+                    built = m.tables.build(_add_hrefs(state.tables[comp["ref"]]))
                     c = dict(comp)
                     c["col_width"] = col_width
                     c["html"] = built.to_bootstrap_html()
@@ -376,7 +384,7 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
 
         return render_template(
             "view.html",
-            model=state.model,
+            model=m,
             title=label,
             rows=rows,
             has_inputs=has_inputs,
@@ -385,21 +393,22 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
 
     @app.route("/inputs", methods=["GET"])
     def inputs():
+        m = state.model
         if state.inputs_group is None:
             return render_template(
                 "view.html",
-                model=state.model,
+                model=m,
                 title="Inputs",
                 rows=[],
                 has_inputs=False,
                 form_action=None,
                 empty_message="This model has no input line items.",
             )
-        built = state.inputs_group.build(state.model)
+        built = state.inputs_group.build(m)
         built["col_width"] = 12
         return render_template(
             "view.html",
-            model=state.model,
+            model=m,
             title="Inputs",
             rows=[[built]],
             has_inputs=True,
@@ -408,32 +417,37 @@ def create_app(model, *, tables=None, charts=None, views=None, home_view=None):
 
     @app.route("/inputs", methods=["POST"])
     def update_inputs():
-        kwargs = {}
         try:
-            for name in state.model_class._scalar_input_names:
-                if name in request.form:
-                    kwargs[name] = float(request.form[name])
-                else:
-                    kwargs[name] = state.model._scalars[name]
-            for name in state.model_class._input_line_names:
-                attr = getattr(state.model_class, name)
-                locked = set(attr.locked_values)  # __init__ fills these in; never pass them
-                current = state.model._input_line_values.get(name, {})
-                if any(f"{name}_{p}" in request.form for p in state.periods):
-                    kwargs[name] = {
-                        period: float(request.form[f"{name}_{period}"])
-                        if f"{name}_{period}" in request.form
-                        else current.get(period)  # carry forward per-period (preserves None)
-                        for period in state.periods
-                        if period not in locked
-                    }
-                else:
-                    kwargs[name] = {p: v for p, v in current.items() if p not in locked}
-            state.model = state.model_class(periods=state.periods, **kwargs)
+            with state.lock:
+                state.model = _updated_model(state.model)
             flash("Model updated.", "success")
         except Exception as e:
             flash(str(e), "danger")
         next_url = request.args.get("next") or url_for("inputs")
         return redirect(next_url)
 
+    def _updated_model(m):
+        """m with the inputs posted in the form."""
+        kwargs = {}
+        for name in state.model_class._scalar_input_names:
+            if name in request.form:
+                kwargs[name] = float(request.form[name])
+            else:
+                kwargs[name] = m._scalars[name]
+        for name in state.model_class._input_line_names:
+            attr = getattr(state.model_class, name)
+            locked = set(attr.locked_values)  # __init__ fills these in; never pass them
+            current = m._input_line_values.get(name, {})
+            if any(f"{name}_{p}" in request.form for p in state.periods):
+                kwargs[name] = {
+                    period: float(request.form[f"{name}_{period}"])
+                    if f"{name}_{period}" in request.form
+                    else current.get(period)  # carry forward per-period (preserves None)
+                    for period in state.periods
+                    if period not in locked
+                }
+            else:
+                kwargs[name] = {p: v for p, v in current.items() if p not in locked}
+        return m.with_inputs(**kwargs)
+
     return app
@@ -0,0 +1,26 @@
+"""
+Optimisation of model inputs: minimise an objective subject to constraints on
+line items, varying ScalarInputLine and InputLine values within bounds::
+
+    from pyproforma.optimize import optimize
+
+    result = optimize(
+        model,
+        "rate_increase",                       # minimise cumulative rate increases
+        vary={"rate_increase": (0.0, 0.15)},
+        constraints=[("dscr", ">=", 1.25), ("ending_cash", ">=", 5_000_000)],
+    )
+    result.inputs["rate_increase"]   # {2026: ..., 2027: ..., ...}
+    result.model                     # the model with them applied
+
+Uses scipy's SLSQP or COBYLA when scipy is installed, and a pure-Python
+pattern search otherwise.
+"""
+
+from .optimizer import Constraint, OptimizeResult, optimize
+
+__all__ = [
+    "optimize",
+    "Constraint",
+    "OptimizeResult",
+]
@@ -0,0 +1,570 @@
+"""
+Optimise a model's inputs: minimise an objective subject to line item constraints.
+
+The varied inputs are scaled to the unit cube using their bounds, and each
+constraint to ``(value - bound) / max(1, |bound|)`` (negated for ``<=``), so
+one tolerance fits ratios and dollar amounts alike.
+
+No model is constructed per candidate. Single candidates are applied with
+``model.with_inputs``, which recalculates only the line items downstream of the
+varied inputs. Sets of independent candidates (the finite-difference stencil of
+a gradient, the poll points of a pattern search) are evaluated together with
+the batch engine when numpy is installed and the objective is a line item.
+"""
+
+import math
+from typing import TYPE_CHECKING, Any, Callable
+
+from pyproforma.engine.numpy_support import numpy_available
+
+from .pattern_search import minimize_pattern, violation
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+_METHODS = ("auto", "pattern", "slsqp", "cobyla")
+_OPERATORS = (">=", "<=")
+_STEP = 1e-7  # finite-difference step in unit-cube coordinates
+
+
+def import_scipy(feature: str):
+    """
+    Import and return scipy.optimize, or raise a helpful ImportError.
+
+    Args:
+        feature: Short description of what needs scipy, used in the error message.
+    """
+    try:
+        import scipy.optimize
+    except ImportError as e:
+        raise ImportError(
+            f"scipy is required for {feature}. "
+            "Install it with: pip install scipy  "
+            "(or: pip install pyproforma[scipy])"
+        ) from e
+    return scipy.optimize
+
+
+def scipy_available() -> bool:
+    """Return True if scipy can be imported."""
+    try:
+        import scipy.optimize  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+class Constraint:
+    """
+    A bound on a line item, applied in each of a set of periods.
+
+    Args:
+        line_item: Name of the constrained line item.
+        op: ``">="`` or ``"<="``.
+        bound: The bound.
+        periods: Periods the constraint applies in. Defaults to every model period.
+
+    Examples:
+        >>> Constraint("dscr", ">=", 1.25)
+        >>> Constraint("ending_cash", ">=", 5_000_000, periods=[2029, 2030])
+    """
+
+    def __init__(
+        self,
+        line_item: str,
+        op: str,
+        bound: float,
+        periods: list[int] | None = None,
+    ):
+        if op not in _OPERATORS:
+            raise ValueError(f"Constraint operator must be '>=' or '<=', got {op!r}")
+        self.line_item = line_item
+        self.op = op
+        self.bound = bound
+        self.periods = None if periods is None else list(periods)
+
+    def __repr__(self):
+        periods = "" if self.periods is None else f", periods={self.periods!r}"
+        return f"Constraint({self.line_item!r}, {self.op!r}, {self.bound!r}{periods})"
+
+
+class OptimizeResult:
+    """
+    Outcome of an optimisation.
+
+    Attributes:
+        model (ProformaModel): The model with the best inputs applied.
+        inputs (dict): The optimised value of each varied input: a float for a
+            ScalarInputLine, ``{period: value}`` for an InputLine.
+        objective (float): The objective at the solution.
+        success (bool): True if the method converged to a feasible point.
+        message (str): Why the method stopped.
+        max_violation (float): Largest constraint shortfall at the solution,
+            relative to ``max(1, |bound|)``. 0.0 when every constraint holds.
+        method (str): The method used.
+        iterations (int): Iterations of the method.
+        evaluations (int): Candidates evaluated in total.
+    """
+
+    def __init__(
+        self,
+        model: "ProformaModel",
+        inputs: dict[str, Any],
+        objective: float,
+        success: bool,
+        message: str,
+        max_violation: float,
+        method: str,
+        iterations: int,
+        evaluations: int,
+    ):
+        self.model = model
+        self.inputs = inputs
+        self.objective = objective
+        self.success = success
+        self.message = message
+        self.max_violation = max_violation
+        self.method = method
+        self.iterations = iterations
+        self.evaluations = evaluations
+
+    def __repr__(self):
+        return (
+            f"OptimizeResult(success={self.success!r}, objective={self.objective!r}, "
+            f"method={self.method!r}, evaluations={self.evaluations})"
+        )
+
+
+def optimize(
+    model: "ProformaModel",
+    objective: "str | Callable[[ProformaModel], float]",
+    *,
+    vary: dict[str, Any],
+    constraints: list = (),
+    maximize: bool = False,
+    periods: list[int] | None = None,
+    method: str = "auto",
+    tolerance: float = 1e-6,
+    constraint_tolerance: float = 1e-6,
+    max_iterations: int = 100,
+    max_evaluations: int = 20_000,
+    batch: bool | None = None,
+) -> OptimizeResult:
+    """
+    Choose input values, within bounds, that minimise an objective subject to constraints.
+
+    Args:
+        model: The model to start from; its input values are the starting point.
+            It is not modified.
+        objective: A line item name, whose values summed over periods are
+            minimised, or a callable taking a model and returning a float.
+        vary: Maps each varied input to its bounds.
+            - ScalarInputLine: ``(low, high)``.
+            - InputLine: ``(low, high)`` varies every period that is not locked
+              and has a value; ``{period: (low, high)}`` varies only those periods.
+        constraints: Constraint objects, or ``(line_item, op, bound)`` /
+            ``(line_item, op, bound, periods)`` tuples.
+        maximize: Maximise the objective instead.
+        periods: Periods summed by a line item objective. Defaults to every period.
+        method: ``"slsqp"`` (gradient-based, requires scipy), ``"cobyla"``
+            (derivative-free, requires scipy), ``"pattern"`` (derivative-free,
+            pure Python) or ``"auto"``: slsqp if scipy is installed, else pattern.
+        tolerance: Convergence tolerance, in unit-cube coordinates for the
+            derivative-free methods and on the objective for slsqp.
+        constraint_tolerance: Largest relative constraint violation accepted.
+        max_iterations: Iterations allowed (augmented Lagrangian iterations for
+            pattern).
+        max_evaluations: Candidate evaluations allowed. Checked before each
+            evaluation, so a set of candidates in progress (a gradient stencil or
+            a poll) can end slightly past it; the best point so far is returned.
+        batch: Evaluate independent candidates with the batch engine. Defaults
+            to True when numpy is installed, the objective is a line item and the
+            model has no iterative solver.
+
+    Returns:
+        OptimizeResult: The best inputs found, the model with them applied, and
+        whether the method converged to a feasible point.
+
+    Raises:
+        ValueError: If vary, the objective, a constraint or method is invalid.
+        ImportError: If the method needs scipy and it is not installed.
+
+    Examples:
+        >>> result = optimize(
+        ...     model,
+        ...     "rate_increase",
+        ...     vary={"rate_increase": (0.0, 0.15)},
+        ...     constraints=[("dscr", ">=", 1.25), ("ending_cash", ">=", 5_000_000)],
+        ... )
+        >>> result.inputs["rate_increase"]
+        {2026: 0.021..., 2027: ..., ...}
+    """
+    if method not in _METHODS:
+        raise ValueError(f"Unknown method {method!r}. Use one of: {', '.join(_METHODS)}")
+    if method == "auto":
+        method = "slsqp" if scipy_available() else "pattern"
+    problem = _Problem(model, objective, vary, constraints, maximize, periods, batch)
+    budget = lambda: problem.evaluations < max_evaluations  # noqa: E731
+
+    if method == "pattern":
+        u, iterations, converged, message = minimize_pattern(
+            problem.evaluate,
+            problem.u0,
+            tolerance,
+            constraint_tolerance,
+            max_iterations,
+            budget,
+        )
+    else:
+        u, iterations, converged, message = _minimize_scipy(
+            problem, method, tolerance, constraint_tolerance, max_iterations, max_evaluations
+        )
+
+    f, g = problem.evaluate([u])[0]
+    max_violation = violation(g)
+    if converged and max_violation > constraint_tolerance:
+        converged, message = False, "No feasible point found."
+    return OptimizeResult(
+        model=problem.model_at(u),
+        inputs=problem.inputs_at(u),
+        objective=problem.sign * f * problem.scale,
+        success=converged,
+        message=message,
+        max_violation=max_violation,
+        method=method,
+        iterations=iterations,
+        evaluations=problem.evaluations,
+    )
+
+
+class _Problem:
+    """Maps unit-cube points to inputs and evaluates the objective and constraints."""
+
+    def __init__(
+        self,
+        model: "ProformaModel",
+        objective: Any,
+        vary: dict[str, Any],
+        constraints: list,
+        maximize: bool,
+        periods: list[int] | None,
+        batch: bool | None,
+    ):
+        cls = model.__class__
+        self.model = model
+        self.inputs = model._input_kwargs()
+        self.variables: list[tuple[str, int | None]] = []
+        self.bounds: list[tuple[float, float]] = []
+        if not vary:
+            raise ValueError("vary must name at least one input.")
+        for name, spec in vary.items():
+            if name in cls._scalar_input_names:
+                self._add(name, None, spec)
+            elif name in cls._input_line_names:
+                locked = getattr(cls, name).locked_values
+                if isinstance(spec, dict):
+                    for period, bounds in spec.items():
+                        if period not in model.periods:
+                            raise ValueError(f"Period {period} is not a period of the model.")
+                        if period in locked:
+                            raise ValueError(
+                                f"'{name}' is locked in period {period} and cannot be varied."
+                            )
+                        self._add(name, period, bounds)
+                else:
+                    values = model._input_line_values[name]
+                    for period in model.periods:
+                        if period not in locked and values.get(period) is not None:
+                            self._add(name, period, spec)
+            else:
+                raise ValueError(
+                    f"'{name}' is not an input of {cls.__name__}. optimize varies "
+                    f"ScalarInputLine and InputLine values."
+                )
+
+        if isinstance(objective, str):
+            self._check_line_item(objective)
+            self.objective_periods = list(model.periods if periods is None else periods)
+            for period in self.objective_periods:
+                if period not in model.periods:
+                    raise ValueError(f"Period {period} is not a period of the model.")
+        elif not callable(objective):
+            raise ValueError("objective must be a line item name or a callable.")
+        self.objective = objective
+        self.sign = -1.0 if maximize else 1.0
+
+        # (line item, period, sign, scale, bound) per constrained value.
+        self.constraints: list[tuple[str, int, float, float, float]] = []
+        for spec in constraints:
+            constraint = spec if isinstance(spec, Constraint) else Constraint(*spec)
+            self._check_line_item(constraint.line_item)
+            sign = 1.0 if constraint.op == ">=" else -1.0
+            scale = max(1.0, abs(constraint.bound))
+            for period in constraint.periods or model.periods:
+                if period not in model.periods:
+                    raise ValueError(f"Period {period} is not a period of the model.")
+                self.constraints.append(
+                    (constraint.line_item, period, sign, scale, constraint.bound)
+                )
+
+        if batch is None:
+            batch = (
+                numpy_available() and isinstance(objective, str) and model._solver is None
+            )
+        elif batch and not isinstance(objective, str):
+            raise ValueError("batch evaluation needs a line item objective, not a callable.")
+        self.batch = batch
+        self.evaluations = 0
+        self._cache: dict[tuple[float, ...], tuple[float, list[float]]] = {}
+        self._models: dict[tuple[float, ...], ProformaModel] = {}
+
+        self.u0 = [
+            _clip((self._current(name, period) - low) / (high - low))
+            for (name, period), (low, high) in zip(self.variables, self.bounds)
+        ]
+        # Scale the objective to order 1 at the starting point.
+        self.scale = 1.0
+        start = self._objective(self.model_at(self.u0))
+        self.scale = abs(start) if start and math.isfinite(start) else 1.0
+
+    def _add(self, name: str, period: int | None, bounds: Any) -> None:
+        label = name if period is None else f"{name}[{period}]"
+        try:
+            low, high = (float(value) for value in bounds)
+        except (TypeError, ValueError):
+            raise ValueError(f"Bounds for {label} must be (low, high), got {bounds!r}") from None
+        if not (math.isfinite(low) and math.isfinite(high) and low < high):
+            raise ValueError(
+                f"Bounds for {label} must be finite with low < high, got {bounds!r}"
+            )
+        self.variables.append((name, period))
+        self.bounds.append((low, high))
+
+    def _check_line_item(self, name: str) -> None:
+        if name not in self.model.line_item_names:
+            raise ValueError(f"'{name}' is not a line item of {self.model.__class__.__name__}.")
+
+    def _current(self, name: str, period: int | None) -> float:
+        if period is None:
+            return float(self.model._scalars[name])
+        value = self.inputs[name].get(period)
+        return 0.0 if value is None else float(value)
+
+    def values_at(self, u: list[float]) -> list[float]:
+        return [
+            low + _clip(x) * (high - low) for x, (low, high) in zip(u, self.bounds)
+        ]
+
+    def inputs_at(self, u: list[float]) -> dict[str, Any]:
+        """The varied inputs at u, in the form ``__init__`` accepts them."""
+        changed: dict[str, Any] = {}
+        for (name, period), value in zip(self.variables, self.values_at(u)):
+            if period is None:
+                changed[name] = value
+            else:
+                changed.setdefault(name, dict(self.inputs[name]))[period] = value
+        return changed
+
+    def model_at(self, u: list[float]) -> "ProformaModel":
+        key = _key(u)
+        model = self._models.get(key)
+        if model is None:
+            model = self.model.with_inputs(**self.inputs_at(list(key)))
+            self.evaluations += 1
+            self._models = {key: model}
+        return model
+
+    def evaluate(self, points: list[list[float]]) -> list[tuple[float, list[float]]]:
+        """Scaled objective and constraint values (``g >= 0`` holds) at each point."""
+        keys = [_key(u) for u in points]
+        missing = list({key: None for key in keys if key not in self._cache})
+        if self.batch and len(missing) > 1:
+            self._cache.update(zip(missing, self._evaluate_batch(missing)))
+        else:
+            for key in missing:
+                self._cache[key] = self._evaluate_model(self.model_at(list(key)))
+        return [self._cache[key] for key in keys]
+
+    def gradients(self, u: list[float]) -> tuple[float, list[float], list, list]:
+        """
+        Forward-difference gradients at u: ``(f, g, df/du, dg/du)``.
+
+        ``dg/du`` has one row per constraint.
+        """
+        u = list(_key(u))
+        stencil = [u]
+        steps = []
+        for i, value in enumerate(u):
+            step = _STEP if value + _STEP <= 1.0 else -_STEP
+            point = list(u)
+            point[i] = value + step
+            stencil.append(point)
+            steps.append(step)
+        # The base point is evaluated with the stencil, so every difference is
+        # taken between values from the same engine path.
+        if self.batch:
+            values = self._evaluate_batch([_key(point) for point in stencil])
+        else:
+            values = [self._evaluate_model(self.model_at(point)) for point in stencil]
+        (f0, g0), perturbed = values[0], values[1:]
+        df = [(f - f0) / step for (f, _), step in zip(perturbed, steps)]
+        dg = [
+            [(g[j] - g0[j]) / step for (_, g), step in zip(perturbed, steps)]
+            for j in range(len(g0))
+        ]
+        return f0, g0, df, dg
+
+    def best(self, constraint_tolerance: float) -> list[float]:
+        """
+        The best point evaluated so far.
+
+        The lowest objective among feasible points, or the least infeasible point
+        when none is feasible. The starting point when nothing was evaluated.
+        """
+        if not self._cache:
+            return list(self.u0)
+        feasible = [
+            (f, key) for key, (f, g) in self._cache.items()
+            if violation(g) <= constraint_tolerance
+        ]
+        if feasible:
+            return list(min(feasible)[1])
+        return list(min(self._cache, key=lambda key: violation(self._cache[key][1])))
+
+    def _evaluate_model(self, model: "ProformaModel") -> tuple[float, list[float]]:
+        f = self.sign * self._objective(model) / self.scale
+        g = []
+        for name, period, sign, scale, bound in self.constraints:
+            value = model[name][period]
+            if value is None:
+                raise ValueError(f"Constrained line item '{name}' has no value in period {period}.")
+            g.append(sign * (float(value) - bound) / scale)
+        return f, g
+
+    def _objective(self, model: "ProformaModel") -> float:
+        if callable(self.objective):
+            return float(self.objective(model))
+        values = [model[self.objective][period] for period in self.objective_periods]
+        return float(sum(value for value in values if value is not None))
+
+    def _evaluate_batch(self, keys: list[tuple[float, ...]]) -> list[tuple[float, list[float]]]:
+        import numpy as np
+
+        model = self.model
+        inputs = [{**self.inputs, **self.inputs_at(list(key))} for key in keys]
+        batch = model.__class__.evaluate_batch(inputs, periods=model.periods)
+        self.evaluations += len(keys)
+        objective = np.nansum(
+            np.stack([batch[self.objective, period] for period in self.objective_periods]),
+            axis=0,
+        )
+        f = self.sign * objective / self.scale
+        columns = []
+        for name, period, sign, scale, bound in self.constraints:
+            value = batch[name, period]
+            if np.isnan(value).any():
+                raise ValueError(
+                    f"Constrained line item '{name}' has no value in period {period}."
+                )
+            columns.append(sign * (value - bound) / scale)
+        return [
+            (float(f[i]), [float(column[i]) for column in columns]) for i in range(len(keys))
+        ]
+
+
+class _EvaluationLimit(Exception):
+    """Stops SLSQP, which has no evaluation limit of its own, at max_evaluations."""
+
+
+def _minimize_scipy(
+    problem: _Problem,
+    method: str,
+    tolerance: float,
+    constraint_tolerance: float,
+    max_iterations: int,
+    max_evaluations: int,
+) -> tuple[list[float], int, bool, str]:
+    optimize = import_scipy(f"method={method!r}")
+    import numpy as np
+
+    def fun(u):
+        return problem.evaluate([list(u)])[0][0]
+
+    def constraint_values(u):
+        return np.array(problem.evaluate([list(u)])[0][1])
+
+    n = len(problem.u0)
+    bounds = [(0.0, 1.0)] * n
+    if method == "slsqp":
+        gradients: dict[tuple[float, ...], tuple] = {}
+        iterations = 0
+
+        def _budget(evaluate):
+            def wrapped(u):
+                if problem.evaluations >= max_evaluations:
+                    raise _EvaluationLimit
+                return evaluate(u)
+
+            return wrapped
+
+        def _gradients(u):
+            key = _key(u)
+            if key not in gradients:
+                gradients.clear()
+                gradients[key] = problem.gradients(list(key))
+            return gradients[key]
+
+        def _iteration(u):
+            nonlocal iterations
+            iterations += 1
+
+        constraints = []
+        if problem.constraints:
+            constraints.append({
+                "type": "ineq",
+                "fun": _budget(constraint_values),
+                "jac": _budget(lambda u: np.array(_gradients(u)[3])),
+            })
+        try:
+            result = optimize.minimize(
+                _budget(fun),
+                np.array(problem.u0),
+                jac=_budget(lambda u: np.array(_gradients(u)[2])),
+                bounds=bounds,
+                constraints=constraints,
+                method="SLSQP",
+                options={"maxiter": max_iterations, "ftol": tolerance},
+                callback=_iteration,
+            )
+        except _EvaluationLimit:
+            u = problem.best(constraint_tolerance)
+            return u, iterations, False, "Evaluation limit reached."
+    else:
+        constraints = []
+        if problem.constraints:
+            constraints.append({"type": "ineq", "fun": constraint_values})
+        result = optimize.minimize(
+            fun,
+            np.array(problem.u0),
+            bounds=bounds,
+            constraints=constraints,
+            method="COBYLA",
+            options={
+                "maxiter": max_evaluations,
+                "rhobeg": 0.25,
+                "tol": tolerance,
+                "catol": constraint_tolerance,
+            },
+        )
+    u = [_clip(float(value)) for value in result.x]
+    iterations = int(getattr(result, "nit", 0) or getattr(result, "nfev", 0))
+    return u, iterations, bool(result.success), str(result.message)
+
+
+def _key(u: Any) -> tuple[float, ...]:
+    """A point as a tuple of Python floats (scipy passes numpy arrays)."""
+    return tuple(float(value) for value in u)
+
+
+def _clip(value: float) -> float:
+    return min(1.0, max(0.0, value))
@@ -0,0 +1,123 @@
+"""
+Derivative-free constrained minimisation in pure Python.
+
+The built-in method, used when scipy is not installed, is an augmented
+Lagrangian pattern search (after Lewis & Torczon). Constraints ``g(u) >= 0``
+are folded into a smooth merit function
+
+    f(u) + sum_j ((max(0, lambda_j - rho * g_j(u))) ** 2 - lambda_j ** 2) / (2 * rho)
+
+which a bound-constrained compass search minimises: poll ``u +/- step`` along
+every coordinate, move to the best improving point (then try extending the
+move), otherwise halve the step. Between searches the multipliers are updated,
+``lambda_j = max(0, lambda_j - rho * g_j)``, and rho grows tenfold whenever the
+constraint violation did not fall by at least three quarters. Each search stops
+at a finer step than the last, down to ``tolerance``.
+
+Variables live in the unit cube: the caller maps them to the input bounds.
+"""
+
+from typing import Callable
+
+Evaluate = Callable[[list[list[float]]], list[tuple[float, list[float]]]]
+
+_INITIAL_STEP = 0.25
+_INITIAL_PENALTY = 10.0
+
+
+def violation(g: list[float]) -> float:
+    """Largest constraint shortfall, ``max(0, -g_j)``."""
+    return max((-value for value in g if value < 0), default=0.0)
+
+
+def minimize_pattern(
+    evaluate: Evaluate,
+    u0: list[float],
+    tolerance: float,
+    constraint_tolerance: float,
+    max_iterations: int,
+    evaluation_budget: Callable[[], bool],
+) -> tuple[list[float], int, bool, str]:
+    """
+    Minimise f(u) subject to g(u) >= 0 over the unit cube.
+
+    Args:
+        evaluate: Returns ``(f, g)`` for each of a list of points. Points of one
+            call are independent, so the caller may evaluate them as a batch.
+        u0: Starting point.
+        tolerance: Final compass step.
+        constraint_tolerance: Largest violation accepted as feasible.
+        max_iterations: Augmented Lagrangian (outer) iterations allowed.
+        evaluation_budget: Returns False once no more evaluations are allowed.
+
+    Returns:
+        tuple: ``(u, iterations, converged, message)``.
+    """
+    u = [min(1.0, max(0.0, value)) for value in u0]
+    f, g = evaluate([u])[0]
+    multipliers = [0.0] * len(g)
+    penalty = _INITIAL_PENALTY
+    previous_violation = violation(g)
+    minimum_step = max(tolerance, 1e-2)
+
+    for iteration in range(1, max_iterations + 1):
+        def merit(value: tuple[float, list[float]]) -> float:
+            f, g = value
+            return f + sum(
+                (max(0.0, lam - penalty * gj) ** 2 - lam ** 2) / (2 * penalty)
+                for lam, gj in zip(multipliers, g)
+            )
+
+        start = u
+        u = _compass_search(evaluate, merit, u, minimum_step, evaluation_budget)
+        f, g = evaluate([u])[0]
+        current_violation = violation(g)
+        multipliers = [max(0.0, lam - penalty * gj) for lam, gj in zip(multipliers, g)]
+        moved = max((abs(a - b) for a, b in zip(u, start)), default=0.0)
+
+        if not evaluation_budget():
+            return u, iteration, False, "Evaluation limit reached."
+        if (
+            minimum_step <= tolerance
+            and current_violation <= constraint_tolerance
+            and moved <= tolerance
+        ):
+            return u, iteration, True, "Converged."
+        if current_violation > max(constraint_tolerance, 0.25 * previous_violation):
+            penalty *= 10.0
+        previous_violation = current_violation
+        minimum_step = max(tolerance, minimum_step * 0.1)
+    return u, max_iterations, False, "Iteration limit reached."
+
+
+def _compass_search(
+    evaluate: Evaluate,
+    merit: Callable[[tuple[float, list[float]]], float],
+    u: list[float],
+    minimum_step: float,
+    evaluation_budget: Callable[[], bool],
+) -> list[float]:
+    """Bound-constrained compass search on merit from u down to minimum_step."""
+    current = merit(evaluate([u])[0])
+    step = _INITIAL_STEP
+    while step >= minimum_step and evaluation_budget():
+        polls = []
+        for i, value in enumerate(u):
+            for moved in (min(1.0, value + step), max(0.0, value - step)):
+                if moved != value:
+                    point = list(u)
+                    point[i] = moved
+                    polls.append(point)
+        merits = [merit(value) for value in evaluate(polls)]
+        best = min(range(len(polls)), key=merits.__getitem__, default=None)
+        if best is None or merits[best] >= current:
+            step /= 2
+            continue
+        previous, u, current = u, polls[best], merits[best]
+        # Try one step further in the same direction.
+        extended = [min(1.0, max(0.0, 2 * a - b)) for a, b in zip(u, previous)]
+        if extended != u:
+            extended_merit = merit(evaluate([extended])[0])
+            if extended_merit < current:
+                u, current = extended, extended_merit
+    return u
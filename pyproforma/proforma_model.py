@@ -6,11 +6,14 @@ class attributes using FixedLine, FormulaLine, InputLine, ScalarLine, or
 ScalarInputLine.
 """
 
-from typing import Any
+from typing import TYPE_CHECKING, Any, Callable
 
 from pyproforma.charts import Charts
-from pyproforma.engine.calculation_engine import calculate_line_items
-from pyproforma.engine.line_item_values import LineItemValues
+from pyproforma.engine.calculation_engine import new_line_item_values
+from pyproforma.engine.dependency_graph import DependencyGraph
+from pyproforma.engine.engines import get_engine
+from pyproforma.engine.lazy_values import LazyLineItemValues
+from pyproforma.engine.model_namespace import namespace_class
 from pyproforma.reserved_words import validate_name
 from pyproforma.results.line_item_result import LineItemResult
 from pyproforma.results.line_item_selection import LineItemSelection
@@ -23,6 +26,14 @@ from pyproforma.specs.scalar_input_line import ScalarInputLine
 from pyproforma.specs.scalar_line import ScalarLine
 from pyproforma.tables import Tables
 
+if TYPE_CHECKING:
+    from pyproforma.engine.iterative_solver import IterativeSolver
+    from pyproforma.optimize import OptimizeResult
+    from pyproforma.results.batch_result import BatchResult
+    from pyproforma.scenarios.covenants import ConstraintCheck
+    from pyproforma.scenarios.tornado import TornadoResult
+    from pyproforma.solve import GoalSeekResult
+
 
 class ProformaModel:
     """
@@ -38,6 +49,30 @@ class ProformaModel:
             instantiation.
         period_label (str): Optional display label for the period column in tables
             (e.g. ``"Fiscal Year"``). Defaults to ``""``.
+        graph (DependencyGraph): Set automatically when the subclass is defined.
+            Direct and transitive dependencies between line items and scalars.
+        value_store (str): How calculated values are stored. ``"dict"`` (default)
+            keeps a ``{period: value}`` dict per line item; ``"array"`` keeps one
+            dense NumPy float64 array for the whole model (requires numpy) and
+            enables zero-copy ``model.revenue.array``; ``"auto"`` uses the array
+            store whenever numpy is installed.
+        compile_formulas (bool): If True, FormulaLine formulas are compiled so that
+            ``li.x[t]`` reads go straight to the value store instead of through
+            the namespace's attribute lookup. Formulas the compiler does not
+            support run unchanged. Defaults to False.
+        batch_backend (str): How ``evaluate_batch`` evaluates formulas. ``"numpy"``
+            (default) calls each formula once per period on scenario arrays;
+            ``"numba"`` compiles arithmetic FormulaLines into JIT kernels over the
+            whole batch (requires numba), evaluating the rest as ``"numpy"`` does;
+            ``"auto"`` uses numba whenever it is installed.
+        engine (str): Name of the engine that calculates instances (see
+            ``pyproforma.engine.engines``): ``"planned"`` (default),
+            ``"reference"``, ``"lazy"``, ``"numpy"``, ``"numba"`` or a name added
+            with ``register_engine``. Set it on ProformaModel itself to change the
+            default for every model.
+        solver (IterativeSolver | None): If set, same-period circular references
+            are solved by fixed-point iteration with these settings instead of
+            raising (``"planned"`` and ``"reference"`` engines). Defaults to None.
 
     Examples:
         >>> class MyModel(ProformaModel):
@@ -55,6 +90,11 @@ class ProformaModel:
     """
 
     period_label: str = ""
+    value_store: str = "dict"
+    compile_formulas: bool = False
+    batch_backend: str = "numpy"
+    engine: str = "planned"
+    solver: "IterativeSolver | None" = None
 
     def __init_subclass__(cls, **kwargs):
         super().__init_subclass__(**kwargs)
@@ -63,6 +103,7 @@ class ProformaModel:
         scalar_names = []
         input_line_names = []
         scalar_input_names = []
+        tag_members: dict[str, list[str]] = {}
 
         for name, value in cls.__dict__.items():
             if isinstance(value, LineItem):
@@ -75,13 +116,26 @@ class ProformaModel:
                     line_item_names.append(name)
                     if isinstance(value, InputLine):
                         input_line_names.append(name)
+                    for tag in value.tags:
+                        tag_members.setdefault(tag, []).append(name)
 
         cls._line_item_names = line_item_names
         cls._scalar_names = scalar_names
         cls._input_line_names = input_line_names
         cls._scalar_input_names = scalar_input_names
-
-    def __init__(self, periods: list[int] | None = None, **kwargs):
+        cls._tag_members = tag_members
+        cls._namespace_cls = namespace_class(cls)
+        cls.graph = DependencyGraph.build(cls)
+
+    def __init__(
+        self,
+        periods: list[int] | None = None,
+        *,
+        lazy: bool = False,
+        engine: str | None = None,
+        solver: "IterativeSolver | None" = None,
+        **kwargs,
+    ):
         """
         Initialize a ProformaModel instance.
 
@@ -89,6 +143,15 @@ class ProformaModel:
             periods: List of periods (typically years) for the model. If ``None``,
                 falls back to ``default_periods`` defined on the subclass. Raises no
                 error if both are absent — the model simply has no periods.
+            lazy: If True, skip the calculation pass. Each value is computed the
+                first time it is read, together with only the precedents it needs,
+                and memoised. Errors (e.g. circular references) surface on that
+                first read, with the same messages as the default eager mode.
+                Shorthand for ``engine="lazy"``.
+            engine: Name of the engine to calculate with. Defaults to the class's
+                ``engine`` setting.
+            solver: Settings for solving same-period circular references by
+                iteration. Defaults to the class's ``solver`` setting.
             **kwargs: Values for ``InputLine`` and ``ScalarInputLine`` fields declared
                 on the subclass. Period-indexed inputs are passed as
                 ``{period: value}`` dicts; scalar inputs as plain floats.
@@ -96,41 +159,234 @@ class ProformaModel:
         Raises:
             TypeError: If unknown kwargs are supplied or required inputs are missing.
             ValueError: If a kwarg attempts to override a locked period (``values=``
-                or ``None`` in ``default``).
+                or ``None`` in ``default``), engine names no registered engine, or
+                a solver is given to an engine that does not support one.
         """
+        if lazy:
+            engine = "lazy"
+        engine_impl = get_engine(engine or self.__class__.engine)
+        if solver is None:
+            solver = self.__class__.solver
+        if solver is not None and not engine_impl.supports_solver:
+            raise ValueError(
+                f"The {engine_impl.name!r} engine does not support iterative solving. "
+                f"Use engine='planned' or 'reference'."
+            )
         if periods is None:
             periods = getattr(self.__class__, "default_periods", [])
         self.periods = list(periods)
         self.line_item_names = self.__class__._line_item_names
         self.scalar_names = self.__class__._scalar_names
 
-        all_input_names = self.__class__._input_line_names + self.__class__._scalar_input_names
+        self._scalars, self._input_line_values = self.__class__._resolve_inputs(kwargs)
+        self._debt_calculators = self._new_debt_calculators()
+        self._engine = engine_impl
+        self._lazy = engine_impl.lazy
+        self._solver = solver
+        self.iteration_counts: dict[int, int] = {}
+
+        # Run the calculation engine
+        if engine_impl.lazy:
+            self._li = engine_impl.calculate(self, self._scalars, self.periods)
+            self.recomputed_items: list[str] = []
+        else:
+            if self.periods:
+                self._li = engine_impl.calculate(self, self._scalars, self.periods)
+            else:
+                self._li = new_line_item_values(self, [])
+            self.recomputed_items = list(self.line_item_names)
+
+        self.tables: Tables = Tables(self)
+        self.charts: Charts = Charts(self)
+        self._tag_namespace = TagNamespace(self)
+
+    def with_inputs(self, **kwargs) -> "ProformaModel":
+        """
+        Return a new model with some inputs changed, recalculating only what they affect.
+
+        Inputs not named in kwargs keep this model's values. Line items that do not
+        depend (directly or through tags, debt schedules or other formulas) on a
+        changed input are not recalculated: the new model shares their values with
+        this one. The result is identical to instantiating the class with the
+        combined inputs.
+
+        A lazy model returns a lazy model: values unaffected by the change are
+        shared (including those computed later), and nothing is computed upfront,
+        so ``recomputed_items`` is empty.
+
+        Args:
+            **kwargs: New values for InputLine / ScalarInputLine fields, as accepted by
+                ``__init__``. An InputLine dict replaces that input's schedule.
+
+        Returns:
+            ProformaModel: A new instance; ``recomputed_items`` lists the line items
+            that were recalculated.
+
+        Raises:
+            TypeError / ValueError: The same validation errors as ``__init__``.
+
+        Examples:
+            >>> base = WaterUtilityModel()
+            >>> high = base.with_inputs(inflation_rate=0.05)
+            >>> "total_revenue" in high.recomputed_items
+            False
+        """
+        from pyproforma.engine.calculation_engine import affected_line_items
+
+        cls = self.__class__
+        scalars, input_line_values = cls._resolve_inputs({**self._input_kwargs(), **kwargs})
+        changed = {
+            name for name in cls._scalar_input_names
+            if scalars[name] != self._scalars[name]
+        }
+        changed.update(
+            name for name in cls._input_line_names
+            if input_line_values.get(name) != self._input_line_values.get(name)
+        )
+
+        model = cls._new_instance(
+            self.periods, scalars, input_line_values, self._engine, self._solver
+        )
+        if self._lazy:
+            affected = affected_line_items(cls, changed)
+            li = LazyLineItemValues(model, scalars, model.periods)
+            li.adopt(
+                self._li, [name for name in model.line_item_names if name not in affected]
+            )
+            for config_id, calculator in self._debt_calculators.items():
+                if not any(name in affected for name in self._debt_line_names(config_id)):
+                    model._debt_calculators[config_id] = calculator
+            model.recomputed_items = []
+        elif model.periods:
+            li, model.recomputed_items = self._engine.recalculate(
+                model, self._li, scalars, model.periods, changed
+            )
+            # Debt schedules of untouched configs are reused along with their values.
+            for config_id, calculator in self._debt_calculators.items():
+                if not any(
+                    name in model.recomputed_items for name in self._debt_line_names(config_id)
+                ):
+                    model._debt_calculators[config_id] = calculator
+        else:
+            li = new_line_item_values(model, [])
+            model.recomputed_items = []
+        return model._attach_values(li)
+
+    @classmethod
+    def _new_instance(
+        cls,
+        periods: list[int],
+        scalars: dict,
+        input_line_values: dict,
+        engine: Any = None,
+        solver: Any = None,
+    ) -> "ProformaModel":
+        """
+        An instance with resolved inputs and no values yet.
+
+        Bypasses ``__init__``, so nothing is calculated; the caller fills a value
+        store and attaches it with ``_attach_values``. The engine and solver
+        default to the class's settings.
+        """
+        model = cls.__new__(cls)
+        model.periods = list(periods)
+        model.line_item_names = cls._line_item_names
+        model.scalar_names = cls._scalar_names
+        model._scalars = scalars
+        model._input_line_values = input_line_values
+        model._engine = engine if engine is not None else get_engine(cls.engine)
+        model._lazy = model._engine.lazy
+        model._solver = solver if solver is not None else cls.solver
+        model._debt_calculators = model._new_debt_calculators()
+        model.iteration_counts = {}
+        model.recomputed_items = list(cls._line_item_names)
+        return model
+
+    def _attach_values(self, li: Any) -> "ProformaModel":
+        """Attach a value store to an instance from ``_new_instance``; returns the model."""
+        self._li = li
+        self.tables = Tables(self)
+        self.charts = Charts(self)
+        self._tag_namespace = TagNamespace(self)
+        return self
+
+    def _input_kwargs(self) -> dict:
+        """This model's inputs in the form ``__init__`` accepts them."""
+        cls = self.__class__
+        kwargs: dict[str, Any] = {
+            name: self._scalars[name] for name in cls._scalar_input_names
+        }
+        for name in cls._input_line_names:
+            locked = getattr(cls, name).locked_values  # re-applied by _resolve_inputs
+            kwargs[name] = {
+                p: v for p, v in self._input_line_values.get(name, {}).items()
+                if p not in locked
+            }
+        return kwargs
+
+    def _new_debt_calculators(self) -> dict[int, DebtCalculator]:
+        """Build per-instance debt calculators, one per DebtConfig (i.e. per pair)."""
+        calculators: dict[int, DebtCalculator] = {}
+        for name in self.line_item_names:
+            spec = getattr(self.__class__, name)
+            if isinstance(spec, DebtBase):
+                config_id = id(spec.config)
+                if config_id not in calculators:
+                    calculators[config_id] = DebtCalculator(
+                        par_amounts=spec.config.par_amounts,
+                        interest_rate=spec.config.interest_rate,
+                        term=spec.config.term,
+                    )
+        return calculators
+
+    def _debt_line_names(self, config_id: int) -> list[str]:
+        return [
+            name for name in self.line_item_names
+            if isinstance(getattr(self.__class__, name), DebtBase)
+            and id(getattr(self.__class__, name).config) == config_id
+        ]
+
+    @classmethod
+    def _resolve_inputs(cls, kwargs: dict) -> tuple[dict, dict]:
+        """
+        Validate input kwargs and resolve them against the class's declarations.
+
+        Returns:
+            tuple[dict, dict]: ``(scalars, input_line_values)`` — scalar values for
+            every ScalarInputLine and ScalarLine, and the merged ``{period: value}``
+            dict for every InputLine (defaults and locked periods applied).
+
+        Raises:
+            TypeError: If unknown kwargs are supplied or required inputs are missing.
+            ValueError: If a kwarg attempts to override a locked period.
+        """
+        all_input_names = cls._input_line_names + cls._scalar_input_names
         unknown = set(kwargs) - set(all_input_names)
         if unknown:
             valid_str = ", ".join(sorted(all_input_names)) or "none"
             raise TypeError(
-                f"{self.__class__.__name__} received unexpected keyword arguments: "
+                f"{cls.__name__} received unexpected keyword arguments: "
                 f"{', '.join(sorted(unknown))}. "
                 f"Valid inputs: {valid_str}"
             )
 
-        self._scalars: dict[str, float] = {}
-        self._input_line_values: dict[str, dict[int, float]] = {}
+        scalars: dict[str, float] = {}
+        input_line_values: dict[str, dict[int, float]] = {}
         missing = []
 
         # Resolve ScalarInputLine values → _scalars
-        for name in self.__class__._scalar_input_names:
-            attr = getattr(self.__class__, name)
+        for name in cls._scalar_input_names:
+            attr = getattr(cls, name)
             if name in kwargs:
-                self._scalars[name] = kwargs[name]
+                scalars[name] = kwargs[name]
             elif attr.has_default:
-                self._scalars[name] = attr.default
+                scalars[name] = attr.default
             else:
                 missing.append(name)
 
         # Resolve period-indexed InputLine values → _input_line_values
-        for name in self.__class__._input_line_names:
-            attr = getattr(self.__class__, name)
+        for name in cls._input_line_names:
+            attr = getattr(cls, name)
             locked_vals = attr.locked_values  # {period: value} — cannot be overridden
             none_periods = (
                 {p for p, v in attr.default.items() if v is None}
@@ -164,42 +420,58 @@ class ProformaModel:
                 continue
             # Always apply values-locked periods on top (they supersede everything)
             merged.update(locked_vals)
-            self._input_line_values[name] = merged
+            input_line_values[name] = merged
 
         if missing:
             raise TypeError(
-                f"{self.__class__.__name__} requires values for: "
+                f"{cls.__name__} requires values for: "
                 f"{', '.join(missing)}"
             )
 
         # Collect ScalarLine values → _scalars
-        for name in self.__class__._scalar_names:
-            attr = getattr(self.__class__, name)
+        for name in cls._scalar_names:
+            attr = getattr(cls, name)
             if isinstance(attr, ScalarLine):
-                self._scalars[name] = float(attr.value)
+                scalars[name] = float(attr.value)
 
-        # Build per-instance debt calculators, one per DebtConfig (i.e. per pair)
-        self._debt_calculators: dict[int, DebtCalculator] = {}
-        for name in self.line_item_names:
-            spec = getattr(self.__class__, name)
-            if isinstance(spec, DebtBase):
-                config_id = id(spec.config)
-                if config_id not in self._debt_calculators:
-                    self._debt_calculators[config_id] = DebtCalculator(
-                        par_amounts=spec.config.par_amounts,
-                        interest_rate=spec.config.interest_rate,
-                        term=spec.config.term,
-                    )
+        return scalars, input_line_values
 
-        # Run the calculation engine
-        if self.periods:
-            self._li = calculate_line_items(self, self._scalars, self.periods)
-        else:
-            self._li = LineItemValues(periods=[])
+    @classmethod
+    def evaluate_batch(
+        cls,
+        inputs: list[dict],
+        periods: list[int] | None = None,
+    ) -> "BatchResult":
+        """
+        Evaluate the model for many scenarios at once (requires numpy).
 
-        self.tables: Tables = Tables(self)
-        self.charts: Charts = Charts(self)
-        self._tag_namespace = TagNamespace(self)
+        Each line item holds an N-length array per period, so every formula runs
+        once per period for the whole batch. Formulas using ordinary arithmetic on
+        ``li.x[t]`` work unchanged. A formula that branches on a value
+        (``if li.x[t] > 0``) cannot run on arrays; it is detected on first failure
+        and evaluated once per scenario instead, and listed in
+        ``result.fallback_items``. Use ``numpy.where`` / ``numpy.maximum`` in such
+        formulas to keep them vectorized — they also work on plain floats.
+
+        Args:
+            inputs: One dict of InputLine / ScalarInputLine values per scenario, as
+                would be passed to ``__init__``.
+            periods: Periods to evaluate. Defaults to ``default_periods``.
+
+        Returns:
+            BatchResult: ``result["dscr"]`` is a (scenarios, periods) array,
+            ``result["dscr", 2030]`` a (scenarios,) array and
+            ``result[i, "dscr", 2030]`` a float.
+
+        Examples:
+            >>> batch = WaterUtilityModel.evaluate_batch(
+            ...     inputs=[{"rate_increase": {...}}, {"rate_increase": {...}}]
+            ... )
+            >>> batch["dscr", 2030]
+        """
+        from pyproforma.engine.batch_engine import evaluate_batch
+
+        return evaluate_batch(cls, inputs, periods)
 
     def get_value(self, name: str, period: int) -> Any:
         if name in self.scalar_names:
@@ -237,14 +509,178 @@ class ProformaModel:
         )
 
     def dependents(self, name: str) -> list[str]:
-        """Return names of line items whose formulas directly reference the given name."""
-        from pyproforma.specs.formula_line import FormulaLine
-        return [
-            n for n in self.line_item_names
-            if n != name
-            and isinstance(getattr(self.__class__, n), FormulaLine)
-            and name in (getattr(self.__class__, n).precedents or [])
-        ]
+        """
+        Return names of line items that directly use the given name.
+
+        Includes formulas that reference it, tag totals over a tag it carries and
+        debt lines whose configuration names it. Answered from the class's cached
+        dependency graph (``ModelClass.graph``).
+        """
+        return self.__class__.graph.dependents(name)
+
+    def goal_seek(
+        self,
+        target: str,
+        *,
+        value: "float | dict[int, float]",
+        vary: str,
+        period: "int | list[int] | None" = None,
+        bounds: "tuple[float, float] | None" = None,
+        tolerance: float = 1e-9,
+        max_iterations: int = 100,
+    ) -> "GoalSeekResult":
+        """
+        Find the input value at which a line item equals a target value.
+
+        Trial values are applied with ``with_inputs``, so each one recalculates
+        only the line items downstream of vary. Varying an InputLine over several
+        periods (or ``period=None``) solves each period's input in turn so that
+        the target hits value in that period. See ``pyproforma.solve.goal_seek``.
+
+        Examples:
+            >>> result = model.goal_seek("dscr", period=2030, value=1.25, vary="inflation_rate")
+            >>> result.model.dscr[2030]
+            1.25
+            >>> model.goal_seek("dscr", value=1.25, vary="rate_increase").value
+            {2026: 0.071..., 2027: ..., ...}
+        """
+        from pyproforma.solve import goal_seek
+
+        return goal_seek(
+            self,
+            target,
+            value=value,
+            vary=vary,
+            period=period,
+            bounds=bounds,
+            tolerance=tolerance,
+            max_iterations=max_iterations,
+        )
+
+    def sensitivity(self, name: str, period: "int | None" = None) -> dict[str, Any]:
+        """
+        Derivatives of one value with respect to every input, from one evaluation pass.
+
+        Inputs are each ScalarInputLine and each unlocked, non-None period of each
+        InputLine, except inputs used as a debt term (a whole number of years).
+        They are evaluated as dual numbers, so derivatives flow through formulas,
+        tag sums and debt schedules. The pass is lazy and memoised, so
+        later calls reuse it. A value whose formula applies a non-differentiable
+        operation (``int()``, ``round()``, ``math`` functions, ``abs`` at zero, or a
+        comparison on a branch boundary) to an input-dependent value is flagged,
+        and sensitivities depending on it raise ValueError.
+
+        Args:
+            name: A line item, or a scalar.
+            period: The period (required for a line item).
+
+        Returns:
+            dict: ``{scalar_input: derivative, input_line: {period: derivative}}``.
+
+        Examples:
+            >>> model.sensitivity("net_revenue", 2030)
+            {'inflation_rate': 1.3e6, 'new_bond_rate': 0.0,
+             'rate_increase': {2026: 1.5e7, ...}}
+        """
+        from pyproforma.engine.sensitivity import sensitivity
+
+        return sensitivity(self, name, period)
+
+    def tornado(
+        self,
+        output: str,
+        period: int,
+        inputs: "list[str] | None" = None,
+        pct: float = 0.1,
+        batch: "bool | None" = None,
+    ) -> "TornadoResult":
+        """
+        Rank inputs by how far moving each one by ±pct, on its own, moves an output.
+
+        All 2 × len(inputs) scenarios are evaluated in one batch-engine call when
+        numpy is installed, otherwise with ``with_inputs``, which recalculates only
+        the line items downstream of each input. See
+        ``pyproforma.scenarios.tornado``.
+
+        Examples:
+            >>> result = model.tornado("dscr", 2030, inputs=["inflation_rate", "rate_increase"])
+            >>> result.bars[0].name
+            'rate_increase'
+            >>> result.chart().show()
+        """
+        from pyproforma.scenarios.tornado import tornado
+
+        return tornado(self, output, period, inputs=inputs, pct=pct, batch=batch)
+
+    def check_constraints(self, constraints: list) -> "ConstraintCheck":
+        """
+        Check line items against constraints in period order, stopping at the first breach.
+
+        On a lazy model, values are computed only as the check reads them, so
+        nothing after the first breach is calculated. To check many scenarios
+        at once see ``pyproforma.scenarios.screen_scenarios``.
+
+        Args:
+            constraints: ``Constraint`` objects or ``(line_item, op, bound[, periods])``
+                tuples, as accepted by ``optimize``.
+
+        Examples:
+            >>> check = WaterUtilityModel(lazy=True).check_constraints([("dscr", ">=", 1.25)])
+            >>> check.breached, check.margin
+            (False, 2.06...)
+        """
+        from pyproforma.scenarios.covenants import check_constraints
+
+        return check_constraints(self, constraints)
+
+    def optimize(
+        self,
+        objective: "str | Callable[[ProformaModel], float]",
+        *,
+        vary: dict[str, Any],
+        constraints: list = (),
+        maximize: bool = False,
+        periods: "list[int] | None" = None,
+        method: str = "auto",
+        tolerance: float = 1e-6,
+        constraint_tolerance: float = 1e-6,
+        max_iterations: int = 100,
+        max_evaluations: int = 20_000,
+        batch: "bool | None" = None,
+    ) -> "OptimizeResult":
+        """
+        Choose input values, within bounds, that minimise an objective subject to constraints.
+
+        Candidates are evaluated with ``with_inputs`` (only downstream line items
+        are recalculated) or, for sets of independent candidates, with the batch
+        engine. Uses scipy's SLSQP or COBYLA when scipy is installed and a
+        pure-Python pattern search otherwise. See ``pyproforma.optimize.optimize``.
+
+        Examples:
+            >>> result = model.optimize(
+            ...     "rate_increase",
+            ...     vary={"rate_increase": (0.0, 0.15)},
+            ...     constraints=[("dscr", ">=", 1.25), ("ending_cash", ">=", 5_000_000)],
+            ... )
+            >>> result.inputs["rate_increase"]
+            {2026: 0.038..., 2027: 0.0, ...}
+        """
+        from pyproforma.optimize import optimize
+
+        return optimize(
+            self,
+            objective,
+            vary=vary,
+            constraints=constraints,
+            maximize=maximize,
+            periods=periods,
+            method=method,
+            tolerance=tolerance,
+            constraint_tolerance=constraint_tolerance,
+            max_iterations=max_iterations,
+            max_evaluations=max_evaluations,
+            batch=batch,
+        )
 
     def compare(self, *others, labels=None):
         from pyproforma.compare import ModelComparison
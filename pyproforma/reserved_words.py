@@ -22,6 +22,22 @@ RESERVED_WORDS = {
     "period",  # Singular form
     "line_item_names",  # Model property
     "get_value",  # Model method
+    "value_store",  # Model class setting
+    "compile_formulas",  # Model class setting
+    "engine",  # Model class setting and __init__ keyword
+    "solver",  # Model class setting and __init__ keyword
+    "iteration_counts",  # Model property
+    "batch_backend",  # Model class setting
+    "evaluate_batch",  # Model classmethod
+    "with_inputs",  # Model method
+    "goal_seek",  # Model method
+    "optimize",  # Model method
+    "sensitivity",  # Model method
+    "tornado",  # Model method
+    "check_constraints",  # Model method
+    "recomputed_items",  # Model property
+    "lazy",  # Model __init__ keyword
+    "graph",  # Model class dependency graph
     # Python/common reserved words to prevent confusion
     "self",
     "class",
@@ -1,11 +1,13 @@
 """Runtime result objects returned to users."""
 
+from .batch_result import BatchResult
 from .line_item_result import LineItemResult
 from .line_item_selection import LineItemSelection
 from .scalar_result import ScalarResult
 from .tags_namespace import TagNamespace
 
 __all__ = [
+    "BatchResult",
     "LineItemResult",
     "LineItemSelection",
     "ScalarResult",
@@ -0,0 +1,142 @@
+"""
+BatchResult — values for many scenarios of one model class.
+
+Returned by ``ProformaModel.evaluate_batch``.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pyproforma.engine.batch_values import BatchLineItemValues
+
+
+class BatchResult:
+    """
+    Read-only results of a batch evaluation, indexed by scenario, item and period.
+
+    Indexing:
+        - ``batch["dscr"]`` → array of shape (scenarios, periods)
+        - ``batch["dscr", 2030]`` → array of shape (scenarios,)
+        - ``batch[3, "dscr", 2030]`` → float for scenario 3
+        - ``batch["discount_rate"]`` → array of shape (scenarios,) for a scalar
+
+    Periods that are None for a line item (not-applicable InputLine periods) read
+    as NaN.
+
+    Attributes:
+        periods (list[int]): The evaluated periods.
+        size (int): Number of scenarios.
+        fallback_items (list[str]): Formula line items that could not run on arrays
+            and were evaluated once per scenario instead.
+        compiled_items (list[str]): Formula line items evaluated by numba kernels
+            (``batch_backend = "numba"``), in evaluation order.
+
+    Examples:
+        >>> batch = WaterUtilityModel.evaluate_batch(inputs=[{...}, {...}])
+        >>> batch["dscr", 2030].min()
+        >>> batch.scenario(0)["dscr"][2030]
+    """
+
+    def __init__(
+        self,
+        model_cls: type,
+        periods: list[int],
+        values: "BatchLineItemValues",
+        scalars: dict[str, Any],
+        fallback_items: list[str] | None = None,
+        compiled_items: list[str] | None = None,
+    ):
+        self._model_cls = model_cls
+        self.periods = list(periods)
+        self._values = values
+        values.data.flags.writeable = False
+        self._scalars = scalars
+        self.size = values.size
+        self.fallback_items = list(fallback_items or [])
+        self.compiled_items = list(compiled_items or [])
+
+    @property
+    def line_item_names(self) -> list[str]:
+        return list(self._model_cls._line_item_names)
+
+    @property
+    def scalar_names(self) -> list[str]:
+        return list(self._model_cls._scalar_names)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._item(key)
+        if not isinstance(key, tuple):
+            raise TypeError(
+                f"BatchResult keys are a name, (name, period) or "
+                f"(scenario, name, period); got {key!r}"
+            )
+        if len(key) == 2 and isinstance(key[0], str):
+            name, period = key
+            if name in self._model_cls._scalar_names:
+                return self._item(name)
+            return self._item(name)[:, self._column(period)]
+        if len(key) == 3:
+            index, name, period = key
+            if name in self._model_cls._scalar_names:
+                return float(self._item(name)[index])
+            return float(self._item(name)[index, self._column(period)])
+        raise TypeError(
+            f"BatchResult keys are a name, (name, period) or "
+            f"(scenario, name, period); got {key!r}"
+        )
+
+    def scenario(self, index: int) -> dict[str, Any]:
+        """
+        Return one scenario's values as plain Python data.
+
+        Returns:
+            dict: ``{line_item: {period: value}}`` for line items and
+            ``{scalar: value}`` for scalars.
+        """
+        if not -self.size <= index < self.size:
+            raise IndexError(f"Scenario {index} out of range for batch of {self.size}")
+        result: dict[str, Any] = {}
+        for name in self._model_cls._line_item_names:
+            row = self._values._row[name]
+            result[name] = {
+                period: (
+                    None
+                    if (row, col) in self._values._none
+                    else float(self._values.data[row, col, index])
+                )
+                for col, period in enumerate(self.periods)
+            }
+        for name in self._model_cls._scalar_names:
+            result[name] = float(self._item(name)[index])
+        return result
+
+    def _item(self, name: str):
+        if name in self._model_cls._scalar_names:
+            import numpy as np
+
+            value = self._scalars[name]
+            return np.broadcast_to(np.asarray(value, dtype=np.float64), (self.size,))
+        row = self._values._row.get(name)
+        if row is None:
+            raise KeyError(
+                f"Item '{name}' not found in batch. "
+                f"Available line items: {', '.join(sorted(self._model_cls._line_item_names))}"
+            )
+        # data is (items, periods, scenarios); present scenarios first.
+        return self._values.data[row].T
+
+    def _column(self, period: int) -> int:
+        col = self._values._column.get(period)
+        if col is None:
+            raise KeyError(f"Period {period} not in batch periods {self.periods}")
+        return col
+
+    def __repr__(self):
+        return (
+            f"BatchResult({self._model_cls.__name__}, size={self.size}, "
+            f"periods={self.periods})"
+        )
@@ -165,6 +165,24 @@ class LineItemResult:
         result = self._model._li.get(self._name, period=None)
         return result if result is not None else {}
 
+    @property
+    def array(self):
+        """
+        Get all period values as a NumPy float64 array, in model period order.
+
+        With ``value_store = "array"`` this is a read-only, zero-copy view of the
+        model's value store; otherwise a new array is built. Periods without a
+        value (or with a None value) are NaN.
+
+        Raises:
+            ImportError: If numpy is not installed.
+
+        Examples:
+            >>> model.revenue.array
+            array([100000., 110000., 121000.])
+        """
+        return self._model._li.array(self._name)
+
     # ------------------------------------------------------------------
     # Stat namespace
     # ------------------------------------------------------------------
@@ -182,7 +200,8 @@ class LineItemResult:
         Returns True for:
         - FixedLine: all periods are hardcoded
         - InputLine: all periods are hardcoded (supplied at instantiation)
-        - FormulaLine: only periods that have an explicit override value
+        - FormulaLine / VectorFormulaLine: only periods that have an explicit
+          override value
 
         Args:
             period (int): The period to check
@@ -193,11 +212,12 @@ class LineItemResult:
         from pyproforma.specs.fixed_line import FixedLine
         from pyproforma.specs.formula_line import FormulaLine
         from pyproforma.specs.input_line import InputLine
+        from pyproforma.specs.vector_formula_line import VectorFormulaLine
 
         spec = self._line_item_spec
         if isinstance(spec, (FixedLine, InputLine)):
             return True
-        if isinstance(spec, FormulaLine):
+        if isinstance(spec, (FormulaLine, VectorFormulaLine)):
             return period in spec.values
         return False
 
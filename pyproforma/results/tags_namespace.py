@@ -24,11 +24,8 @@ class TagNamespace:
     def __getitem__(self, tag: str) -> "LineItemSelection":
         from pyproforma.results.line_item_selection import LineItemSelection
 
-        matching = [
-            name for name in self._model.line_item_names
-            if tag in getattr(self._model.__class__, name).tags
-        ]
-        return LineItemSelection(self._model, matching)
+        matching = self._model.__class__._tag_members.get(tag, [])
+        return LineItemSelection(self._model, list(matching))
 
     def __repr__(self):
         return f"TagNamespace(model={self._model.__class__.__name__})"
@@ -0,0 +1,72 @@
+"""
+Running a model under many scenarios.
+
+Scenario runs across worker processes (requires numpy).
+
+Instantiate a model once per scenario in a process pool and collect only the
+outputs you need::
+
+    from pyproforma import run_scenarios
+
+    results = run_scenarios(
+        WaterUtilityModel,
+        [{"inflation_rate": r} for r in (0.02, 0.03, 0.04)],
+        workers=4,
+        outputs=["dscr"],
+    )
+    results["dscr", 2030]
+
+Tornado analysis: move each input down and up on its own and rank the effect on
+one output::
+
+    result = model.tornado("dscr", 2030, inputs=["inflation_rate", "rate_increase"])
+    result.bars       # largest swing first
+    result.chart()    # a tornado Chart
+
+Covenant screening: check scenarios against constraints period by period, dropping
+each scenario from the batch at its first breach (requires numpy)::
+
+    result = screen_scenarios(
+        WaterUtilityModel,
+        [{"inflation_rate": r} for r in rates],
+        [("dscr", ">=", 1.25)],
+    )
+    result.breach_period   # first failing period per scenario, NaN if none
+
+Scenario trees: scenarios that share inputs for their first periods and then
+branch, evaluated so that each shared period is calculated once::
+
+    tree = ScenarioTree(WaterUtilityModel, rate_increase=base_plan)
+    high = tree.branch("high", rate_increase=high_plan)    # differs from 2028
+    high.branch("high_late", rate_increase=high_late_plan)  # differs from 2030
+    models = tree.evaluate()   # {("high", "high_late"): model, ...}
+
+Grid runs: sweep combinations of inputs, calculating each line item once per
+combination of the inputs it depends on::
+
+    scenarios = grid_scenarios(inflation_rate=rates, rate_increase=paths)
+    for model in run_grid(WaterUtilityModel, scenarios):
+        record(model.dscr[2030])
+"""
+
+from .covenants import ConstraintCheck, ScreeningResult, check_constraints, screen_scenarios
+from .grid import GridRunner, grid_scenarios, run_grid
+from .runner import ScenarioResults, run_scenarios
+from .tornado import TornadoBar, TornadoResult, tornado
+from .tree import ScenarioTree
+
+__all__ = [
+    "run_scenarios",
+    "ScenarioResults",
+    "tornado",
+    "TornadoResult",
+    "TornadoBar",
+    "check_constraints",
+    "screen_scenarios",
+    "ConstraintCheck",
+    "ScreeningResult",
+    "ScenarioTree",
+    "run_grid",
+    "grid_scenarios",
+    "GridRunner",
+]
@@ -0,0 +1,357 @@
+"""
+Covenant checks: evaluate periods in order and stop at the first breached constraint.
+
+A constraint bounds a line item, e.g. ``Constraint("dscr", ">=", 1.25)``. The
+margin of a value is how far it is inside the bound (``value - bound`` for
+``>=``, ``bound - value`` for ``<=``), so a negative margin is a breach. A
+constraint is not checked where its line item has no value (None).
+
+- ``check_constraints`` checks one model. On a lazy model
+  (``Model(lazy=True, ...)``) only the periods up to the first breach, and the
+  line items the constraints need, are ever computed.
+- ``screen_scenarios`` checks many scenarios with the batch engine, period by
+  period. Scenarios that breach are dropped from the batch, so later periods are
+  computed only for the survivors.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from pyproforma.engine.numpy_support import import_numpy
+from pyproforma.optimize import Constraint
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+
+class ConstraintCheck:
+    """
+    Outcome of checking one scenario against a set of constraints.
+
+    Attributes:
+        breached (bool): True if some constraint failed.
+        period (int | None): Period of the first breach.
+        constraint (Constraint | None): The constraint that failed first. Within
+            a period, constraints are checked in the order given.
+        value (float | None): The line item's value at the breach.
+        margin (float | None): At a breach, the (negative) margin of the failing
+            value. Otherwise the smallest margin of any checked value: the
+            headroom left under the tightest constraint. None if nothing was checked.
+    """
+
+    def __init__(
+        self,
+        breached: bool,
+        period: int | None = None,
+        constraint: Constraint | None = None,
+        value: float | None = None,
+        margin: float | None = None,
+    ):
+        self.breached = breached
+        self.period = period
+        self.constraint = constraint
+        self.value = value
+        self.margin = margin
+
+    @property
+    def line_item(self) -> str | None:
+        """Name of the breached line item, or None."""
+        return None if self.constraint is None else self.constraint.line_item
+
+    def __repr__(self):
+        if not self.breached:
+            return f"ConstraintCheck(breached=False, margin={self.margin!r})"
+        return (
+            f"ConstraintCheck(breached=True, period={self.period!r}, "
+            f"line_item={self.line_item!r}, value={self.value!r}, margin={self.margin!r})"
+        )
+
+
+class ScreeningResult:
+    """
+    Outcome of ``screen_scenarios``: the first breach, if any, of each scenario.
+
+    Array attributes have one entry per scenario, in the order given.
+
+    Attributes:
+        constraints (list[Constraint]): The constraints checked.
+        periods (list[int]): The periods checked, in order.
+        breached (numpy.ndarray): True where a constraint failed.
+        breach_period (numpy.ndarray): Period of the first breach; NaN if none.
+        breach_value (numpy.ndarray): Value of the failing line item; NaN if none.
+        margin (numpy.ndarray): Margin at the first breach, or the smallest margin
+            of any checked value for scenarios that never breach (see ConstraintCheck).
+        periods_evaluated (numpy.ndarray): Periods computed for each scenario:
+            every period for survivors, up to and including the breach otherwise.
+        early_exit (bool): False if the model's plan could not be evaluated period
+            by period (it has VectorFormulaLine items), in which case every period
+            was computed for every scenario and only then checked.
+    """
+
+    def __init__(
+        self,
+        constraints: list[Constraint],
+        periods: list[int],
+        breached: Any,
+        breach_period: Any,
+        breach_constraint: Any,
+        breach_value: Any,
+        margin: Any,
+        periods_evaluated: Any,
+        early_exit: bool,
+    ):
+        self.constraints = constraints
+        self.periods = periods
+        self.breached = breached
+        self.breach_period = breach_period
+        self._breach_constraint = breach_constraint
+        self.breach_value = breach_value
+        self.margin = margin
+        self.periods_evaluated = periods_evaluated
+        self.early_exit = early_exit
+
+    def __len__(self) -> int:
+        return len(self.breached)
+
+    def __getitem__(self, index: int) -> ConstraintCheck:
+        """The ConstraintCheck of one scenario."""
+        margin = float(self.margin[index])
+        margin = None if margin != margin else margin
+        if not self.breached[index]:
+            return ConstraintCheck(False, margin=margin)
+        return ConstraintCheck(
+            True,
+            period=int(self.breach_period[index]),
+            constraint=self.constraints[self._breach_constraint[index]],
+            value=float(self.breach_value[index]),
+            margin=margin,
+        )
+
+    @property
+    def breach_line_item(self) -> list[str | None]:
+        """Name of the first breached line item per scenario; None if none."""
+        return [
+            self.constraints[i].line_item if breached else None
+            for i, breached in zip(self._breach_constraint.tolist(), self.breached.tolist())
+        ]
+
+    @property
+    def breach_rate(self) -> float:
+        """Share of scenarios that breach some constraint."""
+        return float(self.breached.mean()) if len(self) else 0.0
+
+    @property
+    def survivors(self) -> Any:
+        """Indices of the scenarios that never breach."""
+        np = import_numpy("screen_scenarios")
+        return np.flatnonzero(~self.breached)
+
+    def __repr__(self):
+        return (
+            f"ScreeningResult(scenarios={len(self)}, "
+            f"breached={int(self.breached.sum())}, periods={self.periods!r})"
+        )
+
+
+def check_constraints(
+    model: "ProformaModel",
+    constraints: list,
+) -> ConstraintCheck:
+    """
+    Check a model's values against constraints, period by period, until one fails.
+
+    Each period is checked in full (constraints in the order given) before the
+    next. On a lazy model, values are computed only as they are read, so nothing
+    after the first breach is computed.
+
+    Args:
+        model: The model to check.
+        constraints: ``Constraint`` objects or ``(line_item, op, bound[, periods])``
+            tuples.
+
+    Returns:
+        ConstraintCheck: The first breach, or the headroom if none.
+
+    Raises:
+        ValueError: If a constraint names an unknown line item or period.
+
+    Examples:
+        >>> model = WaterUtilityModel(lazy=True, inflation_rate=0.06)
+        >>> model.check_constraints([("dscr", ">=", 1.25)])
+        ConstraintCheck(breached=True, period=2028, line_item='dscr', ...)
+    """
+    checks = _period_checks(model.__class__, model.periods, _constraints(constraints))
+    headroom = None
+    for period in model.periods:
+        for constraint in checks[period]:
+            value = model.get_value(constraint.line_item, period)
+            if value is None or value != value:
+                continue
+            margin = _margin(constraint, value)
+            if margin < 0:
+                return ConstraintCheck(True, period, constraint, value, margin)
+            if headroom is None or margin < headroom:
+                headroom = margin
+    return ConstraintCheck(False, margin=headroom)
+
+
+def screen_scenarios(
+    model_cls: type["ProformaModel"],
+    scenarios: list[dict[str, Any]],
+    constraints: list,
+    periods: list[int] | None = None,
+    backend: str | None = None,
+) -> ScreeningResult:
+    """
+    Check many scenarios against constraints, dropping each one at its first breach.
+
+    Scenarios are evaluated together with the batch engine, one period at a time.
+    After each period the constraints are checked, and scenarios that breach are
+    removed from the batch, so later periods are computed only for those still
+    passing. Each scenario's result is the same as ``check_constraints`` on a
+    model built from its inputs.
+
+    Args:
+        model_cls: The ProformaModel subclass.
+        scenarios: One dict of InputLine / ScalarInputLine kwargs per scenario.
+        constraints: ``Constraint`` objects or ``(line_item, op, bound[, periods])``
+            tuples.
+        periods: Periods to evaluate. Defaults to ``default_periods``.
+        backend: Overrides the class's ``batch_backend`` setting.
+
+    Returns:
+        ScreeningResult: Breach period, line item, value and margin per scenario.
+
+    Raises:
+        ValueError: If a constraint names an unknown line item or period, or if
+            no scenarios are given.
+
+    Examples:
+        >>> result = screen_scenarios(
+        ...     WaterUtilityModel,
+        ...     [{"inflation_rate": r} for r in rates],
+        ...     [("dscr", ">=", 1.25)],
+        ... )
+        >>> result.breach_rate
+        0.18
+        >>> result[0]
+        ConstraintCheck(breached=False, margin=0.21...)
+    """
+    np = import_numpy("screen_scenarios")
+    from pyproforma.engine.batch_engine import (
+        _BatchEvaluation,
+        _stack_input_lines,
+        _stack_scalars,
+        calculate_batch,
+    )
+    from pyproforma.engine.evaluation_plan import get_evaluation_plan
+
+    scenarios = list(scenarios)
+    if not scenarios:
+        raise ValueError("screen_scenarios requires at least one scenario.")
+    if periods is None:
+        periods = getattr(model_cls, "default_periods", [])
+    periods = list(periods)
+    constraints = _constraints(constraints)
+    checks = _period_checks(model_cls, periods, constraints)
+    index = {id(constraint): i for i, constraint in enumerate(constraints)}
+
+    resolved = [model_cls._resolve_inputs(kwargs) for kwargs in scenarios]
+    scalars = _stack_scalars([r[0] for r in resolved], np)
+    input_line_values = _stack_input_lines([r[1] for r in resolved], np)
+    size = len(scenarios)
+
+    breached = np.zeros(size, dtype=bool)
+    breach_period = np.full(size, np.nan)
+    breach_constraint = np.zeros(size, dtype=np.int64)
+    breach_value = np.full(size, np.nan)
+    margin = np.full(size, np.nan)
+    periods_evaluated = np.zeros(size, dtype=np.int64)
+
+    def check(period: int, values_of: Any, active: Any) -> Any:
+        """Record this period's first breaches; return the newly breached mask."""
+        failed = np.zeros(len(active), dtype=bool)
+        for constraint in checks[period]:
+            values = values_of(constraint.line_item)
+            if values is None:
+                continue
+            margins = np.broadcast_to(_margin(constraint, values), (len(active),))
+            first = (margins < 0) & ~failed
+            rows = active[first]
+            breach_period[rows] = period
+            breach_constraint[rows] = index[id(constraint)]
+            breach_value[rows] = np.broadcast_to(values, (len(active),))[first]
+            margin[rows] = margins[first]
+            failed |= first
+            passing = active[~failed]
+            margin[passing] = np.fmin(margin[passing], margins[~failed])
+        breached[active[failed]] = True
+        return failed
+
+    early_exit = not get_evaluation_plan(model_cls).vector_items
+    if not early_exit:
+        # Vector items need every period of the earlier stages first; compute the
+        # whole batch and check it afterwards.
+        batch = calculate_batch(model_cls, periods, scalars, input_line_values, size, backend)
+        active = np.arange(size)
+        for period in periods:
+            periods_evaluated[active] += 1
+
+            def values_of(name: str) -> Any:
+                values = batch._values.get(name, period)
+                return None if values is None else values[active]
+
+            failed = check(period, values_of, active)
+            active = active[~failed]
+    else:
+        evaluation = _BatchEvaluation(
+            model_cls, periods, scalars, input_line_values, size, backend
+        )
+        active = np.arange(size)
+        for period in periods:
+            periods_evaluated[active] += 1
+            evaluation.evaluate_period(period)
+            failed = check(period, lambda name: evaluation.li.get(name, period), active)
+            if failed.any():
+                active = active[~failed]
+                if not len(active):
+                    break
+                evaluation.keep(~failed)
+
+    return ScreeningResult(
+        constraints,
+        periods,
+        breached,
+        breach_period,
+        breach_constraint,
+        breach_value,
+        margin,
+        periods_evaluated,
+        early_exit,
+    )
+
+
+def _constraints(specs: list) -> list[Constraint]:
+    return [spec if isinstance(spec, Constraint) else Constraint(*spec) for spec in specs]
+
+
+def _period_checks(
+    model_cls: type, periods: list[int], constraints: list[Constraint]
+) -> dict[int, list[Constraint]]:
+    """``{period: [constraint, ...]}`` in the order given, validated against the model."""
+    checks: dict[int, list[Constraint]] = {period: [] for period in periods}
+    for constraint in constraints:
+        if constraint.line_item not in model_cls._line_item_names:
+            raise ValueError(
+                f"'{constraint.line_item}' is not a line item of {model_cls.__name__}."
+            )
+        for period in constraint.periods or periods:
+            if period not in checks:
+                raise ValueError(f"Period {period} is not a period of the model.")
+            checks[period].append(constraint)
+    return checks
+
+
+def _margin(constraint: Constraint, value: Any) -> Any:
+    if constraint.op == ">=":
+        return value - constraint.bound
+    return constraint.bound - value
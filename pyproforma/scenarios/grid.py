@@ -0,0 +1,232 @@
+"""
+Grid runs: many scenarios of one model, reusing line items across scenarios.
+
+In a sweep over several inputs most line items depend on only some of them: an
+operating cost line that reads inflation but not the rate path takes the same
+values in every scenario with the same inflation rate. GridRunner finds, from
+the model's dependency graph, the inputs each line item depends on
+(transitively, through formulas, tags and debt schedules), and calculates each
+item once per distinct combination of those inputs. Other scenarios reuse the
+values, as ``with_inputs`` does for a single change.
+
+Scenarios are read from any iterable and models are yielded one at a time, so
+a grid does not have to fit in memory::
+
+    from pyproforma.scenarios import grid_scenarios, run_grid
+
+    scenarios = grid_scenarios(inflation_rate=rates, rate_increase=paths)
+    for model in run_grid(WaterUtilityModel, scenarios):
+        record(model.dscr[2030])
+"""
+
+import itertools
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+
+def grid_scenarios(**axes: Iterable[Any]) -> Iterator[dict[str, Any]]:
+    """
+    Yield the cartesian product of input values as scenario kwargs, lazily.
+
+    The last axis varies fastest. Each axis is read once; the product itself is
+    never built.
+
+    Args:
+        **axes: Values to sweep for each input, e.g. ``inflation_rate=[0.02, 0.03]``.
+
+    Examples:
+        >>> list(grid_scenarios(a=[1, 2], b=["x", "y"]))
+        [{'a': 1, 'b': 'x'}, {'a': 1, 'b': 'y'}, {'a': 2, 'b': 'x'}, {'a': 2, 'b': 'y'}]
+    """
+    names = list(axes)
+    for values in itertools.product(*axes.values()):
+        yield dict(zip(names, values))
+
+
+class GridRunner:
+    """
+    Evaluates scenarios of a model class, reusing line items across them.
+
+    Each line item's values are memoised by the values of the inputs it depends
+    on (``dependencies``). A scenario adopts every item whose inputs match an
+    earlier scenario's and calculates only the rest, so its model is identical
+    to instantiating the class with its inputs. Items whose formulas could not
+    be traced, or whose reads cannot be proven (helpers from another module or
+    held in a container, ``getattr`` with a computed name), depend on every
+    input, so they are keyed on all of them.
+
+    Memoisation applies on the ``"planned"`` engine; on other engines each
+    scenario is instantiated as usual.
+
+    Args:
+        model_cls: The ProformaModel subclass.
+        periods: Periods to evaluate. Defaults to ``default_periods``.
+        cache_size: Input combinations remembered per line item, least recently
+            used first out. Bounds memory on long runs; a cartesian grid needs
+            at most the product of the sizes of an item's axes.
+
+    Attributes:
+        dependencies (dict[str, tuple[str, ...]]): The inputs each line item
+            depends on, in declaration order.
+        scenarios (int): Scenarios evaluated so far.
+        computed (int): Line item calculations (one item, every period) so far.
+        reused (int): Line items adopted from an earlier scenario so far.
+
+    Examples:
+        >>> runner = GridRunner(WaterUtilityModel)
+        >>> runner.dependencies["water_sales_revenue"]
+        ('rate_increase',)
+        >>> dscr = [m.dscr[2030] for m in runner.run(grid_scenarios(...))]
+        >>> runner
+        GridRunner(model=WaterUtilityModel, scenarios=200, computed=1086, reused=5114)
+    """
+
+    def __init__(
+        self,
+        model_cls: type["ProformaModel"],
+        periods: list[int] | None = None,
+        cache_size: int = 1024,
+    ):
+        if cache_size < 1:
+            raise ValueError("cache_size must be at least 1")
+        if periods is None:
+            periods = getattr(model_cls, "default_periods", [])
+        self.model_cls = model_cls
+        self.periods = list(periods)
+        self.cache_size = cache_size
+        self.dependencies = _input_dependencies(model_cls)
+        self.scenarios = 0
+        self.computed = 0
+        self.reused = 0
+        self._memoise = getattr(model_cls, "engine", "planned") == "planned"
+        self._caches: dict[str, OrderedDict] = {
+            name: OrderedDict() for name in model_cls._line_item_names
+        }
+        self._debt_lines: dict[int, list[str]] = {}
+
+    def run(self, scenarios: Iterable[dict[str, Any]]) -> Iterator["ProformaModel"]:
+        """
+        Yield a model for each scenario, in order, as the scenarios are read.
+
+        Args:
+            scenarios: Any iterable of scenario kwargs, e.g. a generator.
+        """
+        for kwargs in scenarios:
+            yield self.evaluate(**kwargs)
+
+    def evaluate(self, **inputs) -> "ProformaModel":
+        """
+        Evaluate one scenario, reusing line items from earlier ones.
+
+        Raises:
+            TypeError / ValueError: The same validation errors as instantiating
+                the model.
+        """
+        from pyproforma.engine.calculation_engine import (
+            _evaluate_stages,
+            new_line_item_values,
+            new_namespace,
+        )
+        from pyproforma.engine.evaluation_plan import get_evaluation_plan
+
+        cls = self.model_cls
+        self.scenarios += 1
+        if not self._memoise:
+            self.computed += len(cls._line_item_names)
+            return cls(self.periods, **inputs)
+
+        scalars, input_line_values = cls._resolve_inputs(inputs)
+        input_keys = {name: scalars[name] for name in cls._scalar_input_names}
+        for name in cls._input_line_names:
+            input_keys[name] = tuple(input_line_values.get(name, {}).items())
+
+        model = cls._new_instance(self.periods, scalars, input_line_values)
+        plan = get_evaluation_plan(cls)
+        keys: dict[str, tuple] = {}
+        sources: dict[int, tuple[ProformaModel, list[str]]] = {}
+        # Deferred items are always evaluated, so they are never adopted.
+        dirty = {name for stage in plan.stages for name in stage.deferred_items}
+        for name in cls._line_item_names:
+            key = tuple(input_keys[inp] for inp in self.dependencies[name])
+            keys[name] = key
+            source = None if name in dirty else self._caches[name].get(key)
+            if source is None:
+                dirty.add(name)
+                continue
+            self._caches[name].move_to_end(key)
+            sources.setdefault(id(source), (source, []))[1].append(name)
+
+        li = new_line_item_values(model, self.periods)
+        for source, names in sources.values():
+            li.adopt(source._li, names)
+        # A debt schedule is reused along with its lines, as in with_inputs.
+        for config_id in model._debt_calculators:
+            if config_id not in self._debt_lines:
+                self._debt_lines[config_id] = model._debt_line_names(config_id)
+            lines = self._debt_lines[config_id]
+            if not any(name in dirty for name in lines):
+                source = self._caches[lines[0]][keys[lines[0]]]
+                model._debt_calculators[config_id] = source._debt_calculators[config_id]
+        if dirty:
+            ns = new_namespace(model, li, scalars)
+            _evaluate_stages(model, ns, li, scalars, self.periods, plan, dirty)
+        model.recomputed_items = [name for name in cls._line_item_names if name in dirty]
+        self.computed += len(dirty)
+        self.reused += len(cls._line_item_names) - len(dirty)
+
+        model = model._attach_values(li)
+        for name in dirty:
+            cache = self._caches[name]
+            cache[keys[name]] = model
+            if len(cache) > self.cache_size:
+                cache.popitem(last=False)
+        return model
+
+    def __repr__(self):
+        return (
+            f"GridRunner(model={self.model_cls.__name__}, scenarios={self.scenarios}, "
+            f"computed={self.computed}, reused={self.reused})"
+        )
+
+
+def run_grid(
+    model_cls: type["ProformaModel"],
+    scenarios: Iterable[dict[str, Any]],
+    periods: list[int] | None = None,
+    cache_size: int = 1024,
+) -> Iterator["ProformaModel"]:
+    """
+    Yield a model per scenario, calculating each line item once per combination of its inputs.
+
+    Shorthand for ``GridRunner(model_cls, periods, cache_size).run(scenarios)``.
+
+    Args:
+        model_cls: The ProformaModel subclass.
+        scenarios: Any iterable of scenario kwargs, such as ``grid_scenarios(...)``.
+        periods: Periods to evaluate. Defaults to ``default_periods``.
+        cache_size: Input combinations remembered per line item.
+
+    Examples:
+        >>> scenarios = grid_scenarios(inflation_rate=rates, rate_increase=paths)
+        >>> dscr = [model.dscr[2030] for model in run_grid(WaterUtilityModel, scenarios)]
+    """
+    return GridRunner(model_cls, periods, cache_size).run(scenarios)
+
+
+def _input_dependencies(model_cls: type) -> dict[str, tuple[str, ...]]:
+    """The inputs each line item's values depend on, in declaration order."""
+    from pyproforma.engine.calculation_engine import affected_line_items
+
+    inputs = [
+        name
+        for name in model_cls._scalar_names + model_cls._line_item_names
+        if name in model_cls._scalar_input_names or name in model_cls._input_line_names
+    ]
+    affected = {name: affected_line_items(model_cls, {name}) for name in inputs}
+    return {
+        item: tuple(name for name in inputs if item in affected[name])
+        for item in model_cls._line_item_names
+    }
@@ -0,0 +1,348 @@
+"""
+Run many scenarios of a model class across worker processes or threads.
+
+Each worker instantiates the model for its share of the scenarios and sends back
+only the requested outputs, packed into NumPy arrays, instead of pickled model
+instances. Scenarios are sent in chunks to amortise inter-process overhead.
+
+Evaluating separate models concurrently is thread-safe: every model has its own
+value store and debt calculators, and the per-class caches (dependency graph,
+evaluation plan, compiled kernels) are built under a lock. Threads avoid
+pickling and process start-up, but formulas are Python code, so they only run
+in parallel on a free-threaded build (CPython 3.13t and later).
+"""
+
+import math
+import multiprocessing
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any
+
+from pyproforma.engine.numpy_support import import_numpy
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+
+def run_scenarios(
+    model_cls: type["ProformaModel"],
+    scenarios: list[dict[str, Any]],
+    workers: int | None = None,
+    outputs: list[str] | None = None,
+    periods: list[int] | None = None,
+    chunk_size: int | None = None,
+    max_tasks_per_child: int | None = None,
+    executor: str = "process",
+) -> "ScenarioResults":
+    """
+    Instantiate a model once per scenario in a process or thread pool and collect outputs.
+
+    A scenario that raises (invalid inputs, a failing formula) is recorded in
+    ``errors`` and its outputs read as NaN; the other scenarios are unaffected.
+
+    Args:
+        model_cls: The ProformaModel subclass. With the process executor it must
+            be importable by worker processes, i.e. defined at module level.
+        scenarios: One dict per scenario, holding the keyword arguments you would
+            pass to ``model_cls(...)``.
+        workers: Number of worker processes or threads. Defaults to
+            ``os.cpu_count()``. ``workers=1`` runs every scenario in the calling
+            thread.
+        outputs: Line items and scalars to return. Defaults to all of them.
+        periods: Periods to evaluate. Defaults to ``default_periods``.
+        chunk_size: Scenarios sent to a worker per task. Defaults to about four
+            tasks per worker.
+        max_tasks_per_child: If set, worker processes are replaced after running
+            this many tasks each, releasing any memory they accumulated. Process
+            executor only.
+        executor: ``"process"`` (the default) runs scenarios in a process pool;
+            ``"thread"`` runs them in a thread pool in this process, which scales
+            with ``workers`` on free-threaded Python builds. Errors are then
+            recorded as raised, without being made picklable.
+
+    Returns:
+        ScenarioResults: Output arrays in the order of ``scenarios``.
+
+    Raises:
+        ValueError: If an output name is unknown or an argument is out of range.
+        TypeError: If ``model_cls`` cannot be sent to worker processes.
+
+    Examples:
+        >>> from pyproforma import run_scenarios
+        >>> results = run_scenarios(
+        ...     WaterUtilityModel,
+        ...     [{"inflation_rate": r} for r in (0.02, 0.03, 0.04)],
+        ...     workers=4,
+        ...     outputs=["dscr", "total_revenue"],
+        ... )
+        >>> results["dscr", 2030]
+        array([...])
+    """
+    np = import_numpy("run_scenarios")
+
+    if periods is None:
+        periods = getattr(model_cls, "default_periods", [])
+    periods = list(periods)
+    known = list(model_cls._line_item_names) + list(model_cls._scalar_names)
+    if outputs is None:
+        outputs = known
+    unknown = [name for name in outputs if name not in known]
+    if unknown:
+        raise ValueError(
+            f"Unknown outputs: {', '.join(unknown)}. "
+            f"Available: {', '.join(sorted(known))}"
+        )
+    outputs = list(outputs)
+    if executor not in ("process", "thread"):
+        raise ValueError(f"executor must be 'process' or 'thread', got {executor!r}")
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError(f"workers must be at least 1, got {workers}")
+    if chunk_size is not None and chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    if max_tasks_per_child is not None and max_tasks_per_child < 1:
+        raise ValueError(
+            f"max_tasks_per_child must be at least 1, got {max_tasks_per_child}"
+        )
+
+    scenarios = list(scenarios)
+    if chunk_size is None:
+        chunk_size = max(1, math.ceil(len(scenarios) / (workers * 4)))
+    chunks = [
+        scenarios[start:start + chunk_size]
+        for start in range(0, len(scenarios), chunk_size)
+    ]
+
+    if workers == 1:
+        parts = [_run_chunk(model_cls, periods, outputs, chunk) for chunk in chunks]
+    elif executor == "thread":
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(chunks)))) as pool:
+            futures = [
+                pool.submit(_run_chunk, model_cls, periods, outputs, chunk, False)
+                for chunk in chunks
+            ]
+            parts = [future.result() for future in futures]
+    else:
+        try:
+            pickle.dumps(model_cls)
+        except (pickle.PicklingError, AttributeError, TypeError) as e:
+            raise TypeError(
+                f"{model_cls.__name__} cannot be sent to worker processes. Define "
+                f"the model class at module level, or use workers=1."
+            ) from e
+        parts = _run_in_pool(
+            model_cls, periods, outputs, chunks, workers, max_tasks_per_child
+        )
+
+    scalar_names = set(model_cls._scalar_names)
+    values = {}
+    for name in outputs:
+        if parts:
+            values[name] = np.concatenate([part[name] for part, _ in parts])
+        else:
+            values[name] = np.empty((0,) if name in scalar_names else (0, len(periods)))
+    errors: dict[int, Exception] = {}
+    offset = 0
+    for chunk, (_, chunk_errors) in zip(chunks, parts):
+        errors.update({offset + i: error for i, error in chunk_errors.items()})
+        offset += len(chunk)
+    return ScenarioResults(model_cls, periods, values, errors, len(scenarios))
+
+
+def _run_in_pool(
+    model_cls: type,
+    periods: list[int],
+    outputs: list[str],
+    chunks: list[list[dict]],
+    workers: int,
+    max_tasks_per_child: int | None,
+) -> list[tuple[dict, dict]]:
+    """
+    Run chunks in a process pool, replacing each worker after max_tasks_per_child chunks.
+
+    Recycling uses multiprocessing.Pool, whose ``maxtasksperchild`` holds for every
+    worker on every supported Python version (ProcessPoolExecutor's own option
+    needs 3.11 and can stall once workers start exiting).
+    """
+    if not chunks:
+        return []
+    args = [(model_cls, periods, outputs, chunk) for chunk in chunks]
+    if max_tasks_per_child is not None:
+        with multiprocessing.Pool(
+            min(workers, len(chunks)), maxtasksperchild=max_tasks_per_child
+        ) as pool:
+            return pool.starmap(_run_chunk, args, chunksize=1)
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as pool:
+        futures = [pool.submit(_run_chunk, *arg) for arg in args]
+        return [future.result() for future in futures]
+
+
+def _run_chunk(
+    model_cls: type,
+    periods: list[int],
+    outputs: list[str],
+    chunk: list[dict],
+    picklable: bool = True,
+) -> tuple[dict[str, Any], dict[int, Exception]]:
+    """
+    Worker task: evaluate a chunk of scenarios.
+
+    With picklable set, errors that cannot cross processes are replaced by a
+    RuntimeError with their message.
+
+    Returns:
+        tuple: ``(values, errors)``. values maps each output to an array of shape
+        (scenarios, periods), or (scenarios,) for scalars; failed rows are NaN.
+        errors maps a position within the chunk to the exception raised.
+    """
+    np = import_numpy("run_scenarios")
+
+    scalar_names = set(model_cls._scalar_names)
+    values = {
+        name: np.full(
+            (len(chunk),) if name in scalar_names else (len(chunk), len(periods)),
+            np.nan,
+        )
+        for name in outputs
+    }
+    errors: dict[int, Exception] = {}
+    for i, kwargs in enumerate(chunk):
+        try:
+            model = model_cls(periods=periods, **kwargs)
+            row = {}
+            for name in outputs:
+                if name in scalar_names:
+                    row[name] = float(model._scalars[name])
+                else:
+                    row[name] = [
+                        np.nan if value is None else float(value)
+                        for value in (model._li.get(name, p) for p in periods)
+                    ]
+        except Exception as e:
+            errors[i] = _picklable(e) if picklable else e
+            continue
+        for name, value in row.items():
+            values[name][i] = value
+    return values, errors
+
+
+def _picklable(error: Exception) -> Exception:
+    """Return error, or a RuntimeError with its message if it cannot cross processes."""
+    try:
+        pickle.loads(pickle.dumps(error))
+    except Exception:
+        return RuntimeError(f"{type(error).__name__}: {error}")
+    return error
+
+
+class ScenarioResults:
+    """
+    Outputs of ``run_scenarios``, in the order the scenarios were given.
+
+    Indexing:
+        - ``results["dscr"]`` → array of shape (scenarios, periods)
+        - ``results["dscr", 2030]`` → array of shape (scenarios,)
+        - ``results[3, "dscr", 2030]`` → float for scenario 3
+        - ``results["discount_rate"]`` → array of shape (scenarios,) for a scalar
+
+    Values of failed scenarios, and None values, read as NaN.
+
+    Attributes:
+        periods (list[int]): The evaluated periods.
+        outputs (list[str]): The returned line items and scalars.
+        size (int): Number of scenarios.
+        errors (dict[int, Exception]): Exceptions raised by failed scenarios,
+            keyed by scenario index.
+    """
+
+    def __init__(
+        self,
+        model_cls: type,
+        periods: list[int],
+        values: dict[str, Any],
+        errors: dict[int, Exception],
+        size: int,
+    ):
+        self._model_cls = model_cls
+        self.periods = list(periods)
+        self.outputs = list(values)
+        self._values = values
+        for data in values.values():
+            data.flags.writeable = False
+        self.size = size
+        self.errors = dict(errors)
+        self._column = {period: i for i, period in enumerate(self.periods)}
+
+    @property
+    def failed(self) -> list[int]:
+        """Indices of scenarios that raised, in order."""
+        return sorted(self.errors)
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self._item(key)
+        if isinstance(key, tuple) and len(key) == 2 and isinstance(key[0], str):
+            name, period = key
+            data = self._item(name)
+            return data if data.ndim == 1 else data[:, self._col(period)]
+        if isinstance(key, tuple) and len(key) == 3:
+            index, name, period = key
+            data = self._item(name)
+            if data.ndim == 1:
+                return float(data[index])
+            return float(data[index, self._col(period)])
+        raise TypeError(
+            f"ScenarioResults keys are a name, (name, period) or "
+            f"(scenario, name, period); got {key!r}"
+        )
+
+    def scenario(self, index: int) -> dict[str, Any]:
+        """
+        Return one scenario's outputs as plain Python data.
+
+        Returns:
+            dict: ``{line_item: {period: value}}`` for line items and
+            ``{scalar: value}`` for scalars.
+
+        Raises:
+            Exception: The scenario's own error, if it failed.
+        """
+        if not -self.size <= index < self.size:
+            raise IndexError(f"Scenario {index} out of range for {self.size} scenarios")
+        index %= self.size
+        if index in self.errors:
+            raise self.errors[index]
+        result: dict[str, Any] = {}
+        for name, data in self._values.items():
+            if data.ndim == 1:
+                result[name] = float(data[index])
+            else:
+                result[name] = {
+                    period: float(data[index, col]) for col, period in enumerate(self.periods)
+                }
+        return result
+
+    def _item(self, name: str):
+        data = self._values.get(name)
+        if data is None:
+            raise KeyError(
+                f"'{name}' was not among the requested outputs: {', '.join(self.outputs)}"
+            )
+        return data
+
+    def _col(self, period: int) -> int:
+        col = self._column.get(period)
+        if col is None:
+            raise KeyError(f"Period {period} not in periods {self.periods}")
+        return col
+
+    def __repr__(self):
+        return (
+            f"ScenarioResults({self._model_cls.__name__}, size={self.size}, "
+            f"outputs={len(self.outputs)}, failed={len(self.errors)})"
+        )
@@ -0,0 +1,286 @@
+"""
+Tornado analysis: how far one output moves when each input moves on its own.
+
+Each selected input is set low and high by a percentage of its current value
+while every other input keeps its value, giving two scenarios per input. All of
+them are evaluated together: in one call to the batch engine when numpy is
+installed, otherwise with ``with_inputs``, which recalculates only the line
+items downstream of the input that changed. The inputs are then ranked by how
+far they swing the output.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+from pyproforma.engine.numpy_support import numpy_available
+
+if TYPE_CHECKING:
+    from pyproforma.chart.chart import Chart
+    from pyproforma.proforma_model import ProformaModel
+
+
+class TornadoBar:
+    """
+    One input's effect on the output.
+
+    Attributes:
+        name (str): The input.
+        label (str): The input's label (or name).
+        low_input: The input set low: a float, or a ``{period: value}`` dict for
+            an InputLine.
+        high_input: The input set high, likewise.
+        low (float): The output with the input set low.
+        high (float): The output with the input set high.
+    """
+
+    def __init__(
+        self, name: str, label: str, low_input: Any, high_input: Any, low: float, high: float
+    ):
+        self.name = name
+        self.label = label
+        self.low_input = low_input
+        self.high_input = high_input
+        self.low = low
+        self.high = high
+
+    @property
+    def swing(self) -> float:
+        """How far the output moves between the low and high input, ``abs(high - low)``."""
+        return abs(self.high - self.low)
+
+    def __repr__(self):
+        return f"TornadoBar({self.name!r}, low={self.low!r}, high={self.high!r})"
+
+
+class TornadoResult:
+    """
+    Outcome of a tornado analysis, with bars sorted by swing (largest first).
+
+    Attributes:
+        output (str): The output line item.
+        period (int): The output period.
+        base (float): The output with every input at its current value.
+        pct (float): The relative change applied to each input.
+        bars (list[TornadoBar]): One per input, largest swing first.
+        evaluations (int): Scenarios evaluated.
+
+    Examples:
+        >>> result = model.tornado("dscr", 2030, inputs=["inflation_rate", "rate_increase"])
+        >>> [bar.name for bar in result.bars]
+        ['rate_increase', 'inflation_rate']
+        >>> result.chart().show()
+    """
+
+    def __init__(
+        self,
+        model: "ProformaModel",
+        output: str,
+        period: int,
+        base: float,
+        pct: float,
+        bars: list[TornadoBar],
+        evaluations: int,
+    ):
+        self._model = model
+        self.output = output
+        self.period = period
+        self.base = base
+        self.pct = pct
+        self.bars = bars
+        self.evaluations = evaluations
+
+    def __getitem__(self, name: str) -> TornadoBar:
+        for bar in self.bars:
+            if bar.name == name:
+                return bar
+        raise KeyError(f"'{name}' is not an input of this tornado analysis.")
+
+    def to_dict(self) -> dict:
+        """Return the analysis as plain data, bars largest swing first."""
+        return {
+            "output": self.output,
+            "period": self.period,
+            "base": self.base,
+            "pct": self.pct,
+            "bars": [
+                {
+                    "name": bar.name,
+                    "label": bar.label,
+                    "low": bar.low,
+                    "high": bar.high,
+                    "swing": bar.swing,
+                }
+                for bar in self.bars
+            ],
+        }
+
+    def chart(self, title: str | None = None, value_format=None) -> "Chart":
+        """
+        Build a tornado chart: one horizontal bar per input, largest swing on top.
+
+        The two series hold the change in the output from ``base`` with each
+        input set low and high.
+
+        Args:
+            title: Chart title. Defaults to the output's label and period.
+            value_format: Override the output line item's value format.
+
+        Returns:
+            Chart — call .show() to display or .figure() to get the Figure.
+        """
+        from pyproforma.chart.chart import Chart, ChartSeries
+
+        result = self._model[self.output]
+        labels = [bar.label for bar in self.bars]
+        percent = f"{self.pct * 100:g}%"
+        if title is None:
+            title = f"{result.label or self.output} {self.period}"
+        return Chart(
+            series=[
+                ChartSeries(
+                    label=f"Input -{percent}",
+                    x_values=labels,
+                    y_values=[bar.low - self.base for bar in self.bars],
+                ),
+                ChartSeries(
+                    label=f"Input +{percent}",
+                    x_values=labels,
+                    y_values=[bar.high - self.base for bar in self.bars],
+                ),
+            ],
+            chart_type="tornado",
+            title=title,
+            x_label=f"Change in {result.label or self.output}",
+            value_format=value_format or result.value_format,
+        )
+
+    def __repr__(self):
+        return (
+            f"TornadoResult(output={self.output!r}, period={self.period}, "
+            f"base={self.base!r}, bars={[bar.name for bar in self.bars]})"
+        )
+
+
+def tornado(
+    model: "ProformaModel",
+    output: str,
+    period: int,
+    inputs: list[str] | None = None,
+    pct: float = 0.1,
+    batch: bool | None = None,
+) -> TornadoResult:
+    """
+    Move each input down and up by pct on its own and rank the effect on one output.
+
+    A ScalarInputLine is set to ``value * (1 - pct)`` and ``value * (1 + pct)``.
+    An InputLine has every unlocked period scaled the same way. Inputs at zero
+    do not move, so their swing is zero.
+
+    Args:
+        model: The model. It is not modified.
+        output: The line item to measure.
+        period: The period of output to measure.
+        inputs: ScalarInputLine and InputLine names. Defaults to every input
+            with a numeric value.
+        pct: The relative change, e.g. 0.1 for ±10%.
+        batch: Evaluate all scenarios in one batch-engine call. Defaults to True
+            when numpy is installed and the model has no iterative solver;
+            otherwise each scenario is applied with ``with_inputs``.
+
+    Returns:
+        TornadoResult: The bars, sorted by swing, and ``chart()``.
+
+    Raises:
+        ValueError: If output, period or an input is unknown, an input has no
+            numeric value, pct is not positive, or output has no value in a
+            scenario.
+
+    Examples:
+        >>> result = tornado(model, "dscr", 2030, inputs=["inflation_rate", "rate_increase"])
+        >>> result.bars[0].name, result.bars[0].swing
+        ('rate_increase', 0.41...)
+    """
+    cls = model.__class__
+    if output not in cls._line_item_names:
+        raise ValueError(f"'{output}' is not a line item of {cls.__name__}.")
+    if period not in model.periods:
+        raise ValueError(f"Period {period} is not a period of the model.")
+    if not pct > 0:
+        raise ValueError(f"pct must be positive, got {pct!r}.")
+    if inputs is None:
+        inputs = [
+            name
+            for name in [*cls._scalar_input_names, *cls._input_line_names]
+            if _numeric(_perturbable(model, name))
+        ]
+
+    base_inputs = model._input_kwargs()
+    scenarios: list[dict[str, Any]] = []
+    for name in inputs:
+        values = _perturbable(model, name)
+        if not _numeric(values):
+            raise ValueError(f"Input '{name}' has no numeric value to perturb.")
+        for factor in (1 - pct, 1 + pct):
+            scenarios.append({name: _scaled(base_inputs, name, values, factor)})
+
+    base = model[output][period]
+    if base is None:
+        raise ValueError(f"'{output}' has no value in period {period}.")
+    if batch is None:
+        batch = numpy_available() and model._solver is None
+    if batch and scenarios:
+        results = cls.evaluate_batch(
+            [{**base_inputs, **scenario} for scenario in scenarios], periods=model.periods
+        )[output, period].tolist()
+    else:
+        results = [model.with_inputs(**scenario)[output][period] for scenario in scenarios]
+
+    bars = []
+    for i, name in enumerate(inputs):
+        low, high = results[2 * i], results[2 * i + 1]
+        if low is None or high is None or low != low or high != high:
+            raise ValueError(
+                f"'{output}' has no value in period {period} when '{name}' is perturbed."
+            )
+        bars.append(
+            TornadoBar(
+                name,
+                getattr(cls, name).label or name,
+                scenarios[2 * i][name],
+                scenarios[2 * i + 1][name],
+                float(low),
+                float(high),
+            )
+        )
+    # Stable sort: equal swings keep the order the inputs were given in.
+    bars.sort(key=lambda bar: bar.swing, reverse=True)
+    return TornadoResult(model, output, period, float(base), pct, bars, len(scenarios))
+
+
+def _perturbable(model: "ProformaModel", name: str) -> Any:
+    """The current value of a ScalarInputLine, or the unlocked periods of an InputLine."""
+    cls = model.__class__
+    if name in cls._scalar_input_names:
+        return model._scalars[name]
+    if name in cls._input_line_names:
+        locked = getattr(cls, name).locked_values
+        return {
+            p: v for p, v in model._input_line_values.get(name, {}).items()
+            if p not in locked and v is not None
+        }
+    raise ValueError(
+        f"'{name}' is not an input of {cls.__name__}. tornado perturbs "
+        f"ScalarInputLine and InputLine values."
+    )
+
+
+def _numeric(values: Any) -> bool:
+    if isinstance(values, dict):
+        return bool(values) and all(_numeric(v) for v in values.values())
+    return isinstance(values, (int, float)) and not isinstance(values, bool)
+
+
+def _scaled(base_inputs: dict, name: str, values: Any, factor: float) -> Any:
+    if not isinstance(values, dict):
+        return values * factor
+    # Periods without a value (None) are kept as they are.
+    return {**base_inputs[name], **{p: v * factor for p, v in values.items()}}
@@ -0,0 +1,250 @@
+"""
+Scenario trees: scenarios that share inputs for their first periods and then branch.
+
+Each node of a ScenarioTree holds a full set of model inputs: its parent's,
+with some replaced. A node diverges from its parent at the first period in
+which their inputs differ. Evaluating the tree calculates each node's periods
+before its children diverge once, snapshots the value store and debt schedules
+there, and continues every child from its own copy of the snapshot, so a
+period shared by many leaves is calculated once rather than once per leaf.
+
+Each leaf's model has exactly the values of instantiating the class with the
+leaf's inputs.
+"""
+
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+
+class ScenarioTree:
+    """
+    A node of a scenario tree. The tree itself is its root node.
+
+    Args:
+        model_cls: The ProformaModel subclass.
+        periods: Periods to evaluate. Defaults to the class's ``default_periods``.
+        **inputs: The root's InputLine / ScalarInputLine kwargs, as accepted by
+            ``model_cls(...)``.
+
+    Attributes:
+        name (str | None): The node's name; None for the root.
+        parent (ScenarioTree | None): The parent node.
+        children (list[ScenarioTree]): Branches, in the order added.
+        start (int | None): First period in which the node's inputs differ from
+            its parent's; None for the root, or if they do not differ.
+
+    Raises:
+        TypeError / ValueError: The same validation errors as instantiating the
+            model, for the root's inputs or (from ``branch``) a branch's.
+
+    Examples:
+        >>> tree = ScenarioTree(WaterUtilityModel, inflation_rate=0.03)
+        >>> high = tree.branch("high", rate_increase={2026: 0.05, ..., 2030: 0.05})
+        >>> high.branch("high_late", rate_increase={2026: 0.05, ..., 2030: 0.08})
+        >>> models = tree.evaluate()
+        >>> models["high", "high_late"].dscr[2030]
+    """
+
+    def __init__(
+        self,
+        model_cls: type["ProformaModel"],
+        periods: list[int] | None = None,
+        **inputs,
+    ):
+        if periods is None:
+            periods = getattr(model_cls, "default_periods", [])
+        self.model_cls = model_cls
+        self.periods = list(periods)
+        self.name: str | None = None
+        self.parent: ScenarioTree | None = None
+        self.children: list[ScenarioTree] = []
+        self.start: int | None = None
+        self._inputs = dict(inputs)
+        self._scalars, self._input_line_values = model_cls._resolve_inputs(self._inputs)
+        self._start_index = 0
+
+    def branch(self, name: str, **inputs) -> "ScenarioTree":
+        """
+        Add a child node with some of this node's inputs replaced.
+
+        As with ``with_inputs``, an InputLine dict replaces that input's whole
+        schedule. Periods shared with this node are only shared if nothing
+        changes in them: changing a ScalarInputLine, or an InputLine's first
+        period, makes the branch diverge from the first period.
+
+        Args:
+            name: The child's name, unique among this node's children.
+            **inputs: InputLine / ScalarInputLine kwargs that differ from this node's.
+
+        Returns:
+            ScenarioTree: The new child node, to branch further from.
+        """
+        if any(child.name == name for child in self.children):
+            raise ValueError(f"This node already has a branch named {name!r}.")
+        child = ScenarioTree.__new__(ScenarioTree)
+        child.model_cls = self.model_cls
+        child.periods = self.periods
+        child.name = name
+        child.parent = self
+        child.children = []
+        child._inputs = {**self._inputs, **inputs}
+        child._scalars, child._input_line_values = self.model_cls._resolve_inputs(child._inputs)
+        child._start_index = _divergence(self, child)
+        child.start = (
+            self.periods[child._start_index] if child._start_index < len(self.periods) else None
+        )
+        self.children.append(child)
+        return child
+
+    @property
+    def path(self) -> tuple[str, ...]:
+        """Names of the nodes from the root down to this one."""
+        node, names = self, []
+        while node.parent is not None:
+            names.append(node.name)
+            node = node.parent
+        return tuple(reversed(names))
+
+    @property
+    def inputs(self) -> dict[str, Any]:
+        """This node's inputs, as kwargs for ``model_cls(...)``."""
+        return dict(self._inputs)
+
+    def leaves(self) -> list["ScenarioTree"]:
+        """The nodes without branches under this one (this node, if it has none)."""
+        if not self.children:
+            return [self]
+        return [leaf for child in self.children for leaf in child.leaves()]
+
+    def evaluate(self) -> dict[tuple[str, ...], "ProformaModel"]:
+        """
+        Evaluate every leaf, sharing the periods that leaves have in common.
+
+        Prefixes are shared for models on the ``"planned"`` engine whose formulas
+        only read the current and earlier periods. Otherwise (another engine,
+        VectorFormulaLine items, or reads of later or unknown periods) each
+        leaf is instantiated on its own, with the same results.
+
+        Returns:
+            dict: ``{leaf.path: model}``, in the order of ``leaves()``.
+        """
+        if not _can_share(self.model_cls):
+            return {
+                leaf.path: self.model_cls(self.periods, **leaf._inputs) for leaf in self.leaves()
+            }
+        results: dict[tuple[str, ...], ProformaModel] = {}
+        self._evaluate_from(_Branch(self), results)
+        return {leaf.path: results[leaf.path] for leaf in self.leaves()}
+
+    def _evaluate_from(self, state: "_Branch", results: dict) -> None:
+        children = sorted(self.children, key=_split_index)
+        for i, child in enumerate(children):
+            state.advance(_split_index(child))
+            # The last child can take over this node's state: nothing else needs it.
+            child_state = state.move_to(child) if i == len(children) - 1 else state.copy_to(child)
+            child._evaluate_from(child_state, results)
+        if not children:
+            state.advance(len(self.periods))
+            results[self.path] = state.finish()
+
+    def __repr__(self):
+        label = "root" if self.parent is None else repr(self.name)
+        return (
+            f"ScenarioTree({label}, model={self.model_cls.__name__}, "
+            f"children={len(self.children)}, leaves={len(self.leaves())})"
+        )
+
+
+class _Branch:
+    """A partly calculated model: periods before ``index`` are in its value store."""
+
+    def __init__(self, node: ScenarioTree):
+        from pyproforma.engine.calculation_engine import new_line_item_values
+
+        self.model = _node_model(node)
+        self.li = new_line_item_values(self.model, node.periods)
+        self.index = 0
+
+    def advance(self, stop: int) -> None:
+        """Calculate the periods from ``index`` up to (not including) stop."""
+        from pyproforma.engine.calculation_engine import calculate_periods
+
+        if stop > self.index:
+            periods = self.model.periods[self.index:stop]
+            calculate_periods(self.model, self.li, self.model._scalars, periods)
+            self.index = stop
+
+    def copy_to(self, node: ScenarioTree) -> "_Branch":
+        """A snapshot of this state continuing with node's inputs."""
+        branch = _Branch.__new__(_Branch)
+        branch.model = _node_model(node)
+        branch.model._debt_calculators = {
+            config_id: calculator.copy()
+            for config_id, calculator in self.model._debt_calculators.items()
+        }
+        branch.model.iteration_counts = dict(self.model.iteration_counts)
+        branch.li = self.li._copy(branch.model)
+        branch.index = self.index
+        return branch
+
+    def move_to(self, node: ScenarioTree) -> "_Branch":
+        """This state, without copying, continuing with node's inputs."""
+        from pyproforma.engine.line_item_values import TagNamespace
+
+        model = _node_model(node)
+        model._debt_calculators = self.model._debt_calculators
+        model.iteration_counts = self.model.iteration_counts
+        self.li._model = model
+        self.li._tag_namespace = TagNamespace(model, self.li)
+        self.model = model
+        return self
+
+    def finish(self) -> "ProformaModel":
+        return self.model._attach_values(self.li)
+
+
+def _node_model(node: ScenarioTree) -> "ProformaModel":
+    return node.model_cls._new_instance(node.periods, node._scalars, node._input_line_values)
+
+
+def _split_index(node: ScenarioTree) -> int:
+    """
+    Index of the first period not shared by every leaf under node and its parent.
+
+    A branch whose inputs match its parent's can still have branches of its own
+    that diverge earlier, so the parent's state is handed over at that point.
+    """
+    return min([node._start_index] + [_split_index(child) for child in node.children])
+
+
+_ABSENT = object()
+
+
+def _divergence(parent: ScenarioTree, child: ScenarioTree) -> int:
+    """Index of the first period in which child's inputs differ from parent's."""
+    if child._scalars != parent._scalars:
+        return 0
+    for index, period in enumerate(parent.periods):
+        for name, values in child._input_line_values.items():
+            parent_values = parent._input_line_values.get(name, {})
+            if values.get(period, _ABSENT) != parent_values.get(period, _ABSENT):
+                return index
+    return len(parent.periods)
+
+
+def _can_share(model_cls: type) -> bool:
+    """Whether a period's values depend only on inputs of that and earlier periods."""
+    from pyproforma.engine.evaluation_plan import get_evaluation_plan
+
+    if getattr(model_cls, "engine", "planned") != "planned":
+        return False
+    if get_evaluation_plan(model_cls).vector_items:
+        return False
+    graph = model_cls.graph
+    for name in model_cls._line_item_names:
+        for offsets in graph.offsets(name).values():
+            if any(offset is None or offset > 0 for offset in offsets):
+                return False
+    return True
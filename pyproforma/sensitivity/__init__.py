@@ -0,0 +1,32 @@
+"""
+Global sensitivity analysis (requires numpy).
+
+Estimate how much of an output's variance each input accounts for, with inputs
+varying together over declared ranges::
+
+    from pyproforma.sensitivity import sobol_indices
+
+    result = sobol_indices(
+        WaterUtilityModel,
+        {"inflation_rate": (0.01, 0.05), "rate_increase": (0.0, 0.08)},
+        outputs=["dscr", "net_revenue"],
+        n=4096,
+        seed=42,
+    )
+    result.first_order("dscr", 2030)
+    result.total_order_interval("dscr", 2030)
+
+Latin hypercube and Sobol' sample designs are also available on their own.
+For local derivatives at the current inputs see ``ProformaModel.sensitivity``,
+and for one-at-a-time swings ``ProformaModel.tornado``.
+"""
+
+from .designs import latin_hypercube, sobol_sequence
+from .sobol import SobolResult, sobol_indices
+
+__all__ = [
+    "sobol_indices",
+    "SobolResult",
+    "latin_hypercube",
+    "sobol_sequence",
+]
@@ -0,0 +1,109 @@
+"""
+Sample designs on the unit hypercube.
+
+Each design returns an (n, dimensions) array of points in [0, 1), which callers
+map onto input ranges. Compared with independent uniform draws, both designs
+spread points more evenly, so averages over them converge faster:
+
+- ``latin_hypercube``: every dimension is split into n equal strata and each
+  stratum holds exactly one point.
+- ``sobol_sequence``: a scrambled Sobol' low-discrepancy sequence (requires
+  scipy). Its balance properties hold when n is a power of two.
+"""
+
+from typing import Any
+
+from pyproforma.engine.numpy_support import import_numpy
+
+SAMPLERS = ("auto", "sobol", "lhs", "random")
+
+
+def import_qmc(feature: str):
+    """
+    Import and return scipy.stats.qmc, or raise a helpful ImportError.
+
+    Args:
+        feature: Short description of what needs scipy, used in the error message.
+    """
+    try:
+        from scipy.stats import qmc
+    except ImportError as e:
+        raise ImportError(
+            f"scipy is required for {feature}. "
+            "Install it with: pip install scipy  "
+            "(or: pip install pyproforma[scipy])"
+        ) from e
+    return qmc
+
+
+def qmc_available() -> bool:
+    """Return True if scipy.stats.qmc can be imported."""
+    try:
+        from scipy.stats import qmc  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def latin_hypercube(n: int, dimensions: int, seed: Any = None):
+    """
+    Draw a Latin hypercube sample of n points.
+
+    Args:
+        n: Number of points.
+        dimensions: Number of coordinates per point.
+        seed: Seed or ``numpy.random.Generator``.
+
+    Returns:
+        numpy.ndarray: Shape (n, dimensions), values in [0, 1).
+
+    Examples:
+        >>> latin_hypercube(4, 2, seed=0)[:, 0] * 4 // 1
+        array([1., 3., 0., 2.])
+    """
+    np = import_numpy("Latin hypercube sampling")
+    rng = _generator(seed, np)
+    strata = np.argsort(rng.random((n, dimensions)), axis=0)
+    return (strata + rng.random((n, dimensions))) / n
+
+
+def sobol_sequence(n: int, dimensions: int, seed: Any = None):
+    """
+    Draw n points of a scrambled Sobol' sequence (requires scipy).
+
+    Args:
+        n: Number of points. Use a power of two to keep the sequence balanced.
+        dimensions: Number of coordinates per point.
+        seed: Seed or ``numpy.random.Generator`` for the scrambling.
+
+    Returns:
+        numpy.ndarray: Shape (n, dimensions), values in [0, 1).
+    """
+    np = import_numpy("Sobol' sequences")
+    qmc = import_qmc("Sobol' sequences")
+    sampler = qmc.Sobol(dimensions, scramble=True, seed=_generator(seed, np))
+    if n & (n - 1) == 0:
+        return sampler.random_base2(n.bit_length() - 1)
+    return sampler.random(n)
+
+
+def unit_design(sampler: str, n: int, dimensions: int, rng: Any):
+    """
+    Draw n points with the named sampler: "sobol", "lhs" or "random".
+
+    ``"auto"`` is "sobol" when scipy is installed and "lhs" otherwise.
+    """
+    np = import_numpy("sample designs")
+    if sampler not in SAMPLERS:
+        raise ValueError(f"Unknown sampler {sampler!r}. Choose from: {', '.join(SAMPLERS)}")
+    if sampler == "auto":
+        sampler = "sobol" if qmc_available() else "lhs"
+    if sampler == "sobol":
+        return sobol_sequence(n, dimensions, rng)
+    if sampler == "lhs":
+        return latin_hypercube(n, dimensions, rng)
+    return _generator(rng, np).random((n, dimensions))
+
+
+def _generator(seed: Any, np: Any):
+    return seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
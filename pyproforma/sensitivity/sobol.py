@@ -0,0 +1,371 @@
+"""
+Variance-based global sensitivity: first-order and total Sobol indices.
+
+Each input varies uniformly over a declared range. Saltelli's design draws two
+independent n-point samples A and B over all inputs, and for each input i a
+third, AB_i: A with column i taken from B. The model is evaluated on all
+``n * (inputs + 2)`` points, and the indices follow from the outputs:
+
+- first-order ``S_i = mean(f(B) * (f(AB_i) - f(A))) / Var(f)`` (Saltelli 2010),
+  the share of the output's variance due to input i alone;
+- total ``ST_i = mean((f(A) - f(AB_i)) ** 2) / (2 * Var(f))`` (Jansen), which
+  adds every interaction involving input i.
+
+Points are evaluated in chunks with the batch engine and only the requested
+outputs are kept, so memory grows with n times the number of outputs rather
+than with the size of the model. Confidence intervals come from a bootstrap over
+the n rows of the design.
+"""
+
+from typing import TYPE_CHECKING, Any, Hashable
+
+from pyproforma.engine.numpy_support import import_numpy
+from pyproforma.simulate.distributions import Uniform
+from pyproforma.simulate.monte_carlo import _placeholder_inputs, _simulation_targets
+
+from .designs import unit_design
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+_BOOTSTRAP_CHUNK = 16  # resamples whose weights are held in memory at once
+
+
+def sobol_indices(
+    model_cls: type["ProformaModel"],
+    ranges: dict[str, Any],
+    outputs: list[str],
+    n: int = 1024,
+    seed: Any = None,
+    inputs: dict[str, Any] | None = None,
+    periods: list[int] | None = None,
+    sampler: str = "auto",
+    bootstrap: int = 100,
+    confidence: float = 0.95,
+    chunk_size: int = 10_000,
+) -> "SobolResult":
+    """
+    Estimate first-order and total Sobol indices of line items over input ranges.
+
+    Args:
+        model_cls: The ProformaModel subclass.
+        ranges: Maps input names to ``(low, high)`` (or a ``Uniform``).
+            - ScalarInputLine: one range.
+            - InputLine with one range: a single input, used for every unlocked
+              period.
+            - InputLine with ``{period: (low, high)}``: a separate input per
+              listed period, keyed ``(name, period)``.
+        outputs: Line items to compute indices for, in every period.
+        n: Rows of the design; the model is evaluated ``n * (inputs + 2)``
+            times. A power of two keeps the Sobol' sequence balanced.
+        seed: Seed or ``numpy.random.Generator``, for the design and bootstrap.
+        inputs: Fixed values for the other inputs, as passed to ``model_cls(...)``.
+        periods: Periods to evaluate. Defaults to ``default_periods``.
+        sampler: ``"sobol"`` (scrambled Sobol' sequence, requires scipy),
+            ``"lhs"`` (Latin hypercube) or ``"random"``. ``"auto"`` uses
+            "sobol" when scipy is installed and "lhs" otherwise.
+        bootstrap: Bootstrap resamples for the confidence intervals (0 to skip).
+        confidence: Confidence level of the intervals.
+        chunk_size: Model evaluations per batch. Bounds peak memory without
+            changing the results.
+
+    Returns:
+        SobolResult: Indices and intervals per output and period.
+
+    Raises:
+        ValueError: If a name is not an input, an output is not a line item, a
+            range is invalid, or an argument is out of range.
+
+    Examples:
+        >>> from pyproforma.sensitivity import sobol_indices
+        >>> result = sobol_indices(
+        ...     WaterUtilityModel,
+        ...     {"inflation_rate": (0.01, 0.05), "new_bond_rate": (0.035, 0.065),
+        ...      "rate_increase": (0.0, 0.08)},
+        ...     outputs=["dscr", "net_revenue"],
+        ...     n=4096, seed=42,
+        ... )
+        >>> result.total_order("dscr", 2030)
+        {'inflation_rate': 0.0017..., 'new_bond_rate': 0.010..., 'rate_increase': 0.98...}
+    """
+    np = import_numpy("Sobol sensitivity indices")
+    from pyproforma.engine.batch_engine import calculate_batch
+
+    if n < 2:
+        raise ValueError(f"n must be at least 2, got {n}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    if bootstrap < 0:
+        raise ValueError(f"bootstrap must be non-negative, got {bootstrap}")
+    if not 0 < confidence < 1:
+        raise ValueError(f"confidence must be between 0 and 1, got {confidence}")
+    if not ranges:
+        raise ValueError("ranges must name at least one input.")
+    outputs = list(outputs)
+    unknown = [name for name in outputs if name not in model_cls._line_item_names]
+    if unknown or not outputs:
+        raise ValueError(
+            f"outputs must be line items of {model_cls.__name__}; "
+            f"unknown: {', '.join(unknown) or 'none given'}"
+        )
+    inputs = dict(inputs or {})
+    if periods is None:
+        periods = getattr(model_cls, "default_periods", [])
+    periods = list(periods)
+
+    overlap = sorted(set(inputs) & set(ranges))
+    if overlap:
+        raise ValueError(f"Inputs given both a fixed value and a range: {', '.join(overlap)}")
+    distributions = {name: _uniform(name, spec) for name, spec in ranges.items()}
+    base_scalars, base_lines = model_cls._resolve_inputs(
+        _placeholder_inputs(model_cls, inputs, distributions, periods)
+    )
+    targets = _simulation_targets(model_cls, distributions, periods)
+    variables = list(targets)
+    k = len(variables)
+    low = np.array([targets[var][0].low for var in variables])
+    width = np.array([targets[var][0].high for var in variables]) - low
+
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    design = unit_design(sampler, n, 2 * k, rng)
+    a = low + design[:, :k] * width
+    b = low + design[:, k:] * width
+    del design
+
+    rows = [model_cls._line_item_names.index(name) for name in outputs]
+    # values[output, period, block, row]; block 0 is A, 1 is B, 2 + i is AB_i.
+    values = np.empty((len(outputs), len(periods), k + 2, n))
+    fallback_items: set[str] = set()
+    step = max(1, chunk_size // (k + 2))
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        m = stop - start
+        points = np.empty((k + 2, m, k))
+        points[0] = a[start:stop]
+        points[1] = b[start:stop]
+        points[2:] = a[start:stop]
+        for i in range(k):
+            points[2 + i, :, i] = b[start:stop, i]
+        points = points.reshape(-1, k)
+
+        scalars = dict(base_scalars)
+        line_values = {name: dict(line) for name, line in base_lines.items()}
+        for j, var in enumerate(variables):
+            column = points[:, j]
+            for name, period in targets[var][1]:
+                if period is None:
+                    scalars[name] = column
+                else:
+                    line_values[name][period] = column
+        batch = calculate_batch(model_cls, periods, scalars, line_values, len(points))
+        data = batch._values.data
+        for o, row in enumerate(rows):
+            values[o, :, :, start:stop] = data[row].reshape(len(periods), k + 2, m)
+        fallback_items.update(batch.fallback_items)
+        # The batch store sits in reference cycles that only the garbage
+        # collector frees; drop its array now so chunks do not pile up.
+        batch._values.data = data = None
+
+    del a, b
+    shape = (len(outputs), len(periods), k)
+    first, total = np.empty(shape), np.empty(shape)
+    variance = np.empty(shape[:2])
+    first_interval = np.empty((*shape, 2)) if bootstrap else None
+    total_interval = np.empty((*shape, 2)) if bootstrap else None
+    # The same resamples are used for every output: re-seed from one value.
+    bootstrap_seed = int(rng.integers(2**63))
+    tail = (1 - confidence) / 2
+    for o in range(len(outputs)):
+        for j in range(len(periods)):
+            terms = _row_terms(values[o, j], np)
+            first[o, j], total[o, j], variance[o, j] = _indices(terms.mean(axis=1), k, np)
+            if not bootstrap:
+                continue
+            resampled = np.empty((bootstrap, 2 * k + 2))
+            boot_rng = np.random.default_rng(bootstrap_seed)
+            for start in range(0, bootstrap, _BOOTSTRAP_CHUNK):
+                stop = min(start + _BOOTSTRAP_CHUNK, bootstrap)
+                counts = np.stack([
+                    np.bincount(boot_rng.integers(0, n, n), minlength=n)
+                    for _ in range(start, stop)
+                ])
+                resampled[start:stop] = counts @ terms.T / n
+            boot_first, boot_total, _ = _indices(resampled, k, np)
+            first_interval[o, j] = np.quantile(boot_first, [tail, 1 - tail], axis=0).T
+            total_interval[o, j] = np.quantile(boot_total, [tail, 1 - tail], axis=0).T
+
+    return SobolResult(
+        model_cls,
+        outputs,
+        periods,
+        variables,
+        n,
+        first,
+        total,
+        variance,
+        first_interval,
+        total_interval,
+        confidence,
+        fallback_items=sorted(fallback_items),
+    )
+
+
+def _uniform(name: str, spec: Any) -> Any:
+    """Turn a range (or per-period ranges) into Uniform distributions."""
+    if isinstance(spec, dict):
+        return {period: _uniform(f"{name}[{period}]", s) for period, s in spec.items()}
+    if isinstance(spec, Uniform):
+        return spec
+    try:
+        low, high = spec
+        return Uniform(float(low), float(high))
+    except (TypeError, ValueError) as e:
+        raise ValueError(
+            f"Range for {name} must be (low, high) with low < high, got {spec!r}"
+        ) from e
+
+
+def _row_terms(y: Any, np: Any):
+    """
+    Per-row terms whose means give the indices, shape (2 * inputs + 2, n).
+
+    y holds one output in one period, shape (inputs + 2, n): f(A), f(B), then
+    f(AB_i). Rows are, in order: ``f(B) * (f(AB_i) - f(A))`` per input,
+    ``(f(A) - f(AB_i)) ** 2 / 2`` per input, and the mean and mean square of
+    f(A) and f(B). Outputs are centred first, which keeps the variance accurate
+    for values far from zero and reduces the first-order estimator's noise.
+    """
+    y = y - y[:2].mean()
+    y_a, y_b, y_ab = y[0], y[1], y[2:]
+    return np.concatenate(
+        [
+            y_b * (y_ab - y_a),
+            0.5 * (y_a - y_ab) ** 2,
+            (0.5 * (y_a + y_b))[None],
+            (0.5 * (y_a**2 + y_b**2))[None],
+        ]
+    )
+
+
+def _indices(means: Any, k: int, np: Any) -> tuple[Any, Any, Any]:
+    """First-order and total indices, and the variance, from means of ``_row_terms``."""
+    variance = means[..., 2 * k + 1] - means[..., 2 * k] ** 2
+    scale = np.where(variance > 0, variance, np.nan)[..., None]
+    return means[..., :k] / scale, means[..., k : 2 * k] / scale, variance
+
+
+class SobolResult:
+    """
+    First-order and total Sobol indices per output and period.
+
+    Index methods take an output and return ``{input: index}``, or
+    ``{period: {input: index}}`` when ``period`` is None. Inputs are keyed as in
+    ``ranges``: a name, or ``(name, period)`` for per-period ranges. Indices
+    are NaN where the output does not vary or has no value.
+
+    Attributes:
+        n (int): Rows of the design.
+        evaluations (int): Model evaluations, ``n * (len(variables) + 2)``.
+        variables (list): The inputs, in design column order.
+        outputs (list[str]): The output line items.
+        periods (list[int]): The evaluated periods.
+        confidence (float): Confidence level of the intervals.
+        fallback_items (list[str]): Formula line items evaluated per scenario
+            because they branch on values (see ``ProformaModel.evaluate_batch``).
+
+    Examples:
+        >>> result.first_order("dscr", 2030)
+        {'inflation_rate': 0.0004..., 'new_bond_rate': 0.016..., 'rate_increase': 0.97...}
+        >>> result.total_order_interval("dscr", 2030)["rate_increase"]
+        (0.93..., 1.05...)
+    """
+
+    def __init__(
+        self,
+        model_cls: type,
+        outputs: list[str],
+        periods: list[int],
+        variables: list[Hashable],
+        n: int,
+        first: Any,
+        total: Any,
+        variance: Any,
+        first_interval: Any,
+        total_interval: Any,
+        confidence: float,
+        fallback_items: list[str] | None = None,
+    ):
+        self._model_cls = model_cls
+        self.outputs = list(outputs)
+        self.periods = list(periods)
+        self.variables = list(variables)
+        self.n = n
+        self.evaluations = n * (len(self.variables) + 2)
+        self.confidence = confidence
+        self.fallback_items = list(fallback_items or [])
+        self._first = first
+        self._total = total
+        self._variance = variance
+        self._first_interval = first_interval
+        self._total_interval = total_interval
+
+    def first_order(self, name: str, period: int | None = None):
+        """First-order indices: each input's share of the output variance on its own."""
+        return self._lookup(self._first, name, period, float)
+
+    def total_order(self, name: str, period: int | None = None):
+        """Total indices: each input's share including all its interactions."""
+        return self._lookup(self._total, name, period, float)
+
+    def first_order_interval(self, name: str, period: int | None = None):
+        """Bootstrap ``(low, high)`` confidence intervals of the first-order indices."""
+        return self._lookup(self._interval(self._first_interval), name, period, _pair)
+
+    def total_order_interval(self, name: str, period: int | None = None):
+        """Bootstrap ``(low, high)`` confidence intervals of the total indices."""
+        return self._lookup(self._interval(self._total_interval), name, period, _pair)
+
+    def variance(self, name: str, period: int | None = None):
+        """Variance of the output over the design."""
+        o = self._output(name)
+        if period is None:
+            return {p: float(self._variance[o, j]) for j, p in enumerate(self.periods)}
+        return float(self._variance[o, self._period(period)])
+
+    def _interval(self, interval: Any) -> Any:
+        if interval is None:
+            raise ValueError("No confidence intervals: the indices were computed with bootstrap=0.")
+        return interval
+
+    def _lookup(self, array: Any, name: str, period: int | None, convert: Any):
+        o = self._output(name)
+        columns = range(len(self.periods)) if period is None else [self._period(period)]
+        result = {
+            self.periods[j]: {
+                var: convert(array[o, j, i]) for i, var in enumerate(self.variables)
+            }
+            for j in columns
+        }
+        return result if period is None else result[period]
+
+    def _output(self, name: str) -> int:
+        if name not in self.outputs:
+            raise KeyError(
+                f"'{name}' is not among the outputs. Outputs: {', '.join(self.outputs)}"
+            )
+        return self.outputs.index(name)
+
+    def _period(self, period: int) -> int:
+        if period not in self.periods:
+            raise KeyError(f"Period {period} not in evaluated periods {self.periods}")
+        return self.periods.index(period)
+
+    def __repr__(self):
+        return (
+            f"SobolResult({self._model_cls.__name__}, n={self.n}, "
+            f"outputs={self.outputs}, inputs={len(self.variables)})"
+        )
+
+
+def _pair(values: Any) -> tuple[float, float]:
+    return float(values[0]), float(values[1])
@@ -0,0 +1,31 @@
+"""
+Monte Carlo simulation (requires numpy).
+
+Attach distributions to a model's ScalarInputLine / InputLine fields and
+evaluate thousands of draws in vectorized batches::
+
+    from pyproforma.simulate import Normal, Triangular, simulate
+
+    result = simulate(
+        WaterUtilityModel,
+        {"inflation_rate": Normal(0.03, 0.01),
+         "new_bond_rate": Triangular(0.035, 0.045, 0.065)},
+        n=10_000,
+        seed=42,
+    )
+    result.probability("dscr", "<", 1.25)
+"""
+
+from .distributions import Distribution, Empirical, LogNormal, Normal, Triangular, Uniform
+from .monte_carlo import SimulationResult, simulate
+
+__all__ = [
+    "simulate",
+    "SimulationResult",
+    "Distribution",
+    "Normal",
+    "LogNormal",
+    "Triangular",
+    "Uniform",
+    "Empirical",
+]
@@ -0,0 +1,125 @@
+"""
+Probability distributions for Monte Carlo inputs.
+
+Each distribution draws a NumPy array of samples from a ``numpy.random.Generator``.
+They hold parameters only, so one instance can be reused across simulations.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Any
+
+
+class Distribution(ABC):
+    """Base class for input distributions."""
+
+    @abstractmethod
+    def sample(self, rng: Any, size: int):
+        """
+        Draw ``size`` independent samples.
+
+        Args:
+            rng: A ``numpy.random.Generator``.
+            size: Number of samples.
+
+        Returns:
+            numpy.ndarray: float64 array of shape (size,).
+        """
+
+
+class Normal(Distribution):
+    """
+    Normal distribution with the given mean and standard deviation.
+
+    Examples:
+        >>> inflation = Normal(mean=0.03, std=0.01)
+    """
+
+    def __init__(self, mean: float, std: float):
+        if std < 0:
+            raise ValueError(f"Normal std must be non-negative, got {std}")
+        self.mean = float(mean)
+        self.std = float(std)
+
+    def sample(self, rng: Any, size: int):
+        return rng.normal(self.mean, self.std, size)
+
+    def __repr__(self):
+        return f"Normal(mean={self.mean}, std={self.std})"
+
+
+class LogNormal(Distribution):
+    """
+    Log-normal distribution: ``exp(X)`` where ``X ~ Normal(mu, sigma)``.
+
+    ``mu`` and ``sigma`` are the parameters of the underlying normal, as in
+    ``numpy.random.Generator.lognormal``.
+    """
+
+    def __init__(self, mu: float, sigma: float):
+        if sigma < 0:
+            raise ValueError(f"LogNormal sigma must be non-negative, got {sigma}")
+        self.mu = float(mu)
+        self.sigma = float(sigma)
+
+    def sample(self, rng: Any, size: int):
+        return rng.lognormal(self.mu, self.sigma, size)
+
+    def __repr__(self):
+        return f"LogNormal(mu={self.mu}, sigma={self.sigma})"
+
+
+class Triangular(Distribution):
+    """Triangular distribution on ``[low, high]`` peaking at ``mode``."""
+
+    def __init__(self, low: float, mode: float, high: float):
+        if not low <= mode <= high or low == high:
+            raise ValueError(
+                f"Triangular requires low <= mode <= high and low < high, "
+                f"got low={low}, mode={mode}, high={high}"
+            )
+        self.low = float(low)
+        self.mode = float(mode)
+        self.high = float(high)
+
+    def sample(self, rng: Any, size: int):
+        return rng.triangular(self.low, self.mode, self.high, size)
+
+    def __repr__(self):
+        return f"Triangular(low={self.low}, mode={self.mode}, high={self.high})"
+
+
+class Uniform(Distribution):
+    """Uniform distribution on ``[low, high)``."""
+
+    def __init__(self, low: float, high: float):
+        if not low < high:
+            raise ValueError(f"Uniform requires low < high, got low={low}, high={high}")
+        self.low = float(low)
+        self.high = float(high)
+
+    def sample(self, rng: Any, size: int):
+        return rng.uniform(self.low, self.high, size)
+
+    def __repr__(self):
+        return f"Uniform(low={self.low}, high={self.high})"
+
+
+class Empirical(Distribution):
+    """
+    Resamples (with replacement) from observed values.
+
+    Examples:
+        >>> growth = Empirical([0.010, 0.012, 0.008, 0.015, 0.011])
+    """
+
+    def __init__(self, values: list[float]):
+        values = [float(v) for v in values]
+        if not values:
+            raise ValueError("Empirical requires at least one value")
+        self.values = values
+
+    def sample(self, rng: Any, size: int):
+        return rng.choice(self.values, size=size, replace=True)
+
+    def __repr__(self):
+        return f"Empirical(n={len(self.values)})"
@@ -0,0 +1,329 @@
+"""
+Monte Carlo simulation over a model's ScalarInputLine and InputLine fields.
+
+Samples for every simulated input are drawn up front with a seeded generator,
+then the model is evaluated in vectorized chunks with the batch engine. No
+ProformaModel instance is created per draw.
+"""
+
+from typing import TYPE_CHECKING, Any, Hashable
+
+from pyproforma.engine.numpy_support import import_numpy
+
+from .distributions import Distribution
+from .sampling import correlation_matrix, impose_rank_correlation
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+_COMPARISONS = {
+    "<": lambda values, threshold: values < threshold,
+    "<=": lambda values, threshold: values <= threshold,
+    ">": lambda values, threshold: values > threshold,
+    ">=": lambda values, threshold: values >= threshold,
+}
+
+
+def simulate(
+    model_cls: type["ProformaModel"],
+    distributions: dict[str, Distribution | dict[int, Distribution]],
+    n: int,
+    seed: Any = None,
+    correlation: dict[tuple[Hashable, Hashable], float] | None = None,
+    inputs: dict[str, Any] | None = None,
+    periods: list[int] | None = None,
+    chunk_size: int = 10_000,
+) -> "SimulationResult":
+    """
+    Run a Monte Carlo simulation of a model class.
+
+    Args:
+        model_cls: The ProformaModel subclass to simulate.
+        distributions: Maps input names to distributions.
+            - ScalarInputLine: a Distribution.
+            - InputLine with a single Distribution: one draw per scenario, used
+              for every unlocked period.
+            - InputLine with ``{period: Distribution}``: an independent draw per
+              listed period; other periods keep their default or supplied value.
+        n: Number of draws.
+        seed: Seed or ``numpy.random.Generator`` for reproducible draws.
+        correlation: Pairwise rank correlations, ``{(var_a, var_b): rho}``. A
+            variable is an input name, or ``(name, period)`` for per-period draws.
+        inputs: Fixed values for the other inputs, as passed to ``model_cls(...)``.
+        periods: Periods to evaluate. Defaults to ``default_periods``.
+        chunk_size: Scenarios evaluated per batch. Bounds the batch engine's
+            working set (its value store and intermediate arrays) without
+            changing the results; the result itself holds every line item,
+            period and draw.
+
+    Returns:
+        SimulationResult: Per-draw values with percentile, mean and probability
+        summaries.
+
+    Raises:
+        ValueError: If a name is not a ScalarInputLine/InputLine, a period is
+            locked, or the correlation spec is invalid.
+
+    Examples:
+        >>> from pyproforma.simulate import Normal, Triangular, simulate
+        >>> result = simulate(
+        ...     WaterUtilityModel,
+        ...     {"inflation_rate": Normal(0.03, 0.01),
+        ...      "new_bond_rate": Triangular(0.035, 0.045, 0.065)},
+        ...     n=10_000, seed=42,
+        ...     correlation={("inflation_rate", "new_bond_rate"): 0.6},
+        ... )
+        >>> result.probability("dscr", "<", 1.25)
+    """
+    np = import_numpy("Monte Carlo simulation")
+    from pyproforma.engine.batch_engine import calculate_batch
+
+    if n < 1:
+        raise ValueError(f"n must be at least 1, got {n}")
+    if chunk_size < 1:
+        raise ValueError(f"chunk_size must be at least 1, got {chunk_size}")
+    inputs = dict(inputs or {})
+    if periods is None:
+        periods = getattr(model_cls, "default_periods", [])
+    periods = list(periods)
+
+    overlap = sorted(set(inputs) & set(distributions))
+    if overlap:
+        raise ValueError(
+            f"Inputs given both a fixed value and a distribution: {', '.join(overlap)}"
+        )
+    base_scalars, base_lines = model_cls._resolve_inputs(
+        _placeholder_inputs(model_cls, inputs, distributions, periods)
+    )
+    targets = _simulation_targets(model_cls, distributions, periods)
+
+    rng = seed if isinstance(seed, np.random.Generator) else np.random.default_rng(seed)
+    variables = list(targets)
+    samples = np.empty((n, len(variables)))
+    for j, var in enumerate(variables):
+        samples[:, j] = targets[var][0].sample(rng, n)
+    if correlation:
+        target = correlation_matrix(variables, correlation, np)
+        samples = impose_rank_correlation(samples, target, rng, np)
+
+    names = list(model_cls._line_item_names)
+    data = np.empty((len(names), len(periods), n))
+    fallback_items: set[str] = set()
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        scalars = dict(base_scalars)
+        line_values = {name: dict(values) for name, values in base_lines.items()}
+        for j, var in enumerate(variables):
+            column = samples[start:stop, j]
+            for name, period in targets[var][1]:
+                if period is None:
+                    scalars[name] = column
+                else:
+                    line_values[name][period] = column
+        batch = calculate_batch(model_cls, periods, scalars, line_values, stop - start)
+        data[:, :, start:stop] = batch._values.data
+        fallback_items.update(batch.fallback_items)
+
+    return SimulationResult(
+        model_cls,
+        periods,
+        data,
+        base_scalars,
+        samples={var: samples[:, j] for j, var in enumerate(variables)},
+        fallback_items=sorted(fallback_items),
+    )
+
+
+def _placeholder_inputs(
+    model_cls: type, inputs: dict, distributions: dict, periods: list[int]
+) -> dict:
+    """
+    Add zero placeholders for simulated inputs that have no default.
+
+    ``_resolve_inputs`` rejects missing required inputs, but a simulated input is
+    supplied by its samples; the placeholders pass validation and are then
+    overwritten.
+    """
+    kwargs = dict(inputs)
+    for name, spec in distributions.items():
+        if name in model_cls._scalar_input_names:
+            if not getattr(model_cls, name).has_default:
+                kwargs[name] = 0.0
+        elif name in model_cls._input_line_names:
+            attr = getattr(model_cls, name)
+            if attr.has_default or attr.locked_values:
+                continue
+            sampled = spec.keys() if isinstance(spec, dict) else periods
+            kwargs[name] = dict.fromkeys(sampled, 0.0)
+    return kwargs
+
+
+def _simulation_targets(
+    model_cls: type,
+    distributions: dict,
+    periods: list[int],
+) -> dict[Hashable, tuple[Distribution, list[tuple[str, int | None]]]]:
+    """
+    Map each sampled variable to its distribution and the (name, period) cells it
+    fills. ``period`` is None for scalar inputs.
+    """
+    targets: dict[Hashable, tuple[Distribution, list[tuple[str, int | None]]]] = {}
+    for name, spec in distributions.items():
+        if name in model_cls._scalar_input_names:
+            if not isinstance(spec, Distribution):
+                raise ValueError(
+                    f"'{name}' is a ScalarInputLine; give it a single Distribution, "
+                    f"got {type(spec).__name__}"
+                )
+            targets[name] = (spec, [(name, None)])
+        elif name in model_cls._input_line_names:
+            locked = _locked_periods(getattr(model_cls, name))
+            if isinstance(spec, Distribution):
+                cells = [(name, p) for p in periods if p not in locked]
+                targets[name] = (spec, cells)
+                continue
+            if not isinstance(spec, dict):
+                raise ValueError(
+                    f"Distribution for '{name}' must be a Distribution or "
+                    f"{{period: Distribution}}, got {type(spec).__name__}"
+                )
+            for period, dist in spec.items():
+                if period in locked:
+                    raise ValueError(
+                        f"'{name}' period {period} is locked and cannot be simulated."
+                    )
+                if not isinstance(dist, Distribution):
+                    raise ValueError(
+                        f"Distribution for '{name}' period {period} must be a "
+                        f"Distribution, got {type(dist).__name__}"
+                    )
+                targets[(name, period)] = (dist, [(name, period)])
+        else:
+            inputs = model_cls._scalar_input_names + model_cls._input_line_names
+            raise ValueError(
+                f"'{name}' is not a ScalarInputLine or InputLine on "
+                f"{model_cls.__name__}. Inputs: {', '.join(sorted(inputs)) or 'none'}"
+            )
+    return targets
+
+
+def _locked_periods(attr: Any) -> set[int]:
+    """Periods fixed by ``values=`` or set to None in the InputLine spec."""
+    locked = set(attr.locked_values)
+    if attr.has_default:
+        locked.update(p for p, v in attr.default.items() if v is None)
+    return locked
+
+
+class SimulationResult:
+    """
+    Per-draw results of a Monte Carlo simulation.
+
+    Summaries take a line item or scalar name. For line items they return a
+    ``{period: value}`` dict, or a float when ``period`` is given; for scalars
+    they return a float.
+
+    Attributes:
+        n (int): Number of draws.
+        periods (list[int]): The evaluated periods.
+        samples (dict): Input draws keyed by variable (name or ``(name, period)``).
+        fallback_items (list[str]): Formula line items evaluated per draw because
+            they branch on values (see ``ProformaModel.evaluate_batch``).
+
+    Examples:
+        >>> result.percentile("dscr", 5)            # {2025: ..., 2026: ...}
+        >>> result.percentile("dscr", 5, period=2030)
+        >>> result.mean("ending_cash", period=2030)
+        >>> result.probability("dscr", "<", 1.25)   # {period: P(dscr < 1.25)}
+    """
+
+    def __init__(
+        self,
+        model_cls: type,
+        periods: list[int],
+        data: Any,
+        scalars: dict[str, Any],
+        samples: dict[Hashable, Any],
+        fallback_items: list[str] | None = None,
+    ):
+        self._model_cls = model_cls
+        self.periods = list(periods)
+        self._data = data
+        self._data.flags.writeable = False
+        self._row = {name: i for i, name in enumerate(model_cls._line_item_names)}
+        self._column = {period: j for j, period in enumerate(self.periods)}
+        self._scalars = scalars
+        self.samples = samples
+        self.n = data.shape[2]
+        self.fallback_items = list(fallback_items or [])
+
+    def __len__(self) -> int:
+        return self.n
+
+    def values(self, name: str, period: int | None = None):
+        """
+        Raw per-draw values.
+
+        Returns:
+            numpy.ndarray: Shape (n, periods) for a line item, (n,) for a line item
+            at one period or for a scalar.
+        """
+        np = import_numpy("Monte Carlo simulation")
+        if name in self._model_cls._scalar_names:
+            if name in self.samples:
+                return self.samples[name]
+            return np.full(self.n, float(self._scalars[name]))
+        row = self._row.get(name)
+        if row is None:
+            raise KeyError(
+                f"Item '{name}' not found in simulation. Available line items: "
+                f"{', '.join(sorted(self._row))}"
+            )
+        if period is None:
+            return self._data[row].T
+        col = self._column.get(period)
+        if col is None:
+            raise KeyError(f"Period {period} not in simulation periods {self.periods}")
+        return self._data[row, col]
+
+    def percentile(self, name: str, q: float, period: int | None = None):
+        """The ``q``-th percentile (0–100) across draws."""
+        np = import_numpy("Monte Carlo simulation")
+        return self._summarize(name, period, lambda v: np.percentile(v, q, axis=0))
+
+    def mean(self, name: str, period: int | None = None):
+        """Mean across draws."""
+        return self._summarize(name, period, lambda v: v.mean(axis=0))
+
+    def std(self, name: str, period: int | None = None):
+        """Standard deviation across draws."""
+        return self._summarize(name, period, lambda v: v.std(axis=0))
+
+    def probability(self, name: str, op: str, threshold: float, period: int | None = None):
+        """
+        Fraction of draws where ``value <op> threshold``.
+
+        Args:
+            op: One of ``"<"``, ``"<="``, ``">"``, ``">="``.
+
+        Examples:
+            >>> result.probability("dscr", "<", 1.25, period=2030)
+            0.071
+        """
+        compare = _COMPARISONS.get(op)
+        if compare is None:
+            raise ValueError(f"op must be one of {', '.join(_COMPARISONS)}, got {op!r}")
+        return self._summarize(name, period, lambda v: compare(v, threshold).mean(axis=0))
+
+    def _summarize(self, name: str, period: int | None, reduce):
+        values = self.values(name, period)
+        result = reduce(values)
+        if values.ndim == 1:
+            return float(result)
+        return {p: float(result[j]) for j, p in enumerate(self.periods)}
+
+    def __repr__(self):
+        return (
+            f"SimulationResult({self._model_cls.__name__}, n={self.n}, "
+            f"periods={self.periods})"
+        )
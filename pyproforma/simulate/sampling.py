@@ -0,0 +1,86 @@
+"""
+Drawing correlated input samples.
+
+Correlation between inputs is imposed with the Iman–Conover method: every
+variable is sampled independently from its own distribution, then each column
+is reordered so its ranks follow correlated normal scores. Marginal
+distributions are preserved exactly and the rank correlation approximates the
+target matrix.
+"""
+
+from typing import Any, Hashable
+
+
+def correlation_matrix(
+    variables: list[Hashable],
+    correlation: dict[tuple[Hashable, Hashable], float],
+    np: Any,
+):
+    """
+    Build a full correlation matrix from pairwise entries.
+
+    Args:
+        variables: Variable keys, in column order.
+        correlation: ``{(var_a, var_b): rho}``. Unlisted pairs are uncorrelated.
+
+    Raises:
+        ValueError: If a key names an unknown variable, a coefficient is outside
+            [-1, 1], a pair is given twice with different values, or the matrix is
+            not positive definite.
+    """
+    index = {var: i for i, var in enumerate(variables)}
+    matrix = np.eye(len(variables))
+    for pair, rho in correlation.items():
+        first, second = pair
+        for var in pair:
+            if var not in index:
+                raise ValueError(
+                    f"Correlation refers to {var!r}, which has no distribution. "
+                    f"Simulated inputs: {', '.join(repr(v) for v in variables)}"
+                )
+        if first == second:
+            raise ValueError(f"Correlation pair {pair!r} repeats the same input")
+        if not -1 <= rho <= 1:
+            raise ValueError(f"Correlation for {pair!r} must be in [-1, 1], got {rho}")
+        i, j = index[first], index[second]
+        if matrix[i, j] not in (0.0, rho):
+            raise ValueError(f"Correlation for {pair!r} is given twice with different values")
+        matrix[i, j] = matrix[j, i] = rho
+    try:
+        np.linalg.cholesky(matrix)
+    except np.linalg.LinAlgError:
+        raise ValueError(
+            "Correlation matrix is not positive definite. "
+            "Check that the pairwise correlations are mutually consistent."
+        ) from None
+    return matrix
+
+
+def impose_rank_correlation(samples, target, rng: Any, np: Any):
+    """
+    Reorder sample columns so their rank correlation approximates ``target``.
+
+    Args:
+        samples: (n, k) array of independent samples, one column per variable.
+        target: (k, k) positive definite correlation matrix.
+        rng: ``numpy.random.Generator`` used for the normal scores.
+
+    Returns:
+        numpy.ndarray: A new (n, k) array; each column is a permutation of the
+        corresponding input column.
+    """
+    n, k = samples.shape
+    if k < 2 or n < k + 1:
+        return samples.copy()
+
+    scores = rng.standard_normal((n, k))
+    # Remove the scores' own sample correlation, then apply the target.
+    current = np.linalg.cholesky(np.corrcoef(scores, rowvar=False)).T
+    desired = np.linalg.cholesky(target).T
+    scores = scores @ np.linalg.solve(current, desired)
+
+    result = np.empty_like(samples)
+    for j in range(k):
+        ranks = np.argsort(np.argsort(scores[:, j]))
+        result[:, j] = np.sort(samples[:, j])[ranks]
+    return result
@@ -0,0 +1,14 @@
+"""
+Solving for inputs: find the input values that make a model hit a target.
+
+    result = model.goal_seek("dscr", period=2030, value=1.25, vary="inflation_rate")
+    result.value    # the solved inflation_rate
+    result.model    # the model with it applied
+"""
+
+from .goal_seek import GoalSeekResult, goal_seek
+
+__all__ = [
+    "goal_seek",
+    "GoalSeekResult",
+]
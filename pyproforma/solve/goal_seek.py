@@ -0,0 +1,356 @@
+"""
+Goal seek: find the input value that makes a line item hit a target.
+
+Each trial value is applied with ``model.with_inputs``, so only the line items
+downstream of the varied input are recalculated; the rest of the model is
+shared with the original. If the dependency graph finds no path from the input
+to the target (it can miss reads a formula makes in ways it cannot trace),
+each trial is instantiated from scratch instead, and the target is only
+reported independent of the input when no trial value moves it.
+
+The root is found with Brent's method (bisection safeguarding secant and
+inverse quadratic interpolation steps) inside a bracket given by ``bounds`` or
+found by stepping outward from the current value.
+"""
+
+import math
+from typing import TYPE_CHECKING, Any, Callable
+
+if TYPE_CHECKING:
+    from pyproforma.proforma_model import ProformaModel
+
+_EPS = 2.220446049250313e-16
+_MAX_EXPANSIONS = 60
+
+
+class GoalSeekResult:
+    """
+    Outcome of a goal seek.
+
+    Attributes:
+        model (ProformaModel): The model with the solved input applied.
+        vary (str): The varied input.
+        value (float | dict[int, float]): The solved input value; a
+            ``{period: value}`` dict when each period was solved separately.
+        achieved (float | dict[int, float]): The target line item's value at the
+            solution, per period likewise.
+        iterations (int | dict[int, int]): Brent iterations, per period likewise.
+        evaluations (int): Models evaluated in total (bracketing included).
+
+    Examples:
+        >>> result = model.goal_seek("dscr", period=2030, value=1.25, vary="inflation_rate")
+        >>> result.value
+        0.0412...
+        >>> result.model.dscr[2030]
+        1.25
+    """
+
+    def __init__(
+        self,
+        model: "ProformaModel",
+        vary: str,
+        value: Any,
+        achieved: Any,
+        iterations: Any,
+        evaluations: int,
+    ):
+        self.model = model
+        self.vary = vary
+        self.value = value
+        self.achieved = achieved
+        self.iterations = iterations
+        self.evaluations = evaluations
+
+    def __repr__(self):
+        return (
+            f"GoalSeekResult(vary={self.vary!r}, value={self.value!r}, "
+            f"achieved={self.achieved!r}, evaluations={self.evaluations})"
+        )
+
+
+def goal_seek(
+    model: "ProformaModel",
+    target: str,
+    *,
+    value: float | dict[int, float],
+    vary: str,
+    period: int | list[int] | None = None,
+    bounds: tuple[float, float] | None = None,
+    tolerance: float = 1e-9,
+    max_iterations: int = 100,
+) -> GoalSeekResult:
+    """
+    Find the value of an input at which a line item equals a target value.
+
+    Varying a ScalarInputLine solves one equation, ``target[period] == value``.
+    Varying an InputLine with a single period solves for that period's input.
+    Varying an InputLine with a list of periods, or ``period=None``, solves each
+    period in turn: the period's input is chosen so that ``target`` hits
+    ``value`` in that period, with the inputs of earlier periods already solved.
+
+    Args:
+        model: The model to start from. It is not modified.
+        target: Name of the line item to drive to value.
+        value: The target value, or ``{period: value}`` when solving per period.
+        vary: Name of the ScalarInputLine or InputLine to vary.
+        period: The target period (required for a ScalarInputLine). For an
+            InputLine, a period or list of periods; None means every model
+            period whose input is not locked.
+        bounds: ``(low, high)`` bracket for the input. Defaults to searching
+            outward from the current value.
+        tolerance: Stop when ``|target - value|`` is at most this.
+        max_iterations: Brent iterations allowed per solve.
+
+    Returns:
+        GoalSeekResult: The solved model, input value(s) and iteration counts.
+
+    Raises:
+        ValueError: If vary is not an input, the target is not bracketed, or
+            the solve does not converge.
+    """
+    cls = model.__class__
+    if vary in cls._scalar_input_names:
+        if period is None or isinstance(period, (list, tuple)):
+            raise ValueError(
+                f"goal_seek on scalar input '{vary}' needs a single target period."
+            )
+        solver = _Solver(model, target, vary, tolerance, max_iterations, bounds)
+        solved, achieved, iterations = solver.solve(
+            period, _target_for(value, period), model._scalars[vary], lambda x: {vary: x}
+        )
+        return GoalSeekResult(
+            solver.model_at(solved), vary, solved, achieved, iterations, solver.evaluations
+        )
+
+    if vary not in cls._input_line_names:
+        raise ValueError(
+            f"'{vary}' is not an input of {cls.__name__}. goal_seek varies a "
+            f"ScalarInputLine or InputLine."
+        )
+
+    spec = getattr(cls, vary)
+    inputs = model._input_kwargs()[vary]
+    if period is None:
+        periods = [
+            p for p in model.periods
+            if p not in spec.locked_values and model._input_line_values[vary].get(p) is not None
+        ]
+    elif isinstance(period, (list, tuple)):
+        periods = list(period)
+    else:
+        periods = [period]
+    for p in periods:
+        if p not in model.periods:
+            raise ValueError(f"Period {p} is not a period of the model.")
+        if p in spec.locked_values:
+            raise ValueError(f"'{vary}' is locked in period {p} and cannot be varied.")
+
+    solver = _Solver(model, target, vary, tolerance, max_iterations, bounds)
+    solved_values, achieved, iterations = {}, {}, {}
+    for p in periods:
+        current = inputs.get(p)
+
+        def kwargs(x: float, p: int = p) -> dict:
+            return {vary: {**inputs, p: x}}
+
+        solved, achieved[p], iterations[p] = solver.solve(
+            p, _target_for(value, p), 0.0 if current is None else current, kwargs
+        )
+        solved_values[p] = solved
+        inputs = {**inputs, p: solved}
+    # The last solve's model has every solved period applied.
+    solved_model = solver.model_at(solved_values[periods[-1]]) if periods else model
+    if isinstance(period, int):
+        return GoalSeekResult(
+            solved_model,
+            vary,
+            solved_values[period],
+            achieved[period],
+            iterations[period],
+            solver.evaluations,
+        )
+    return GoalSeekResult(
+        solved_model, vary, solved_values, achieved, iterations, solver.evaluations
+    )
+
+
+def _target_for(value: Any, period: int) -> float:
+    if isinstance(value, dict):
+        if period not in value:
+            raise ValueError(f"No target value given for period {period}.")
+        return value[period]
+    return value
+
+
+class _Solver:
+    """Evaluates trial inputs with with_inputs and runs Brent's method."""
+
+    def __init__(
+        self,
+        model: "ProformaModel",
+        target: str,
+        vary: str,
+        tolerance: float,
+        max_iterations: int,
+        bounds: tuple[float, float] | None,
+    ):
+        from pyproforma.engine.calculation_engine import affected_line_items
+
+        if target not in model.line_item_names:
+            raise ValueError(f"'{target}' is not a line item of {model.__class__.__name__}.")
+        if bounds is not None and not bounds[0] < bounds[1]:
+            raise ValueError(f"bounds must be (low, high) with low < high, got {bounds!r}")
+        self.model = model
+        self.target = target
+        self.vary = vary
+        self.tolerance = tolerance
+        self.max_iterations = max_iterations
+        self.bounds = bounds
+        self.evaluations = 0
+        # Without a path in the graph, with_inputs would keep the target's values.
+        self._fresh = target not in affected_line_items(model.__class__, {vary})
+        self._models: dict[float, ProformaModel] = {}
+        self._kwargs: Callable[[float], dict] = lambda x: {}
+
+    def model_at(self, x: float) -> "ProformaModel":
+        model = self._models.get(x)
+        if model is None:
+            model = self._evaluate(self._kwargs(x))
+            self._models = {x: model}
+        return model
+
+    def _evaluate(self, kwargs: dict) -> "ProformaModel":
+        self.evaluations += 1
+        if not self._fresh:
+            return self.model.with_inputs(**kwargs)
+        model = self.model
+        return model.__class__(
+            model.periods,
+            engine=model._engine.name,
+            solver=model._solver,
+            **{**model._input_kwargs(), **kwargs},
+        )
+
+    def solve(
+        self,
+        period: int,
+        value: float,
+        start: float,
+        kwargs: Callable[[float], dict],
+    ) -> tuple[float, float, int]:
+        """Return ``(input value, achieved target value, iterations)``."""
+        self._kwargs = kwargs
+        self._models = {}
+
+        def f(x: float) -> float:
+            model = self._evaluate(kwargs(x))
+            self._models[x] = model
+            result = model[self.target][period]
+            if result is None:
+                raise ValueError(
+                    f"'{self.target}' has no value in period {period} "
+                    f"with {self.vary} = {x!r}."
+                )
+            return float(result) - value
+
+        a, fa, b, fb = self._bracket(f, float(start), period, value)
+        x, fx, iterations = _brent(f, a, b, fa, fb, self.tolerance, self.max_iterations)
+        if abs(fx) > self.tolerance:
+            raise ValueError(
+                f"goal_seek did not converge: '{self.target}' in period {period} is "
+                f"{fx + value!r} at {self.vary} = {x!r}, target {value!r}. The target "
+                f"may be discontinuous in '{self.vary}'."
+            )
+        # Keep only the solution's model.
+        self._models = {x: self._models[x]}
+        return x, fx + value, iterations
+
+    def _bracket(
+        self, f: Callable[[float], float], start: float, period: int, value: float
+    ) -> tuple[float, float, float, float]:
+        if self.bounds is not None:
+            a, b = float(self.bounds[0]), float(self.bounds[1])
+            fa, fb = f(a), f(b)
+            if fa * fb > 0:
+                raise ValueError(
+                    f"'{self.target}' does not cross {value!r} in period {period} "
+                    f"for {self.vary} in {self.bounds!r} (values {fa + value!r} and "
+                    f"{fb + value!r})."
+                )
+            return a, fa, b, fb
+
+        f0 = f(start)
+        if f0 == 0:
+            return start, f0, start, f0
+        step = 0.1 * abs(start) if start else 0.01
+        moved = False
+        for _ in range(_MAX_EXPANSIONS):
+            for x in (start + step, start - step):
+                fx = f(x)
+                if fx == 0 or fx * f0 < 0:
+                    return (start, f0, x, fx) if x > start else (x, fx, start, f0)
+                moved = moved or fx != f0
+            step *= 2
+        if not moved:
+            raise ValueError(
+                f"'{self.target}' does not depend on '{self.vary}': it is "
+                f"{f0 + value!r} in period {period} for every value tried."
+            )
+        raise ValueError(
+            f"Could not find a value of '{self.vary}' at which '{self.target}' "
+            f"crosses {value!r} in period {period}. Pass bounds=(low, high)."
+        )
+
+
+def _brent(
+    f: Callable[[float], float],
+    a: float,
+    b: float,
+    fa: float,
+    fb: float,
+    tolerance: float,
+    max_iterations: int,
+) -> tuple[float, float, int]:
+    """Brent's root finder on a bracket [a, b] with f(a) * f(b) <= 0."""
+    if abs(fa) <= tolerance and abs(fa) <= abs(fb):
+        return a, fa, 0
+    if abs(fb) <= tolerance:
+        return b, fb, 0
+    c, fc = a, fa
+    d = e = b - a
+    for iteration in range(1, max_iterations + 1):
+        if (fb > 0) == (fc > 0):
+            c, fc = a, fa
+            d = e = b - a
+        if abs(fc) < abs(fb):
+            a, b, c = b, c, b
+            fa, fb, fc = fb, fc, fb
+        tol = 2 * _EPS * abs(b)
+        midpoint = 0.5 * (c - b)
+        if abs(fb) <= tolerance or abs(midpoint) <= tol:
+            return b, fb, iteration - 1
+        if abs(e) >= tol and abs(fa) > abs(fb):
+            s = fb / fa
+            if a == c:
+                # Secant step.
+                p = 2 * midpoint * s
+                q = 1 - s
+            else:
+                # Inverse quadratic interpolation.
+                q = fa / fc
+                r = fb / fc
+                p = s * (2 * midpoint * q * (q - r) - (b - a) * (r - 1))
+                q = (q - 1) * (r - 1) * (s - 1)
+            if p > 0:
+                q = -q
+            p = abs(p)
+            if 2 * p < min(3 * midpoint * q - abs(tol * q), abs(e * q)):
+                e, d = d, p / q
+            else:
+                d = e = midpoint
+        else:
+            d = e = midpoint
+        a, fa = b, fb
+        b += d if abs(d) > tol else math.copysign(tol, midpoint)
+        fb = f(b)
+    return b, fb, max_iterations
@@ -16,11 +16,13 @@ from .input_line import InputLine
 from .line_item import LineItem
 from .scalar_input_line import ScalarInputLine
 from .scalar_line import ScalarLine
+from .vector_formula_line import VectorFormulaLine
 
 __all__ = [
     "LineItem",
     "FixedLine",
     "FormulaLine",
+    "VectorFormulaLine",
     "InputLine",
     "ScalarLine",
     "ScalarInputLine",
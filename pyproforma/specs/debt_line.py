@@ -23,6 +23,7 @@ from abc import abstractmethod
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Union
 
+from pyproforma.engine.dual_numbers import Dual
 from pyproforma.table import NumberFormatSpec
 
 from .line_item import LineItem
@@ -50,9 +51,13 @@ class DebtCalculator:
     """
     Per-instance stateful calculator for bond debt schedules across multiple issuances.
 
-    Created fresh for each model instance by ProformaModel.__init__ — never shared
-    across instances. Reads interest rate and term from the model namespace at
-    calculation time, so they can be varied via ScalarInputLine for scenario analysis.
+    Created fresh for each model instance by ProformaModel.__init__; ``with_inputs``
+    shares a calculator only with models whose debt lines it does not recalculate.
+    Reads interest rate and term from the model namespace at calculation time, so
+    they can be varied via ScalarInputLine for scenario analysis.
+
+    Adding an issuance replaces ``_schedules`` rather than changing it in place,
+    so a thread reading payments never sees the mapping change under it.
 
     Attributes:
         par_amounts (str): Name of the line item containing par amounts per period.
@@ -78,13 +83,27 @@ class DebtCalculator:
 
         # Support both ScalarLine (float) and FixedLine/FormulaLine (period-indexed)
         rate_val = getattr(ns, self.interest_rate)
-        rate = float(rate_val[t] if not isinstance(rate_val, (int, float)) else rate_val)
+        if not isinstance(rate_val, (int, float, Dual)):
+            rate_val = rate_val[t]
+        # A Dual (sensitivity pass) keeps its derivatives through the schedule.
+        rate = rate_val if isinstance(rate_val, Dual) else float(rate_val)
 
         term_val = getattr(ns, self.term)
-        term = int(term_val[t] if not isinstance(term_val, (int, float)) else term_val)
+        if not isinstance(term_val, (int, float, Dual)):
+            term_val = term_val[t]
+        # The term is a whole number of years, a discrete parameter with no derivative.
+        term = int(term_val.value if isinstance(term_val, Dual) else term_val)
 
         self._add_bond_issue(par_amount, t, rate, term)
 
+    def copy(self) -> "DebtCalculator":
+        """Return a calculator holding the same bond issues, to branch a calculation."""
+        copied = DebtCalculator(self.par_amounts, self.interest_rate, self.term)
+        copied._schedules = {
+            issue_year: dict(schedule) for issue_year, schedule in self._schedules.items()
+        }
+        return copied
+
     def _calculate_annual_payment(self, par: float, rate: float, term: int) -> float:
         if rate == 0:
             return par / term
@@ -112,7 +131,7 @@ class DebtCalculator:
             }
             balance -= principal
 
-        self._schedules[issue_year] = schedule
+        self._schedules = {**self._schedules, issue_year: schedule}
 
     def get_principal(self, period: int) -> float:
         return sum(
@@ -2,7 +2,12 @@
 FormulaLine class for calculated line items.
 """
 
+import dis
+import functools
 import inspect
+import os
+import sysconfig
+import types
 from typing import TYPE_CHECKING, Callable, Union
 
 from pyproforma.table import NumberFormatSpec
@@ -10,7 +15,9 @@ from pyproforma.table import NumberFormatSpec
 from .line_item import LineItem
 
 if TYPE_CHECKING:
+    from pyproforma.engine.formula_compiler import CompiledFormula
     from pyproforma.engine.model_namespace import ModelNamespace
+    from pyproforma.engine.period_offsets import PeriodOffsets
 
 
 # ---------------------------------------------------------------------------
@@ -44,6 +51,8 @@ class _DummyValue:
     def __le__(self, other): return False
     def __eq__(self, other): return False
     def __ne__(self, other): return True
+    def lag(self, *args, **kwargs): return self
+    def lead(self, *args, **kwargs): return self
 
 
 class _TagRecorder:
@@ -76,6 +85,7 @@ class _PrecedentRecorder:
         self._items_seen: set[str] = set()
         self._tags: list[str] = []
         self._tags_seen: set[str] = set()
+        self._failed = False
 
     def __getattr__(self, name: str):
         if name.startswith("_"):
@@ -88,14 +98,266 @@ class _PrecedentRecorder:
         return _DummyValue()
 
 
-def _trace_formula(formula: Callable) -> tuple[list[str], list[str]]:
-    """Run formula with a recording proxy and return (line_item_refs, tag_refs)."""
+def _record_formula(formula: Callable, *args) -> _PrecedentRecorder:
+    """Run formula with a recording proxy and return the recorder.
+
+    args follow the recorder (``0`` for the period of a ``(li, t)`` formula;
+    nothing for a VectorFormulaLine's ``(li)`` formula).
+    ``recorder._failed`` is True if the formula raised during tracing, in which
+    case the recorded references may be incomplete.
+    """
     recorder = _PrecedentRecorder()
     try:
-        formula(recorder, 0)
+        formula(recorder, *args)
     except Exception:
-        pass
-    return recorder._items, recorder._tags
+        recorder._failed = True
+    return recorder
+
+
+def _static_references(formula: Callable) -> tuple[set[str], set[str]]:
+    """Return (attribute names, string constants) appearing in the formula's code.
+
+    Complements the recorder: tracing follows only the branch taken at t=0,
+    while the compiled code lists every ``li.<name>`` and string literal (a tag,
+    or an item name passed to ``getattr``) in every branch. Strings held in the
+    globals and closure variables the code reads (``li.tag[TAG]``) count as
+    constants. Helper functions defined in the formula's module are scanned
+    too, recursively. Callers intersect the result with known line item,
+    scalar and tag names, so unrelated attributes (``math.exp``) are ignored.
+    """
+    names, strings, _ = _scan_code(formula)
+    return names, strings
+
+
+def _has_opaque_calls(formula: Callable) -> bool:
+    """Whether the formula may read line items its code does not name.
+
+    That is the case if it reaches user code that is not scanned: a function
+    defined outside the formula's module (including installed packages), a
+    user-defined class or callable object, a container or object holding
+    functions (``HELPERS["calc"](li, t)``), a ``getattr`` whose attribute
+    name is not a string constant, or a tag sum whose tag name is neither a
+    string constant nor a global or closure variable holding a string
+    (``li.tag[prefix + "_revenue"]``).
+    """
+    return _scan_code(formula)[2]
+
+
+_MISSING = object()
+
+# Instructions skipped when matching the arguments of a getattr call.
+_NO_OPS = frozenset({"CACHE", "EXTENDED_ARG", "KW_NAMES", "NOP", "PUSH_NULL"})
+_SIMPLE_LOADS = frozenset({"LOAD_DEREF", "LOAD_FAST", "LOAD_GLOBAL", "LOAD_NAME"})
+_CALLS = frozenset({"CALL", "PRECALL"})
+# Names that reach attributes without naming them in the code.
+_DYNAMIC_NAMES = frozenset({"__dict__", "__getattr__", "__getattribute__", "attrgetter", "vars"})
+
+
+def _scan_code(formula: Callable) -> tuple[set[str], set[str], bool]:
+    """(names, strings, opaque) for formula and the helper functions it reaches."""
+    names: set[str] = set()
+    strings: set[str] = set()
+    opaque = False
+    seen: set = set()
+
+    root = _unwrap(formula)
+    if not isinstance(root, types.FunctionType):
+        return names, strings, _is_user_callable(formula)
+    home = root.__globals__
+    functions: list = [root]
+    if isinstance(formula, functools.partial):
+        opaque = _holds_code((formula.args, formula.keywords))
+
+    def visit(value: object, attr_names: tuple[str, ...] = ()) -> None:
+        nonlocal opaque
+        value = _unwrap(value)
+        if isinstance(value, types.FunctionType):
+            if value.__globals__ is home:
+                functions.append(value)
+            elif not _is_library(value):
+                opaque = True
+        elif isinstance(value, types.ModuleType):
+            if not _is_library(value):
+                for name in attr_names:
+                    attr = getattr(value, name, _MISSING)
+                    if not isinstance(attr, types.ModuleType):
+                        visit(attr)
+        elif _is_user_callable(value) or _holds_code(value):
+            opaque = True
+        elif not _is_library(type(value)):
+            # An object of a user class: any method the code reaches is opaque.
+            for name in attr_names:
+                attr = inspect.getattr_static(value, name, _MISSING)
+                if attr is not _MISSING and callable(attr):
+                    opaque = True
+
+    while functions:
+        function = functions.pop()
+        code = function.__code__
+        if code in seen:
+            continue
+        cells = function.__closure__ or ()
+        closure = {}
+        for name, cell in zip(code.co_freevars, cells):
+            try:
+                closure[name] = cell.cell_contents
+            except ValueError:  # an empty cell
+                pass
+        scope = getattr(function, "__globals__", {})
+        codes = [code]
+        while codes:
+            code = codes.pop()
+            if code in seen:
+                continue
+            seen.add(code)
+            names.update(code.co_names)
+            consts = list(code.co_consts)
+            while consts:
+                const = consts.pop()
+                if isinstance(const, str):
+                    strings.add(const)
+                elif isinstance(const, (tuple, frozenset)):
+                    consts.extend(const)
+                elif hasattr(const, "co_names"):
+                    codes.append(const)
+            if _DYNAMIC_NAMES & set(code.co_names) or _dynamic_getattr(code):
+                opaque = True
+            if _dynamic_tag(code, closure, scope):
+                opaque = True
+            for name in code.co_names + code.co_freevars:
+                value = closure.get(name, scope.get(name, _MISSING))
+                if isinstance(value, str):
+                    strings.add(value)
+                    continue
+                if isinstance(value, (tuple, list, frozenset, set)):
+                    strings.update(item for item in value if isinstance(item, str))
+                if value is not _MISSING:
+                    visit(value, code.co_names)
+    return names, strings, opaque
+
+
+def _unwrap(value: object) -> object:
+    """The function behind a ``functools.partial`` or bound method."""
+    while isinstance(value, (functools.partial, types.MethodType)):
+        value = value.func if isinstance(value, functools.partial) else value.__func__
+    return value
+
+
+def _is_user_callable(value: object) -> bool:
+    """Whether value is a function, class or callable object from user code."""
+    value = _unwrap(value)
+    if isinstance(value, types.BuiltinFunctionType) or not callable(value):
+        return False
+    if isinstance(value, (types.FunctionType, type)):
+        return not _is_library(value)
+    return not _is_library(type(value))
+
+
+def _holds_code(value: object, depth: int = 3) -> bool:
+    """Whether a container (or plain namespace) holds user callables, a few levels deep."""
+    if isinstance(value, dict):
+        items = value.values()
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        items = value
+    elif isinstance(value, types.SimpleNamespace):
+        items = vars(value).values()
+    else:
+        return False
+    return any(
+        _is_user_callable(item) or (depth > 1 and _holds_code(item, depth - 1))
+        for item in items
+    )
+
+
+def _dynamic_getattr(code: types.CodeType) -> bool:
+    """Whether code calls ``getattr`` with an attribute name that is not a string constant."""
+    if "getattr" not in code.co_names:
+        return False
+    ops = [op for op in dis.get_instructions(code) if op.opname not in _NO_OPS]
+    for i, op in enumerate(ops):
+        if op.argval != "getattr" or op.opname not in ("LOAD_GLOBAL", "LOAD_NAME"):
+            continue
+        args = ops[i + 1 : i + 5]
+        if len(args) < 3 or args[0].opname not in _SIMPLE_LOADS:
+            return True
+        if args[1].opname != "LOAD_CONST" or not isinstance(args[1].argval, str):
+            return True
+        if args[2].opname == "LOAD_CONST":  # getattr(obj, "name", default)
+            args = args[1:]
+        if len(args) < 3 or args[2].opname not in _CALLS:
+            return True
+    return False
+
+
+def _dynamic_tag(code: types.CodeType, closure: dict, scope: dict) -> bool:
+    """Whether code reads ``li.tag[...]`` with a tag name that cannot be resolved to a string."""
+    if "tag" not in code.co_names:
+        return False
+    ops = [op for op in dis.get_instructions(code) if op.opname not in _NO_OPS]
+    for i, op in enumerate(ops):
+        if op.argval != "tag" or op.opname not in ("LOAD_ATTR", "LOAD_METHOD"):
+            continue
+        args = ops[i + 1 : i + 3]
+        if len(args) < 2 or not _is_subscript(args[1]):
+            return True
+        key = args[0]
+        if key.opname == "LOAD_CONST" and isinstance(key.argval, str):
+            continue
+        if key.opname in ("LOAD_DEREF", "LOAD_GLOBAL", "LOAD_NAME") and isinstance(
+            closure.get(key.argval, scope.get(key.argval)), str
+        ):
+            continue
+        return True
+    return False
+
+
+def _is_subscript(op: dis.Instruction) -> bool:
+    return op.opname == "BINARY_SUBSCR" or (op.opname == "BINARY_OP" and op.argrepr == "[]")
+
+
+def _site_paths(*keys: str) -> tuple[str, ...]:
+    paths = sysconfig.get_paths()
+    return tuple({os.path.realpath(paths[key]) for key in keys if paths.get(key)})
+
+
+_STDLIB_PATHS = _site_paths("stdlib", "platstdlib")
+_PACKAGE_PATHS = _site_paths("purelib", "platlib")
+# Installed packages known never to read a model: the array libraries the
+# engines build on. Any other installed package may hold user helpers.
+_LIBRARY_PACKAGES = frozenset({"numba", "numpy", "scipy"})
+
+
+def _is_library(obj: object) -> bool:
+    """Whether obj is builtin, standard library or array library code, which never reads a model."""
+    if isinstance(obj, types.ModuleType):
+        module = obj.__name__
+    else:
+        module = getattr(obj, "__module__", None)
+    if isinstance(module, str) and module.partition(".")[0] in _LIBRARY_PACKAGES:
+        return True
+    try:
+        filename = inspect.getfile(obj)
+    except TypeError:
+        return True
+    path = os.path.realpath(filename)
+    return path.startswith(_STDLIB_PATHS) and not path.startswith(_PACKAGE_PATHS)
+
+
+def _formula_source(formula: Callable) -> str | None:
+    """Source of a formula, trimmed to the lambda itself; None if unavailable."""
+    try:
+        source = inspect.getsource(formula).strip()
+    except OSError:
+        return None
+
+    if formula.__name__ == "<lambda>":
+        idx = source.find("lambda")
+        if idx != -1:
+            source = source[idx:]
+            source = source.rstrip(" ,")
+            while source.endswith(")") and source.count("(") < source.count(")"):
+                source = source[:-1].rstrip(" ,")
+    return source
 
 
 # ---------------------------------------------------------------------------
@@ -128,13 +390,30 @@ class FormulaLine(LineItem):
         super().__init__(label=label, tags=tags, value_format=value_format)
         self.formula = formula
         self.values = values or {}
+        self._trace_cache: tuple | None = None
+        self._compile_cache: tuple | None = None
+        self._offsets_cache: tuple | None = None
+
+    def _trace(self) -> tuple[list[str], list[str], bool]:
+        """Trace the formula once and cache ``(items, tags, failed)``.
+
+        The cache is keyed on the formula object, so reassigning ``formula``
+        triggers a fresh trace.
+        """
+        cache = getattr(self, "_trace_cache", None)
+        if cache is None or cache[0] is not self.formula:
+            recorder = _record_formula(self.formula, 0)
+            cache = (self.formula, recorder._items, recorder._tags, recorder._failed)
+            self._trace_cache = cache
+        return cache[1], cache[2], cache[3]
 
     @property
     def precedents(self) -> list[str] | None:
         """Names of line items and scalars directly referenced by this formula.
 
         Uses a recording proxy rather than bytecode inspection, so it works
-        across Python versions and correctly excludes tag references.
+        across Python versions and correctly excludes tag references. The trace
+        runs once and is cached.
         Tag-based references are available via tag_references.
 
         Returns None if no formula is set.
@@ -152,8 +431,8 @@ class FormulaLine(LineItem):
         """
         if self.formula is None:
             return None
-        items, _ = _trace_formula(self.formula)
-        return items
+        items, _, _ = self._trace()
+        return list(items)
 
     @property
     def tag_references(self) -> list[str] | None:
@@ -168,32 +447,79 @@ class FormulaLine(LineItem):
         """
         if self.formula is None:
             return None
-        _, tags = _trace_formula(self.formula)
-        return tags
+        _, tags, _ = self._trace()
+        return list(tags)
+
+    def _period_offsets(self) -> "PeriodOffsets | None":
+        """Analyze the formula's period offsets once; see ``engine.period_offsets``."""
+        from pyproforma.engine.period_offsets import analyze_offsets
+
+        cache = getattr(self, "_offsets_cache", None)
+        if cache is None or cache[0] is not self.formula:
+            offsets = analyze_offsets(self.formula) if self.formula is not None else None
+            cache = (self.formula, offsets)
+            self._offsets_cache = cache
+        return cache[1]
+
+    @property
+    def precedent_offsets(self) -> dict[str, list[int | None]] | None:
+        """Period offsets at which each line item is read, relative to ``t``.
+
+        ``li.x[t]`` is offset 0 (a same-period dependency) and ``li.x[t - 1]`` is
+        offset -1 (the previous period). An index that is not ``t`` plus a
+        constant is reported as None (unknown). Offsets are read from the
+        formula's source, so every branch is covered; if the source is
+        unavailable the formula is traced instead. Tag reads are not included.
+
+        Returns None if no formula is set.
+
+        Examples:
+            >>> cash = FormulaLine(formula=lambda li, t: li.cash[t - 1] + li.net[t])
+            >>> cash.precedent_offsets
+            {'cash': [-1], 'net': [0]}
+        """
+        offsets = self._period_offsets()
+        if offsets is None:
+            return None
+        return {name: list(found) for name, found in offsets.items.items()}
 
     @property
     def formula_source(self) -> str | None:
         """Source code of the formula function, or None if unavailable."""
         if self.formula is None:
             return None
-        try:
-            source = inspect.getsource(self.formula).strip()
-        except OSError:
-            return None
+        return _formula_source(self.formula)
 
-        if self.formula.__name__ == "<lambda>":
-            idx = source.find("lambda")
-            if idx != -1:
-                source = source[idx:]
-                source = source.rstrip(" ,")
-                while source.endswith(")") and source.count("(") < source.count(")"):
-                    source = source[:-1].rstrip(" ,")
-        return source
+    def compiled(self) -> "CompiledFormula | None":
+        """The formula compiled to bypass namespace dispatch, or None if unsupported.
+
+        Compiled once and cached; see ``pyproforma.engine.formula_compiler``.
+        """
+        from pyproforma.engine.formula_compiler import compile_formula
+
+        cache = getattr(self, "_compile_cache", None)
+        if cache is None or cache[0] is not self.formula:
+            compiled = compile_formula(self.formula) if self.formula is not None else None
+            cache = (self.formula, compiled)
+            self._compile_cache = cache
+        return cache[1]
 
     def eval(self, ns: "ModelNamespace", t: int) -> float:
-        """Evaluate the formula for a specific period."""
+        """Evaluate the formula for a specific period.
+
+        When ns was created with ``compile_formulas=True`` the compiled formula,
+        bound to ns on first use, runs instead of the original function.
+        """
         if self.formula is None:
             raise ValueError(f"No formula defined for '{self.name}'")
+        bound = getattr(ns, "_bound", None)
+        if bound is not None:
+            function = bound.get(self)
+            if function is None:
+                compiled = self.compiled()
+                function = (compiled and compiled.bind(ns)) or self.formula
+                bound[self] = function
+            return function(ns, t)
         return self.formula(ns, t)
 
     def get_value(self, period: int) -> float | None:
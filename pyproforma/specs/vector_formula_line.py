@@ -0,0 +1,125 @@
+"""
+VectorFormulaLine class for line items calculated across all periods at once.
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Union
+
+from pyproforma.table import NumberFormatSpec
+
+from .formula_line import _formula_source, _record_formula
+from .line_item import LineItem
+
+if TYPE_CHECKING:
+    from pyproforma.engine.vector_namespace import VectorNamespace
+
+
+class VectorFormulaLine(LineItem):
+    """
+    A line item whose formula computes every period in one call.
+
+    The formula receives a single parameter, li (VectorNamespace), in which each
+    line item is a NumPy array with one value per model period, and returns an
+    array of the same length (or a number, used for every period):
+
+    - ``li.revenue``: revenue for every period (a PeriodVector)
+    - ``li.revenue.lag(1)``: revenue of the previous period, NaN for the first
+      period (``lag(1, fill=0.0)`` to use another fill value); ``lead(n)``
+      shifts the other way
+    - ``li.tag["income"]``: sum of the items tagged "income", per period
+    - ``li.tax_rate``: scalars, as plain values
+    - ``li.t``: the periods themselves, as an integer array
+
+    The formula is evaluated once per model instead of once per period, which
+    makes purely elementwise items much cheaper than the equivalent FormulaLine.
+    It is evaluated as soon as every line item it reads is known for every
+    period; per-period FormulaLines that read it are evaluated afterwards.
+    Vector items therefore cannot take part in circular references (including
+    reading their own earlier values); use a FormulaLine for those. Requires
+    numpy.
+
+    Values are stored as plain floats, exactly as the equivalent FormulaLine
+    would produce them. ``None`` values (not-applicable InputLine periods) read
+    as NaN.
+
+    Examples:
+        >>> expenses = VectorFormulaLine(lambda li: li.revenue * li.expense_ratio)
+        >>> growth = VectorFormulaLine(
+        ...     lambda li: li.revenue / li.revenue.lag(1) - 1, values={2024: 0.0}
+        ... )
+        >>> total = VectorFormulaLine(lambda li: li.tag["revenue"])
+    """
+
+    def __init__(
+        self,
+        formula: "Callable[[VectorNamespace], Any] | None" = None,
+        values: dict[int, float] | None = None,
+        label: str | None = None,
+        tags: list[str] | None = None,
+        value_format: Union[str, NumberFormatSpec, dict, None] = None,
+    ):
+        super().__init__(label=label, tags=tags, value_format=value_format)
+        self.formula = formula
+        self.values = values or {}
+        self._trace_cache: tuple | None = None
+
+    def _trace(self) -> tuple[list[str], list[str], bool]:
+        """Trace the formula once and cache ``(items, tags, failed)``."""
+        cache = self._trace_cache
+        if cache is None or cache[0] is not self.formula:
+            recorder = _record_formula(self.formula)
+            cache = (self.formula, recorder._items, recorder._tags, recorder._failed)
+            self._trace_cache = cache
+        return cache[1], cache[2], cache[3]
+
+    @property
+    def precedents(self) -> list[str] | None:
+        """Names of line items and scalars directly referenced by this formula.
+
+        Returns None if no formula is set.
+
+        Examples:
+            >>> margin = VectorFormulaLine(lambda li: li.profit / li.revenue)
+            >>> margin.precedents
+            ['profit', 'revenue']
+        """
+        if self.formula is None:
+            return None
+        items, _, _ = self._trace()
+        return list(items)
+
+    @property
+    def tag_references(self) -> list[str] | None:
+        """Tag names used in this formula via li.tag["name"].
+
+        Returns None if no formula is set, empty list if formula uses no tags.
+        """
+        if self.formula is None:
+            return None
+        _, tags, _ = self._trace()
+        return list(tags)
+
+    @property
+    def formula_source(self) -> str | None:
+        """Source code of the formula function, or None if unavailable."""
+        if self.formula is None:
+            return None
+        return _formula_source(self.formula)
+
+    def eval(self, ns: "VectorNamespace") -> Any:
+        """Evaluate the formula for every period at once."""
+        if self.formula is None:
+            raise ValueError(f"No formula defined for '{self.name}'")
+        return self.formula(ns)
+
+    def get_value(self, period: int) -> float | None:
+        if period in self.values:
+            return self.values[period]
+        return None
+
+    def __repr__(self):
+        parts = [f"formula={self.formula!r}"]
+        if self.values:
+            parts.append(f"values={self.values}")
+        if self.label:
+            parts.append(f"label={self.label!r}")
+        return f"VectorFormulaLine({', '.join(parts)})"
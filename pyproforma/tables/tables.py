@@ -20,6 +20,7 @@ if TYPE_CHECKING:
     from pyproforma.tables.table_def import TableDef
 
 from pyproforma.specs.formula_line import FormulaLine
+from pyproforma.specs.vector_formula_line import VectorFormulaLine
 
 
 class Tables:
@@ -298,9 +299,10 @@ class Tables:
         """
         Generate a table showing the precedents of a line item.
 
-        For FormulaLine items, shows each precedent line item followed by a
-        bottom border on the last precedent, then the calculated line item in
-        bold. For non-formula line items, shows just the single item in bold.
+        For FormulaLine and VectorFormulaLine items, shows each precedent line
+        item followed by a bottom border on the last precedent, then the
+        calculated line item in bold. For non-formula line items, shows just the
+        single item in bold.
 
         Only precedents that are themselves line items in the model are shown
         (assumption references are excluded).
@@ -327,7 +329,8 @@ class Tables:
         line_item_def = getattr(self._model.__class__, name)
         template = [rt.HeaderRow(col_labels="Label")]
 
-        if isinstance(line_item_def, FormulaLine) and line_item_def.precedents:
+        is_formula = isinstance(line_item_def, (FormulaLine, VectorFormulaLine))
+        if is_formula and line_item_def.precedents:
             precedent_names = [
                 p for p in line_item_def.precedents
                 if p in self._model.line_item_names and p != name
@@ -0,0 +1,139 @@
+"""
+Tests for the NumPy-backed ArrayLineItemValues store.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from pyproforma import FixedLine, FormulaLine, InputLine, ProformaModel
+
+np = pytest.importorskip("numpy")
+
+from pyproforma.engine.array_values import ArrayLineItemValue, ArrayLineItemValues  # noqa: E402
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+
+
+def _load_module(path):
+    spec = importlib.util.spec_from_file_location("_example", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestArrayLineItemValues:
+
+    def test_set_and_get(self):
+        li = ArrayLineItemValues(periods=[2024, 2025], names=["revenue", "costs"])
+        li.set("revenue", 2024, 100)
+        assert li.get("revenue", 2024) == 100.0
+        assert li.get("revenue", 2025) is None
+        assert li.get("revenue") == {2024: 100.0}
+        assert li.get("missing") is None
+
+    def test_values_are_plain_floats(self):
+        li = ArrayLineItemValues(periods=[2024], names=["revenue"])
+        li.set("revenue", 2024, 100)
+        assert type(li.revenue[2024]) is float
+
+    def test_dense_layout(self):
+        li = ArrayLineItemValues(
+            {"revenue": {2024: 1, 2025: 2}, "costs": {2025: 3}},
+            periods=[2024, 2025],
+            names=["revenue", "costs"],
+        )
+        assert li.data.shape == (2, 2)
+        assert li.data.dtype == np.float64
+        assert li.data[0].tolist() == [1.0, 2.0]
+
+    def test_unset_period_raises_key_error(self):
+        li = ArrayLineItemValues(periods=[2024, 2025], names=["revenue"])
+        li.set("revenue", 2024, 100)
+        with pytest.raises(KeyError, match="Period 2025 not found for line item 'revenue'"):
+            li.revenue[2025]
+
+    def test_none_value_round_trips(self):
+        li = ArrayLineItemValues(periods=[2024, 2025], names=["capex"])
+        li.set("capex", 2024, None)
+        li.set("capex", 2025, 5.0)
+        assert li.capex[2024] is None
+        assert li.get("capex") == {2024: None, 2025: 5.0}
+        assert np.isnan(li.array("capex")[0])
+
+    def test_unregistered_name(self):
+        li = ArrayLineItemValues(periods=[2024], names=["revenue"])
+        with pytest.raises(ValueError, match="unregistered line item 'costs'"):
+            li.set("costs", 2024, 1)
+        with pytest.raises(AttributeError, match="is not registered"):
+            li.costs
+
+    def test_unknown_period(self):
+        li = ArrayLineItemValues(periods=[2024], names=["revenue"])
+        with pytest.raises(ValueError, match="not one of the model periods"):
+            li.set("revenue", 2030, 1)
+
+    def test_array_is_zero_copy_read_only_view(self):
+        li = ArrayLineItemValues(periods=[2024, 2025], names=["revenue"])
+        li.set("revenue", 2024, 1)
+        view = li.array("revenue")
+        assert np.shares_memory(view, li.data)
+        li.set("revenue", 2025, 2)
+        assert view.tolist() == [1.0, 2.0]
+        with pytest.raises(ValueError):
+            view[0] = 5
+
+    def test_attribute_views_are_reused(self):
+        li = ArrayLineItemValues(periods=[2024], names=["revenue"])
+        assert isinstance(li.revenue, ArrayLineItemValue)
+        assert li.revenue is li.revenue
+
+
+class TestArrayValueStoreModels:
+
+    def test_model_with_array_store(self):
+        class TestModel(ProformaModel):
+            value_store = "array"
+            revenue = FixedLine(values={2024: 100, 2025: 110})
+            capex = InputLine(default={2024: None, 2025: 5})
+            profit = FormulaLine(formula=lambda li, t: li.revenue[t] * 0.4)
+
+        model = TestModel(periods=[2024, 2025])
+        assert isinstance(model._li, ArrayLineItemValues)
+        assert model.profit[2025] == pytest.approx(44.0)
+        assert model.capex[2024] is None
+        assert model.revenue.values == {2024: 100.0, 2025: 110.0}
+        assert np.shares_memory(model.revenue.array, model._li.data)
+
+    def test_dict_store_array_is_a_copy(self):
+        class TestModel(ProformaModel):
+            revenue = FixedLine(values={2024: 100, 2025: 110})
+
+        model = TestModel(periods=[2024, 2025])
+        assert model.revenue.array.tolist() == [100.0, 110.0]
+
+    def test_auto_store_uses_array_when_numpy_installed(self):
+        class TestModel(ProformaModel):
+            value_store = "auto"
+            revenue = FixedLine(values={2024: 100})
+
+        assert isinstance(TestModel(periods=[2024])._li, ArrayLineItemValues)
+
+    def test_unknown_store_rejected(self):
+        class TestModel(ProformaModel):
+            value_store = "sparse"
+            revenue = FixedLine(values={2024: 100})
+
+        with pytest.raises(ValueError, match="Unknown value_store 'sparse'"):
+            TestModel(periods=[2024])
+
+    def test_water_utility_matches_dict_store(self, monkeypatch):
+        mod = _load_module(EXAMPLES_DIR / "water_utility" / "model.py")
+        base = mod.WaterUtilityModel()
+        monkeypatch.setattr(mod.WaterUtilityModel, "value_store", "array")
+        arrayed = mod.WaterUtilityModel()
+
+        assert isinstance(arrayed._li, ArrayLineItemValues)
+        for name in base.line_item_names:
+            assert arrayed[name].values == pytest.approx(base[name].values), name
@@ -0,0 +1,196 @@
+"""
+Tests for batch (many-scenario) evaluation via ProformaModel.evaluate_batch.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from pyproforma import (
+    BatchResult,
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    create_debt_lines,
+)
+
+np = pytest.importorskip("numpy")
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+
+
+def _load_module(path):
+    spec = importlib.util.spec_from_file_location("_example", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class _Growth(ProformaModel):
+    default_periods = [2024, 2025, 2026]
+
+    growth = ScalarInputLine(default=0.05)
+    tax_rate = ScalarLine(value=0.25)
+    price = InputLine(default={2024: 10.0, 2025: 11.0, 2026: 12.0})
+    units = FormulaLine(
+        lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 100.0}
+    )
+    revenue = FormulaLine(lambda li, t: li.units[t] * li.price[t], tags=["income"])
+    other = FixedLine(values={2024: 5.0, 2025: 5.0, 2026: 5.0}, tags=["income"])
+    total = FormulaLine(lambda li, t: li.tag["income"][t])
+    profit = FormulaLine(lambda li, t: li.total[t] * (1 - li.tax_rate))
+
+
+class TestEvaluateBatch:
+
+    def test_matches_individual_models(self):
+        inputs = [{"growth": 0.0}, {"growth": 0.1, "price": {2024: 9, 2025: 9, 2026: 9}}, {}]
+        batch = _Growth.evaluate_batch(inputs=inputs)
+        for i, kwargs in enumerate(inputs):
+            model = _Growth(**kwargs)
+            for name in model.line_item_names:
+                for period in model.periods:
+                    assert batch[i, name, period] == model.get_value(name, period)
+
+    def test_returns_batch_result(self):
+        batch = _Growth.evaluate_batch(inputs=[{}, {}])
+        assert isinstance(batch, BatchResult)
+        assert len(batch) == 2
+        assert batch.periods == [2024, 2025, 2026]
+        assert batch.fallback_items == []
+
+    def test_periods_override(self):
+        batch = _Growth.evaluate_batch(inputs=[{}], periods=[2024, 2025])
+        assert batch.periods == [2024, 2025]
+        assert batch["units"].shape == (1, 2)
+
+    def test_empty_inputs_raises(self):
+        with pytest.raises(ValueError, match="at least one scenario"):
+            _Growth.evaluate_batch(inputs=[])
+
+    def test_input_validation_matches_init(self):
+        with pytest.raises(TypeError, match="unexpected keyword arguments"):
+            _Growth.evaluate_batch(inputs=[{}, {"bogus": 1}])
+
+
+class TestBatchResultIndexing:
+
+    @pytest.fixture
+    def batch(self):
+        return _Growth.evaluate_batch(inputs=[{"growth": 0.0}, {"growth": 0.5}])
+
+    def test_item_shape(self, batch):
+        assert batch["units"].shape == (2, 3)
+
+    def test_item_period(self, batch):
+        np.testing.assert_array_equal(batch["units", 2025], [100.0, 150.0])
+
+    def test_scenario_item_period(self, batch):
+        assert batch[1, "units", 2026] == 225.0
+        assert type(batch[1, "units", 2026]) is float
+
+    def test_scalar(self, batch):
+        np.testing.assert_array_equal(batch["growth"], [0.0, 0.5])
+        np.testing.assert_array_equal(batch["tax_rate"], [0.25, 0.25])
+        assert batch[1, "growth", 2024] == 0.5
+
+    def test_scenario_dict(self, batch):
+        scenario = batch.scenario(1)
+        assert scenario["units"] == {2024: 100.0, 2025: 150.0, 2026: 225.0}
+        assert scenario["growth"] == 0.5
+
+    def test_results_are_read_only(self, batch):
+        with pytest.raises(ValueError):
+            batch["units"][0, 0] = 1.0
+
+    def test_unknown_item_raises(self, batch):
+        with pytest.raises(KeyError, match="not found in batch"):
+            batch["nope"]
+
+    def test_unknown_period_raises(self, batch):
+        with pytest.raises(KeyError, match="Period 1999"):
+            batch["units", 1999]
+
+
+class TestFallback:
+
+    def test_branching_formula_falls_back_per_scenario(self):
+        class Branching(ProformaModel):
+            default_periods = [2024, 2025]
+            cost = ScalarInputLine(default=10.0)
+            revenue = FixedLine(values={2024: 20.0, 2025: 5.0})
+            margin = FormulaLine(
+                lambda li, t: li.revenue[t] - li.cost if li.revenue[t] > li.cost else 0.0
+            )
+            doubled = FormulaLine(lambda li, t: li.margin[t] * 2)
+
+        inputs = [{"cost": 1.0}, {"cost": 10.0}, {"cost": 30.0}]
+        batch = Branching.evaluate_batch(inputs=inputs)
+        assert batch.fallback_items == ["margin"]
+        for i, kwargs in enumerate(inputs):
+            model = Branching(**kwargs)
+            assert batch.scenario(i)["doubled"] == model.doubled.values
+
+    def test_numpy_where_stays_vectorized(self):
+        class Vectorized(ProformaModel):
+            default_periods = [2024]
+            cost = ScalarInputLine(default=10.0)
+            revenue = FixedLine(values={2024: 20.0})
+            margin = FormulaLine(
+                lambda li, t: np.maximum(li.revenue[t] - li.cost, 0.0)
+            )
+
+        batch = Vectorized.evaluate_batch(inputs=[{"cost": 1.0}, {"cost": 30.0}])
+        assert batch.fallback_items == []
+        np.testing.assert_array_equal(batch["margin", 2024], [19.0, 0.0])
+
+
+class TestBatchDebt:
+
+    def test_debt_lines_match_individual_models(self):
+        class Debt(ProformaModel):
+            default_periods = [2024, 2025, 2026, 2027]
+            par = InputLine(default={2024: 1000.0, 2025: 0.0, 2026: 500.0, 2027: 0.0})
+            rate = ScalarInputLine(default=0.05)
+            term = ScalarLine(value=3)
+            principal, interest = create_debt_lines(
+                par_amounts="par", interest_rate="rate", term="term"
+            )
+
+        inputs = [
+            {},
+            {"rate": 0.0},
+            {"rate": 0.08, "par": {2024: 0.0, 2025: 200.0, 2026: 0.0, 2027: 0.0}},
+        ]
+        batch = Debt.evaluate_batch(inputs=inputs)
+        for i, kwargs in enumerate(inputs):
+            model = Debt(**kwargs)
+            for name in ("principal", "interest"):
+                for period in model.periods:
+                    assert batch[i, name, period] == model.get_value(name, period)
+
+
+class TestWaterUtilityBatch:
+
+    def test_matches_individual_models(self):
+        mod = _load_module(EXAMPLES_DIR / "water_utility" / "model.py")
+        model_cls = mod.WaterUtilityModel
+        inputs = [
+            {},
+            {"inflation_rate": 0.05},
+            {"new_bond_rate": 0.06, "rate_increase": {
+                2026: 0.0, 2027: 0.0, 2028: 0.0, 2029: 0.0, 2030: 0.0,
+            }},
+        ]
+        batch = model_cls.evaluate_batch(inputs=inputs)
+        assert "dscr" in batch.fallback_items
+        for i, kwargs in enumerate(inputs):
+            model = model_cls(**kwargs)
+            scenario = batch.scenario(i)
+            for name in model.line_item_names:
+                expected = model[name].values
+                assert scenario[name] == expected, name
@@ -0,0 +1,104 @@
+"""
+Tests for the class-level DependencyGraph (ModelClass.graph).
+"""
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    ProformaModel,
+    ScalarLine,
+    create_debt_lines,
+)
+from pyproforma.engine.dependency_graph import DependencyGraph
+
+
+class _Model(ProformaModel):
+    rate = ScalarLine(value=0.05)
+    term = ScalarLine(value=3)
+    sales = FixedLine(values={2024: 100}, tags=["revenue"])
+    fees = FormulaLine(lambda li, t: li.sales[t] * 0.1, tags=["revenue"])
+    total = FormulaLine(lambda li, t: li.tag["revenue"][t])
+    par = FormulaLine(lambda li, t: li.total[t] * 2)
+    principal, interest = create_debt_lines(
+        par_amounts="par", interest_rate="rate", term="term"
+    )
+    cash = FormulaLine(
+        lambda li, t: li.cash[t - 1] + li.total[t] - li.interest[t], values={2024: 0}
+    )
+
+
+class TestDependencyGraph:
+
+    def test_built_when_class_is_defined(self):
+        assert isinstance(_Model.graph, DependencyGraph)
+        assert "graph" not in _Model._line_item_names
+
+    def test_each_subclass_has_its_own_graph(self):
+        class Other(ProformaModel):
+            x = FixedLine(values={2024: 1})
+
+        assert Other.graph is not _Model.graph
+        assert Other.graph.names == ["x"]
+
+    def test_direct_precedents(self):
+        assert _Model.graph.precedents("fees") == ["sales"]
+        assert _Model.graph.precedents("sales") == []
+
+    def test_tag_edges_resolved_to_items(self):
+        assert _Model.graph.precedents("total") == ["sales", "fees"]
+        assert "total" in _Model.graph.dependents("sales")
+
+    def test_debt_edges(self):
+        assert _Model.graph.precedents("principal") == ["rate", "term", "par"]
+        assert _Model.graph.dependents("rate") == ["principal", "interest"]
+
+    def test_self_lag_is_not_an_edge(self):
+        assert _Model.graph.precedents("cash") == ["total", "interest"]
+
+    def test_ancestors(self):
+        assert _Model.graph.ancestors("interest") == [
+            "rate", "term", "sales", "fees", "total", "par",
+        ]
+
+    def test_descendants(self):
+        assert _Model.graph.descendants("sales") == [
+            "fees", "total", "par", "principal", "interest", "cash",
+        ]
+        assert _Model.graph.descendants("cash") == []
+
+    def test_transitive_queries_are_cached(self):
+        graph = _Model.graph
+        graph.descendants("fees")
+        assert "fees" in graph._descendants
+
+    def test_levels(self):
+        graph = _Model.graph
+        assert graph.level("sales") == 0
+        assert graph.level("fees") == 1
+        assert graph.level("total") == 2
+        assert graph.level("interest") == 4
+        assert graph.levels[0] == ["rate", "term", "sales"]
+
+    def test_cycle_members_share_a_level(self):
+        class Cash(ProformaModel):
+            flow = FixedLine(values={2024: 10})
+            starting = FormulaLine(lambda li, t: li.ending[t - 1], values={2024: 0})
+            ending = FormulaLine(lambda li, t: li.starting[t] + li.flow[t])
+
+        assert Cash.graph.level("starting") == Cash.graph.level("ending") == 1
+
+    def test_unknown_name_raises(self):
+        with pytest.raises(KeyError, match="not a line item or scalar"):
+            _Model.graph.precedents("nope")
+
+    def test_unresolved_formulas_reported(self):
+        class Broken(ProformaModel):
+            x = FormulaLine(lambda li, t: {2024: 1}[t])
+
+        assert Broken.graph.unresolved == ["x"]
+
+    def test_dependents_uses_graph(self):
+        model = _Model(periods=[2024])
+        assert model.dependents("total") == ["par", "cash"]
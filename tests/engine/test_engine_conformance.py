@@ -0,0 +1,279 @@
+"""
+Conformance suite: every registered engine must match the reference engine.
+
+Each case is a model class and its inputs. An engine conforms if every line item
+value, for every period, equals the reference engine's, if ``with_inputs`` gives
+the same values as a fresh reference model, and if errors are raised with the
+same messages.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    VectorFormulaLine,
+    create_debt_lines,
+)
+from pyproforma.engine import engines
+from pyproforma.engine.engines import (
+    Engine,
+    PlannedEngine,
+    available_engines,
+    get_engine,
+    register_engine,
+)
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+INCOME_TAG = "income"
+ENGINES = [name for name in available_engines() if name != "reference"]
+
+
+def _example_cls(name):
+    path = EXAMPLES_DIR / name / "model.py"
+    spec = importlib.util.spec_from_file_location(f"_example_{name}", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return type(mod.model)
+
+
+def _features_cls():
+    class Features(ProformaModel):
+        default_periods = [2024, 2025, 2026, 2027]
+
+        growth = ScalarInputLine(default=0.05)
+        tax_rate = ScalarLine(value=0.25)
+        term = ScalarLine(value=3)
+        price = InputLine(
+            default={2024: 10.0, 2025: 11.0, 2026: None, 2027: 12.5}, tags=["driver"]
+        )
+        # Declared before the item it reads in the same period.
+        revenue = FormulaLine(lambda li, t: li.units[t] * (li.price[t] or 0.0), tags=["income"])
+        units = FormulaLine(
+            lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 100.0}
+        )
+        grant = FixedLine(values={2024: 50, 2025: 0, 2026: 25, 2027: 0}, tags=["income"])
+        total = FormulaLine(lambda li, t: li.tag["income"][t])
+        tax = FormulaLine(lambda li, t: li.total[t] * li.tax_rate if li.total[t] > 0 else 0.0)
+        capex = FormulaLine(lambda li, t: 200.0 if t == 2025 else 0.0)
+        principal, interest = create_debt_lines(
+            par_amounts="capex", interest_rate="tax_rate", term="term"
+        )
+        cash = FormulaLine(
+            lambda li, t: li.cash[t - 1] + li.total[t] - li.tax[t] - li.interest[t],
+            values={2024: 0.0},
+        )
+
+    return Features
+
+
+def _variable_tag_cls():
+    prefix = "in"
+
+    class VariableTag(ProformaModel):
+        default_periods = [2024, 2025, 2026]
+
+        growth = ScalarInputLine(default=0.1)
+        # Declared before the tagged items, and the tag is only read from 2025, so
+        # the trace at t=0 never sees it: the name is a variable, then computed.
+        total = FormulaLine(lambda li, t: li.tag[INCOME_TAG][t] if t > 2024 else 0.0)
+        computed = FormulaLine(lambda li, t: li.tag[prefix + "come"][t] if t > 2024 else 0.0)
+        sales = FormulaLine(lambda li, t: 100.0 * (1 + li.growth) ** (t - 2024), tags=["income"])
+        fees = FormulaLine(lambda li, t: li.sales[t] * 0.1, tags=["income"])
+
+    return VariableTag
+
+
+CASES = {
+    "features": (_features_cls, {"growth": 0.1}),
+    "variable_tag": (_variable_tag_cls, {"growth": 0.5}),
+    "water_utility": (lambda: _example_cls("water_utility"), {"inflation_rate": 0.04}),
+    "coffee_shop": (lambda: _example_cls("coffee_shop"), {}),
+}
+
+
+def _assert_same(model, reference):
+    for name in reference.line_item_names:
+        for period in reference.periods:
+            expected = reference[name][period]
+            actual = model[name][period]
+            if expected is None:
+                assert actual is None, (name, period)
+            else:
+                assert actual == pytest.approx(expected, rel=1e-12, abs=1e-12), (name, period)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+@pytest.mark.parametrize("case", sorted(CASES))
+class TestConformance:
+
+    def test_values_match_reference(self, engine, case):
+        factory, _ = CASES[case]
+        model_cls = factory()
+        _assert_same(model_cls(engine=engine), model_cls(engine="reference"))
+
+    def test_with_inputs_matches_reference(self, engine, case):
+        factory, changes = CASES[case]
+        model_cls = factory()
+        derived = model_cls(engine=engine).with_inputs(**changes)
+        _assert_same(derived, model_cls(engine="reference", **changes))
+
+
+@pytest.mark.parametrize("engine", ENGINES + ["reference"])
+class TestErrorConformance:
+
+    def test_circular_reference(self, engine):
+        class Circular(ProformaModel):
+            first = FormulaLine(lambda li, t: li.second[t] + 1)
+            second = FormulaLine(lambda li, t: li.first[t] + 1)
+
+        with pytest.raises(ValueError, match="Circular reference detected for period 2024"):
+            model = Circular(periods=[2024], engine=engine)
+            model.first[2024]
+
+    def test_formula_error(self, engine):
+        class Broken(ProformaModel):
+            sales = FixedLine(values={2024: 1.0})
+            bad = FormulaLine(lambda li, t: li.sales[t] + undefined_name)  # noqa: F821
+
+        with pytest.raises(ValueError, match="Error evaluating formula for 'bad' in period 2024"):
+            model = Broken(periods=[2024], engine=engine)
+            model.bad[2024]
+
+    def test_division_by_zero(self, engine):
+        class Ratio(ProformaModel):
+            aa = FixedLine(values={2024: 0.0})
+            b = FormulaLine(lambda li, t: 10 / li.aa[t])
+
+        message = "Error evaluating formula for 'b' in period 2024: float division by zero"
+        with pytest.raises(ValueError, match=message):
+            model = Ratio(periods=[2024], engine=engine)
+            model.b[2024]
+
+    def test_unregistered_item(self, engine):
+        class Typo(ProformaModel):
+            sales = FixedLine(values={2024: 1.0})
+            bad = FormulaLine(lambda li, t: li.sale[t])
+
+        with pytest.raises(ValueError, match="Error in formula for 'bad'"):
+            model = Typo(periods=[2024], engine=engine)
+            model.bad[2024]
+
+
+def test_variable_tag_reads_full_sum():
+    model = _variable_tag_cls()(engine="reference")
+    assert model.total[2025] == model.computed[2025] == pytest.approx(121.0)
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_vector_items_match_planned(engine):
+    # The reference engine does not support VectorFormulaLine; planned is checked
+    # against it for everything else.
+    class Vector(ProformaModel):
+        default_periods = [2024, 2025, 2026]
+        sales = FixedLine(values={2024: 100.0, 2025: 110.0, 2026: 125.0})
+        costs = VectorFormulaLine(lambda li: li.sales * 0.6)
+        cash = FormulaLine(
+            lambda li, t: li.cash[t - 1] + li.sales[t] - li.costs[t], values={2024: 0.0}
+        )
+
+    pytest.importorskip("numpy")
+    _assert_same(Vector(engine=engine), Vector(engine="planned"))
+
+
+@pytest.mark.parametrize("engine", ENGINES)
+def test_vector_division_by_zero_matches_formula_line(engine):
+    np = pytest.importorskip("numpy")
+
+    class Scalar(ProformaModel):
+        default_periods = [2024, 2025]
+        s = FixedLine(values={2024: 2.0, 2025: 0.0})
+        f = FormulaLine(lambda li, t: 10 / li.s[t])
+
+    class Vector(ProformaModel):
+        default_periods = [2024, 2025]
+        s = FixedLine(values={2024: 2.0, 2025: 0.0})
+        f = VectorFormulaLine(lambda li: 10 / li.s)
+
+    class Masked(ProformaModel):
+        default_periods = [2024, 2025]
+        s = FixedLine(values={2024: 2.0, 2025: 0.0})
+        f = VectorFormulaLine(lambda li: np.where(li.s != 0, 10 / li.s, 0.0))
+        g = FormulaLine(lambda li, t: 10 / li.s[t] if li.s[t] != 0 else 0.0)
+
+    with pytest.raises(ValueError) as expected:
+        Scalar(engine="reference")
+    assert "in period 2025: float division by zero" in str(expected.value)
+    with pytest.raises(ValueError) as raised:
+        Vector(engine=engine).f[2025]
+    assert str(raised.value) == str(expected.value)
+    # A division masked out of the result is not an error, as in a guarded FormulaLine.
+    masked = Masked(engine=engine)
+    assert [masked.f[t] for t in (2024, 2025)] == [masked.g[t] for t in (2024, 2025)] == [5.0, 0.0]
+
+
+class TestRegistry:
+
+    def test_builtin_engines(self):
+        assert {"reference", "planned", "lazy"} <= set(available_engines())
+        assert get_engine("planned").name == "planned"
+
+    def test_unknown_engine(self):
+        with pytest.raises(ValueError, match="Unknown engine 'fast'"):
+            _features_cls()(engine="fast")
+
+    def test_register_engine(self, monkeypatch):
+        monkeypatch.setattr(engines, "_ENGINES", dict(engines._ENGINES))
+        calls = []
+
+        class Counting(PlannedEngine):
+            def calculate(self, model, scalars, periods):
+                calls.append(model)
+                return super().calculate(model, scalars, periods)
+
+        register_engine("counting", Counting())
+        model = _features_cls()(engine="counting")
+        assert calls == [model]
+        assert model.with_inputs(growth=0.2).recomputed_items
+        with pytest.raises(TypeError, match="Engine instance"):
+            register_engine("bad", object())
+
+    def test_engine_must_implement_calculate(self):
+        class Incomplete(Engine):
+            pass
+
+        with pytest.raises(TypeError, match="abstract method"):
+            Incomplete()
+
+    def test_class_and_global_defaults(self, monkeypatch):
+        model_cls = _features_cls()
+        model_cls.engine = "lazy"
+        assert model_cls().recomputed_items == []
+        assert model_cls(engine="planned").recomputed_items
+
+        monkeypatch.setattr(ProformaModel, "engine", "reference")
+        assert _features_cls()()._engine.name == "reference"
+
+    def test_lazy_keyword_selects_lazy_engine(self):
+        assert _features_cls()(lazy=True)._engine.name == "lazy"
+
+    def test_unavailable_engine(self, monkeypatch):
+        class Missing(Engine):
+            def require(self):
+                raise ImportError("needs something")
+
+            def calculate(self, model, scalars, periods):
+                raise AssertionError("never called")
+
+        monkeypatch.setattr(engines, "_ENGINES", dict(engines._ENGINES))
+        register_engine("missing", Missing())
+        assert "missing" not in available_engines()
+        with pytest.raises(ImportError, match="needs something"):
+            _features_cls()(engine="missing")
@@ -0,0 +1,183 @@
+"""
+Tests for the per-class evaluation plan used by calculate_line_items.
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    ProformaModel,
+    ScalarLine,
+    create_debt_lines,
+)
+from pyproforma.engine.calculation_engine import _calculate_with_retry
+from pyproforma.engine.evaluation_plan import build_evaluation_plan, get_evaluation_plan
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+
+
+def _load_module(path):
+    spec = importlib.util.spec_from_file_location("_example", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class TestEvaluationPlanOrder:
+
+    def test_reverse_declaration_order_is_sorted(self):
+        class TestModel(ProformaModel):
+            profit = FormulaLine(formula=lambda li, t: li.revenue[t] - li.expenses[t])
+            expenses = FormulaLine(formula=lambda li, t: li.revenue[t] * 0.6)
+            revenue = FixedLine(values={2024: 100})
+
+        plan = get_evaluation_plan(TestModel)
+        assert plan.fixed_items == ["revenue"]
+        assert plan.ordered_items == ["expenses", "profit"]
+        assert plan.deferred_items == []
+
+    def test_declaration_order_kept_when_independent(self):
+        class TestModel(ProformaModel):
+            revenue = FixedLine(values={2024: 100})
+            second = FormulaLine(formula=lambda li, t: li.revenue[t] * 2)
+            first = FormulaLine(formula=lambda li, t: li.revenue[t] * 3)
+
+        assert get_evaluation_plan(TestModel).ordered_items == ["second", "first"]
+
+    def test_tag_members_precede_tag_total(self):
+        class TestModel(ProformaModel):
+            total = FormulaLine(formula=lambda li, t: li.tag["revenue"][t])
+            sales = FormulaLine(formula=lambda li, t: 100, tags=["revenue"])
+            fees = FormulaLine(formula=lambda li, t: 20, tags=["revenue"])
+
+        plan = get_evaluation_plan(TestModel)
+        assert plan.precedents["total"] == ["sales", "fees"]
+        assert plan.ordered_items == ["sales", "fees", "total"]
+
+    def test_debt_lines_follow_config_items(self):
+        class TestModel(ProformaModel):
+            principal, interest = create_debt_lines(
+                par_amounts="par", interest_rate="rate", term="term"
+            )
+            par = FormulaLine(formula=lambda li, t: 1000 if t == 2024 else 0)
+            rate = ScalarLine(value=0.05)
+            term = ScalarLine(value=5)
+
+        plan = get_evaluation_plan(TestModel)
+        assert plan.ordered_items == ["par", "principal", "interest"]
+
+    def test_lagged_cycle_kept_in_declaration_order(self):
+        class TestModel(ProformaModel):
+            net = FixedLine(values={2024: 10, 2025: 20})
+            starting = FormulaLine(formula=lambda li, t: li.ending[t - 1], values={2024: 0})
+            ending = FormulaLine(formula=lambda li, t: li.starting[t] + li.net[t])
+
+        plan = get_evaluation_plan(TestModel)
+        assert plan.ordered_items == ["starting", "ending"]
+        model = TestModel(periods=[2024, 2025])
+        assert model.ending[2025] == 30
+
+    def test_untraceable_formula_is_deferred_with_dependents(self):
+        def fragile(li, t):
+            if not isinstance(t, int) or t < 2000:
+                raise RuntimeError("needs a real period")
+            return li.revenue[t] * 2
+
+        class TestModel(ProformaModel):
+            revenue = FixedLine(values={2024: 100})
+            doubled = FormulaLine(formula=fragile)
+            tripled = FormulaLine(formula=lambda li, t: li.doubled[t] * 1.5)
+            other = FormulaLine(formula=lambda li, t: li.revenue[t] + 1)
+
+        plan = get_evaluation_plan(TestModel)
+        assert plan.ordered_items == ["other"]
+        assert plan.deferred_items == ["doubled", "tripled"]
+        assert TestModel(periods=[2024]).tripled[2024] == 300
+
+    def test_plan_is_cached_per_class(self):
+        class TestModel(ProformaModel):
+            revenue = FixedLine(values={2024: 100})
+
+        assert get_evaluation_plan(TestModel) is get_evaluation_plan(TestModel)
+        assert build_evaluation_plan(TestModel) is not get_evaluation_plan(TestModel)
+
+
+class TestPlannedEvaluation:
+
+    def test_each_item_evaluated_once_per_period(self):
+        calls = []
+
+        def counted(name, formula):
+            def wrapper(li, t):
+                if isinstance(t, int) and t >= 2000:
+                    calls.append((name, t))
+                return formula(li, t)
+            return wrapper
+
+        class TestModel(ProformaModel):
+            item_d = FormulaLine(formula=counted("item_d", lambda li, t: li.item_c[t] + 1))
+            item_c = FormulaLine(formula=counted("item_c", lambda li, t: li.item_b[t] + 1))
+            item_b = FormulaLine(formula=counted("item_b", lambda li, t: li.item_a[t] + 1))
+            item_a = FixedLine(values={2024: 1, 2025: 2})
+
+        model = TestModel(periods=[2024, 2025])
+        assert model.item_d[2025] == 5
+        assert sorted(calls) == sorted(
+            (name, t) for name in ("item_b", "item_c", "item_d") for t in (2024, 2025)
+        )
+
+    def test_missed_precedent_falls_back_to_retry(self):
+        class TestModel(ProformaModel):
+            base = FixedLine(values={2024: 1, 2025: 2})
+            # The t=0 trace only sees `early`, so `late` is a hidden precedent.
+            switch = FormulaLine(
+                formula=lambda li, t: li.late[t] if t > 2024 else li.early[t]
+            )
+            early = FormulaLine(formula=lambda li, t: li.base[t] * 10)
+            late = FormulaLine(formula=lambda li, t: li.base[t] * 100)
+
+        model = TestModel(periods=[2024, 2025])
+        assert model.switch[2024] == 10
+        assert model.switch[2025] == 200
+
+    def test_missed_tag_member_falls_back_to_retry(self):
+        suffix = "come"
+
+        class TestModel(ProformaModel):
+            # The tag name is computed and only read from 2025, so the plan has
+            # no edge to the tag members declared after the reader.
+            total = FormulaLine(
+                formula=lambda li, t: li.tag["in" + suffix][t] if t > 2024 else 0.0
+            )
+            sales = FormulaLine(formula=lambda li, t: 100.0, tags=["income"])
+            fees = FormulaLine(formula=lambda li, t: li.sales[t] * 0.1, tags=["income"])
+
+        plan = get_evaluation_plan(TestModel)
+        assert plan.precedents["total"] == []
+        assert plan.ordered_items.index("total") < plan.ordered_items.index("sales")
+        model = TestModel(periods=[2024, 2025])
+        assert model.total[2025] == 110.0
+
+    def test_circular_reference_message_unchanged(self):
+        class TestModel(ProformaModel):
+            item_a = FormulaLine(formula=lambda li, t: li.item_c[t] + 1)
+            item_b = FormulaLine(formula=lambda li, t: li.item_a[t] + 1)
+            item_c = FormulaLine(formula=lambda li, t: li.item_b[t] + 1)
+
+        with pytest.raises(
+            ValueError,
+            match="Circular reference detected for period 2024. "
+                  "Cannot calculate: item_a, item_b, item_c",
+        ):
+            TestModel(periods=[2024])
+
+    def test_matches_retry_engine_on_water_utility(self):
+        mod = _load_module(EXAMPLES_DIR / "water_utility" / "model.py")
+        model = mod.WaterUtilityModel()
+        reference = _calculate_with_retry(model, model._scalars, model.periods)
+        for name in model.line_item_names:
+            assert model._li.get(name) == reference.get(name), name
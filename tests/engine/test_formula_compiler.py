@@ -0,0 +1,185 @@
+"""
+Tests for formula compilation (compile_formulas = True).
+"""
+
+import math
+
+import pytest
+
+from pyproforma import FixedLine, FormulaLine, InputLine, ProformaModel, ScalarLine
+from pyproforma.engine.formula_compiler import compile_formula
+from pyproforma.engine.model_namespace import ModelNamespace
+
+GROWTH = 1.1
+
+
+def _helper(value):
+    return value * 2
+
+
+def _def_formula(li, t):
+    base = li.revenue[t]
+    return base * li.tax_rate
+
+
+def _model_cls(compile_formulas=False, value_store="dict"):
+    class Model(ProformaModel):
+        default_periods = [2024, 2025, 2026]
+
+        tax_rate = ScalarLine(value=0.2)
+        count = ScalarLine(value=3)
+        revenue = FixedLine(values={2024: 100, 2025: 110, 2026: 121}, tags=["income"])
+        other = FixedLine(values={2024: 1, 2025: 2, 2026: 3}, tags=["income"])
+        price = InputLine(default={2024: 1.0, 2025: None, 2026: 2.0})
+        profit = FormulaLine(lambda li, t: li.revenue[t] * (1 - li.tax_rate))
+        lagged = FormulaLine(lambda li, t: li.revenue[t - 1] * GROWTH, values={2024: 0})
+        total = FormulaLine(lambda li, t: li.tag["income"][t])
+        helper = FormulaLine(lambda li, t: _helper(li.revenue[t]) + math.sqrt(4))
+        tax = FormulaLine(_def_formula)
+        scaled = FormulaLine(lambda li, t: li.count * li.other[t])
+        priced = FormulaLine(lambda li, t: li.price[t] if li.price[t] is not None else 0.0)
+        branch = FormulaLine(lambda li, t: li.revenue[t] if t > 2024 else li.other[t])
+
+    Model.compile_formulas = compile_formulas
+    Model.value_store = value_store
+    return Model
+
+
+_Model = _model_cls()
+_Compiled = _model_cls(compile_formulas=True)
+
+
+def _assert_same_values(model, expected):
+    for name in expected.line_item_names:
+        assert model[name].values == expected[name].values, name
+
+
+class TestCompileFormula:
+
+    def test_compiled_model_matches_uncompiled(self):
+        _assert_same_values(_Compiled(), _Model())
+
+    def test_references_are_rewritten(self):
+        compiled = compile_formula(_Model.profit.formula)
+        assert compiled.names == ["revenue", "tax_rate"]
+        assert compiled.indexed == ["revenue"]
+
+    def test_tag_lookup_is_not_a_period_read(self):
+        compiled = compile_formula(_Model.total.formula)
+        assert compiled.names == ["tag"]
+        assert compiled.indexed == []
+
+    def test_def_formulas_compile(self):
+        assert compile_formula(_def_formula) is not None
+
+    def test_closures_and_defaults(self):
+        factor = 3.0
+
+        class Closure(ProformaModel):
+            compile_formulas = True
+            default_periods = [2024]
+            revenue = FixedLine(values={2024: 10})
+            scaled = FormulaLine(lambda li, t, k=2: li.revenue[t] * factor * k)
+
+        assert compile_formula(Closure.scaled.formula) is not None
+        assert Closure().scaled[2024] == 60.0
+
+    def test_compiled_formula_is_cached(self):
+        assert _Model.profit.compiled() is _Model.profit.compiled()
+
+    @pytest.mark.parametrize(
+        "formula",
+        [
+            lambda li, t: getattr(li, "revenue")[t],
+            lambda li, t: _helper(li),
+            lambda li, t: li._li,
+            lambda li, t: [li for li in range(3)][0],
+        ],
+    )
+    def test_unsupported_constructs_fall_back(self, formula):
+        assert compile_formula(formula) is None
+
+    def test_unavailable_source_falls_back(self):
+        formula = eval("lambda li, t: li.revenue[t]")
+        assert compile_formula(formula) is None
+
+    def test_fallback_formula_still_evaluates(self):
+        class Dynamic(ProformaModel):
+            compile_formulas = True
+            default_periods = [2024]
+            revenue = FixedLine(values={2024: 10})
+            copy = FormulaLine(lambda li, t: getattr(li, "revenue")[t])
+
+        assert Dynamic().copy[2024] == 10
+
+    def test_binds_once_per_namespace(self):
+        model = _Model()
+        ns = ModelNamespace(model._li, model._scalars, compile_formulas=True)
+        _Model.profit.eval(ns, 2024)
+        bound = ns._bound[_Model.profit]
+        _Model.profit.eval(ns, 2025)
+        assert ns._bound[_Model.profit] is bound
+        assert bound is not _Model.profit.formula
+
+
+class TestCompiledErrors:
+
+    @staticmethod
+    def _assert_same_error(build):
+        with pytest.raises(ValueError) as expected:
+            build(False)()
+        with pytest.raises(ValueError) as actual:
+            build(True)()
+        assert str(actual.value) == str(expected.value)
+
+    def test_errors_match_uncompiled(self):
+        def build(compile_formulas):
+            class Broken(ProformaModel):
+                default_periods = [2024]
+                base = FixedLine(values={2024: 0})
+                ratio = FormulaLine(lambda li, t: 1 / li.base[t])
+
+            Broken.compile_formulas = compile_formulas
+            return Broken
+
+        self._assert_same_error(build)
+
+    def test_unknown_name_matches_uncompiled(self):
+        def build(compile_formulas):
+            class Typo(ProformaModel):
+                default_periods = [2024]
+                revenue = FixedLine(values={2024: 1})
+                profit = FormulaLine(lambda li, t: li.revenu[t])
+
+            Typo.compile_formulas = compile_formulas
+            return Typo
+
+        self._assert_same_error(build)
+
+    def test_circular_reference_matches_uncompiled(self):
+        def build(compile_formulas):
+            class Circular(ProformaModel):
+                default_periods = [2024]
+                first = FormulaLine(lambda li, t: li.second[t] + 1)
+                second = FormulaLine(lambda li, t: li.first[t] + 1)
+
+            Circular.compile_formulas = compile_formulas
+            return Circular
+
+        self._assert_same_error(build)
+
+
+class TestCompiledStores:
+
+    @pytest.mark.parametrize("store", ["array", "dict"])
+    def test_value_stores(self, store):
+        if store == "array":
+            pytest.importorskip("numpy")
+        _assert_same_values(_model_cls(compile_formulas=True, value_store=store)(), _Model())
+
+    def test_lazy_and_with_inputs(self):
+        lazy = _Compiled(lazy=True)
+        assert lazy.lagged[2026] == _Model().lagged[2026]
+        changed = _Compiled().with_inputs(price={2024: 5.0, 2026: 7.0})
+        expected = _Model(price={2024: 5.0, 2026: 7.0})
+        assert changed.priced.values == expected.priced.values
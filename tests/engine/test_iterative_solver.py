@@ -0,0 +1,152 @@
+"""
+Tests for iterative solving of same-period circular references (IterativeSolver).
+"""
+
+import pytest
+
+from pyproforma import (
+    FormulaLine,
+    InputLine,
+    IterativeSolver,
+    ProformaModel,
+    ScalarLine,
+)
+
+PERIODS = [2024, 2025, 2026, 2027]
+
+
+def _cash_model(solver=None, engine="planned"):
+    """Interest earned on the average of opening and closing cash."""
+
+    class Cash(ProformaModel):
+        default_periods = PERIODS
+
+        rate = ScalarLine(value=0.08)
+        income = InputLine(default={p: 100.0 for p in PERIODS})
+        interest = FormulaLine(
+            lambda li, t: li.rate * (li.cash[t - 1] + li.cash[t]) / 2, values={2024: 0.0}
+        )
+        cash = FormulaLine(
+            lambda li, t: li.cash[t - 1] + li.income[t] + li.interest[t],
+            values={2024: 1000.0},
+        )
+        closing_ratio = FormulaLine(lambda li, t: li.interest[t] / li.cash[t])
+
+    Cash.solver = solver
+    Cash.engine = engine
+    return Cash
+
+
+def _expected_cash(income=100.0, rate=0.08):
+    cash = {2024: 1000.0}
+    for prev, period in zip(PERIODS, PERIODS[1:]):
+        cash[period] = (cash[prev] * (1 + rate / 2) + income) / (1 - rate / 2)
+    return cash
+
+
+def _slow_model(acceleration=None):
+    """A linear cycle contracting by 0.9 per sweep; the fixed point is x = 10."""
+
+    class Slow(ProformaModel):
+        default_periods = [2024, 2025]
+        solver = IterativeSolver(
+            tolerance=1e-10, max_iterations=1000, acceleration=acceleration
+        )
+
+        x = FormulaLine(lambda li, t: 0.9 * li.y[t] + 1)
+        y = FormulaLine(lambda li, t: li.x[t])
+
+    return Slow
+
+
+class TestIterativeSolving:
+
+    def test_without_solver_raises(self):
+        with pytest.raises(ValueError, match="Circular reference detected for period 2025"):
+            _cash_model()()
+
+    @pytest.mark.parametrize("engine", ["planned", "reference"])
+    def test_interest_on_average_cash(self, engine):
+        model = _cash_model(IterativeSolver(tolerance=1e-12), engine)()
+        for period, expected in _expected_cash().items():
+            assert model.cash[period] == pytest.approx(expected, rel=1e-10)
+        assert model.closing_ratio[2025] == pytest.approx(
+            model.interest[2025] / model.cash[2025]
+        )
+
+    def test_iteration_counts_per_period(self):
+        model = _cash_model(IterativeSolver())()
+        assert set(model.iteration_counts) == {2025, 2026, 2027}
+        assert all(count > 1 for count in model.iteration_counts.values())
+
+    def test_warm_start_reduces_iterations(self):
+        model = _slow_model()()
+        assert model.x[2024] == pytest.approx(10.0, rel=1e-8)
+        # 2025 starts from 2024's solution, which is already the fixed point.
+        assert model.iteration_counts[2025] == 1 < model.iteration_counts[2024]
+
+    @pytest.mark.parametrize("acceleration", ["aitken", "anderson"])
+    def test_acceleration(self, acceleration):
+        plain = _slow_model()()
+        accelerated = _slow_model(acceleration)()
+        assert accelerated.x[2024] == pytest.approx(10.0, rel=1e-8)
+        assert accelerated.iteration_counts[2024] < plain.iteration_counts[2024] / 5
+
+    def test_not_converged(self):
+        model_cls = _slow_model()
+        with pytest.raises(ValueError, match="did not converge in 5 iterations"):
+            model_cls(solver=IterativeSolver(max_iterations=5))
+
+    def test_divergent_cycle_does_not_converge(self):
+        class Divergent(ProformaModel):
+            solver = IterativeSolver(max_iterations=50)
+            x = FormulaLine(lambda li, t: 2 * li.y[t] + 1)
+            y = FormulaLine(lambda li, t: li.x[t])
+
+        with pytest.raises(ValueError, match="did not converge"):
+            Divergent(periods=[2024])
+
+    def test_constructor_overrides_class_setting(self):
+        model_cls = _cash_model()
+        model = model_cls(solver=IterativeSolver())
+        assert model.cash[2027] == pytest.approx(_expected_cash()[2027], rel=1e-8)
+
+    def test_with_inputs(self):
+        model = _cash_model(IterativeSolver(tolerance=1e-12))()
+        derived = model.with_inputs(income={p: 50.0 for p in PERIODS})
+        assert derived.cash[2027] == pytest.approx(_expected_cash(income=50.0)[2027], rel=1e-10)
+        assert set(derived.iteration_counts) == {2025, 2026, 2027}
+
+    def test_non_numeric_value(self):
+        class Text(ProformaModel):
+            solver = IterativeSolver()
+            x = FormulaLine(lambda li, t: "n/a" if li.y[t] else "none")
+            y = FormulaLine(lambda li, t: li.x[t])
+
+        with pytest.raises(ValueError, match="must evaluate to a number"):
+            Text(periods=[2024])
+
+    def test_unsupported_engine(self):
+        with pytest.raises(ValueError, match="does not support iterative solving"):
+            _cash_model(IterativeSolver(), engine="lazy")()
+
+
+class TestIterativeSolverSettings:
+
+    @pytest.mark.parametrize(
+        "kwargs, message",
+        [
+            ({"tolerance": 0}, "tolerance"),
+            ({"max_iterations": 0}, "max_iterations"),
+            ({"acceleration": "newton"}, "Unknown acceleration"),
+            ({"anderson_depth": 0}, "anderson_depth"),
+        ],
+    )
+    def test_invalid_settings(self, kwargs, message):
+        with pytest.raises(ValueError, match=message):
+            IterativeSolver(**kwargs)
+
+    def test_solve_reports_sweeps(self):
+        solution, sweeps = IterativeSolver().solve(lambda x: [x[0] / 2 + 1], [0.0])
+        assert solution[0] == pytest.approx(2.0)
+        assert sweeps > 1
@@ -0,0 +1,165 @@
+"""
+Tests for the numba batch backend (batch_backend = "numba").
+"""
+
+import math
+import sys
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+)
+from pyproforma.engine import jit_kernels
+from pyproforma.engine.jit_kernels import translate_formula
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("numba")
+
+FLOOR = 60.0
+
+
+@pytest.fixture(autouse=True, scope="module")
+def _kernel_cache(tmp_path_factory):
+    cache = tmp_path_factory.mktemp("cache")
+    patch = pytest.MonkeyPatch()
+    patch.setenv("PYPROFORMA_CACHE_DIR", str(cache))
+    patch.setattr(jit_kernels, "_KERNELS", {})
+    yield cache
+    patch.undo()
+
+
+def _model_cls(backend="numba", periods=(2024, 2025, 2026, 2027)):
+    def _cost(li, t):
+        """Variable cost plus a fixed floor."""
+        return max(li.revenue[t] * li.cost_ratio, FLOOR)
+
+    attrs = dict(
+        default_periods=list(periods),
+        batch_backend=backend,
+        growth=ScalarInputLine(default=0.05),
+        cost_ratio=ScalarLine(value=0.4),
+        revenue=InputLine(default={p: 100.0 for p in periods}, tags=["income"]),
+        other=FixedLine(values={p: 5.0 for p in periods}, tags=["income"]),
+        cost=FormulaLine(_cost),
+        units=FormulaLine(
+            lambda li, t: li.units[t - 1] * (1 + li.growth), values={periods[0]: 10.0}
+        ),
+        margin=FormulaLine(
+            lambda li, t: (li.tag["income"][t] - li.cost[t]) / li.revenue[t]
+            if li.revenue[t] != 0 else 0.0
+        ),
+        # Not plain arithmetic: evaluated by the NumPy engine between kernels.
+        shifted=FormulaLine(lambda li, t: sum([li.margin[t], 1.0])),
+        score=FormulaLine(lambda li, t: math.sqrt(abs(li.shifted[t])) + t - 2024),
+    )
+    return type("JitModel", (ProformaModel,), attrs)
+
+
+def _inputs(size=6, periods=(2024, 2025, 2026, 2027)):
+    return [
+        {"growth": 0.01 * i, "revenue": {p: 50.0 + 20 * i + p - periods[0] for p in periods}}
+        for i in range(size)
+    ]
+
+
+class TestTranslateFormula:
+
+    def test_arithmetic_expression(self):
+        model_cls = _model_cls()
+        formula = translate_formula(model_cls, "units")
+        assert formula.expression == "(data[3, j - 1, s] * (1 + scalars[0, s]))"
+        assert formula.reads == [("units", -1)]
+        assert formula.scalars == ["growth"]
+
+    def test_globals_builtins_and_tags_are_inlined(self):
+        model_cls = _model_cls()
+        assert translate_formula(model_cls, "cost").expression == (
+            "max((data[0, j, s] * scalars[1, s]), 60.0)"
+        )
+        assert "(0.0 + data[0, j, s] + data[1, j, s])" in translate_formula(
+            model_cls, "margin"
+        ).expression
+
+    def test_unsupported_formulas(self):
+        model_cls = _model_cls()
+        assert translate_formula(model_cls, "shifted") is None
+        assert translate_formula(model_cls, "revenue") is None
+
+
+class TestNumbaBackend:
+
+    def test_matches_numpy_backend(self):
+        numba_batch = _model_cls("numba").evaluate_batch(_inputs())
+        numpy_batch = _model_cls("numpy").evaluate_batch(_inputs())
+        for name in numba_batch.line_item_names:
+            np.testing.assert_array_equal(numba_batch[name], numpy_batch[name])
+
+    def test_falls_back_per_item(self):
+        batch = _model_cls().evaluate_batch(_inputs())
+        assert batch.compiled_items == ["cost", "units", "margin", "score"]
+        assert "shifted" not in batch.compiled_items
+
+    def test_matches_individual_models(self):
+        model_cls = _model_cls()
+        inputs = _inputs(size=3)
+        batch = model_cls.evaluate_batch(inputs)
+        for i, kwargs in enumerate(inputs):
+            model = model_cls(**kwargs)
+            for name in model.line_item_names:
+                for period in model.periods:
+                    assert batch[i, name, period] == pytest.approx(
+                        model[name][period], rel=1e-12
+                    )
+
+    def test_lag_without_consecutive_periods_is_not_compiled(self):
+        periods = (2024, 2025, 2027)
+        model_cls = _model_cls(periods=periods)
+        model_cls.units.values = {2024: 10.0, 2027: 20.0}
+        batch = model_cls.evaluate_batch(_inputs(periods=periods))
+        assert "units" not in batch.compiled_items
+        assert "cost" in batch.compiled_items
+
+    def test_none_inputs_are_not_compiled(self):
+        model_cls = _model_cls()
+        inputs = _inputs()
+        for kwargs in inputs:
+            kwargs["revenue"][2024] = None
+        model_cls.cost.values = {2024: 0.0}
+        model_cls.margin.values = {2024: 0.0}
+        model_cls.score.values = {2024: 0.0}
+        model_cls.shifted.values = {2024: 0.0}
+        batch = model_cls.evaluate_batch(inputs)
+        assert "cost" not in batch.compiled_items
+        assert "units" in batch.compiled_items
+
+    def test_auto_uses_numba_when_installed(self):
+        batch = _model_cls("auto").evaluate_batch(_inputs())
+        assert batch.compiled_items
+
+    def test_unknown_backend(self):
+        with pytest.raises(ValueError, match="Unknown batch_backend"):
+            _model_cls("gpu").evaluate_batch(_inputs())
+
+    def test_missing_numba(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "numba", None)
+        with pytest.raises(ImportError, match="pip install numba"):
+            _model_cls("numba").evaluate_batch(_inputs())
+
+
+class TestKernelCache:
+
+    def test_kernels_are_written_to_cache_dir(self, _kernel_cache):
+        _model_cls().evaluate_batch(_inputs())
+        sources = list((_kernel_cache / "kernels").glob("kernel_*.py"))
+        assert sources
+        assert all("@njit(cache=True" in path.read_text() for path in sources)
+
+    def test_kernel_loaded_once_per_source(self):
+        source = jit_kernels.kernel_source([0], [translate_formula(_model_cls(), "cost")])
+        assert jit_kernels.load_kernel(source) is jit_kernels.load_kernel(source)
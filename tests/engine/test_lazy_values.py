@@ -0,0 +1,225 @@
+"""
+Tests for lazy on-demand evaluation (Model(lazy=True)).
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    create_debt_lines,
+)
+from pyproforma.engine.lazy_values import LazyLineItemValues
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+
+
+def _load_module(path):
+    spec = importlib.util.spec_from_file_location("_example", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class _Model(ProformaModel):
+    default_periods = [2024, 2025, 2026]
+
+    tax_rate = ScalarInputLine(default=0.2)
+    units = FixedLine(values={2024: 100, 2025: 110, 2026: 120})
+    price = InputLine(default={2024: 10.0, 2025: 11.0, 2026: 12.0})
+    revenue = FormulaLine(lambda li, t: li.units[t] * li.price[t], tags=["income"])
+    fees = FormulaLine(lambda li, t: li.units[t] * 0.5, tags=["income"])
+    total = FormulaLine(lambda li, t: li.tag["income"][t])
+    tax = FormulaLine(lambda li, t: li.total[t] * li.tax_rate)
+    cumulative = FormulaLine(lambda li, t: li.cumulative[t - 1] + li.tax[t], values={2024: 0})
+    headcount = FormulaLine(lambda li, t: li.units[t] / 10)
+
+
+def _computed(model):
+    return {name: sorted(values) for name, values in model._li._values.items() if values}
+
+
+class TestLazyEvaluation:
+
+    def test_nothing_computed_at_init(self):
+        model = _Model(lazy=True)
+        assert isinstance(model._li, LazyLineItemValues)
+        assert _computed(model) == {}
+        assert model.recomputed_items == []
+
+    def test_only_requested_subgraph_is_computed(self):
+        model = _Model(lazy=True)
+        assert model.revenue[2025] == 1210.0
+        assert _computed(model) == {"units": [2025], "price": [2025], "revenue": [2025]}
+
+    def test_lagged_reference_computes_earlier_periods(self):
+        model = _Model(lazy=True)
+        model.cumulative[2026]
+        computed = _computed(model)
+        assert computed["cumulative"] == [2024, 2025, 2026]
+        assert "headcount" not in computed
+
+    def test_values_match_eager(self):
+        lazy, eager = _Model(lazy=True, tax_rate=0.3), _Model(tax_rate=0.3)
+        for name in eager.line_item_names:
+            assert lazy[name].values == eager[name].values, name
+
+    def test_access_paths(self):
+        model = _Model(lazy=True)
+        assert model.get_value("tax", 2024) == pytest.approx(210.0)
+        assert model.total[2026] == 1500.0
+        assert model.tag["income"].sum(2024) == 1050.0
+        assert model._li.revenue.get(2030) is None
+        with pytest.raises(KeyError, match="Period 2030 not found"):
+            model.revenue[2030]
+
+    def test_circular_reference_message_matches_eager(self):
+        class Circular(ProformaModel):
+            default_periods = [2024]
+            first = FormulaLine(lambda li, t: li.second[t] + 1)
+            second = FormulaLine(lambda li, t: li.first[t] + 1)
+            other = FixedLine(values={2024: 1})
+
+        with pytest.raises(ValueError) as eager:
+            Circular()
+        model = Circular(lazy=True)
+        assert model.other[2024] == 1
+        with pytest.raises(ValueError) as lazy:
+            model.first[2024]
+        assert str(lazy.value) == str(eager.value)
+
+    def test_formula_error_message_matches_eager(self):
+        class Broken(ProformaModel):
+            default_periods = [2024]
+            base = FixedLine(values={2024: 0})
+            ratio = FormulaLine(lambda li, t: 1 / li.base[t])
+            scaled = FormulaLine(lambda li, t: li.ratio[t] * 2)
+
+        with pytest.raises(ValueError) as eager:
+            Broken()
+        with pytest.raises(ValueError) as lazy:
+            Broken(lazy=True).scaled[2024]
+        assert str(lazy.value) == str(eager.value)
+
+    def test_unknown_reference_message_matches_eager(self):
+        class Typo(ProformaModel):
+            default_periods = [2024]
+            revenue = FixedLine(values={2024: 1})
+            profit = FormulaLine(lambda li, t: li.revenu[t])
+
+        with pytest.raises(ValueError) as eager:
+            Typo()
+        with pytest.raises(ValueError) as lazy:
+            Typo(lazy=True).profit[2024]
+        assert str(lazy.value) == str(eager.value)
+
+    def test_debt_lines_match_eager(self):
+        class Debt(ProformaModel):
+            default_periods = [2024, 2025, 2026]
+            par = InputLine(default={2024: 1000.0, 2025: 500.0, 2026: 0.0})
+            rate = ScalarInputLine(default=0.05)
+            term = FixedLine(values={2024: 3, 2025: 3, 2026: 3})
+            principal, interest = create_debt_lines(
+                par_amounts="par", interest_rate="rate", term="term"
+            )
+
+        lazy, eager = Debt(lazy=True), Debt()
+        assert lazy.interest[2026] == eager.interest[2026]
+        assert lazy.principal.values == eager.principal.values
+
+    def test_with_inputs_stays_lazy_and_shares_clean_values(self):
+        base = _Model(lazy=True)
+        base.headcount[2024]
+        changed = base.with_inputs(tax_rate=0.5)
+        assert isinstance(changed._li, LazyLineItemValues)
+        assert changed._li._values["headcount"] is base._li._values["headcount"]
+        assert changed.tax.values == _Model(tax_rate=0.5).tax.values
+        assert base.tax.values == _Model().tax.values
+
+    def test_lazy_is_reserved(self):
+        with pytest.raises(ValueError):
+            class Bad(ProformaModel):
+                lazy = FixedLine(values={2024: 1})
+
+
+def _item_chain(length):
+    attrs = {"default_periods": [2024, 2025], "x0": FormulaLine(lambda li, t: 1.0)}
+    for i in range(1, length):
+        attrs[f"x{i}"] = FormulaLine(lambda li, t, prev=f"x{i - 1}": li.get(prev)[t] + 1)
+    return type("Chain", (ProformaModel,), attrs)
+
+
+class TestDeepChains:
+    """Values deeper than the recursion limit are computed without recursing."""
+
+    def test_long_item_chain(self):
+        chain = _item_chain(300)
+        assert chain(lazy=True)[f"x{299}"][2025] == 300.0
+
+    def test_long_period_chain(self):
+        periods = list(range(1700, 2300))
+
+        class Cash(ProformaModel):
+            default_periods = periods
+            inflow = ScalarInputLine(default=1.0)
+            cash = FormulaLine(lambda li, t: li.cash[t - 1] + li.inflow, values={1700: 0.0})
+
+        assert Cash(lazy=True).cash[2299] == 599.0
+        assert Cash().sensitivity("cash", 2299) == {"inflow": 599.0}
+
+    def test_long_chain_at_offsets_the_graph_cannot_see(self):
+        periods = list(range(1700, 2300))
+        previous = {p: p - 1 for p in periods}
+
+        class Cash(ProformaModel):
+            default_periods = periods
+            cash = FormulaLine(lambda li, t: li.cash[previous[t]] + 1.0, values={1700: 0.0})
+
+        assert Cash(lazy=True).cash[2299] == 599.0
+
+    def test_each_formula_runs_once(self):
+        calls = []
+
+        class Counted(ProformaModel):
+            default_periods = [2024, 2025, 2026]
+            base = FixedLine(values={2024: 1.0, 2025: 2.0, 2026: 3.0})
+            running = FormulaLine(
+                lambda li, t: calls.append(t) or li.running[t - 1] + li.base[t],
+                values={2024: 1.0},
+            )
+
+        calls.clear()  # tracing at class creation calls it too
+        assert Counted(lazy=True).running[2026] == 6.0
+        assert sorted(calls) == [2025, 2026]
+
+    def test_branch_not_taken_is_not_evaluated(self):
+        class Guarded(ProformaModel):
+            default_periods = [2024, 2025]
+            divisor = FixedLine(values={2024: 2.0, 2025: 0.0})
+            ratio = FormulaLine(lambda li, t: 1 / li.divisor[t])
+            safe = FormulaLine(lambda li, t: li.ratio[t] if li.divisor[t] else 0.0)
+
+        model = Guarded(lazy=True)
+        assert model.safe[2025] == 0.0
+        assert model.safe[2024] == 0.5
+        with pytest.raises(ValueError, match="division by zero"):
+            model.ratio[2025]
+
+
+class TestWaterUtilityLazy:
+
+    def test_matches_eager(self):
+        mod = _load_module(EXAMPLES_DIR / "water_utility" / "model.py")
+        cls = mod.WaterUtilityModel
+        lazy, eager = cls(lazy=True), cls()
+        last = eager.periods[-1]
+        assert lazy.dscr[last] == eager.dscr[last]
+        assert len(_computed(lazy)) < len(cls._line_item_names)
+        for name in eager.line_item_names:
+            assert lazy[name].values == eager[name].values, name
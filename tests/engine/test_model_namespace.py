@@ -0,0 +1,73 @@
+"""
+Tests for the namespace class generated per model (ProformaModel._namespace_cls).
+"""
+
+import pytest
+
+from pyproforma import FixedLine, FormulaLine, ProformaModel, ScalarInputLine, ScalarLine
+from pyproforma.engine.calculation_engine import new_namespace
+from pyproforma.engine.line_item_values import LineItemValue
+from pyproforma.engine.model_namespace import ModelNamespace, _ScalarValue
+
+
+class _Model(ProformaModel):
+    default_periods = [2024, 2025]
+
+    tax_rate = ScalarLine(value=0.2)
+    label = ScalarInputLine(default="base")
+    revenue = FixedLine(values={2024: 100, 2025: 110}, tags=["income"])
+    profit = FormulaLine(lambda li, t: li.revenue[t] * (1 - li.tax_rate))
+
+
+def _namespace():
+    model = _Model()
+    return model, new_namespace(model, model._li, model._scalars)
+
+
+class TestGeneratedNamespace:
+
+    def test_class_generated_per_model(self):
+        ns_cls = _Model._namespace_cls
+        assert issubclass(ns_cls, ModelNamespace)
+        assert ns_cls.__name__ == "_ModelNamespace"
+        assert set(ns_cls.__slots__) == {"tag", "tax_rate", "label", "revenue", "profit"}
+
+    def test_line_items_bound_once(self):
+        model, ns = _namespace()
+        assert isinstance(ns.revenue, LineItemValue)
+        assert ns.revenue is ns.revenue
+        assert ns.revenue[2025] == 110
+
+    def test_scalars_prewrapped(self):
+        _, ns = _namespace()
+        assert isinstance(ns.tax_rate, _ScalarValue)
+        assert ns.tax_rate is ns.tax_rate
+        assert ns.label == "base"
+
+    def test_tag_sums(self):
+        _, ns = _namespace()
+        assert ns.tag["income"][2024] == 100
+
+    def test_scalar_indexing_error_unchanged(self):
+        _, ns = _namespace()
+        with pytest.raises(TypeError, match="'tax_rate' is a scalar"):
+            ns.tax_rate[2024]
+
+    def test_unknown_name_error_unchanged(self):
+        model, ns = _namespace()
+        generic = ModelNamespace(model._li, model._scalars)
+        with pytest.raises(AttributeError) as expected:
+            generic.revenu
+        with pytest.raises(AttributeError) as actual:
+            ns.revenu
+        assert str(actual.value) == str(expected.value)
+
+    def test_private_names_rejected(self):
+        _, ns = _namespace()
+        with pytest.raises(AttributeError):
+            ns._missing
+
+    def test_values_match_generic_namespace(self, monkeypatch):
+        expected = _Model()
+        monkeypatch.setattr(_Model, "_namespace_cls", ModelNamespace)
+        assert _Model().profit.values == expected.profit.values
@@ -0,0 +1,105 @@
+"""
+Tests for period-offset analysis (FormulaLine.precedent_offsets, graph offsets).
+"""
+
+from pyproforma import FixedLine, FormulaLine, ProformaModel, ScalarLine, create_debt_lines
+from pyproforma.engine.evaluation_plan import get_evaluation_plan
+from pyproforma.engine.period_offsets import analyze_offsets
+
+FIRST_YEAR = 2024
+
+
+def _def_formula(li, t):
+    if t > FIRST_YEAR:
+        return li.balance[t - 1] + li.flow[t]
+    return li.opening[t]
+
+
+class _Model(ProformaModel):
+    rate = ScalarLine(value=0.05)
+    term = ScalarLine(value=3)
+    sales = FixedLine(values={2024: 100, 2025: 120}, tags=["revenue"])
+    fees = FormulaLine(lambda li, t: li.sales[t] * 0.1, tags=["revenue"])
+    total = FormulaLine(
+        lambda li, t: li.tag["revenue"][t] - li.tag["revenue"][t - 1] * 0, values={2024: 110}
+    )
+    principal, interest = create_debt_lines(
+        par_amounts="sales", interest_rate="rate", term="term"
+    )
+    # Declared before "starting", which it reads in the same period.
+    ending = FormulaLine(lambda li, t: li.starting[t] + li.total[t])
+    starting = FormulaLine(lambda li, t: li.ending[t - 1], values={2024: 0})
+    base = FormulaLine(
+        lambda li, t: li.sales[FIRST_YEAR] + li.fees[t - 2], values={2024: 0, 2025: 0}
+    )
+
+
+class TestAnalyzeOffsets:
+
+    def test_lambda_offsets(self):
+        offsets = analyze_offsets(lambda li, t: li.cash[t - 1] + li.net[t] + li.net[1 + t])
+        assert offsets.items == {"cash": [-1], "net": [0, 1]}
+        assert offsets.exact
+
+    def test_every_branch_is_covered(self):
+        assert analyze_offsets(_def_formula).items == {
+            "balance": [-1], "flow": [0], "opening": [0],
+        }
+
+    def test_unknown_index(self):
+        offsets = analyze_offsets(lambda li, t: li.sales[FIRST_YEAR] + li.sales[t * 2])
+        assert offsets.items == {"sales": [None]}
+
+    def test_nested_arithmetic(self):
+        assert analyze_offsets(lambda li, t: li.x[(t - 1) - 1]).items == {"x": [-2]}
+
+    def test_tag_offsets(self):
+        offsets = analyze_offsets(lambda li, t: li.tag["revenue"][t - 1])
+        assert offsets.items == {}
+        assert offsets.tags == {"revenue": [-1]}
+
+    def test_traced_when_source_unavailable(self):
+        formula = eval("lambda li, t: li.cash[t - 1] + li.net[t] + li.other[2024]")
+        offsets = analyze_offsets(formula)
+        assert offsets.items == {"cash": [-1], "net": [0], "other": [None]}
+        assert not offsets.exact
+
+    def test_precedent_offsets_property(self):
+        line = FormulaLine(formula=lambda li, t: li.cash[t - 1] + li.net[t] * li.rate)
+        assert line.precedent_offsets == {"cash": [-1], "net": [0]}
+        assert FormulaLine().precedent_offsets is None
+
+
+class TestGraphOffsets:
+
+    def test_offsets_include_tags_and_self(self):
+        graph = _Model.graph
+        assert graph.offsets("total") == {"sales": [-1, 0], "fees": [-1, 0]}
+        assert graph.offsets("starting") == {"ending": [-1]}
+        assert graph.offsets("principal") == {"sales": [0]}
+        assert graph.offsets("sales") == {}
+
+    def test_same_period_precedents(self):
+        assert _Model.graph.same_period_precedents("ending") == ["total", "starting"]
+        assert _Model.graph.same_period_precedents("starting") == []
+
+    def test_lookback(self):
+        assert _Model.graph.lookback("fees") == 0
+        assert _Model.graph.lookback("starting") == 1
+        assert _Model.graph.lookback("base") is None
+
+    def test_circular_references(self):
+        assert _Model.graph.circular_references() == []
+
+        class Circular(ProformaModel):
+            first = FormulaLine(lambda li, t: li.second[t] + 1)
+            second = FormulaLine(lambda li, t: li.first[t] + 1)
+            lagged = FormulaLine(lambda li, t: li.lagged[t - 1], values={2024: 0})
+
+        assert Circular.graph.circular_references() == [["first", "second"]]
+
+    def test_plan_orders_cycle_by_same_period_reads(self):
+        plan = get_evaluation_plan(_Model)
+        assert plan.ordered_items.index("starting") < plan.ordered_items.index("ending")
+        model = _Model(periods=[2024, 2025])
+        assert model.ending[2025] == model.ending[2024] + model.total[2025]
@@ -0,0 +1,251 @@
+"""
+Tests for dual numbers and model.sensitivity (forward-mode differentiation).
+"""
+
+import math
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    IterativeSolver,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    VectorFormulaLine,
+    create_debt_lines,
+)
+from pyproforma.engine.dual_numbers import Dual, NonDifferentiableError
+
+_revenue_calls = []
+
+
+def _revenue(li, t):
+    _revenue_calls.append(t)
+    return li.units[t] * (li.price[t] + (li.surcharge[t] or 0.0))
+
+
+def _model_cls():
+    class Plan(ProformaModel):
+        default_periods = [2024, 2025, 2026]
+
+        growth = ScalarInputLine(default=0.05)
+        rate = ScalarInputLine(default=0.04)
+        term = ScalarLine(value=5)
+        price = InputLine(values={2024: 10.0}, default={2025: 10.5, 2026: 11.0})
+        surcharge = InputLine(default={2024: None, 2025: 0.25, 2026: 0.5})
+        units = FormulaLine(
+            lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 100.0}
+        )
+        revenue = FormulaLine(_revenue, tags=["income"])
+        grant = FixedLine(values={2024: 5.0, 2025: 5.0, 2026: 5.0}, tags=["income"])
+        total = FormulaLine(lambda li, t: li.tag["income"][t])
+        capex = FixedLine(values={2024: 500.0, 2025: 0.0, 2026: 0.0})
+        principal, interest = create_debt_lines(
+            par_amounts="capex", interest_rate="rate", term="term"
+        )
+        coverage = FormulaLine(
+            lambda li, t: li.total[t] / (li.principal[t] + li.interest[t]) ** 0.5
+            if li.total[t] > 0 else 0.0
+        )
+
+    return Plan
+
+
+class TestDual:
+
+    def test_chain_rule(self):
+        x = Dual(3.0, (1.0, 0.0))
+        y = Dual(2.0, (0.0, 1.0))
+        assert (x * y + x ** 2).derivatives == (8.0, 3.0)
+        assert (x / y).derivatives == pytest.approx((0.5, -0.75))
+        assert (1 - 2 / x).derivatives == pytest.approx((2 / 9, 0.0))
+        z = x ** y
+        assert z.value == 9.0
+        assert z.derivatives == pytest.approx((6.0, 9.0 * math.log(3.0)))
+        assert (2 ** x).derivatives == pytest.approx((8 * math.log(2), 0.0))
+
+    def test_builtins_and_numpy_scalars(self):
+        np = pytest.importorskip("numpy")
+        x = Dual(-3.0, (1.0,))
+        assert abs(x).derivatives == (-1.0,)
+        assert max(x, -5.0) is x
+        assert sum([x, x, 1.0]).derivatives == (2.0,)
+        assert (np.float64(2.0) * x).derivatives == (2.0,)
+
+    @pytest.mark.parametrize(
+        "operation",
+        [float, int, round, math.floor, math.exp, abs, bool, lambda x: x // 2, lambda x: x == 0.0],
+    )
+    def test_non_differentiable_operations(self, operation):
+        with pytest.raises(NonDifferentiableError):
+            operation(Dual(0.0, (1.0,)))
+
+    def test_constant_duals_convert_freely(self):
+        assert int(Dual(4.0, (0.0,))) == 4
+        assert math.exp(Dual(0.0, (0.0,))) == 1.0
+
+    @pytest.mark.parametrize("exponent", [0.5, Dual(0.5, (0.0,))])
+    def test_fractional_power_at_zero(self, exponent):
+        with pytest.raises(NonDifferentiableError, match=r"x \*\* 0.5"):
+            Dual(0.0, (1.0,)) ** exponent
+        assert (Dual(0.0, (0.0,)) ** exponent).derivatives == (0.0,)
+        assert (Dual(0.0, (1.0,)) ** 1).derivatives == (1.0,)
+        assert (Dual(0.0, (1.0,)) ** Dual(1.0, (0.0,))).derivatives == (1.0,)
+        assert (Dual(0.0, (1.0,)) ** 2).derivatives == (0.0,)
+
+    def test_tie_between_duals(self):
+        with pytest.raises(NonDifferentiableError, match="branch boundary"):
+            max(Dual(1.0, (1.0,)), Dual(1.0, (0.0,)))
+        assert max(Dual(1.0, (1.0,)), Dual(1.0, (1.0,))).value == 1.0
+
+
+class TestSensitivity:
+
+    def test_matches_finite_differences(self):
+        model = _model_cls()()
+        h = 1e-6
+        for name in ("units", "revenue", "total", "interest", "coverage"):
+            sensitivity = model.sensitivity(name, 2026)
+            bumped = model.with_inputs(rate=0.04 + h)
+            assert sensitivity["rate"] == pytest.approx(
+                (bumped[name][2026] - model[name][2026]) / h, rel=1e-5, abs=1e-6
+            )
+            bumped = model.with_inputs(growth=0.05 + h)
+            assert sensitivity["growth"] == pytest.approx(
+                (bumped[name][2026] - model[name][2026]) / h, rel=1e-5, abs=1e-6
+            )
+
+    def test_inputs_are_scalars_and_unlocked_input_periods(self):
+        sensitivity = _model_cls()().sensitivity("revenue", 2025)
+        # price is locked in 2024; surcharge is None in 2024.
+        assert sensitivity == {
+            "growth": pytest.approx(100.0 * 10.75),
+            "rate": 0.0,
+            "price": {2025: pytest.approx(105.0), 2026: 0.0},
+            "surcharge": {2025: pytest.approx(105.0), 2026: 0.0},
+        }
+
+    def test_scalars(self):
+        model = _model_cls()()
+        zeros = {"price": {2025: 0.0, 2026: 0.0}, "surcharge": {2025: 0.0, 2026: 0.0}}
+        assert model.sensitivity("growth") == {"growth": 1.0, "rate": 0.0, **zeros}
+        assert model.sensitivity("term") == {"growth": 0.0, "rate": 0.0, **zeros}
+
+    def test_one_lazy_memoised_pass(self):
+        model = _model_cls()()
+        _revenue_calls.clear()
+        model.sensitivity("revenue", 2025)
+        assert _revenue_calls == [2025]
+        model.sensitivity("total", 2025)
+        model.sensitivity("revenue", 2025)
+        assert _revenue_calls == [2025]
+
+    def test_with_inputs_does_not_share_the_pass(self):
+        model = _model_cls()()
+        model.sensitivity("units", 2026)
+        derived = model.with_inputs(growth=0.1)
+        assert derived.sensitivity("units", 2026)["growth"] == pytest.approx(2 * 100 * 1.1)
+
+    def test_errors(self):
+        model = _model_cls()()
+        with pytest.raises(ValueError, match="'sales' is not a line item or scalar"):
+            model.sensitivity("sales", 2025)
+        with pytest.raises(ValueError, match="needs one of the model periods"):
+            model.sensitivity("revenue")
+        with pytest.raises(ValueError, match="'surcharge' has no value in period 2024"):
+            model.sensitivity("surcharge", 2024)
+
+    def test_vector_formulas(self):
+        np = pytest.importorskip("numpy")
+
+        class Vector(ProformaModel):
+            default_periods = [2024, 2025, 2026]
+            g = ScalarInputLine(default=2.0)
+            s = FixedLine(values={2024: 1.0, 2025: 2.0, 2026: 3.0})
+            p = InputLine(default={2024: 1.0, 2025: 2.0, 2026: 3.0})
+            c = VectorFormulaLine(lambda li: li.s * li.g + li.p.lag(1, fill=0.0))
+            total = VectorFormulaLine(lambda li: np.cumsum(li.c))
+            growth = VectorFormulaLine(lambda li: np.exp(li.c))
+
+        model = Vector()
+        assert model.sensitivity("c", 2025) == {"g": 2.0, "p": {2024: 1.0, 2025: 0.0, 2026: 0.0}}
+        assert model.sensitivity("total", 2026) == {
+            "g": 6.0, "p": {2024: 1.0, 2025: 1.0, 2026: 0.0}
+        }
+        # A NumPy function without a Dual method is flagged, not a TypeError.
+        with pytest.raises(ValueError, match="vector formula for 'growth' does not support dual"):
+            model.sensitivity("growth", 2025)
+
+    def test_iterative_solver_not_supported(self):
+        model_cls = _model_cls()
+        with pytest.raises(ValueError, match="IterativeSolver"):
+            model_cls(solver=IterativeSolver()).sensitivity("revenue", 2025)
+
+
+class TestFlagging:
+
+    def test_math_function_is_flagged(self):
+        class Logged(ProformaModel):
+            default_periods = [2024, 2025]
+            growth = ScalarInputLine(default=0.05)
+            units = FormulaLine(
+                lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 100.0}
+            )
+            score = FormulaLine(lambda li, t: math.log(li.units[t]))
+            bonus = FormulaLine(lambda li, t: li.score[t] * 2)
+
+        model = Logged()
+        with pytest.raises(ValueError, match=r"'bonus' in period 2025 is undefined.*'score'"):
+            model.sensitivity("bonus", 2025)
+        # The value is kept; items not depending on it are unaffected.
+        assert model._sensitivity_values.get("score", 2025).value == pytest.approx(
+            math.log(105.0)
+        )
+        assert model.sensitivity("units", 2025) == {"growth": pytest.approx(100.0)}
+        # In 2024 units is a seed value, so math.log sees a plain float.
+        assert model.sensitivity("bonus", 2024) == {"growth": 0.0}
+
+    def test_rounding_an_input_is_flagged(self):
+        class Rounded(ProformaModel):
+            default_periods = [2024]
+            headcount = ScalarInputLine(default=10.4)
+            payroll = FormulaLine(lambda li, t: round(li.headcount) * 50_000)
+
+        with pytest.raises(ValueError, match=r"round\(\) is not differentiable"):
+            Rounded().sensitivity("payroll", 2024)
+
+    def test_branch_on_input_away_from_boundary(self):
+        class Floor(ProformaModel):
+            default_periods = [2024]
+            sales = ScalarInputLine(default=100.0)
+            cost = FormulaLine(lambda li, t: max(li.sales * 0.4, 60.0))
+
+        assert Floor().sensitivity("cost", 2024) == {"sales": 0.0}
+        assert Floor(sales=300.0).sensitivity("cost", 2024) == {"sales": pytest.approx(0.4)}
+        with pytest.raises(ValueError, match="non-differentiable"):
+            Floor(sales=150.0).sensitivity("cost", 2024)
+
+    def test_debt_term_input_is_discrete(self):
+        class Bond(ProformaModel):
+            default_periods = [2024, 2025, 2026]
+            par = FixedLine(values={2024: 1000.0, 2025: 0.0, 2026: 0.0})
+            rate = ScalarInputLine(default=0.05)
+            term = ScalarInputLine(default=10)
+            principal, interest = create_debt_lines(
+                par_amounts="par", interest_rate="rate", term="term"
+            )
+
+        def slope(name, period, **kwargs):
+            h = 1e-6
+            up = Bond(rate=0.05 + h, **kwargs)[name][period]
+            down = Bond(rate=0.05 - h, **kwargs)[name][period]
+            return (up - down) / (2 * h)
+
+        # Derivatives with respect to the rate flow through the schedule.
+        result = Bond().sensitivity("interest", 2025)
+        assert result == {"rate": pytest.approx(slope("interest", 2025), rel=1e-5)}
+        result = Bond(term=3).sensitivity("principal", 2026)
+        assert result == {"rate": pytest.approx(slope("principal", 2026, term=3), rel=1e-5)}
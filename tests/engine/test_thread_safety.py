@@ -0,0 +1,128 @@
+"""
+Tests for evaluating and reading models from several threads at once.
+
+Each test runs the same work serially and from a pool of threads and compares
+the results. A short switch interval makes threads interleave inside formulas
+and debt schedules on GIL builds too.
+"""
+
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from pyproforma import (
+    FormulaLine,
+    InputLine,
+    LineItem,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    create_debt_lines,
+)
+from pyproforma.engine.evaluation_plan import get_evaluation_plan
+
+_PERIODS = list(range(2024, 2036))
+_THREADS = 8
+
+
+class _Utility(ProformaModel):
+    default_periods = _PERIODS
+
+    growth = ScalarInputLine(default=0.04)
+    rate = ScalarInputLine(default=0.05)
+    term = ScalarLine(value=6)
+    borrowing = InputLine(default={p: 40.0 if p % 3 == 0 else 0.0 for p in _PERIODS})
+    revenue = FormulaLine(
+        lambda li, t: li.revenue[t - 1] * (1 + li.growth), values={2024: 500.0}, tags=["income"]
+    )
+    grants = FormulaLine(lambda li, t: li.revenue[t] * 0.02, tags=["income"])
+    principal, interest = create_debt_lines(
+        par_amounts="borrowing", interest_rate="rate", term="term"
+    )
+    service = FormulaLine(lambda li, t: li.principal[t] + li.interest[t])
+    cash = FormulaLine(
+        lambda li, t: li.cash[t - 1] + li.tag["income"][t] + li.borrowing[t] - li.service[t],
+        values={2024: 0.0},
+    )
+
+
+def _scenarios(n):
+    return [{"growth": 0.01 * (i % 7), "rate": 0.03 + 0.005 * (i % 5)} for i in range(n)]
+
+
+def _values(model):
+    return {name: model[name].values for name in model.line_item_names}
+
+
+@pytest.fixture(autouse=True)
+def _interleave():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def _in_threads(func, items):
+    with ThreadPoolExecutor(max_workers=_THREADS) as pool:
+        return list(pool.map(func, items))
+
+
+class TestConcurrentEvaluation:
+
+    def test_instantiation_matches_serial(self):
+        scenarios = _scenarios(64)
+        expected = [_values(_Utility(**kwargs)) for kwargs in scenarios]
+        assert _in_threads(lambda kwargs: _values(_Utility(**kwargs)), scenarios) == expected
+
+    def test_with_inputs_from_a_shared_model(self):
+        base = _Utility()
+        scenarios = _scenarios(64)
+        expected = [_values(_Utility(**kwargs)) for kwargs in scenarios]
+        results = _in_threads(lambda kwargs: _values(base.with_inputs(**kwargs)), scenarios)
+        assert results == expected
+        assert _values(base) == _values(_Utility())
+
+    def test_first_use_of_a_class_builds_one_plan(self):
+        items = {k: v for k, v in _Utility.__dict__.items() if isinstance(v, LineItem)}
+        model_cls = type("Fresh", (ProformaModel,), {"default_periods": _PERIODS, **items})
+        barrier = threading.Barrier(_THREADS)
+
+        def plan(_):
+            barrier.wait()
+            return get_evaluation_plan(model_cls)
+
+        plans = _in_threads(plan, range(_THREADS))
+        assert all(p is plans[0] for p in plans)
+
+
+class TestConcurrentLazyReads:
+
+    def test_reads_match_the_eager_model(self):
+        expected = _Utility()
+        for _ in range(5):
+            model = _Utility(lazy=True)
+            barrier = threading.Barrier(_THREADS)
+
+            def read(i):
+                barrier.wait()
+                # Each thread walks the periods in a different order.
+                periods = _PERIODS[i % len(_PERIODS):] + _PERIODS[: i % len(_PERIODS)]
+                return [(name, p, model[name][p]) for p in periods for name in ("cash", "interest")]
+
+            for reads in _in_threads(read, range(_THREADS)):
+                for name, period, value in reads:
+                    assert value == expected[name][period]
+
+    def test_models_sharing_memoised_values(self):
+        base = _Utility(lazy=True)
+        variants = [base.with_inputs(growth=0.01 * i) for i in range(_THREADS)]
+
+        def read(i):
+            return _values(variants[i]) if i % 2 else _values(base)
+
+        results = _in_threads(read, range(_THREADS))
+        for i, values in enumerate(results):
+            expected = _Utility(growth=0.01 * i) if i % 2 else _Utility()
+            assert values == _values(expected)
@@ -0,0 +1,184 @@
+"""
+Tests for VectorFormulaLine (whole-column formulas) and its scheduling.
+"""
+
+import math
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    VectorFormulaLine,
+)
+from pyproforma.engine.evaluation_plan import get_evaluation_plan
+
+np = pytest.importorskip("numpy")
+
+from pyproforma.engine.vector_namespace import PeriodVector  # noqa: E402
+
+PERIODS = [2024, 2025, 2026, 2027]
+
+
+def _model_cls(vector=True, value_store="dict", compile_formulas=False):
+    """The same model with its elementwise items as vector or per-period formulas."""
+    line = VectorFormulaLine if vector else FormulaLine
+
+    def column(vector_formula, scalar_formula, **kwargs):
+        return line(vector_formula if vector else scalar_formula, **kwargs)
+
+    class Model(ProformaModel):
+        default_periods = PERIODS
+
+        ratio = ScalarLine(value=0.4)
+        growth = ScalarInputLine(default=0.1)
+        revenue = FixedLine(values={2024: 100, 2025: 110, 2026: 125, 2027: 140}, tags=["income"])
+        other = InputLine(default={2024: 1.0, 2025: 2.0, 2026: 3.0, 2027: 4.0}, tags=["income"])
+        expenses = column(lambda li: li.revenue * li.ratio, lambda li, t: li.revenue[t] * li.ratio)
+        cash = FormulaLine(lambda li, t: li.cash[t - 1] + li.expenses[t], values={2024: 0})
+        change = column(
+            lambda li: li.cash - li.cash.lag(1),
+            lambda li, t: li.cash[t] - li.cash[t - 1],
+            values={2024: 0.0},
+        )
+        total = column(
+            lambda li: li.tag["income"] * (1 + li.growth),
+            lambda li, t: li.tag["income"][t] * (1 + li.growth),
+        )
+        after = FormulaLine(lambda li, t: li.change[t] + li.total[t])
+
+    Model.value_store = value_store
+    Model.compile_formulas = compile_formulas
+    return Model
+
+
+_Vector = _model_cls()
+_Scalar = _model_cls(vector=False)
+
+
+def _assert_same_values(model, expected):
+    for name in expected.line_item_names:
+        assert model[name].values == expected[name].values, name
+
+
+class TestVectorFormulaLine:
+
+    def test_mixed_model_matches_scalar_engine(self):
+        _assert_same_values(_Vector(), _Scalar())
+
+    @pytest.mark.parametrize("store", ["dict", "array"])
+    def test_value_stores_and_compiled_formulas(self, store):
+        model = _model_cls(value_store=store, compile_formulas=True)()
+        _assert_same_values(model, _Scalar())
+
+    def test_stages(self):
+        plan = get_evaluation_plan(_Vector)
+        assert [stage.vector_items for stage in plan.stages] == [
+            ["expenses", "total"], ["change"], [],
+        ]
+        assert [stage.ordered_items for stage in plan.stages] == [[], ["cash"], ["after"]]
+        assert plan.vector_items == ["expenses", "total", "change"]
+        assert len(get_evaluation_plan(_Scalar).stages) == 1
+
+    def test_values_are_plain_floats(self):
+        assert type(_Vector().expenses[2025]) is float
+
+    def test_lazy_and_with_inputs(self):
+        lazy = _Vector(lazy=True)
+        assert lazy.after[2027] == _Scalar().after[2027]
+        other = {2024: 9.0, 2025: 9.0, 2026: 9.0, 2027: 9.0}
+        changed = _Vector().with_inputs(growth=0.2, other=other)
+        _assert_same_values(changed, _Scalar(growth=0.2, other=other))
+
+    def test_batch_matches_scalar_batch(self):
+        inputs = [{"growth": 0.0}, {"growth": 0.3}]
+        vector = _Vector.evaluate_batch(inputs=inputs)
+        scalar = _Scalar.evaluate_batch(inputs=inputs)
+        for name in _Scalar._line_item_names:
+            assert np.array_equal(vector[name], scalar[name]), name
+
+    def test_precedents_and_tags(self):
+        assert _Vector.change.precedents == ["cash"]
+        assert _Vector.total.tag_references == ["income"]
+        assert _Vector.graph.precedents("total") == ["growth", "revenue", "other"]
+
+    def test_none_reads_as_nan(self):
+        class Model(ProformaModel):
+            default_periods = [2024, 2025]
+            price = InputLine(default={2024: 1.0, 2025: None})
+            doubled = VectorFormulaLine(lambda li: li.price * 2)
+
+        assert Model().doubled[2024] == 2.0
+        assert math.isnan(Model().doubled[2025])
+
+    def test_period_array_and_scalar_result(self):
+        class Model(ProformaModel):
+            default_periods = [2024, 2025, 2026]
+            flag = VectorFormulaLine(lambda li: np.where(li.t >= 2025, 1.0, 0.0))
+            constant = VectorFormulaLine(lambda li: 5)
+
+        assert Model().flag.values == {2024: 0.0, 2025: 1.0, 2026: 1.0}
+        assert Model().constant.values == {2024: 5.0, 2025: 5.0, 2026: 5.0}
+
+
+class TestPeriodVector:
+
+    def test_lag_and_lead(self):
+        v = PeriodVector([1.0, 2.0, 3.0])
+        assert np.array_equal(v.lag(1), [np.nan, 1.0, 2.0], equal_nan=True)
+        assert np.array_equal(v.lag(2, fill=0.0), [0.0, 0.0, 1.0])
+        assert np.array_equal(v.lead(1, fill=0.0), [2.0, 3.0, 0.0])
+        assert np.array_equal(v.lag(-1, fill=0.0), v.lead(1, fill=0.0))
+        assert np.array_equal(v.lag(5, fill=0.0), [0.0, 0.0, 0.0])
+
+    def test_shift_applies_to_expressions(self):
+        v = PeriodVector([1.0, 2.0, 3.0])
+        assert isinstance(v * 2, PeriodVector)
+        assert np.array_equal((v * 2).lag(1, fill=0.0), [0.0, 2.0, 4.0])
+
+    def test_lag_shifts_last_axis_of_batch(self):
+        v = PeriodVector([[1.0, 2.0], [3.0, 4.0]])
+        assert np.array_equal(v.lag(1, fill=0.0), [[0.0, 1.0], [0.0, 3.0]])
+
+
+class TestVectorErrors:
+
+    def test_self_reference_rejected(self):
+        class Model(ProformaModel):
+            default_periods = [2024, 2025]
+            balance = VectorFormulaLine(lambda li: li.balance.lag(1, fill=0.0) + 1)
+
+        with pytest.raises(ValueError, match="references itself"):
+            Model()
+
+    def test_circular_reference_rejected(self):
+        class Model(ProformaModel):
+            default_periods = [2024, 2025]
+            base = FormulaLine(lambda li, t: li.scaled[t - 1], values={2024: 1.0})
+            scaled = VectorFormulaLine(lambda li: li.base * 2)
+
+        with pytest.raises(ValueError, match="part of a circular reference"):
+            Model()
+        with pytest.raises(ValueError, match="part of a circular reference"):
+            Model(lazy=True).scaled[2025]
+
+    def test_formula_errors(self):
+        class Typo(ProformaModel):
+            default_periods = [2024]
+            revenue = FixedLine(values={2024: 1})
+            doubled = VectorFormulaLine(lambda li: li.revenu * 2)
+
+        with pytest.raises(ValueError, match="Error in formula for 'doubled'"):
+            Typo()
+
+    def test_wrong_shape(self):
+        class Model(ProformaModel):
+            default_periods = [2024, 2025]
+            pair = VectorFormulaLine(lambda li: [1.0, 2.0, 3.0])
+
+        with pytest.raises(ValueError, match="one value per period"):
+            Model()
@@ -0,0 +1,232 @@
+"""
+Tests for input optimisation (ProformaModel.optimize / pyproforma.optimize).
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+
+import pytest
+
+from pyproforma import FixedLine, FormulaLine, InputLine, ProformaModel, ScalarInputLine
+from pyproforma.optimize import Constraint, OptimizeResult, optimize
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+METHODS = ["pattern", "slsqp", "cobyla"]
+
+
+class _Utility(ProformaModel):
+    default_periods = [2024, 2025, 2026, 2027]
+
+    growth = ScalarInputLine(default=0.0)
+    rate_increase = InputLine(
+        values={2024: 0.0}, default={2025: 0.05, 2026: 0.05, 2027: 0.05}
+    )
+    costs = FixedLine(values={2024: 80.0, 2025: 95.0, 2026: 96.0, 2027: 120.0})
+    rate = FormulaLine(
+        lambda li, t: li.rate[t - 1] * (1 + li.rate_increase[t]), values={2024: 10.0}
+    )
+    units = FormulaLine(lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 10.0})
+    revenue = FormulaLine(lambda li, t: li.rate[t] * li.units[t])
+    coverage = FormulaLine(lambda li, t: li.revenue[t] / li.costs[t])
+
+
+def _method(method):
+    if method != "pattern":
+        pytest.importorskip("scipy")
+    return method
+
+
+@pytest.mark.parametrize("method", METHODS)
+class TestMethods:
+
+    def test_spreads_increases_evenly(self, method):
+        # Only the final rate is bounded below: sum(r) subject to
+        # prod(1 + r) >= 1.5 is smallest with equal increases.
+        result = _Utility().optimize(
+            "rate_increase",
+            vary={"rate_increase": (0.0, 0.3)},
+            constraints=[("rate", ">=", 15.0, [2027])],
+            method=_method(method),
+        )
+        assert isinstance(result, OptimizeResult)
+        assert result.success, result.message
+        expected = 1.5 ** (1 / 3) - 1
+        for period in (2025, 2026, 2027):
+            assert result.inputs["rate_increase"][period] == pytest.approx(expected, abs=1e-3)
+        assert result.objective == pytest.approx(3 * expected, abs=1e-5)
+        assert result.model.rate[2027] >= 15.0 * (1 - 1e-6)
+
+    def test_coverage_in_every_period(self, method):
+        model = _Utility()
+        result = model.optimize(
+            "rate_increase",
+            vary={"rate_increase": (0.0, 0.3)},
+            constraints=[Constraint("coverage", ">=", 1.25)],
+            method=_method(method),
+        )
+        assert result.success, result.message
+        for period in model.periods:
+            assert result.model.coverage[period] >= 1.25 * (1 - 1e-6)
+        # Never worse than meeting each year's floor exactly, year by year.
+        greedy = model.goal_seek("coverage", value=1.25, vary="rate_increase", bounds=(0, 1))
+        assert result.objective <= sum(greedy.value.values()) + 1e-5
+        assert model.rate_increase[2025] == 0.05  # the original is untouched
+
+    def test_scalar_input_and_callable_objective(self, method):
+        # Maximise 2027 revenue with coverage capped at 2.0 that year.
+        result = _Utility().optimize(
+            lambda m: m.revenue[2027],
+            vary={"growth": (-0.1, 0.5)},
+            constraints=[("coverage", "<=", 2.0, [2027])],
+            maximize=True,
+            method=_method(method),
+        )
+        assert result.success, result.message
+        expected = _Utility().goal_seek(
+            "coverage", period=2027, value=2.0, vary="growth", bounds=(-0.1, 0.5)
+        )
+        assert result.inputs["growth"] == pytest.approx(expected.value, abs=1e-4)
+        assert result.objective == pytest.approx(240.0, rel=1e-5)
+
+
+class TestEvaluation:
+
+    def test_no_model_is_constructed_per_candidate(self, monkeypatch):
+        model = _Utility()
+        constructed = []
+        original = ProformaModel.__init__
+
+        def counting_init(self, *args, **kwargs):
+            constructed.append(self)
+            original(self, *args, **kwargs)
+
+        monkeypatch.setattr(ProformaModel, "__init__", counting_init)
+        result = model.optimize(
+            "rate_increase",
+            vary={"rate_increase": (0.0, 0.3)},
+            constraints=[("coverage", ">=", 1.25)],
+            method="pattern",
+        )
+        assert result.success
+        assert constructed == []
+        assert "costs" not in result.model.recomputed_items
+        assert "units" not in result.model.recomputed_items
+
+    def test_batch_and_incremental_agree(self):
+        pytest.importorskip("numpy")
+        kwargs = dict(
+            vary={"rate_increase": (0.0, 0.3)},
+            constraints=[("coverage", ">=", 1.25)],
+            method="pattern",
+        )
+        batched = _Utility().optimize("rate_increase", batch=True, **kwargs)
+        incremental = _Utility().optimize("rate_increase", batch=False, **kwargs)
+        assert batched.evaluations == incremental.evaluations
+        for period, value in incremental.inputs["rate_increase"].items():
+            assert batched.inputs["rate_increase"][period] == pytest.approx(value, abs=1e-12)
+
+    def test_per_period_bounds(self):
+        result = _Utility().optimize(
+            "rate_increase",
+            vary={"rate_increase": {2026: (0.0, 0.3), 2027: (0.0, 0.3)}},
+            constraints=[("rate", ">=", 13.0, [2027])],
+            method="pattern",
+        )
+        assert result.success
+        assert result.inputs["rate_increase"][2025] == 0.05
+        assert result.model.rate[2027] == pytest.approx(13.0, rel=1e-5)
+
+    def test_infeasible(self):
+        result = optimize(
+            _Utility(),
+            "rate_increase",
+            vary={"rate_increase": (0.0, 0.1)},
+            constraints=[("coverage", ">=", 2.0)],
+            method="pattern",
+            max_iterations=5,
+        )
+        assert not result.success
+        assert result.max_violation > 0.1
+
+    def test_slsqp_evaluation_limit(self):
+        pytest.importorskip("scipy")
+        result = _Utility().optimize(
+            "rate_increase",
+            vary={"rate_increase": (0.0, 0.3)},
+            constraints=[("coverage", ">=", 1.25)],
+            method="slsqp",
+            max_evaluations=10,
+            batch=False,
+        )
+        assert not result.success
+        assert result.message == "Evaluation limit reached."
+        # At most one gradient stencil (3 variables + the base point) past the limit.
+        assert result.evaluations <= 10 + 4
+        assert result.max_violation <= 1e-6
+
+    def test_water_utility_rate_plan(self):
+        pytest.importorskip("scipy")
+        path = EXAMPLES_DIR / "water_utility" / "model.py"
+        spec = importlib.util.spec_from_file_location("_example_water_utility", path)
+        mod = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(mod)
+        model = mod.model
+        result = model.optimize(
+            "rate_increase",
+            vary={"rate_increase": (0.0, 0.15)},
+            constraints=[("dscr", ">=", 1.25), ("ending_cash", ">=", 6_000_000)],
+        )
+        assert result.success, result.message
+        assert result.method == "slsqp"
+        assert min(result.model.dscr[p] for p in model.periods) >= 1.25
+        assert result.model.ending_cash[2030] == pytest.approx(6_000_000, rel=1e-6)
+
+
+class TestValidation:
+
+    def _optimize(self, **kwargs):
+        options = dict(vary={"rate_increase": (0.0, 0.3)}, method="pattern")
+        options.update(kwargs)
+        return _Utility().optimize(options.pop("objective", "rate_increase"), **options)
+
+    def test_not_an_input(self):
+        with pytest.raises(ValueError, match="'revenue' is not an input"):
+            self._optimize(vary={"revenue": (0, 1)})
+
+    def test_bad_bounds(self):
+        with pytest.raises(ValueError, match=r"Bounds for growth must be finite"):
+            self._optimize(vary={"growth": (0.5, 0.1)})
+        with pytest.raises(ValueError, match=r"Bounds for rate_increase\[2025\]"):
+            self._optimize(vary={"rate_increase": {2025: 0.1}})
+
+    def test_locked_period(self):
+        with pytest.raises(ValueError, match="locked in period 2024"):
+            self._optimize(vary={"rate_increase": {2024: (0.0, 0.1)}})
+
+    def test_unknown_line_item(self):
+        with pytest.raises(ValueError, match="'dscr' is not a line item"):
+            self._optimize(constraints=[("dscr", ">=", 1.25)])
+        with pytest.raises(ValueError, match="'cost' is not a line item"):
+            self._optimize(objective="cost")
+
+    def test_bad_operator(self):
+        with pytest.raises(ValueError, match="operator must be"):
+            Constraint("coverage", ">", 1.25)
+
+    def test_unknown_method(self):
+        with pytest.raises(ValueError, match="Unknown method 'newton'"):
+            self._optimize(method="newton")
+
+    def test_batch_needs_line_item_objective(self):
+        with pytest.raises(ValueError, match="batch evaluation needs"):
+            self._optimize(objective=lambda m: m.revenue[2027], batch=True)
+
+    def test_missing_scipy(self, monkeypatch):
+        monkeypatch.setitem(sys.modules, "scipy", None)
+        monkeypatch.setitem(sys.modules, "scipy.optimize", None)
+        with pytest.raises(ImportError, match="pip install scipy"):
+            self._optimize(method="slsqp")
+        result = self._optimize(method="auto", constraints=[("coverage", ">=", 1.25)])
+        assert result.method == "pattern"
+        assert result.success
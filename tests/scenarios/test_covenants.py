@@ -0,0 +1,172 @@
+"""
+Tests for covenant checks (check_constraints / screen_scenarios).
+"""
+
+import pytest
+
+from pyproforma import (
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    VectorFormulaLine,
+    create_debt_lines,
+)
+from pyproforma.optimize import Constraint
+from pyproforma.scenarios import (
+    ConstraintCheck,
+    ScreeningResult,
+    check_constraints,
+    screen_scenarios,
+)
+
+_CALLS = []
+
+
+def _record(li, t):
+    _CALLS.append((t, getattr(li.revenue[t], "size", 1)))
+    return li.revenue[t] * 0.1
+
+
+class _Project(ProformaModel):
+    default_periods = [2024, 2025, 2026, 2027]
+
+    growth = ScalarInputLine(default=0.1)
+    par = InputLine(default={2024: 1000.0, 2025: 0.0, 2026: 0.0, 2027: 0.0})
+    rate = ScalarInputLine(default=0.05)
+    term = ScalarLine(value=4)
+    principal, interest = create_debt_lines(par_amounts="par", interest_rate="rate", term="term")
+    revenue = FormulaLine(lambda li, t: li.revenue[t - 1] * (1 + li.growth), values={2024: 500.0})
+    service = FormulaLine(lambda li, t: li.principal[t] + li.interest[t])
+    # Branches on a value, so batches evaluate it one scenario at a time.
+    dscr = FormulaLine(lambda li, t: li.revenue[t] / li.service[t] if li.service[t] > 0 else 0.0)
+    fees = FormulaLine(_record)
+    target = InputLine(values={2024: 1.0, 2025: None}, default={2026: 1.0, 2027: 1.0})
+
+
+_DSCR = Constraint("dscr", ">=", 1.15)
+
+
+class TestCheckConstraints:
+
+    def test_first_breach(self):
+        model = _Project(growth=-0.6)
+        check = model.check_constraints([_DSCR, ("revenue", "<=", 1000.0)])
+        assert isinstance(check, ConstraintCheck)
+        assert check.breached
+        assert check.period == 2025
+        assert check.line_item == "dscr"
+        assert check.value == model.dscr[2025]
+        assert check.margin == pytest.approx(model.dscr[2025] - 1.15)
+
+    def test_headroom_when_nothing_breaches(self):
+        model = _Project()
+        check = check_constraints(model, [("revenue", "<=", 700.0), ("dscr", ">=", 1.0)])
+        assert not check.breached
+        assert check.period is None and check.line_item is None
+        margins = [700.0 - model.revenue[p] for p in model.periods]
+        margins += [model.dscr[p] - 1.0 for p in (2024, 2025, 2026)]
+        assert check.margin == pytest.approx(min(margins))
+
+    def test_constraint_periods_and_none_values(self):
+        model = _Project(growth=-0.2)
+        assert not model.check_constraints([("dscr", ">=", 1.2, [2024])]).breached
+        # target has no value in 2025, so it is not checked there.
+        check = model.check_constraints([("target", "<=", 1.0, [2025])])
+        assert not check.breached and check.margin is None
+
+    def test_lazy_model_stops_at_breach(self):
+        _CALLS.clear()
+        model = _Project(lazy=True, growth=-0.6)
+        model.check_constraints([_DSCR, ("fees", ">=", 0.0)])
+        # fees is checked after dscr each period, so 2025's breach ends the run.
+        assert _CALLS == [(2024, 1)]
+
+    def test_errors(self):
+        model = _Project()
+        with pytest.raises(ValueError, match="'profit' is not a line item of _Project"):
+            model.check_constraints([("profit", ">=", 0)])
+        with pytest.raises(ValueError, match="Period 2030 is not a period"):
+            model.check_constraints([("dscr", ">=", 1.2, [2030])])
+        with pytest.raises(ValueError, match="Constraint operator"):
+            model.check_constraints([("dscr", ">", 1.2)])
+
+
+_SCENARIOS = [
+    {},
+    {"growth": -0.2},
+    {"growth": -0.05, "rate": 0.08},
+    {"par": {2024: 1000.0, 2025: 0.0, 2026: 800.0, 2027: 0.0}},
+    {"growth": 0.0, "par": {2024: 500.0, 2025: 0.0, 2026: 2000.0, 2027: 0.0}},
+    {"growth": -0.6},
+]
+_CONSTRAINTS = [_DSCR, ("revenue", ">=", 300.0)]
+
+
+@pytest.mark.parametrize("backend", ["numpy", "numba"])
+class TestScreenScenarios:
+
+    def test_matches_check_constraints(self, backend):
+        pytest.importorskip(backend)
+        result = screen_scenarios(_Project, _SCENARIOS, _CONSTRAINTS, backend=backend)
+        assert isinstance(result, ScreeningResult)
+        assert len(result) == len(_SCENARIOS)
+        for i, kwargs in enumerate(_SCENARIOS):
+            expected = _Project(**kwargs).check_constraints(_CONSTRAINTS)
+            actual = result[i]
+            assert actual.breached == expected.breached
+            assert actual.period == expected.period
+            assert actual.line_item == expected.line_item
+            assert actual.value == expected.value
+            assert actual.margin == expected.margin
+        assert result.breach_line_item == [None, "dscr", None, None, "dscr", "dscr"]
+        assert list(result.survivors) == [0, 2, 3]
+
+
+class TestActiveSet:
+
+    def test_breached_scenarios_are_dropped(self):
+        pytest.importorskip("numpy")
+        _CALLS.clear()
+        result = screen_scenarios(_Project, _SCENARIOS, [_DSCR])
+        assert result.early_exit
+        # Scenario 5 breaches in 2025; 1 and 4 (once its new issue is serviced) in 2026.
+        assert result.periods_evaluated.tolist() == [4, 3, 4, 4, 3, 2]
+        assert _CALLS == [(2024, 6), (2025, 6), (2026, 5), (2027, 3)]
+        assert result.breach_rate == 0.5
+
+    def test_all_scenarios_breach(self):
+        np = pytest.importorskip("numpy")
+        result = screen_scenarios(_Project, [{}, {"growth": 0.2}], [("revenue", "<=", 400.0)])
+        assert result.breached.all()
+        assert result.breach_period.tolist() == [2024, 2024]
+        assert np.isnan(result.margin).tolist() == [False, False]
+
+    def test_vector_items_are_checked_after_full_evaluation(self):
+        np = pytest.importorskip("numpy")
+
+        class Vector(ProformaModel):
+            default_periods = [2024, 2025, 2026]
+            growth = ScalarInputLine(default=0.1)
+            revenue = FormulaLine(
+                lambda li, t: li.revenue[t - 1] * (1 + li.growth), values={2024: 500.0}
+            )
+            cover = VectorFormulaLine(lambda li: np.cumsum(li.revenue, axis=-1) / 1000.0)
+
+        scenarios = [{"growth": g} for g in (-0.5, -0.2, 0.0, 0.5)]
+        constraints = [("cover", ">=", 1.0, [2025, 2026]), ("revenue", ">=", 300.0)]
+        result = screen_scenarios(Vector, scenarios, constraints)
+        assert not result.early_exit
+        assert result.periods_evaluated.tolist() == [2, 2, 3, 3]
+        for i, kwargs in enumerate(scenarios):
+            expected = Vector(**kwargs).check_constraints(constraints)
+            assert result[i].period == expected.period
+            assert result[i].margin == pytest.approx(expected.margin)
+
+    def test_errors(self):
+        pytest.importorskip("numpy")
+        with pytest.raises(ValueError, match="at least one scenario"):
+            screen_scenarios(_Project, [], [_DSCR])
+        with pytest.raises(ValueError, match="'profit' is not a line item"):
+            screen_scenarios(_Project, [{}], [("profit", ">=", 0)])
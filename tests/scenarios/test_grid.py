@@ -0,0 +1,223 @@
+"""
+Tests for grid runs (pyproforma.scenarios.run_grid / GridRunner).
+"""
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    LineItem,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    create_debt_lines,
+)
+from pyproforma.scenarios import GridRunner, grid_scenarios, run_grid
+
+_PERIODS = [2024, 2025, 2026, 2027]
+_CALLS = []
+
+
+def _record(li, t):
+    _CALLS.append(t)
+    return li.revenue[t] * li.cost_ratio
+
+
+class _Utility(ProformaModel):
+    default_periods = _PERIODS
+
+    growth = ScalarInputLine(default=0.05)
+    cost_ratio = ScalarInputLine(default=0.6)
+    rate = ScalarInputLine(default=0.04)
+    term = ScalarLine(value=3)
+    borrowing = InputLine(default={2024: 100.0, 2025: 0.0, 2026: 50.0, 2027: 0.0})
+    revenue = FormulaLine(
+        lambda li, t: li.revenue[t - 1] * (1 + li.growth), values={2024: 200.0}, tags=["income"]
+    )
+    costs = FormulaLine(_record)
+    grants = FormulaLine(lambda li, t: 10.0, tags=["income"])
+    principal, interest = create_debt_lines(
+        par_amounts="borrowing", interest_rate="rate", term="term"
+    )
+    service = FormulaLine(lambda li, t: li.principal[t] + li.interest[t])
+    cash = FormulaLine(
+        lambda li, t: li.cash[t - 1] + li.tag["income"][t] - li.costs[t] - li.service[t],
+        values={2024: 0.0},
+    )
+
+
+def _variant(name, **attrs):
+    """A copy of _Utility with class settings or line items added."""
+    items = {key: value for key, value in _Utility.__dict__.items() if isinstance(value, LineItem)}
+    return type(name, (ProformaModel,), {"default_periods": _PERIODS, **items, **attrs})
+
+
+def _grid():
+    return grid_scenarios(
+        growth=[0.0, 0.05, 0.1],
+        cost_ratio=[0.5, 0.6],
+        rate=[0.03, 0.04],
+    )
+
+
+def _assert_matches_independent(model_cls, models, scenarios):
+    assert len(models) == len(scenarios)
+    for model, scenario in zip(models, scenarios):
+        expected = model_cls(**scenario)
+        for name in model_cls._line_item_names:
+            assert model[name].values == expected[name].values, (scenario, name)
+
+
+class TestGridScenarios:
+
+    def test_cartesian_product_in_order(self):
+        assert list(grid_scenarios(a=[1, 2], b=["x", "y"])) == [
+            {"a": 1, "b": "x"},
+            {"a": 1, "b": "y"},
+            {"a": 2, "b": "x"},
+            {"a": 2, "b": "y"},
+        ]
+        assert len(list(_grid())) == 12
+
+
+@pytest.mark.parametrize("store", ["dict", "array"])
+class TestRunGrid:
+
+    def test_models_match_independent_models(self, store):
+        if store == "array":
+            pytest.importorskip("numpy")
+        model_cls = _variant("Utility", value_store=store)
+        models = list(run_grid(model_cls, _grid()))
+        _assert_matches_independent(model_cls, models, list(_grid()))
+        assert models[-1].with_inputs(growth=0.0).cash[2027] == model_cls(
+            growth=0.0, cost_ratio=0.6, rate=0.04
+        ).cash[2027]
+
+
+class TestReuse:
+
+    def test_dependencies(self):
+        runner = GridRunner(_Utility)
+        assert runner.dependencies["revenue"] == ("growth",)
+        assert runner.dependencies["costs"] == ("growth", "cost_ratio")
+        assert runner.dependencies["grants"] == ()
+        assert runner.dependencies["interest"] == ("rate", "borrowing")
+        assert runner.dependencies["cash"] == ("growth", "cost_ratio", "rate", "borrowing")
+
+    def test_items_are_calculated_once_per_combination(self):
+        runner = GridRunner(_Utility)
+        _CALLS.clear()
+        models = list(runner.run(_grid()))
+        # costs depends on growth and cost_ratio: 6 combinations of 12 scenarios.
+        assert len(_CALLS) == 6 * len(_PERIODS)
+        assert "costs" in models[0].recomputed_items
+        assert models[1].recomputed_items == ["principal", "interest", "service", "cash"]
+        assert runner.scenarios == 12
+        assert runner.computed + runner.reused == 12 * len(_Utility._line_item_names)
+        assert runner.reused > runner.computed
+
+    def test_cache_size_evicts_least_recently_used(self):
+        runner = GridRunner(_Utility, cache_size=1)
+        _CALLS.clear()
+        for growth in (0.0, 0.1, 0.0):
+            runner.evaluate(growth=growth)
+        assert len(_CALLS) == 3 * len(_PERIODS)
+        with pytest.raises(ValueError, match="cache_size"):
+            GridRunner(_Utility, cache_size=0)
+
+    def test_scenarios_are_read_lazily(self):
+        read = []
+
+        def scenarios():
+            for growth in (0.0, 0.1, 0.2):
+                read.append(growth)
+                yield {"growth": growth}
+
+        models = run_grid(_Utility, scenarios())
+        assert read == []
+        assert next(models).revenue[2025] == 200.0
+        assert read == [0.0]
+
+    def test_helper_function_formulas_match_fresh_models(self):
+        def helper(li, t):
+            return li.base[t] * (li.rate[t] if t >= 2025 else 1.0)
+
+        class Helped(ProformaModel):
+            default_periods = [2024, 2025]
+            g = ScalarInputLine(default=2.0)
+            rate = InputLine(default={2024: 1.0, 2025: 1.0})
+            base = FixedLine(values={2024: 10.0, 2025: 10.0})
+            x = FormulaLine(lambda li, t: helper(li, t) * li.g)
+
+        scenarios = list(grid_scenarios(
+            g=[2.0, 4.0], rate=[{2024: 1.0, 2025: 1.0}, {2024: 1.0, 2025: 2.5}]
+        ))
+        models = list(run_grid(Helped, scenarios))
+        assert [model.x[2025] for model in models] == [20.0, 50.0, 40.0, 100.0]
+        _assert_matches_independent(Helped, models, scenarios)
+
+    def test_helper_in_a_container_matches_fresh_models(self):
+        helpers = {"calc": lambda li, t: li.base[t] * (li.rate[t] if t >= 2025 else 1.0)}
+
+        class Contained(ProformaModel):
+            default_periods = [2024, 2025]
+            rate = InputLine(default={2024: 1.0, 2025: 1.0})
+            base = FixedLine(values={2024: 10.0, 2025: 10.0})
+            x = FormulaLine(lambda li, t: helpers["calc"](li, t))
+
+        scenarios = [{"rate": {2024: 1.0, 2025: 1.0}}, {"rate": {2024: 1.0, 2025: 3.0}}]
+        models = list(run_grid(Contained, scenarios))
+        assert [model.x[2025] for model in models] == [10.0, 30.0]
+        _assert_matches_independent(Contained, models, scenarios)
+
+    def test_getattr_formulas_match_fresh_models(self):
+        class Picked(ProformaModel):
+            default_periods = [2024, 2025]
+            pick = ScalarInputLine(default=0)
+            aa = ScalarInputLine(default=1.0)
+            bb = ScalarInputLine(default=1.0)
+            branch = FormulaLine(lambda li, t: getattr(li, "aa" if t < 2025 else "bb"))
+            computed = FormulaLine(lambda li, t: getattr(li, ["aa", "bb"][int(li.pick)]) * 10)
+
+        scenarios = list(grid_scenarios(pick=[0, 1], bb=[1.0, 7.0]))
+        models = list(run_grid(Picked, scenarios))
+        assert [model.branch[2025] for model in models] == [1.0, 7.0, 1.0, 7.0]
+        assert [model.computed[2025] for model in models] == [10.0, 10.0, 10.0, 70.0]
+        _assert_matches_independent(Picked, models, scenarios)
+
+    def test_tag_name_in_a_variable_matches_fresh_models(self):
+        tag = "rev"
+
+        class VariableTag(ProformaModel):
+            default_periods = [2024, 2025]
+            g = ScalarInputLine(default=0.1)
+            h = ScalarInputLine(default=1.0)
+            sales = FormulaLine(lambda li, t: 100 * (1 + li.g), tags=["rev"])
+            total = FormulaLine(lambda li, t: li.tag[tag][t] * li.h if t > 2024 else 0.0)
+
+        assert GridRunner(VariableTag).dependencies["total"] == ("g", "h")
+        scenarios = list(grid_scenarios(g=[0.1, 0.5], h=[1.0, 2.0]))
+        models = list(run_grid(VariableTag, scenarios))
+        totals = [model.total[2025] for model in models]
+        assert totals == pytest.approx([110.0, 220.0, 150.0, 300.0])
+        _assert_matches_independent(VariableTag, models, scenarios)
+
+
+class TestFallback:
+
+    def test_other_engines(self):
+        model_cls = _variant("Lazy", engine="lazy")
+        runner = GridRunner(model_cls)
+        models = list(runner.run(_grid()))
+        assert models[0]._lazy
+        assert runner.reused == 0
+        _assert_matches_independent(model_cls, models, list(_grid()))
+
+    def test_periods_and_validation(self):
+        models = list(run_grid(_Utility, [{"growth": 0.2}], periods=[2024, 2025]))
+        assert models[0].periods == [2024, 2025]
+        assert models[0].revenue[2025] == pytest.approx(240.0)
+        with pytest.raises(TypeError):
+            next(run_grid(_Utility, [{"growht": 0.1}]))
@@ -0,0 +1,185 @@
+"""
+Tests for the scenario runner (pyproforma.run_scenarios) and its process and thread pools.
+"""
+
+import os
+import sys
+from collections import Counter
+
+import pytest
+
+from pyproforma import (
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    ScenarioResults,
+    create_debt_lines,
+    run_scenarios,
+)
+
+np = pytest.importorskip("numpy")
+
+
+class _Project(ProformaModel):
+    default_periods = [2024, 2025, 2026]
+
+    growth = ScalarInputLine(default=0.05)
+    divisor = ScalarInputLine(default=1.0)
+    price = InputLine(values={2024: 10.0}, default={2025: 10.0, 2026: 10.0})
+    units = FormulaLine(lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 100.0})
+    revenue = FormulaLine(lambda li, t: li.units[t] * li.price[t])
+    margin = FormulaLine(lambda li, t: li.revenue[t] / li.divisor)
+
+
+class _Pid(ProformaModel):
+    default_periods = [2024]
+
+    growth = ScalarInputLine(default=0.0)
+    pid = FormulaLine(lambda li, t: float(os.getpid()))
+
+
+def _scenarios(n):
+    return [{"growth": 0.01 * i} for i in range(n)]
+
+
+class TestRunScenarios:
+
+    @pytest.mark.parametrize("workers", [1, 2])
+    def test_matches_individual_models(self, workers):
+        scenarios = _scenarios(7)
+        results = run_scenarios(
+            _Project, scenarios, workers=workers, outputs=["revenue", "growth"], chunk_size=2
+        )
+        assert isinstance(results, ScenarioResults)
+        assert len(results) == 7
+        assert results["revenue"].shape == (7, 3)
+        for i, kwargs in enumerate(scenarios):
+            model = _Project(**kwargs)
+            assert results[i, "revenue", 2026] == model.revenue[2026]
+            assert results[i, "growth", 2026] == kwargs["growth"]
+        np.testing.assert_array_equal(
+            results["revenue", 2025], [_Project(**s).revenue[2025] for s in scenarios]
+        )
+
+    def test_only_requested_outputs_returned(self):
+        results = run_scenarios(_Project, _scenarios(2), workers=1, outputs=["margin"])
+        assert results.outputs == ["margin"]
+        with pytest.raises(KeyError, match="not among the requested outputs"):
+            results["revenue"]
+
+    def test_default_outputs_are_all_items(self):
+        results = run_scenarios(_Project, _scenarios(1), workers=1)
+        assert results.outputs == _Project._line_item_names + _Project._scalar_names
+
+    def test_errors_do_not_stop_the_batch(self):
+        scenarios = [{"divisor": 1.0}, {"divisor": 0.0}, {"bogus": 1}, {"divisor": 2.0}]
+        results = run_scenarios(_Project, scenarios, workers=2, outputs=["margin"], chunk_size=1)
+        assert results.failed == [1, 2]
+        assert isinstance(results.errors[1], ValueError)
+        assert isinstance(results.errors[2], TypeError)
+        assert np.isnan(results["margin"][1]).all()
+        assert results[3, "margin", 2024] == 500.0
+        with pytest.raises(ValueError):
+            results.scenario(1)
+        assert results.scenario(0)["margin"][2024] == 1000.0
+
+    def test_worker_recycling_preserves_order(self):
+        scenarios = _scenarios(10)
+        results = run_scenarios(
+            _Project, scenarios, workers=2, outputs=["units"], chunk_size=1,
+            max_tasks_per_child=2,
+        )
+        expected = [_Project(**s).units[2026] for s in scenarios]
+        np.testing.assert_array_equal(results["units", 2026], expected)
+
+    def test_worker_recycling_limits_tasks_per_worker(self):
+        results = run_scenarios(
+            _Pid, _scenarios(12), workers=2, outputs=["pid"], chunk_size=1,
+            max_tasks_per_child=2,
+        )
+        tasks_per_worker = Counter(results["pid", 2024].tolist())
+        assert sum(tasks_per_worker.values()) == 12
+        assert max(tasks_per_worker.values()) <= 2
+        assert os.getpid() not in tasks_per_worker
+
+    def test_results_are_read_only(self):
+        results = run_scenarios(_Project, _scenarios(2), workers=1, outputs=["units"])
+        with pytest.raises(ValueError):
+            results["units"][0, 0] = 1.0
+
+    def test_empty_scenarios(self):
+        results = run_scenarios(_Project, [], workers=2, outputs=["units", "growth"])
+        assert len(results) == 0
+        assert results["units"].shape == (0, 3)
+
+    def test_validation(self):
+        with pytest.raises(ValueError, match="Unknown outputs"):
+            run_scenarios(_Project, [], outputs=["nope"])
+        with pytest.raises(ValueError, match="workers"):
+            run_scenarios(_Project, [], workers=0)
+        with pytest.raises(ValueError, match="max_tasks_per_child"):
+            run_scenarios(_Project, [], max_tasks_per_child=0)
+        with pytest.raises(ValueError, match="executor"):
+            run_scenarios(_Project, [], executor="fork")
+
+    def test_local_class_needs_single_worker(self):
+        class Local(ProformaModel):
+            default_periods = [2024]
+            x = ScalarInputLine(default=1.0)
+
+        with pytest.raises(TypeError, match="module level"):
+            run_scenarios(Local, [{}], workers=2)
+        assert run_scenarios(Local, [{}], workers=1)[0, "x", 2024] == 1.0
+
+
+class _Financed(ProformaModel):
+    default_periods = list(range(2024, 2040))
+
+    growth = ScalarInputLine(default=0.03)
+    rate = ScalarInputLine(default=0.05)
+    term = ScalarLine(value=8)
+    borrowing = InputLine(default={p: 25.0 if p % 4 == 0 else 0.0 for p in range(2024, 2040)})
+    revenue = FormulaLine(lambda li, t: li.revenue[t - 1] * (1 + li.growth), values={2024: 300.0})
+    principal, interest = create_debt_lines(
+        par_amounts="borrowing", interest_rate="rate", term="term"
+    )
+    cash = FormulaLine(
+        lambda li, t: li.cash[t - 1] + li.revenue[t] - li.principal[t] - li.interest[t],
+        values={2024: 0.0},
+    )
+
+
+class TestThreadExecutor:
+
+    def test_concurrent_runs_match_serial(self):
+        scenarios = [
+            {"growth": 0.005 * (i % 11), "rate": 0.02 + 0.004 * (i % 9)} for i in range(400)
+        ]
+        serial = run_scenarios(_Financed, scenarios, workers=1)
+        interval = sys.getswitchinterval()
+        sys.setswitchinterval(1e-6)  # interleave threads inside formulas and schedules
+        try:
+            for _ in range(3):
+                threaded = run_scenarios(
+                    _Financed, scenarios, workers=16, chunk_size=1, executor="thread"
+                )
+                assert threaded.errors == {}
+                for name in serial.outputs:
+                    np.testing.assert_array_equal(threaded[name], serial[name])
+        finally:
+            sys.setswitchinterval(interval)
+
+    def test_errors_and_local_classes(self):
+        class Local(ProformaModel):
+            default_periods = [2024]
+            x = ScalarInputLine(default=1.0)
+            y = FormulaLine(lambda li, t: 1.0 / li.x)
+
+        results = run_scenarios(
+            Local, [{"x": 2.0}, {"x": 0.0}], workers=2, chunk_size=1, executor="thread"
+        )
+        assert results[0, "y", 2024] == 0.5
+        assert results.failed == [1]
+        assert "division by zero" in str(results.errors[1])
@@ -0,0 +1,163 @@
+"""
+Tests for scenario trees (pyproforma.scenarios.ScenarioTree).
+"""
+
+import pytest
+
+from pyproforma import (
+    FormulaLine,
+    InputLine,
+    LineItem,
+    ProformaModel,
+    ScalarInputLine,
+    ScalarLine,
+    VectorFormulaLine,
+    create_debt_lines,
+)
+from pyproforma.scenarios import ScenarioTree
+
+_PERIODS = [2024, 2025, 2026, 2027, 2028]
+_CALLS = []
+
+
+def _record(li, t):
+    _CALLS.append(t)
+    return li.revenue[t] * 0.1
+
+
+class _Plan(ProformaModel):
+    default_periods = _PERIODS
+
+    growth = ScalarInputLine(default=0.05)
+    rate = ScalarInputLine(default=0.04)
+    term = ScalarLine(value=3)
+    borrowing = InputLine(default={2024: 100.0, 2025: 0.0, 2026: 0.0, 2027: 0.0, 2028: 0.0})
+    revenue = FormulaLine(
+        lambda li, t: li.revenue[t - 1] * (1 + li.growth), values={2024: 200.0}, tags=["income"]
+    )
+    fees = FormulaLine(_record, tags=["income"])
+    principal, interest = create_debt_lines(
+        par_amounts="borrowing", interest_rate="rate", term="term"
+    )
+    service = FormulaLine(lambda li, t: li.principal[t] + li.interest[t])
+    cash = FormulaLine(
+        lambda li, t: li.cash[t - 1] + li.tag["income"][t] + li.borrowing[t] - li.service[t],
+        values={2024: 0.0},
+    )
+
+
+def _variant(name, **attrs):
+    """A copy of _Plan with class settings or line items added."""
+    items = {key: value for key, value in _Plan.__dict__.items() if isinstance(value, LineItem)}
+    return type(name, (ProformaModel,), {"default_periods": _PERIODS, **items, **attrs})
+
+
+def _borrowing(**amounts):
+    plan = {2024: 100.0, 2025: 0.0, 2026: 0.0, 2027: 0.0, 2028: 0.0}
+    plan.update({int(year[1:]): amount for year, amount in amounts.items()})
+    return plan
+
+
+def _tree(model_cls=_Plan):
+    tree = ScenarioTree(model_cls)
+    for a in (0.0, 50.0):
+        first = tree.branch(f"a{a:g}", borrowing=_borrowing(y2026=a))
+        for b in (0.0, 80.0, 120.0):
+            first.branch(f"b{b:g}", borrowing=_borrowing(y2026=a, y2027=b))
+    tree.branch("fast", growth=0.1)
+    return tree
+
+
+def _assert_matches_independent(tree, models):
+    assert list(models) == [leaf.path for leaf in tree.leaves()]
+    for leaf in tree.leaves():
+        expected = tree.model_cls(**leaf.inputs)
+        for name in tree.model_cls._line_item_names:
+            assert models[leaf.path][name].values == expected[name].values, (leaf.path, name)
+
+
+@pytest.mark.parametrize("store", ["dict", "array"])
+class TestEvaluate:
+
+    def test_leaves_match_independent_models(self, store):
+        if store == "array":
+            pytest.importorskip("numpy")
+        tree = _tree(_variant("Plan", value_store=store))
+        models = tree.evaluate()
+        assert len(models) == 7
+        _assert_matches_independent(tree, models)
+        model = models["a50", "b120"]
+        assert model.with_inputs(growth=0.0).revenue[2028] == 200.0
+        assert model.with_inputs(growth=0.0).cash[2028] == _Plan(
+            growth=0.0, borrowing=_borrowing(y2026=50.0, y2027=120.0)
+        ).cash[2028]
+
+
+class TestSharing:
+
+    def test_shared_periods_are_calculated_once(self):
+        tree = _tree()
+        _CALLS.clear()
+        tree.evaluate()
+        # 2024-2025 once for all seven leaves; 2026 for the two "a" branches
+        # and "fast"; 2027-2028 for every leaf.
+        assert sorted(_CALLS) == sorted(
+            [2024, 2025] + [2024, 2025] + [2026] * 3 + [2027, 2028] * 7
+        )
+
+    def test_divergence_periods(self):
+        tree = _tree()
+        same, second = tree.children[:2]
+        assert tree.start is None
+        assert same.start is None  # borrows nothing extra: the root's inputs
+        assert second.start == 2026
+        assert [child.start for child in second.children] == [None, 2027, 2027]
+        assert tree.children[-1].start == 2024  # a scalar changes every period
+        assert second.children[1].path == ("a50", "b80")
+        assert second.children[1].inputs["borrowing"] == _borrowing(y2026=50.0, y2027=80.0)
+
+    def test_branch_matching_its_parent_with_earlier_sub_branches(self):
+        tree = ScenarioTree(_Plan)
+        same = tree.branch("same", borrowing=_borrowing())
+        tree.branch("late", borrowing=_borrowing(y2028=10.0))
+        same.branch("early", borrowing=_borrowing(y2025=40.0))
+        same.branch("later", borrowing=_borrowing(y2027=40.0))
+        assert same.start is None
+        _assert_matches_independent(tree, tree.evaluate())
+
+    def test_single_node(self):
+        models = ScenarioTree(_Plan, periods=[2024, 2025], growth=0.2).evaluate()
+        assert list(models) == [()]
+        assert models[()].revenue[2025] == pytest.approx(240.0)
+
+
+class TestFallback:
+
+    def test_vector_items_and_unknown_offsets(self):
+        np = pytest.importorskip("numpy")
+
+        total = VectorFormulaLine(lambda li: np.cumsum(li.revenue, axis=-1))
+        tree = _tree(_variant("Vector", total=total))
+        _assert_matches_independent(tree, tree.evaluate())
+
+        # A read of a fixed period has no offset from t that sharing can rely on.
+        indexed = FormulaLine(lambda li, t: li.revenue[t] / li.revenue[_PERIODS[0]])
+        tree = _tree(_variant("Indexed", indexed=indexed))
+        _assert_matches_independent(tree, tree.evaluate())
+
+    def test_other_engines(self):
+        tree = _tree(_variant("Lazy", engine="lazy"))
+        models = tree.evaluate()
+        assert models["a50", "b80"]._lazy
+        _assert_matches_independent(tree, models)
+
+
+class TestValidation:
+
+    def test_errors(self):
+        tree = ScenarioTree(_Plan)
+        tree.branch("a", growth=0.1)
+        with pytest.raises(ValueError, match="already has a branch named 'a'"):
+            tree.branch("a", growth=0.2)
+        with pytest.raises(TypeError):
+            tree.branch("b", growht=0.1)
@@ -0,0 +1,158 @@
+"""
+Tests for tornado analysis (ProformaModel.tornado / pyproforma.scenarios.tornado).
+"""
+
+import pytest
+
+from pyproforma import (
+    FormulaLine,
+    InputLine,
+    IterativeSolver,
+    ProformaModel,
+    ScalarInputLine,
+)
+from pyproforma.scenarios import TornadoBar, TornadoResult, tornado
+
+
+class _Project(ProformaModel):
+    default_periods = [2024, 2025, 2026]
+
+    growth = ScalarInputLine(default=0.05, label="Growth")
+    cost_share = ScalarInputLine(default=0.6)
+    fee = ScalarInputLine(default=0.0)
+    indexed = ScalarInputLine(default=True)
+    price = InputLine(values={2024: 10.0}, default={2025: 10.0, 2026: None})
+    units = FormulaLine(lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 100.0})
+    revenue = FormulaLine(lambda li, t: li.units[t] * (li.price[t] or li.price[t - 1]) + li.fee)
+    margin = FormulaLine(lambda li, t: li.revenue[t] * (1 - li.cost_share))
+
+
+def _batch(batch):
+    if batch:
+        pytest.importorskip("numpy")
+    return batch
+
+
+@pytest.mark.parametrize("batch", [True, False])
+class TestTornado:
+
+    def test_matches_individual_models(self, batch):
+        model = _Project()
+        result = model.tornado("margin", 2025, pct=0.2, batch=_batch(batch))
+        assert isinstance(result, TornadoResult)
+        assert result.base == model.margin[2025]
+        assert result.evaluations == 8
+        # Every numeric input, largest swing first; bools are not perturbed.
+        assert [bar.name for bar in result.bars] == ["cost_share", "price", "growth", "fee"]
+        for bar in result.bars:
+            assert isinstance(bar, TornadoBar)
+            low = _Project(**{bar.name: bar.low_input}).margin[2025]
+            high = _Project(**{bar.name: bar.high_input}).margin[2025]
+            assert bar.low == pytest.approx(low, rel=1e-12)
+            assert bar.high == pytest.approx(high, rel=1e-12)
+        assert result["growth"].low_input == pytest.approx(0.04)
+        assert result["fee"].swing == 0.0
+
+    def test_input_line_scales_unlocked_periods(self, batch):
+        result = _Project().tornado("margin", 2025, inputs=["price"], batch=_batch(batch))
+        bar = result["price"]
+        # 2024 is locked and 2026 has no value: both are left alone.
+        assert bar.low_input == {2025: 9.0, 2026: None}
+        assert bar.high_input == {2025: 11.0, 2026: None}
+        assert bar.swing == pytest.approx(2.0 * 105.0 * 0.4)
+
+    def test_only_selected_inputs(self, batch):
+        result = tornado(_Project(), "units", 2026, inputs=["fee", "growth"], batch=_batch(batch))
+        assert [bar.name for bar in result.bars] == ["growth", "fee"]
+        assert result["growth"].high == pytest.approx(100.0 * 1.055 ** 2)
+
+
+class TestEvaluation:
+
+    def test_one_batch_call_and_no_model_constructions(self, monkeypatch):
+        pytest.importorskip("numpy")
+        model = _Project()
+        calls, constructed = [], []
+        original_batch = _Project.evaluate_batch.__func__
+        original_init = ProformaModel.__init__
+
+        def counting_batch(cls, inputs, periods=None):
+            calls.append(len(inputs))
+            return original_batch(cls, inputs, periods)
+
+        def counting_init(self, *args, **kwargs):
+            constructed.append(self)
+            original_init(self, *args, **kwargs)
+
+        monkeypatch.setattr(_Project, "evaluate_batch", classmethod(counting_batch))
+        monkeypatch.setattr(ProformaModel, "__init__", counting_init)
+        model.tornado("margin", 2026)
+        model.tornado("margin", 2026, batch=False)
+        assert calls == [8]
+        assert constructed == []
+
+    def test_iterative_solver_uses_with_inputs(self):
+        class Circular(ProformaModel):
+            default_periods = [2024]
+            rate = ScalarInputLine(default=0.1)
+            revenue = FormulaLine(lambda li, t: 100.0 + li.interest[t])
+            interest = FormulaLine(lambda li, t: li.revenue[t] * li.rate)
+
+        model = Circular(solver=IterativeSolver())
+        result = model.tornado("revenue", 2024)
+        assert result["rate"].high == pytest.approx(100.0 / (1 - 0.11), rel=1e-6)
+
+    def test_model_is_unchanged(self):
+        model = _Project()
+        model.tornado("margin", 2026)
+        assert model.growth.value == 0.05
+        assert model.price[2025] == 10.0
+
+
+class TestChart:
+
+    def test_chart_holds_changes_from_base(self):
+        result = _Project().tornado("margin", 2025, inputs=["growth", "cost_share"])
+        chart = result.chart()
+        assert chart.chart_type == "tornado"
+        assert chart.title == "margin 2025"
+        low, high = chart.series
+        assert low.label == "Input -10%"
+        assert high.label == "Input +10%"
+        assert low.x_values == ["cost_share", "Growth"]
+        assert low.y_values == [bar.low - result.base for bar in result.bars]
+        assert high.y_values == [bar.high - result.base for bar in result.bars]
+
+    def test_figure(self):
+        pytest.importorskip("matplotlib")
+        import matplotlib.figure
+
+        chart = _Project().tornado("margin", 2025).chart(title="Margin drivers")
+        assert isinstance(chart.figure(), matplotlib.figure.Figure)
+
+    def test_to_dict(self):
+        data = _Project().tornado("margin", 2025, inputs=["growth"]).to_dict()
+        assert data["output"] == "margin"
+        assert [bar["name"] for bar in data["bars"]] == ["growth"]
+
+
+class TestValidation:
+
+    def test_errors(self):
+        model = _Project()
+        with pytest.raises(ValueError, match="'sales' is not a line item"):
+            model.tornado("sales", 2025)
+        with pytest.raises(ValueError, match="Period 2030 is not a period"):
+            model.tornado("margin", 2030)
+        with pytest.raises(ValueError, match="pct must be positive"):
+            model.tornado("margin", 2025, pct=0.0)
+        with pytest.raises(ValueError, match="'units' is not an input"):
+            model.tornado("margin", 2025, inputs=["units"])
+        with pytest.raises(ValueError, match="'indexed' has no numeric value"):
+            model.tornado("margin", 2025, inputs=["indexed"])
+        with pytest.raises(KeyError, match="'fee' is not an input"):
+            model.tornado("margin", 2025, inputs=["growth"])["fee"]
+
+    def test_output_without_value(self):
+        with pytest.raises(ValueError, match="'price' has no value in period 2026"):
+            _Project().tornado("price", 2026)
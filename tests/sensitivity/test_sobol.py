@@ -0,0 +1,158 @@
+"""
+Tests for variance-based global sensitivity (pyproforma.sensitivity).
+"""
+
+import pytest
+
+from pyproforma import FixedLine, FormulaLine, InputLine, ProformaModel, ScalarInputLine
+
+np = pytest.importorskip("numpy")
+
+from pyproforma.sensitivity import (  # noqa: E402
+    SobolResult,
+    latin_hypercube,
+    sobol_indices,
+    sobol_sequence,
+)
+from pyproforma.simulate import Uniform  # noqa: E402
+
+
+class _Product(ProformaModel):
+    default_periods = [2024, 2025]
+
+    x1 = ScalarInputLine(default=0.5)
+    x2 = ScalarInputLine(default=0.5)
+    growth = InputLine(values={2024: 0.0}, default={2025: 0.02})
+    product = FormulaLine(lambda li, t: li.x1 * li.x2)
+    weighted = FormulaLine(lambda li, t: 2 * li.x1 + li.x2)
+    base = FormulaLine(lambda li, t: li.base[t - 1] * (1 + li.growth[t]), values={2024: 1.0})
+    scaled = FormulaLine(lambda li, t: li.base[t] + li.x1)
+    constant = FixedLine(values={2024: 5.0, 2025: 5.0})
+
+
+_RANGES = {"x1": (0.0, 1.0), "x2": (0.0, 1.0)}
+
+
+class TestDesigns:
+
+    def test_latin_hypercube_has_one_point_per_stratum(self):
+        points = latin_hypercube(50, 3, seed=0)
+        assert points.shape == (50, 3)
+        for column in points.T:
+            assert sorted((column * 50).astype(int)) == list(range(50))
+
+    def test_sobol_sequence(self):
+        pytest.importorskip("scipy")
+        points = sobol_sequence(64, 4, seed=0)
+        assert points.shape == (64, 4)
+        assert points.min() >= 0 and points.max() < 1
+        # Balanced: each half of each coordinate holds exactly half the points.
+        assert ((points < 0.5).sum(axis=0) == 32).all()
+
+
+@pytest.mark.parametrize("sampler", ["lhs", "random", "sobol"])
+class TestIndices:
+
+    def test_analytic_values(self, sampler):
+        if sampler == "sobol":
+            pytest.importorskip("scipy")
+        result = sobol_indices(
+            _Product, _RANGES, ["product", "weighted"], n=4096, seed=1, sampler=sampler
+        )
+        assert isinstance(result, SobolResult)
+        tolerance = 0.01 if sampler == "sobol" else 0.05
+        # x1 * x2 on the unit square: S_1 = 3/7, ST_1 = 4/7.
+        first = result.first_order("product", 2025)
+        total = result.total_order("product", 2025)
+        for var in ("x1", "x2"):
+            assert first[var] == pytest.approx(3 / 7, abs=tolerance)
+            assert total[var] == pytest.approx(4 / 7, abs=tolerance)
+        # 2 * x1 + x2 is additive: shares 4/5 and 1/5, no interactions.
+        expected = {
+            "x1": pytest.approx(0.8, abs=tolerance),
+            "x2": pytest.approx(0.2, abs=tolerance),
+        }
+        assert result.first_order("weighted", 2025) == expected
+        assert result.total_order("weighted", 2025) == expected
+        assert result.variance("weighted", 2025) == pytest.approx(5 / 12, rel=0.05)
+
+
+class TestSobolIndices:
+
+    def test_confidence_intervals(self):
+        result = sobol_indices(_Product, _RANGES, ["product"], n=2048, seed=3, sampler="lhs")
+        intervals = result.first_order_interval("product", 2025)
+        first = result.first_order("product", 2025)
+        for var, (low, high) in intervals.items():
+            assert low < first[var] < high
+            assert high - low < 0.2
+        assert result.total_order_interval("product") == {
+            2024: result.total_order_interval("product", 2024),
+            2025: result.total_order_interval("product", 2025),
+        }
+
+    def test_chunking_and_seed_do_not_change_results(self):
+        kwargs = dict(n=512, seed=7, sampler="lhs", bootstrap=20)
+        small = sobol_indices(_Product, _RANGES, ["product"], chunk_size=10, **kwargs)
+        large = sobol_indices(_Product, _RANGES, ["product"], **kwargs)
+        assert small.first_order("product") == large.first_order("product")
+        assert small.total_order_interval("product") == large.total_order_interval("product")
+
+    def test_input_line_ranges(self):
+        result = sobol_indices(
+            _Product,
+            {"growth": (0.0, 0.1), "x1": Uniform(0.0, 0.01)},
+            ["scaled"],
+            n=1024,
+            seed=0,
+            sampler="lhs",
+        )
+        assert result.variables == ["growth", "x1"]
+        assert result.first_order("scaled", 2025)["growth"] > 0.9
+        per_period = sobol_indices(
+            _Product, {"growth": {2025: (0.0, 0.1)}}, ["scaled"], n=256, seed=0, bootstrap=0
+        )
+        assert per_period.variables == [("growth", 2025)]
+        assert per_period.first_order("scaled", 2025)[("growth", 2025)] == pytest.approx(1.0)
+
+    def test_constant_output_has_nan_indices(self):
+        result = sobol_indices(_Product, _RANGES, ["constant"], n=64, seed=0, bootstrap=0)
+        assert result.variance("constant", 2024) == 0.0
+        assert np.isnan(result.first_order("constant", 2024)["x1"])
+
+    def test_no_model_is_constructed(self, monkeypatch):
+        def fail(*args, **kwargs):
+            raise AssertionError("a model was instantiated")
+
+        monkeypatch.setattr(ProformaModel, "__init__", fail)
+        result = sobol_indices(_Product, _RANGES, ["product"], n=128, seed=0, bootstrap=0)
+        assert result.evaluations == 128 * 4
+        assert result.n == 128
+
+
+class TestValidation:
+
+    def test_bad_arguments(self):
+        with pytest.raises(ValueError, match="'revenue' is not a ScalarInputLine or InputLine"):
+            sobol_indices(_Product, {"revenue": (0, 1)}, ["product"])
+        with pytest.raises(ValueError, match=r"Range for x1 must be \(low, high\)"):
+            sobol_indices(_Product, {"x1": (1, 0)}, ["product"])
+        with pytest.raises(ValueError, match=r"Range for growth\[2025\]"):
+            sobol_indices(_Product, {"growth": {2025: 0.1}}, ["product"])
+        with pytest.raises(ValueError, match="unknown: profit"):
+            sobol_indices(_Product, _RANGES, ["profit"])
+        with pytest.raises(ValueError, match="both a fixed value and a range: x1"):
+            sobol_indices(_Product, _RANGES, ["product"], inputs={"x1": 0.2})
+        with pytest.raises(ValueError, match="Unknown sampler 'halton'"):
+            sobol_indices(_Product, _RANGES, ["product"], sampler="halton")
+        with pytest.raises(ValueError, match="confidence must be between 0 and 1"):
+            sobol_indices(_Product, _RANGES, ["product"], confidence=95)
+
+    def test_result_lookups(self):
+        result = sobol_indices(_Product, _RANGES, ["product"], n=32, seed=0, bootstrap=0)
+        with pytest.raises(KeyError, match="'weighted' is not among the outputs"):
+            result.first_order("weighted", 2025)
+        with pytest.raises(KeyError, match="Period 2030 not in evaluated periods"):
+            result.total_order("product", 2030)
+        with pytest.raises(ValueError, match="bootstrap=0"):
+            result.first_order_interval("product", 2025)
@@ -0,0 +1,209 @@
+"""
+Tests for Monte Carlo simulation (pyproforma.simulate).
+"""
+
+import pytest
+
+from pyproforma import FormulaLine, InputLine, ProformaModel, ScalarInputLine
+
+np = pytest.importorskip("numpy")
+
+from pyproforma.simulate import (  # noqa: E402
+    Distribution,
+    Empirical,
+    LogNormal,
+    Normal,
+    SimulationResult,
+    Triangular,
+    Uniform,
+    simulate,
+)
+
+
+class _Project(ProformaModel):
+    default_periods = [2024, 2025, 2026]
+
+    growth = ScalarInputLine(default=0.05)
+    cost_rate = ScalarInputLine(default=0.6)
+    price = InputLine(values={2024: 10.0}, default={2025: 10.0, 2026: 10.0})
+    units = FormulaLine(lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 100.0})
+    revenue = FormulaLine(lambda li, t: li.units[t] * li.price[t])
+    profit = FormulaLine(lambda li, t: li.revenue[t] * (1 - li.cost_rate))
+
+
+class TestDistributions:
+
+    @pytest.mark.parametrize(
+        "dist, low, high",
+        [
+            (Uniform(1.0, 2.0), 1.0, 2.0),
+            (Triangular(0.0, 0.5, 1.0), 0.0, 1.0),
+            (LogNormal(0.0, 0.5), 0.0, np.inf),
+            (Empirical([3.0, 4.0]), 3.0, 4.0),
+        ],
+    )
+    def test_samples_within_support(self, dist, low, high):
+        samples = dist.sample(np.random.default_rng(0), 1000)
+        assert samples.shape == (1000,)
+        assert samples.min() >= low and samples.max() <= high
+
+    def test_normal_moments(self):
+        samples = Normal(5.0, 2.0).sample(np.random.default_rng(0), 100_000)
+        assert samples.mean() == pytest.approx(5.0, abs=0.05)
+        assert samples.std() == pytest.approx(2.0, abs=0.05)
+
+    @pytest.mark.parametrize(
+        "factory",
+        [
+            lambda: Normal(0, -1),
+            lambda: LogNormal(0, -1),
+            lambda: Triangular(0, 2, 1),
+            lambda: Uniform(1, 1),
+            lambda: Empirical([]),
+        ],
+    )
+    def test_invalid_parameters(self, factory):
+        with pytest.raises(ValueError):
+            factory()
+
+    def test_base_class_is_abstract(self):
+        class Fixed(Distribution):
+            pass
+
+        with pytest.raises(TypeError):
+            Distribution()
+        with pytest.raises(TypeError):
+            Fixed()
+
+
+class TestSimulate:
+
+    def test_returns_simulation_result(self):
+        result = simulate(_Project, {"growth": Uniform(0.0, 0.1)}, n=100, seed=1)
+        assert isinstance(result, SimulationResult)
+        assert len(result) == 100
+        assert result.values("units").shape == (100, 3)
+
+    def test_draws_match_individual_models(self):
+        result = simulate(
+            _Project,
+            {"growth": Normal(0.05, 0.02), "price": {2026: Uniform(8, 12)}},
+            n=5,
+            seed=3,
+        )
+        for i in range(5):
+            model = _Project(
+                growth=float(result.samples["growth"][i]),
+                price={2025: 10.0, 2026: float(result.samples[("price", 2026)][i])},
+            )
+            for period in model.periods:
+                assert result.values("profit", period)[i] == model.profit[period]
+
+    def test_seed_is_reproducible(self):
+        spec = {"growth": Normal(0.05, 0.02)}
+        first = simulate(_Project, spec, n=50, seed=7)
+        second = simulate(_Project, spec, n=50, seed=7)
+        np.testing.assert_array_equal(first.values("profit"), second.values("profit"))
+
+    def test_chunking_does_not_change_results(self):
+        spec = {"growth": Normal(0.05, 0.02), "cost_rate": Uniform(0.5, 0.7)}
+        whole = simulate(_Project, spec, n=101, seed=2)
+        chunked = simulate(_Project, spec, n=101, seed=2, chunk_size=10)
+        np.testing.assert_array_equal(whole.values("profit"), chunked.values("profit"))
+
+    def test_single_distribution_on_input_line_skips_locked_periods(self):
+        result = simulate(_Project, {"price": Uniform(5, 6)}, n=20, seed=0)
+        assert np.all(result.values("price", 2024) == 10.0)
+        np.testing.assert_array_equal(
+            result.values("price", 2025), result.values("price", 2026)
+        )
+
+    def test_locked_period_raises(self):
+        with pytest.raises(ValueError, match="locked"):
+            simulate(_Project, {"price": {2024: Uniform(5, 6)}}, n=10, seed=0)
+
+    def test_unknown_input_raises(self):
+        with pytest.raises(ValueError, match="not a ScalarInputLine or InputLine"):
+            simulate(_Project, {"units": Uniform(5, 6)}, n=10, seed=0)
+
+    def test_fixed_inputs(self):
+        result = simulate(
+            _Project, {"growth": Uniform(0, 0.1)}, n=10, seed=0, inputs={"cost_rate": 1.0}
+        )
+        assert result.mean("profit", period=2026) == 0.0
+
+    def test_required_input_without_default(self):
+        class NoDefault(ProformaModel):
+            default_periods = [2024]
+            rate = ScalarInputLine()
+            doubled = FormulaLine(lambda li, t: li.rate * 2)
+
+        result = simulate(NoDefault, {"rate": Uniform(1, 2)}, n=10, seed=0)
+        np.testing.assert_array_equal(
+            result.values("doubled", 2024), result.samples["rate"] * 2
+        )
+
+
+class TestCorrelation:
+
+    def test_rank_correlation_imposed_and_marginals_kept(self):
+        spec = {"growth": Normal(0.05, 0.02), "cost_rate": Uniform(0.5, 0.7)}
+        independent = simulate(_Project, spec, n=5000, seed=4)
+        correlated = simulate(
+            _Project, spec, n=5000, seed=4, correlation={("growth", "cost_rate"): 0.7}
+        )
+        growth = correlated.samples["growth"]
+        cost = correlated.samples["cost_rate"]
+        ranks = np.corrcoef(np.argsort(np.argsort(growth)), np.argsort(np.argsort(cost)))
+        assert ranks[0, 1] == pytest.approx(0.7, abs=0.03)
+        np.testing.assert_array_equal(np.sort(growth), np.sort(independent.samples["growth"]))
+
+    def test_unknown_variable_raises(self):
+        with pytest.raises(ValueError, match="has no distribution"):
+            simulate(
+                _Project, {"growth": Normal(0, 1)}, n=10, seed=0,
+                correlation={("growth", "cost_rate"): 0.5},
+            )
+
+    def test_inconsistent_matrix_raises(self):
+        spec = {"growth": Normal(0, 1), "cost_rate": Normal(0, 1), "price": Normal(0, 1)}
+        correlation = {
+            ("growth", "cost_rate"): 0.9,
+            ("growth", "price"): 0.9,
+            ("cost_rate", "price"): -0.9,
+        }
+        with pytest.raises(ValueError, match="not positive definite"):
+            simulate(_Project, spec, n=10, seed=0, correlation=correlation)
+
+
+class TestSummaries:
+
+    @pytest.fixture
+    def result(self):
+        return simulate(_Project, {"growth": Uniform(0.0, 0.1)}, n=1000, seed=5)
+
+    def test_percentile_by_period(self, result):
+        p50 = result.percentile("units", 50)
+        assert list(p50) == [2024, 2025, 2026]
+        assert p50[2024] == 100.0
+        assert p50[2025] == pytest.approx(105.0, abs=1.0)
+
+    def test_percentile_single_period(self, result):
+        assert result.percentile("units", 0, period=2025) >= 100.0
+
+    def test_mean_and_std(self, result):
+        assert result.mean("growth") == pytest.approx(0.05, abs=0.005)
+        assert result.std("units", period=2024) == 0.0
+
+    def test_probability(self, result):
+        probability = result.probability("units", "<", 105.0, period=2025)
+        assert probability == pytest.approx(0.5, abs=0.06)
+        assert result.probability("units", ">=", 100.0) == {2024: 1.0, 2025: 1.0, 2026: 1.0}
+
+    def test_invalid_op(self, result):
+        with pytest.raises(ValueError, match="op must be one of"):
+            result.probability("units", "==", 1.0)
+
+    def test_unknown_item(self, result):
+        with pytest.raises(KeyError, match="not found in simulation"):
+            result.mean("nope")
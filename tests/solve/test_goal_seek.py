@@ -0,0 +1,162 @@
+"""
+Tests for goal seek (ProformaModel.goal_seek / pyproforma.solve.goal_seek).
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+)
+from pyproforma.engine import calculation_engine
+from pyproforma.solve import GoalSeekResult
+from pyproforma.solve.goal_seek import _brent
+
+EXAMPLES_DIR = Path(__file__).parent.parent.parent / "examples"
+
+_overhead_calls = []
+
+
+def _overhead(li, t):
+    _overhead_calls.append(t)
+    return li.fixed_costs[t] * 1.1
+
+
+class _Plan(ProformaModel):
+    default_periods = [2024, 2025, 2026]
+
+    growth = ScalarInputLine(default=0.05)
+    price_increase = InputLine(
+        values={2024: 0.0}, default={2025: 0.03, 2026: 0.03}
+    )
+    fixed_costs = FixedLine(values={2024: 40.0, 2025: 42.0, 2026: 45.0})
+    overhead = FormulaLine(_overhead)
+    price = FormulaLine(
+        lambda li, t: li.price[t - 1] * (1 + li.price_increase[t]), values={2024: 10.0}
+    )
+    units = FormulaLine(lambda li, t: li.units[t - 1] * (1 + li.growth), values={2024: 10.0})
+    revenue = FormulaLine(lambda li, t: li.price[t] * li.units[t])
+    coverage = FormulaLine(lambda li, t: li.revenue[t] / (li.overhead[t] + li.fixed_costs[t]))
+
+
+class TestScalarGoalSeek:
+
+    def test_hits_target(self):
+        model = _Plan()
+        result = model.goal_seek("revenue", period=2026, value=150.0, vary="growth")
+        assert isinstance(result, GoalSeekResult)
+        assert result.achieved == pytest.approx(150.0, abs=1e-9)
+        assert result.model.revenue[2026] == pytest.approx(150.0, abs=1e-9)
+        assert result.model.growth.value == result.value
+        assert model.growth.value == 0.05  # the original is untouched
+
+    def test_recomputes_only_descendants(self):
+        model = _Plan()
+        _overhead_calls.clear()
+        result = model.goal_seek("coverage", period=2026, value=1.5, vary="growth")
+        assert _overhead_calls == []
+        assert "overhead" not in result.model.recomputed_items
+        assert set(result.model.recomputed_items) == {"units", "revenue", "coverage"}
+
+    def test_bounds(self):
+        result = _Plan().goal_seek(
+            "revenue", period=2025, value=120.0, vary="growth", bounds=(0.0, 1.0)
+        )
+        # revenue[2025] = 10 * 1.03 * 10 * (1 + g)
+        assert result.value == pytest.approx(120.0 / 103.0 - 1, rel=1e-9)
+
+    def test_target_not_bracketed(self):
+        with pytest.raises(ValueError, match="does not cross"):
+            _Plan().goal_seek(
+                "revenue", period=2025, value=120.0, vary="growth", bounds=(0.0, 0.1)
+            )
+
+    def test_unreachable_target(self):
+        with pytest.raises(ValueError, match="Pass bounds"):
+            _Plan().goal_seek("revenue", period=2025, value=-1e30, vary="growth")
+
+    def test_target_independent_of_input(self):
+        with pytest.raises(ValueError, match="'overhead' does not depend on 'growth'"):
+            _Plan().goal_seek("overhead", period=2025, value=1.0, vary="growth")
+
+    def test_read_missed_by_the_graph(self, monkeypatch):
+        class Helped(ProformaModel):
+            default_periods = [2024, 2025]
+            rate = ScalarInputLine(default=1.0)
+            base = FixedLine(values={2024: 10.0, 2025: 10.0})
+            x = FormulaLine(lambda li, t: li.base[t] * (li.rate if t >= 2025 else 1.0))
+
+        # Simulate a formula whose read of rate the dependency graph cannot see.
+        monkeypatch.setattr(calculation_engine, "affected_line_items", lambda *args: set())
+        result = Helped().goal_seek("x", period=2025, value=20.0, vary="rate")
+        assert result.value == pytest.approx(2.0)
+        assert result.model.x[2025] == pytest.approx(20.0)
+
+    def test_scalar_needs_single_period(self):
+        with pytest.raises(ValueError, match="single target period"):
+            _Plan().goal_seek("revenue", value=150.0, vary="growth")
+
+    def test_vary_must_be_input(self):
+        with pytest.raises(ValueError, match="is not an input"):
+            _Plan().goal_seek("revenue", period=2025, value=1.0, vary="fixed_costs")
+
+    def test_target_must_be_line_item(self):
+        with pytest.raises(ValueError, match="is not a line item"):
+            _Plan().goal_seek("profit", period=2025, value=1.0, vary="growth")
+
+
+class TestPerPeriodGoalSeek:
+
+    def test_each_period_hits_target(self):
+        result = _Plan().goal_seek("coverage", value=1.2, vary="price_increase")
+        assert list(result.value) == [2025, 2026]
+        for period in (2025, 2026):
+            assert result.model.coverage[period] == pytest.approx(1.2, abs=1e-9)
+            assert result.model.price_increase[period] == result.value[period]
+        assert set(result.iterations) == {2025, 2026}
+
+    def test_targets_per_period(self):
+        result = _Plan().goal_seek(
+            "revenue", value={2025: 110.0, 2026: 130.0}, vary="price_increase"
+        )
+        assert result.achieved == pytest.approx({2025: 110.0, 2026: 130.0})
+
+    def test_single_period(self):
+        result = _Plan().goal_seek(
+            "revenue", period=2026, value=130.0, vary="price_increase"
+        )
+        assert isinstance(result.value, float)
+        assert result.model.revenue[2026] == pytest.approx(130.0, abs=1e-9)
+        assert result.model.price_increase[2025] == 0.03
+
+    def test_locked_period(self):
+        with pytest.raises(ValueError, match="locked in period 2024"):
+            _Plan().goal_seek("revenue", period=2024, value=1.0, vary="price_increase")
+
+
+class TestBrent:
+
+    def test_finds_root_of_cubic(self):
+        root, residual, iterations = _brent(
+            lambda x: x**3 - 2 * x - 5, 2.0, 3.0, -1.0, 16.0, 1e-12, 100
+        )
+        assert root == pytest.approx(2.0945514815423265, rel=1e-12)
+        assert abs(residual) <= 1e-12
+        assert iterations < 10
+
+
+def test_water_utility_dscr():
+    spec = importlib.util.spec_from_file_location(
+        "_water_utility", EXAMPLES_DIR / "water_utility" / "model.py"
+    )
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    result = mod.model.goal_seek("dscr", value=1.25, vary="rate_increase")
+    for period in result.value:
+        assert result.model.dscr[period] == pytest.approx(1.25, abs=1e-9)
@@ -82,3 +82,22 @@ class TestFormulaLinePrecedents:
 
         line = FormulaLine(formula=my_formula)
         assert line.precedents == ["revenue", "expenses"]
+
+    def test_trace_runs_once(self):
+        calls = []
+
+        def formula(li, t):
+            calls.append(t)
+            return li.revenue[t]
+
+        line = FormulaLine(formula=formula)
+        assert line.precedents == ["revenue"]
+        assert line.tag_references == []
+        assert line.precedents == ["revenue"]
+        assert len(calls) == 1
+
+    def test_reassigned_formula_is_retraced(self):
+        line = FormulaLine(formula=lambda li, t: li.revenue[t])
+        assert line.precedents == ["revenue"]
+        line.formula = lambda li, t: li.costs[t]
+        assert line.precedents == ["costs"]
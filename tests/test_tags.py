@@ -4,7 +4,9 @@ Tests for tags functionality in v2 API.
 
 import pytest
 
-from pyproforma import FixedLine, FormulaLine, ProformaModel
+from pyproforma import FixedLine, FormulaLine, LineItemValues, ProformaModel
+
+REVENUE_TAG = "rev"
 
 
 class TestLineTags:
@@ -349,3 +351,79 @@ class TestModelTagSelection:
 
         income_selection = model.tag["income"]
         assert set(income_selection.names) == {"revenue", "interest"}
+
+
+class TestTagIndex:
+    """Tests for the class-level tag index and memoised tag sums."""
+
+    class _Model(ProformaModel):
+        default_periods = [2024, 2025]
+        sales = FixedLine(values={2024: 100, 2025: 110}, tags=["revenue", "operating"])
+        fees = FixedLine(values={2024: 10, 2025: 20}, tags=["revenue"])
+        rent = FixedLine(values={2024: 5, 2025: 5}, tags=["operating"])
+        total = FormulaLine(lambda li, t: li.tag["revenue"][t])
+        doubled = FormulaLine(lambda li, t: li.tag["revenue"][t] * 2)
+
+    def test_index_built_at_class_creation(self):
+        """Test that tag members are indexed in declaration order."""
+        assert self._Model._tag_members == {
+            "revenue": ["sales", "fees"],
+            "operating": ["sales", "rent"],
+        }
+
+    def test_sum_memoised_once_members_computed(self):
+        """Test that a completed tag sum is cached on the value store."""
+        model = self._Model()
+        assert model.doubled[2025] == 260
+        assert model._li._tag_sums[("revenue", 2024)] == 110
+
+    def test_set_invalidates_memoised_sum(self):
+        """Test that overwriting a member value drops the cached sum."""
+        model = self._Model()
+        model._li.set("fees", 2024, 50)
+        assert ("revenue", 2024) not in model._li._tag_sums
+        assert model._li.tag["revenue"][2024] == 150
+
+    def test_incomplete_sum_raises(self):
+        """Test that a sum over members not yet computed raises instead of being partial."""
+        model = self._Model(lazy=True)
+        li = model._li
+        assert li.tag["revenue"][2024] == 110  # lazy store computes members on demand
+        assert ("revenue", 2024) in li._tag_sums
+
+        partial = LineItemValues(periods=[2024], names=["sales", "fees"], model=model)
+        partial.set("sales", 2024, 100)
+        with pytest.raises(KeyError, match="Period 2024 not yet calculated for 'fees'"):
+            partial.tag["revenue"][2024]
+        assert partial._tag_sums == {}
+
+    def test_tag_name_in_variable(self):
+        """Test that a reader declared first waits for members of a tag held in a variable."""
+
+        class VariableTag(ProformaModel):
+            default_periods = [2024, 2025, 2026]
+            total = FormulaLine(lambda li, t: li.tag[REVENUE_TAG][t] if t > 2024 else 0.0)
+            sales = FormulaLine(lambda li, t: 100.0 + (t - 2024) * 10, tags=["rev"])
+
+        for engine in ("reference", "planned", "lazy"):
+            model = VariableTag(engine=engine)
+            assert [model.total[t] for t in model.periods] == [0.0, 110.0, 120.0], engine
+
+    @pytest.mark.parametrize("engine", ["reference", "planned", "lazy", "numpy"])
+    def test_self_tagged_total(self, engine):
+        """Test that a total carrying the tag it sums adds up the other members."""
+        if engine == "numpy":
+            pytest.importorskip("numpy")
+
+        class SelfTagged(ProformaModel):
+            default_periods = [2024, 2025]
+            sales = FixedLine(values={2024: 5.0, 2025: 6.0}, tags=["rev"])
+            fees = FormulaLine(lambda li, t: li.sales[t] * 2, tags=["rev"])
+            total = FormulaLine(lambda li, t: li.tag["rev"][t], tags=["rev"])
+
+        model = SelfTagged(engine=engine)
+        assert [model.total[t] for t in model.periods] == [15.0, 18.0]
+
+    def test_model_tag_selection_uses_index(self):
+        """Test that model.tag resolves members from the index."""
+        assert self._Model().tag["operating"].names == ["sales", "rent"]
@@ -0,0 +1,279 @@
+"""
+Tests for incremental recalculation via ProformaModel.with_inputs().
+"""
+
+import importlib.util
+from pathlib import Path
+
+import pytest
+
+from pyproforma import (
+    FixedLine,
+    FormulaLine,
+    InputLine,
+    ProformaModel,
+    ScalarInputLine,
+    create_debt_lines,
+)
+from pyproforma.specs import formula_line
+
+EXAMPLES_DIR = Path(__file__).parent.parent / "examples"
+
+
+def _load_module(path):
+    spec = importlib.util.spec_from_file_location("_example", path)
+    mod = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(mod)
+    return mod
+
+
+class _Model(ProformaModel):
+    default_periods = [2024, 2025, 2026]
+
+    tax_rate = ScalarInputLine(default=0.2)
+    price = InputLine(values={2024: 10.0}, default={2025: 11.0, 2026: 12.0})
+    units = FixedLine(values={2024: 100, 2025: 110, 2026: 120})
+    revenue = FormulaLine(lambda li, t: li.units[t] * li.price[t], tags=["income"])
+    fees = FormulaLine(lambda li, t: li.units[t] * 0.5, tags=["income"])
+    total = FormulaLine(lambda li, t: li.tag["income"][t])
+    tax = FormulaLine(lambda li, t: li.total[t] * li.tax_rate)
+    headcount = FormulaLine(lambda li, t: li.units[t] / 10)
+
+
+def _assert_same_values(model, expected):
+    for name in expected.line_item_names:
+        assert model[name].values == expected[name].values, name
+
+
+class TestWithInputs:
+
+    def test_matches_fresh_instance(self):
+        base = _Model()
+        changed = base.with_inputs(tax_rate=0.3, price={2025: 20.0, 2026: 21.0})
+        _assert_same_values(changed, _Model(tax_rate=0.3, price={2025: 20.0, 2026: 21.0}))
+
+    def test_base_model_unchanged(self):
+        base = _Model()
+        before = base.tax.values.copy()
+        base.with_inputs(tax_rate=0.5)
+        assert base.tax.values == before
+
+    def test_scalar_change_recomputes_only_dependents(self):
+        changed = _Model().with_inputs(tax_rate=0.3)
+        assert changed.recomputed_items == ["tax"]
+
+    def test_input_line_change_follows_tags(self):
+        changed = _Model().with_inputs(price={2025: 20.0, 2026: 21.0})
+        assert changed.recomputed_items == ["price", "revenue", "total", "tax"]
+
+    def test_unaffected_values_are_shared(self):
+        base = _Model()
+        changed = base.with_inputs(tax_rate=0.3)
+        assert changed._li.get("headcount") is base._li.get("headcount")
+        assert changed._li.get("tax") is not base._li.get("tax")
+
+    def test_unchanged_inputs_recompute_nothing(self):
+        changed = _Model().with_inputs(tax_rate=0.2)
+        assert changed.recomputed_items == []
+
+    def test_new_instance_recomputes_everything(self):
+        assert _Model().recomputed_items == _Model._line_item_names
+
+    def test_chained_changes(self):
+        model = _Model().with_inputs(tax_rate=0.3).with_inputs(price={2025: 1.0, 2026: 2.0})
+        _assert_same_values(model, _Model(tax_rate=0.3, price={2025: 1.0, 2026: 2.0}))
+
+    def test_validation_errors_match_init(self):
+        base = _Model()
+        with pytest.raises(TypeError, match="unexpected keyword arguments"):
+            base.with_inputs(bogus=1)
+        with pytest.raises(ValueError, match="locked"):
+            base.with_inputs(price={2024: 1.0})
+
+    def test_branch_not_taken_while_tracing_is_a_dependency(self):
+        class Branching(ProformaModel):
+            default_periods = [2024]
+            switch = ScalarInputLine(default=0.0)
+            fallback = ScalarInputLine(default=5.0)
+            value = FormulaLine(lambda li, t: 1.0 if li.switch > 0 else li.fallback)
+
+        changed = Branching().with_inputs(fallback=7.0)
+        assert changed.recomputed_items == ["value"]
+        assert changed.value[2024] == 7.0
+
+    def test_untraceable_formula_always_recomputed(self):
+        def unpredictable(li, t):
+            return li.units[t] * {2024: 1, 2025: 2}[t]
+
+        class Untraceable(ProformaModel):
+            default_periods = [2024, 2025]
+            rate = ScalarInputLine(default=1.0)
+            units = FixedLine(values={2024: 1, 2025: 2})
+            scaled = FormulaLine(unpredictable)
+            other = FormulaLine(lambda li, t: li.units[t] * li.rate)
+
+        changed = Untraceable().with_inputs(rate=2.0)
+        assert changed.recomputed_items == ["scaled", "other"]
+
+    def test_helper_function_reads_are_dependencies(self):
+        changed = _Helped().with_inputs(rate={2024: 1.0, 2025: 2.5})
+        assert "x" in changed.recomputed_items
+        assert changed.x[2025] == _Helped(rate={2024: 1.0, 2025: 2.5}).x[2025] == 50.0
+
+    def test_opaque_callable_depends_on_every_input(self):
+        class Scale:
+            def __call__(self, li, t):
+                return li.base[t] * li.rate[t]
+
+        scale = Scale()
+
+        class Opaque(ProformaModel):
+            default_periods = [2024, 2025]
+            g = ScalarInputLine(default=1.0)
+            rate = InputLine(default={2024: 1.0, 2025: 1.0})
+            base = FixedLine(values={2024: 10.0, 2025: 10.0})
+            x = FormulaLine(lambda li, t: scale(li, t))
+
+        assert "g" in Opaque.graph.precedents("x")  # never read, but cannot be ruled out
+        assert Opaque().with_inputs(rate={2024: 1.0, 2025: 3.0}).x[2025] == 30.0
+
+    def test_helper_in_a_container_depends_on_every_input(self):
+        class Contained(ProformaModel):
+            default_periods = [2024, 2025]
+            rate = InputLine(default={2024: 1.0, 2025: 1.0})
+            base = FixedLine(values={2024: 10.0, 2025: 10.0})
+            x = FormulaLine(lambda li, t: _HELPERS["calc"](li, t))
+
+        rate = {2024: 1.0, 2025: 3.0}
+        assert "rate" in Contained.graph.precedents("x")
+        assert Contained().with_inputs(rate=rate).x[2025] == Contained(rate=rate).x[2025] == 30.0
+
+    def test_getattr_with_a_branching_name(self):
+        class Branching(ProformaModel):
+            default_periods = [2024, 2025]
+            aa = ScalarInputLine(default=2.0)
+            bb = ScalarInputLine(default=3.0)
+            x = FormulaLine(lambda li, t: getattr(li, "aa" if t < 2025 else "bb"))
+
+        assert Branching().with_inputs(bb=5.0).x[2025] == Branching(bb=5.0).x[2025] == 5.0
+
+    def test_getattr_with_a_computed_name(self):
+        class Computed(ProformaModel):
+            default_periods = [2024, 2025]
+            pick = ScalarInputLine(default=0)
+            aa = ScalarInputLine(default=1.0)
+            bb = ScalarInputLine(default=1.0)
+            x = FormulaLine(lambda li, t: getattr(li, ["aa", "bb"][int(li.pick)]) * 10)
+
+        changed = Computed(pick=1).with_inputs(bb=7.0)
+        assert changed.x[2025] == Computed(pick=1, bb=7.0).x[2025] == 70.0
+
+    def test_tag_name_in_a_variable_is_a_dependency(self):
+        class VariableTag(ProformaModel):
+            default_periods = [2024, 2025]
+            g = ScalarInputLine(default=0.1)
+            sales = FormulaLine(lambda li, t: 100 * (1 + li.g), tags=["rev"])
+            total = FormulaLine(lambda li, t: li.tag[_TAG][t] if t > 2024 else 0.0)
+
+        assert VariableTag.graph.precedents("total") == ["sales"]
+        changed = VariableTag().with_inputs(g=0.5)
+        assert changed.recomputed_items == ["sales", "total"]
+        assert changed.total[2025] == VariableTag(g=0.5).total[2025] == 150.0
+
+    def test_computed_tag_name_depends_on_every_input(self):
+        prefix = "r"
+
+        class ComputedTag(ProformaModel):
+            default_periods = [2024, 2025]
+            g = ScalarInputLine(default=0.1)
+            sales = FormulaLine(lambda li, t: 100 * (1 + li.g), tags=["rev"])
+            total = FormulaLine(lambda li, t: li.tag[prefix + "ev"][t] if t > 2024 else 0.0)
+
+        assert "g" in ComputedTag.graph.precedents("total")
+        changed = ComputedTag().with_inputs(g=0.5)
+        assert changed.total[2025] == ComputedTag(g=0.5).total[2025] == 150.0
+
+    def test_helper_from_an_installed_package_depends_on_every_input(
+        self, tmp_path, monkeypatch
+    ):
+        site_packages = tmp_path / "site-packages"
+        site_packages.mkdir()
+        monkeypatch.setattr(formula_line, "_STDLIB_PATHS", (str(tmp_path),))
+        monkeypatch.setattr(formula_line, "_PACKAGE_PATHS", (str(site_packages),))
+        path = site_packages / "_other_helpers.py"
+        path.write_text(
+            "def calc(li, t):\n"
+            "    return li.base[t] * (li.rate[t] if t >= 2025 else 1.0)\n"
+        )
+        calc = _load_module(path).calc
+
+        class Imported(ProformaModel):
+            default_periods = [2024, 2025]
+            rate = InputLine(default={2024: 1.0, 2025: 1.0})
+            base = FixedLine(values={2024: 10.0, 2025: 10.0})
+            x = FormulaLine(lambda li, t: calc(li, t))
+
+        assert Imported().with_inputs(rate={2024: 1.0, 2025: 3.0}).x[2025] == 30.0
+
+
+_TAG = "rev"
+
+
+def _helper(li, t):
+    # Branches on t: a trace at t=0 never reads li.rate.
+    return li.base[t] * (li.rate[t] if t >= 2025 else 1.0)
+
+
+class _Helped(ProformaModel):
+    default_periods = [2024, 2025]
+
+    g = ScalarInputLine(default=2.0)
+    rate = InputLine(default={2024: 1.0, 2025: 1.0})
+    base = FixedLine(values={2024: 10.0, 2025: 10.0})
+    x = FormulaLine(lambda li, t: _helper(li, t) * li.g)
+
+
+_HELPERS = {"calc": _helper}
+
+
+class TestWithInputsDebt:
+
+    class _DebtModel(ProformaModel):
+        default_periods = [2024, 2025, 2026]
+        par = InputLine(default={2024: 1000.0, 2025: 0.0, 2026: 0.0})
+        rate = ScalarInputLine(default=0.05)
+        opex = ScalarInputLine(default=10.0)
+        term = FixedLine(values={2024: 3, 2025: 3, 2026: 3})
+        principal, interest = create_debt_lines(
+            par_amounts="par", interest_rate="rate", term="term"
+        )
+        costs = FormulaLine(lambda li, t: li.opex * 2)
+
+    def test_debt_lines_recomputed_when_rate_changes(self):
+        changed = self._DebtModel().with_inputs(rate=0.08)
+        assert changed.recomputed_items == ["principal", "interest"]
+        _assert_same_values(changed, self._DebtModel(rate=0.08))
+
+    def test_debt_schedule_reused_when_unaffected(self):
+        base = self._DebtModel()
+        changed = base.with_inputs(opex=20.0)
+        assert changed.recomputed_items == ["costs"]
+        assert list(changed._debt_calculators.values()) == list(
+            base._debt_calculators.values()
+        )
+
+
+class TestWaterUtilityWithInputs:
+
+    def test_matches_fresh_instance(self):
+        mod = _load_module(EXAMPLES_DIR / "water_utility" / "model.py")
+        cls = mod.WaterUtilityModel
+        base = cls()
+        for kwargs in (
+            {"inflation_rate": 0.05},
+            {"new_bond_rate": 0.06},
+            {"rate_increase": {2026: 0.1, 2027: 0.0, 2028: 0.0, 2029: 0.0, 2030: 0.0}},
+        ):
+            changed = base.with_inputs(**kwargs)
+            _assert_same_values(changed, cls(**kwargs))
+            assert len(changed.recomputed_items) < len(cls._line_item_names)